@@ -0,0 +1,5 @@
+"""
+Project-wide pytest configuration.
+"""
+
+pytest_plugins = ['venezuelan_pos.core.pytest_query_budget']
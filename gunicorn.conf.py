@@ -5,13 +5,30 @@ Gunicorn configuration for Venezuelan POS System.
 import multiprocessing
 import os
 
+# Serving mode: "wsgi" (sync workers) or "asgi" (uvicorn workers, which
+# run the async availability and ticket validation views on an event loop)
+server_mode = os.environ.get("GUNICORN_SERVER_MODE", "wsgi").lower()
+if server_mode not in ("wsgi", "asgi"):
+    raise ValueError(f"GUNICORN_SERVER_MODE must be 'wsgi' or 'asgi', not {server_mode!r}")
+
+# Application (an application given on the command line takes precedence)
+wsgi_app = (
+    "venezuelan_pos.asgi:application" if server_mode == "asgi"
+    else "venezuelan_pos.wsgi:application"
+)
+
 # Server socket
 bind = "0.0.0.0:8000"
 backlog = 2048
 
 # Worker processes
-workers = multiprocessing.cpu_count() * 2 + 1
-worker_class = "sync"  # Use sync for WSGI apps like Django
+if server_mode == "asgi":
+    # Each worker's event loop serves many requests; one per core is enough
+    workers = multiprocessing.cpu_count() + 1
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    workers = multiprocessing.cpu_count() * 2 + 1
+    worker_class = "sync"  # Use sync for WSGI apps like Django
 worker_connections = 1000
 timeout = 30
 keepalive = 2
@@ -154,15 +154,52 @@ analyze_results() {
     echo ""
 }
 
+# Function to compare sync and ASGI deployments on the async endpoints
+run_comparison() {
+    local sync_url=${SYNC_URL:-$TARGET_URL}
+    local asgi_url=${ASGI_URL:-"http://localhost:8001"}
+    local config_file="load_testing/artillery_async_config.yml"
+    
+    echo -e "${YELLOW}Comparing sync ($sync_url) and ASGI ($asgi_url) deployments...${NC}"
+    
+    for mode in sync asgi; do
+        local url=$sync_url
+        [ "$mode" = "asgi" ] && url=$asgi_url
+        artillery run \
+            --target "$url" \
+            --output "$RESULTS_DIR/compare_${mode}_${TIMESTAMP}.json" \
+            "$config_file"
+    done
+    
+    if command -v jq &> /dev/null; then
+        echo ""
+        echo -e "${BLUE}Sync vs ASGI:${NC}"
+        printf "  %-10s %12s %10s %10s %10s\n" "Mode" "Requests" "Mean" "P95" "P99"
+        for mode in sync asgi; do
+            local result="$RESULTS_DIR/compare_${mode}_${TIMESTAMP}.json"
+            printf "  %-10s %12s %8sms %8sms %8sms\n" "$mode" \
+                "$(jq '.aggregate.counters["http.requests"] // 0' "$result")" \
+                "$(jq '.aggregate.latency.mean // .aggregate.summaries["http.response_time"].mean // 0' "$result")" \
+                "$(jq '.aggregate.latency.p95 // .aggregate.summaries["http.response_time"].p95 // 0' "$result")" \
+                "$(jq '.aggregate.latency.p99 // .aggregate.summaries["http.response_time"].p99 // 0' "$result")"
+        done
+    else
+        echo -e "${YELLOW}Install 'jq' for a side-by-side comparison${NC}"
+    fi
+    
+    echo ""
+}
+
 # Main execution
 echo -e "${YELLOW}Select test type:${NC}"
 echo "1. Smoke test (quick validation)"
 echo "2. Standard load test"
 echo "3. Stress test (high load)"
 echo "4. All tests"
+echo "5. Sync vs ASGI comparison (SYNC_URL, ASGI_URL)"
 echo ""
 
-read -p "Enter your choice (1-4): " choice
+read -p "Enter your choice (1-5): " choice
 
 case $choice in
     1)
@@ -237,6 +274,9 @@ EOF
         run_test "stress_test" "$stress_config"
         analyze_results
         ;;
+    5)
+        run_comparison
+        ;;
     *)
         echo -e "${RED}Invalid choice${NC}"
         exit 1
@@ -7,6 +7,7 @@ from rest_framework.filters import OrderingFilter, SearchFilter
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
+from venezuelan_pos.core.db_router import with_reporting_db
 from .models import Customer, CustomerPreferences
 from .serializers import (
     CustomerSerializer,
@@ -270,6 +271,7 @@ def customer_lookup(request):
 )
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@with_reporting_db
 def customer_statistics(request):
     """
     Get customer statistics for the current tenant.
@@ -7,6 +7,7 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.utils.translation import gettext as _
 
+from venezuelan_pos.core.db_router import with_reporting_db
 from .models import Customer, CustomerPreferences
 from .forms import (
     CustomerForm, CustomerPreferencesForm, CustomerSearchForm,
@@ -295,6 +296,7 @@ def customer_toggle_active(request, pk):
 
 
 @login_required
+@with_reporting_db
 def customer_dashboard(request):
     """Customer management dashboard."""
     from django.db.models import Count, Q
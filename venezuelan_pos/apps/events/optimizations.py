@@ -145,57 +145,41 @@ class EventQueryOptimizer:
     
     @staticmethod
     def get_event_dashboard_data(event):
-        """Get optimized data for event dashboard."""
-        cache_key = f'event_dashboard_{event.id}'
-        data = cache.get(cache_key)
+        """
+        Get optimized data for event dashboard.
+        Zone availability and sales come from the event's dashboard snapshot,
+        which is cached and refreshed on sales, so nothing is cached on top.
+        """
+        from venezuelan_pos.apps.reports.dashboards import dashboard_snapshots
         
-        if data is None:
-            # Get zones with availability
-            zones_data = event.zones.annotate(
-                total_seats=Count('seats'),
-                available_seats=Count('seats', filter=Q(seats__status='available')),
-                sold_seats=Count('seats', filter=Q(seats__status='sold')),
-                reserved_seats=Count('seats', filter=Q(seats__status='reserved'))
-            ).values(
-                'id', 'name', 'zone_type', 'capacity',
-                'total_seats', 'available_seats', 'sold_seats', 'reserved_seats'
-            )
-            
-            # Get sales summary
-            sales_summary = event.transactions.filter(
-                status='completed'
-            ).aggregate(
-                total_revenue=Sum('total_amount'),
-                total_transactions=Count('id'),
-                total_tickets=Count('items__id'),
-                average_transaction=Avg('total_amount')
-            )
-            
-            # Get current price stages
-            current_stages = event.zones.prefetch_related(
-                Prefetch(
-                    'price_stages',
-                    queryset=models.QuerySet().filter(
-                        is_active=True,
-                        start_date__lte=timezone.now(),
-                        end_date__gte=timezone.now()
-                    ).order_by('stage_order')
-                )
-            ).values(
-                'id', 'name', 'price_stages__name', 'price_stages__modifier_value'
+        snapshot = dashboard_snapshots.get_event_snapshot(event)
+        sales = snapshot['sales']
+        
+        # Get current price stages
+        current_stages = event.zones.prefetch_related(
+            Prefetch(
+                'price_stages',
+                queryset=models.QuerySet().filter(
+                    is_active=True,
+                    start_date__lte=timezone.now(),
+                    end_date__gte=timezone.now()
+                ).order_by('stage_order')
             )
-            
-            data = {
-                'zones': list(zones_data),
-                'sales_summary': sales_summary,
-                'current_stages': list(current_stages),
-                'last_updated': timezone.now().isoformat(),
-            }
-            
-            # Cache for 2 minutes (frequent updates needed)
-            cache.set(cache_key, data, 120)
+        ).values(
+            'id', 'name', 'price_stages__name', 'price_stages__modifier_value'
+        )
         
-        return data
+        return {
+            'zones': snapshot['zones'],
+            'sales_summary': {
+                'total_revenue': sales['total_revenue'],
+                'total_transactions': sales['total_transactions'],
+                'total_tickets': sales['total_tickets'],
+                'average_transaction': sales['average_transaction_value'],
+            },
+            'current_stages': list(current_stages),
+            'last_updated': snapshot['as_of'].isoformat(),
+        }
     
     @staticmethod
     def get_event_seat_map_data(event):
@@ -299,7 +283,6 @@ class EventQueryOptimizer:
     def invalidate_event_cache(event_id):
         """Invalidate all cached data for an event."""
         cache_keys = [
-            f'event_dashboard_{event_id}',
             f'event_seat_map_{event_id}',
             f'event_pricing_{event_id}',
         ]
@@ -325,42 +308,14 @@ class EventQueryOptimizer:
     
     @staticmethod
     def get_event_performance_metrics(event):
-        """Get comprehensive performance metrics for an event."""
-        cache_key = f'event_metrics_{event.id}'
-        metrics = cache.get(cache_key)
+        """Get comprehensive performance metrics for an event from its cached snapshot."""
+        from venezuelan_pos.apps.reports.dashboards import dashboard_snapshots
         
-        if metrics is None:
-            # Sales metrics
-            sales_data = event.transactions.filter(status='completed').aggregate(
-                total_revenue=Sum('total_amount'),
-                total_transactions=Count('id'),
-                total_tickets=Count('items__id'),
-                average_transaction_value=Avg('total_amount'),
-                first_sale=models.Min('completed_at'),
-                last_sale=models.Max('completed_at')
-            )
-            
-            # Capacity metrics
-            capacity_data = event.zones.aggregate(
-                total_capacity=Sum('capacity'),
-                total_seats=Count('seats'),
-                sold_seats=Count('seats', filter=Q(seats__status='sold')),
-                available_seats=Count('seats', filter=Q(seats__status='available'))
-            )
-            
-            # Calculate occupancy rate
-            occupancy_rate = 0
-            if capacity_data['total_seats'] and capacity_data['sold_seats']:
-                occupancy_rate = (capacity_data['sold_seats'] / capacity_data['total_seats']) * 100
-            
-            metrics = {
-                'sales': sales_data,
-                'capacity': capacity_data,
-                'occupancy_rate': round(occupancy_rate, 2),
-                'last_updated': timezone.now().isoformat(),
-            }
-            
-            # Cache for 5 minutes
-            cache.set(cache_key, metrics, 300)
+        snapshot = dashboard_snapshots.get_event_snapshot(event)
         
-        return metrics
\ No newline at end of file
+        return {
+            'sales': snapshot['sales'],
+            'capacity': snapshot['capacity'],
+            'occupancy_rate': snapshot['occupancy_rate'],
+            'last_updated': snapshot['as_of'].isoformat(),
+        }
\ No newline at end of file
@@ -9,11 +9,13 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from datetime import datetime, timedelta
 
+from venezuelan_pos.core.db_router import with_reporting_db
 from .models import Venue, Event, EventConfiguration
 from .forms import VenueForm, EventForm, EventConfigurationForm
 
 
 @login_required
+@with_reporting_db
 def dashboard(request):
     """Dashboard principal para tenant admins."""
     
@@ -10,8 +10,8 @@ from django.utils import timezone
 from django.db.models import Count, Sum
 from django.contrib.admin import SimpleListFilter
 from .models import (
-    FiscalSeries, FiscalSeriesCounter, FiscalDay, FiscalReport,
-    AuditLog, TaxConfiguration, TaxCalculationHistory
+    FiscalSeries, FiscalSeriesCounter, FiscalDay, FiscalDayLedger, FiscalReport,
+    AuditLog, AuditLogBatch, TaxConfiguration, TaxCalculationHistory
 )
 
 
@@ -145,6 +145,40 @@ class FiscalDayAdmin(admin.ModelAdmin):
     close_fiscal_days.short_description = "Close selected fiscal days"
 
 
+@admin.register(FiscalDayLedger)
+class FiscalDayLedgerAdmin(admin.ModelAdmin):
+    """Admin interface for Fiscal Day Ledgers"""
+    list_display = [
+        'fiscal_date', 'tenant', 'transaction_count', 'total_amount',
+        'total_tax', 'payment_count', 'first_series', 'last_series', 'updated_at'
+    ]
+    list_filter = [TenantFilter, 'fiscal_date']
+    search_fields = ['tenant__name', 'first_series', 'last_series']
+    readonly_fields = [field.name for field in FiscalDayLedger._meta.fields]
+    date_hierarchy = 'fiscal_date'
+    
+    actions = ['rebuild_ledgers']
+    
+    def has_add_permission(self, request):
+        """Prevent manual creation - ledgers are maintained by sales"""
+        return False
+    
+    def rebuild_ledgers(self, request, queryset):
+        """Admin action to recompute selected ledgers from source records"""
+        from .services import FiscalLedgerService
+        
+        rebuilt_count = 0
+        for ledger in queryset:
+            FiscalLedgerService.rebuild_ledger(ledger.tenant, ledger.fiscal_date)
+            rebuilt_count += 1
+        
+        self.message_user(
+            request,
+            f"Successfully rebuilt {rebuilt_count} fiscal day ledgers."
+        )
+    rebuild_ledgers.short_description = "Rebuild selected ledgers from transactions"
+
+
 @admin.register(FiscalReport)
 class FiscalReportAdmin(admin.ModelAdmin):
     """Admin interface for Fiscal Reports"""
@@ -214,7 +248,8 @@ class AuditLogAdmin(admin.ModelAdmin):
     readonly_fields = [
         'id', 'tenant', 'user', 'action_type', 'object_type',
         'object_id', 'fiscal_series', 'timestamp', 'ip_address',
-        'user_agent', 'old_values', 'new_values', 'description'
+        'user_agent', 'old_values', 'new_values', 'description',
+        'batch', 'entry_hash'
     ]
     fieldsets = (
         ('Audit Information', {
@@ -231,6 +266,10 @@ class AuditLogAdmin(admin.ModelAdmin):
             'fields': ('old_values', 'new_values', 'description'),
             'classes': ('collapse',)
         }),
+        ('Tamper Evidence', {
+            'fields': ('batch', 'entry_hash'),
+            'classes': ('collapse',)
+        }),
     )
     date_hierarchy = 'timestamp'
     
@@ -255,6 +294,30 @@ class AuditLogAdmin(admin.ModelAdmin):
         return False
 
 
+@admin.register(AuditLogBatch)
+class AuditLogBatchAdmin(admin.ModelAdmin):
+    """Admin interface for Audit Log Batches"""
+    list_display = [
+        'sequence', 'tenant', 'entry_count', 'batch_hash', 'created_at'
+    ]
+    list_filter = [TenantFilter, 'created_at']
+    search_fields = ['tenant__name', 'batch_hash', 'entries_hash']
+    readonly_fields = [field.name for field in AuditLogBatch._meta.fields]
+    date_hierarchy = 'created_at'
+    
+    def has_add_permission(self, request):
+        """Prevent manual creation - batches are written by the audit writer"""
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        """Prevent modification - batches are immutable"""
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        """Prevent deletion - batches are immutable"""
+        return False
+
+
 @admin.register(TaxConfiguration)
 class TaxConfigurationAdmin(admin.ModelAdmin):
     """Admin interface for Tax Configurations"""
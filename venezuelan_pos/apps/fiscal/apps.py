@@ -4,4 +4,8 @@ from django.apps import AppConfig
 class FiscalConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'venezuelan_pos.apps.fiscal'
-    verbose_name = 'Fiscal Compliance'
\ No newline at end of file
+    verbose_name = 'Fiscal Compliance'
+
+    def ready(self):
+        """Import signals when app is ready."""
+        import venezuelan_pos.apps.fiscal.signals
@@ -0,0 +1,368 @@
+"""
+Buffered, tamper-evident audit trail writer.
+Audit entries are queued from the request path and written in batches with
+bulk_create; every batch hashes its entries and chains to the tenant's
+previous batch, so the whole trail can be verified in a single pass.
+"""
+
+import hashlib
+import json
+import logging
+import uuid
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+import pytz
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from redis.exceptions import ConnectionError, TimeoutError
+
+from .models import AuditLog, AuditLogBatch
+
+logger = logging.getLogger(__name__)
+
+CARACAS_TZ = pytz.timezone('America/Caracas')
+
+# Fields covered by an entry hash, in hashing order
+HASHED_FIELDS = [
+    'id', 'tenant_id', 'user_id', 'action_type', 'object_type', 'object_id',
+    'fiscal_series_id', 'timestamp', 'ip_address', 'user_agent',
+    'old_values', 'new_values', 'description',
+]
+
+
+def _canonical_json(value) -> str:
+    """Serialize a value deterministically for hashing."""
+    return json.dumps(value, cls=DjangoJSONEncoder, sort_keys=True, separators=(',', ':'))
+
+
+def _normalize_values(values) -> dict:
+    """Round-trip change data through JSON so stored and hashed values match."""
+    return json.loads(json.dumps(values or {}, cls=DjangoJSONEncoder))
+
+
+def _entry_data(audit_log: AuditLog) -> Dict:
+    """Extract the hashed fields of an audit log entry."""
+    return {
+        'id': str(audit_log.id),
+        'tenant_id': str(audit_log.tenant_id),
+        'user_id': str(audit_log.user_id) if audit_log.user_id else None,
+        'action_type': audit_log.action_type,
+        'object_type': audit_log.object_type,
+        'object_id': audit_log.object_id,
+        'fiscal_series_id': str(audit_log.fiscal_series_id) if audit_log.fiscal_series_id else None,
+        'timestamp': audit_log.timestamp.astimezone(pytz.utc).isoformat(),
+        'ip_address': audit_log.ip_address,
+        'user_agent': audit_log.user_agent,
+        'old_values': audit_log.old_values,
+        'new_values': audit_log.new_values,
+        'description': audit_log.description,
+    }
+
+
+def compute_entry_hash(audit_log: AuditLog) -> str:
+    """Compute the SHA-256 hash of an audit log entry."""
+    data = _entry_data(audit_log)
+    payload = _canonical_json([data[field] for field in HASHED_FIELDS])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def compute_entries_hash(entry_hashes: List[str]) -> str:
+    """Compute the hash of an ordered list of entry hashes."""
+    return hashlib.sha256(''.join(entry_hashes).encode('utf-8')).hexdigest()
+
+
+def compute_batch_hash(tenant_id, sequence: int, previous_hash: str, entries_hash: str) -> str:
+    """Compute the chained hash of a batch."""
+    payload = f"{tenant_id}:{sequence}:{previous_hash}:{entries_hash}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _entry_sort_key(audit_log: AuditLog):
+    """Order entries within a batch the same way the verifier reads them."""
+    return audit_log.timestamp, str(audit_log.id)
+
+
+class AuditLogWriter:
+    """
+    Queues audit entries in Redis and writes them in hash-chained batches.
+    Falls back to writing single-entry batches synchronously when Redis
+    is not available.
+    """
+
+    QUEUE_KEY = "audit_log:queue"
+    PROCESSING_KEY = "audit_log:processing"
+    FLUSH_LOCK_KEY = "audit_log:flush_lock"
+
+    # Seconds before the flush lock of a crashed worker expires
+    FLUSH_LOCK_TTL = 300
+
+    # Entries per bulk insert / batch
+    BATCH_SIZE = 500
+
+    def __init__(self):
+        """Initialize the audit writer."""
+        self._redis_client = None
+
+        # Try to get direct Redis client for list operations
+        try:
+            from django_redis import get_redis_connection
+            self._redis_client = get_redis_connection('default')
+        except Exception as e:
+            logger.warning(f"Could not get Redis client: {e}")
+
+    # Entries
+
+    @staticmethod
+    def build_entry(tenant, user, action_type, object_type, object_id,
+                    fiscal_series=None, old_values=None, new_values=None,
+                    description="", ip_address=None, user_agent=None) -> AuditLog:
+        """Build an unsaved audit log entry timestamped now."""
+        ip_field = AuditLog._meta.get_field('ip_address')
+
+        return AuditLog(
+            id=uuid.uuid4(),
+            tenant_id=tenant.id if hasattr(tenant, 'id') else tenant,
+            user_id=user.id if user is not None else None,
+            action_type=action_type,
+            object_type=object_type,
+            object_id=str(object_id),
+            fiscal_series_id=fiscal_series.id if fiscal_series is not None else None,
+            timestamp=timezone.now().astimezone(CARACAS_TZ),
+            ip_address=ip_field.to_python(ip_address) if ip_address else None,
+            user_agent=user_agent or '',
+            old_values=_normalize_values(old_values),
+            new_values=_normalize_values(new_values),
+            description=description or '',
+        )
+
+    @staticmethod
+    def _serialize(audit_log: AuditLog) -> str:
+        """Serialize an entry for the queue."""
+        return _canonical_json(_entry_data(audit_log))
+
+    @staticmethod
+    def _deserialize(payload) -> AuditLog:
+        """Rebuild an unsaved entry from its queued form."""
+        if isinstance(payload, bytes):
+            payload = payload.decode('utf-8')
+        data = json.loads(payload)
+        data['id'] = uuid.UUID(data['id'])
+        data['timestamp'] = datetime.fromisoformat(data['timestamp']).astimezone(CARACAS_TZ)
+        return AuditLog(**data)
+
+    # Queueing
+
+    def enqueue(self, audit_log: AuditLog) -> None:
+        """
+        Queue an entry for the next batch write.
+        The entry is queued after the surrounding DB transaction commits,
+        so rolled back operations leave no audit trail.
+        """
+        if self._redis_client is None:
+            self.write_entries([audit_log])
+            return
+
+        payload = self._serialize(audit_log)
+        transaction.on_commit(lambda: self._push(audit_log, payload))
+
+    def _push(self, audit_log: AuditLog, payload: str) -> None:
+        """Push a serialized entry to the queue, writing it directly on failure."""
+        try:
+            self._redis_client.rpush(self.QUEUE_KEY, payload)
+        except (ConnectionError, TimeoutError) as e:
+            logger.warning(f"Redis unavailable, writing audit entry directly: {e}")
+            self.write_entries([audit_log])
+
+    def get_queue_length(self) -> int:
+        """Number of entries waiting to be written."""
+        if self._redis_client is None:
+            return 0
+        try:
+            return self._redis_client.llen(self.QUEUE_KEY)
+        except (ConnectionError, TimeoutError) as e:
+            logger.warning(f"Could not read audit queue length: {e}")
+            return 0
+
+    def flush(self, max_entries: Optional[int] = None) -> int:
+        """
+        Write queued entries in batches.
+        Entries are moved to a processing list and only removed from it
+        once their batch is committed, so a crash or DB error leaves them
+        to be retried by the next flush. Returns the number of entries
+        written.
+        """
+        if self._redis_client is None:
+            return 0
+
+        try:
+            if not self._redis_client.set(self.FLUSH_LOCK_KEY, "locked", nx=True, ex=self.FLUSH_LOCK_TTL):
+                return 0
+        except (ConnectionError, TimeoutError) as e:
+            logger.warning(f"Could not lock audit queue: {e}")
+            return 0
+
+        try:
+            # Entries left over by an interrupted flush come first
+            written = self._write_processing()
+
+            while max_entries is None or written < max_entries:
+                size = self.BATCH_SIZE
+                if max_entries is not None:
+                    size = min(size, max_entries - written)
+
+                pipe = self._redis_client.pipeline(transaction=False)
+                for _ in range(size):
+                    pipe.lmove(self.QUEUE_KEY, self.PROCESSING_KEY, 'LEFT', 'RIGHT')
+                moved = [payload for payload in pipe.execute() if payload is not None]
+
+                if not moved:
+                    break
+
+                written += self._write_processing()
+
+            return written
+
+        except (ConnectionError, TimeoutError) as e:
+            logger.warning(f"Could not read audit queue: {e}")
+            return 0
+
+        finally:
+            try:
+                self._redis_client.delete(self.FLUSH_LOCK_KEY)
+            except (ConnectionError, TimeoutError) as e:
+                logger.warning(f"Could not unlock audit queue: {e}")
+
+    def _write_processing(self) -> int:
+        """
+        Write the entries in the processing list and then clear it.
+        Entries already saved by an interrupted flush are skipped.
+        """
+        payloads = self._redis_client.lrange(self.PROCESSING_KEY, 0, -1)
+        if not payloads:
+            return 0
+
+        entries = [self._deserialize(payload) for payload in payloads]
+        saved = set(AuditLog.objects.filter(id__in=[entry.id for entry in entries]).values_list('id', flat=True))
+        self.write_entries([entry for entry in entries if entry.id not in saved])
+
+        self._redis_client.ltrim(self.PROCESSING_KEY, len(payloads), -1)
+        return len(payloads) - len(saved)
+
+    # Writing
+
+    def write_entries(self, audit_logs: List[AuditLog]) -> List[AuditLogBatch]:
+        """Write entries as one chained batch per tenant and BATCH_SIZE entries."""
+        by_tenant: Dict[str, List[AuditLog]] = {}
+        for audit_log in audit_logs:
+            by_tenant.setdefault(str(audit_log.tenant_id), []).append(audit_log)
+
+        batches = []
+        for tenant_id, entries in by_tenant.items():
+            entries.sort(key=_entry_sort_key)
+            for start in range(0, len(entries), self.BATCH_SIZE):
+                batches.append(self._write_batch(tenant_id, entries[start:start + self.BATCH_SIZE]))
+
+        return batches
+
+    def _write_batch(self, tenant_id, entries: List[AuditLog], retries: int = 3) -> AuditLogBatch:
+        """Chain a batch to the tenant's last batch and bulk insert its entries."""
+        entry_hashes = [compute_entry_hash(entry) for entry in entries]
+        entries_hash = compute_entries_hash(entry_hashes)
+
+        for attempt in range(retries):
+            try:
+                with transaction.atomic():
+                    last_batch = AuditLogBatch.objects.select_for_update().filter(
+                        tenant_id=tenant_id
+                    ).order_by('-sequence').first()
+
+                    sequence = last_batch.sequence + 1 if last_batch else 1
+                    previous_hash = last_batch.batch_hash if last_batch else ''
+
+                    batch = AuditLogBatch.objects.create(
+                        tenant_id=tenant_id,
+                        sequence=sequence,
+                        entry_count=len(entries),
+                        entries_hash=entries_hash,
+                        previous_hash=previous_hash,
+                        batch_hash=compute_batch_hash(tenant_id, sequence, previous_hash, entries_hash)
+                    )
+
+                    for entry, entry_hash in zip(entries, entry_hashes):
+                        entry.batch = batch
+                        entry.entry_hash = entry_hash
+
+                    AuditLog.objects.bulk_create(entries)
+                    return batch
+
+            except IntegrityError:
+                # Another writer took the sequence number; chain to its batch instead
+                if attempt == retries - 1:
+                    raise
+
+
+def verify_audit_chain(tenant_id=None, chunk_size: int = 2000) -> Iterator[Dict]:
+    """
+    Verify batch chains and entry hashes, yielding one dict per problem found.
+    Batches and entries are streamed in chain order, so memory use is
+    bounded by the chunk size rather than the size of the trail.
+    """
+    batches = AuditLogBatch.objects.order_by('tenant_id', 'sequence')
+    entries = AuditLog.objects.filter(batch__isnull=False).order_by(
+        'batch__tenant_id', 'batch__sequence', 'timestamp', 'id'
+    )
+    if tenant_id:
+        batches = batches.filter(tenant_id=tenant_id)
+        entries = entries.filter(batch__tenant_id=tenant_id)
+
+    entry_iter = entries.iterator(chunk_size=chunk_size)
+    next_entry = next(entry_iter, None)
+
+    current_tenant = None
+    previous_batch = None
+
+    for batch in batches.iterator(chunk_size=chunk_size):
+        if batch.tenant_id != current_tenant:
+            current_tenant = batch.tenant_id
+            previous_batch = None
+
+        def issue(kind, **detail):
+            return {'tenant_id': str(batch.tenant_id), 'sequence': batch.sequence, 'issue': kind, **detail}
+
+        expected_sequence = previous_batch.sequence + 1 if previous_batch else 1
+        expected_previous_hash = previous_batch.batch_hash if previous_batch else ''
+
+        if batch.sequence != expected_sequence:
+            yield issue('sequence_gap', expected=expected_sequence)
+        if batch.previous_hash != expected_previous_hash:
+            yield issue('broken_link', expected=expected_previous_hash, actual=batch.previous_hash)
+
+        entry_hashes = []
+        while next_entry is not None and next_entry.batch_id == batch.id:
+            entry_hash = compute_entry_hash(next_entry)
+            if entry_hash != next_entry.entry_hash or str(next_entry.tenant_id) != str(batch.tenant_id):
+                yield issue('entry_modified', entry_id=str(next_entry.id))
+            entry_hashes.append(entry_hash)
+            next_entry = next(entry_iter, None)
+
+        if len(entry_hashes) != batch.entry_count:
+            yield issue('entry_count_mismatch', expected=batch.entry_count, actual=len(entry_hashes))
+
+        entries_hash = compute_entries_hash(entry_hashes)
+        if entries_hash != batch.entries_hash:
+            yield issue('entries_hash_mismatch')
+
+        expected_batch_hash = compute_batch_hash(
+            batch.tenant_id, batch.sequence, batch.previous_hash, batch.entries_hash
+        )
+        if expected_batch_hash != batch.batch_hash:
+            yield issue('batch_hash_mismatch')
+
+        previous_batch = batch
+
+
+# Global audit writer instance
+audit_writer = AuditLogWriter()
@@ -7,6 +7,8 @@ from decimal import Decimal
 import hashlib
 import json
 
+from .tax_resolver import tax_resolver
+
 
 class FiscalCache:
     """Cache for fiscal calculations to improve checkout performance."""
@@ -52,25 +54,21 @@ class FiscalCache:
     
     @classmethod
     def invalidate_event_taxes(cls, event_id):
-        """Invalidate all tax calculations for an event."""
-        # This is a simple implementation - in production you might want
-        # to use cache versioning or tagged caching
-        cache_pattern = f"{cls.CACHE_PREFIX}:tax:*{event_id}*"
-        # Note: This requires a cache backend that supports pattern deletion
-        # For Redis: cache.delete_pattern(cache_pattern)
-        pass
+        """Invalidate compiled tax rules for an event's tenant."""
+        from venezuelan_pos.apps.events.models import Event
+        
+        tenant_id = Event.objects.filter(id=event_id).values_list('tenant_id', flat=True).first()
+        if tenant_id:
+            tax_resolver.invalidate(tenant_id)
     
     @classmethod
-    def get_simple_tax_rate(cls, tenant_id):
-        """Get simple tax rate for fast calculations."""
-        cache_key = f"{cls.CACHE_PREFIX}:rate:{tenant_id}"
-        cached_rate = cache.get(cache_key)
-        
-        if cached_rate is not None:
-            return Decimal(str(cached_rate))
-        
-        # Default Venezuelan IVA rate
-        default_rate = Decimal('0.16')  # 16%
-        cache.set(cache_key, str(default_rate), cls.DEFAULT_TIMEOUT * 24)  # Cache for 24 hours
-        
-        return default_rate
\ No newline at end of file
+    def get_tax_amounts(cls, tenant_id, event_id, base_amounts, include_fixed=True):
+        """Calculate taxes for many base amounts from compiled tax rules."""
+        return tax_resolver.calculate_many(
+            tenant_id, event_id, base_amounts, include_fixed=include_fixed
+        )
+    
+    @classmethod
+    def get_simple_tax_rate(cls, tenant_id, event_id=None):
+        """Get the combined tax rate for fast calculations."""
+        return tax_resolver.get_rule_set(tenant_id, event_id).composite_rate()
@@ -0,0 +1,69 @@
+"""
+Management command to verify the hash-chained audit trail.
+Streams batches and entries in chain order and reports any tampering.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from venezuelan_pos.apps.fiscal.audit import audit_writer, verify_audit_chain
+
+
+class Command(BaseCommand):
+    help = 'Verify audit log batch hash chains and entry hashes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            type=str,
+            help='Tenant slug to verify (default: all tenants)',
+        )
+
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Rows fetched per database round trip',
+        )
+
+        parser.add_argument(
+            '--flush',
+            action='store_true',
+            help='Write queued audit entries before verifying',
+        )
+
+    def handle(self, *args, **options):
+        tenant_id = None
+        if options['tenant']:
+            from venezuelan_pos.apps.tenants.models import Tenant
+
+            try:
+                tenant_id = Tenant.objects.get(slug=options['tenant']).id
+            except Tenant.DoesNotExist:
+                raise CommandError(f"Tenant '{options['tenant']}' not found")
+
+        if options['flush']:
+            written = audit_writer.flush()
+            self.stdout.write(f"Flushed {written} queued audit entries")
+
+        started_at = timezone.now()
+        issues_count = 0
+
+        for issue in verify_audit_chain(tenant_id=tenant_id, chunk_size=options['chunk_size']):
+            issues_count += 1
+            details = ', '.join(
+                f"{key}={value}" for key, value in issue.items()
+                if key not in ('tenant_id', 'sequence', 'issue')
+            )
+            self.stdout.write(
+                f"tenant={issue['tenant_id']} batch={issue['sequence']} {issue['issue']}"
+                + (f" ({details})" if details else '')
+            )
+
+        elapsed = (timezone.now() - started_at).total_seconds()
+        message = f"Audit chain verification finished in {elapsed:.1f}s: {issues_count} issue(s) found"
+
+        if issues_count:
+            self.stderr.write(self.style.ERROR(message))
+            raise CommandError("Audit chain verification failed")
+
+        self.stderr.write(self.style.SUCCESS(message))
@@ -0,0 +1,92 @@
+# Generated by Django 5.0.14 on 2026-10-18 20:39
+
+import django.db.models.deletion
+import uuid
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fiscal", "0002_make_effective_from_optional"),
+        ("tenants", "0002_add_performance_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FiscalDayLedger",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("fiscal_date", models.DateField()),
+                ("transaction_count", models.IntegerField(default=0)),
+                (
+                    "total_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=12
+                    ),
+                ),
+                (
+                    "total_tax",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=12
+                    ),
+                ),
+                ("payment_count", models.IntegerField(default=0)),
+                (
+                    "cash_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=12
+                    ),
+                ),
+                (
+                    "card_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=12
+                    ),
+                ),
+                (
+                    "transfer_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=12
+                    ),
+                ),
+                (
+                    "other_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=12
+                    ),
+                ),
+                (
+                    "first_series",
+                    models.CharField(blank=True, max_length=50, null=True),
+                ),
+                ("last_series", models.CharField(blank=True, max_length=50, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fiscal_day_ledgers",
+                        to="tenants.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Fiscal Day Ledger",
+                "verbose_name_plural": "Fiscal Day Ledgers",
+                "db_table": "fiscal_day_ledger",
+                "ordering": ["-fiscal_date"],
+                "unique_together": {("tenant", "fiscal_date")},
+            },
+        ),
+    ]
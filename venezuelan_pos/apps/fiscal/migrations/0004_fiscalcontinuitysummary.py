@@ -0,0 +1,80 @@
+# Generated by Django 5.0.14 on 2026-10-18 20:46
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0003_add_payment_methods_to_event_configuration"),
+        ("fiscal", "0003_fiscaldayledger"),
+        ("tenants", "0002_add_performance_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FiscalContinuitySummary",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("fiscal_date", models.DateField()),
+                (
+                    "source",
+                    models.CharField(
+                        choices=[
+                            ("fiscal_series", "Fiscal Series"),
+                            ("transaction", "Transaction Fiscal Series"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("first_number", models.BigIntegerField(blank=True, null=True)),
+                ("last_number", models.BigIntegerField(blank=True, null=True)),
+                ("issued_count", models.IntegerField(default=0)),
+                ("missing_ranges", models.JSONField(default=list)),
+                ("duplicates", models.JSONField(default=list)),
+                ("out_of_order", models.JSONField(default=list)),
+                ("computed_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "event",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fiscal_continuity_summaries",
+                        to="events.event",
+                    ),
+                ),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fiscal_continuity_summaries",
+                        to="tenants.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Fiscal Continuity Summary",
+                "verbose_name_plural": "Fiscal Continuity Summaries",
+                "db_table": "fiscal_continuity_summary",
+                "ordering": ["fiscal_date"],
+                "indexes": [
+                    models.Index(
+                        fields=["tenant", "fiscal_date"],
+                        name="fiscal_cont_tenant__961602_idx",
+                    )
+                ],
+                "unique_together": {("tenant", "fiscal_date", "source", "event")},
+            },
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.0.14 on 2026-10-18 20:55
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fiscal", "0004_fiscalcontinuitysummary"),
+        ("tenants", "0002_add_performance_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="auditlog",
+            name="entry_hash",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AlterField(
+            model_name="auditlog",
+            name="timestamp",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False
+            ),
+        ),
+        migrations.CreateModel(
+            name="AuditLogBatch",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("sequence", models.PositiveBigIntegerField()),
+                ("entry_count", models.PositiveIntegerField()),
+                ("entries_hash", models.CharField(max_length=64)),
+                ("previous_hash", models.CharField(blank=True, max_length=64)),
+                ("batch_hash", models.CharField(max_length=64)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="audit_log_batches",
+                        to="tenants.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Audit Log Batch",
+                "verbose_name_plural": "Audit Log Batches",
+                "db_table": "audit_log_batch",
+                "ordering": ["tenant", "sequence"],
+                "unique_together": {("tenant", "sequence")},
+            },
+        ),
+        migrations.AddField(
+            model_name="auditlog",
+            name="batch",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="entries",
+                to="fiscal.auditlogbatch",
+            ),
+        ),
+    ]
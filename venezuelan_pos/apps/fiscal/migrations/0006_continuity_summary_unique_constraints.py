@@ -0,0 +1,63 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:41
+
+from django.db import migrations, models
+
+
+def dedupe_tenant_summaries(apps, schema_editor):
+    """
+    Keep the first computed tenant-wide summary per day and source before
+    the constraint is added. unique_together did not cover a NULL event,
+    so repeated audits could store the same summary more than once.
+    """
+    FiscalContinuitySummary = apps.get_model("fiscal", "FiscalContinuitySummary")
+
+    duplicates = (
+        FiscalContinuitySummary.objects.filter(event__isnull=True)
+        .values("tenant_id", "fiscal_date", "source")
+        .annotate(count=models.Count("id"))
+        .filter(count__gt=1)
+    )
+
+    for duplicate in duplicates:
+        summaries = FiscalContinuitySummary.objects.filter(
+            tenant_id=duplicate["tenant_id"],
+            fiscal_date=duplicate["fiscal_date"],
+            source=duplicate["source"],
+            event__isnull=True,
+        ).order_by("computed_at", "id")
+        FiscalContinuitySummary.objects.filter(
+            pk__in=list(summaries.values_list("pk", flat=True)[1:])
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0003_add_payment_methods_to_event_configuration"),
+        ("fiscal", "0005_auditlogbatch"),
+        ("tenants", "0002_add_performance_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_tenant_summaries, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name="fiscalcontinuitysummary",
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name="fiscalcontinuitysummary",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("event__isnull", False)),
+                fields=("tenant", "fiscal_date", "source", "event"),
+                name="unique_fiscal_continuity_summary_event",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="fiscalcontinuitysummary",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("event__isnull", True)),
+                fields=("tenant", "fiscal_date", "source"),
+                name="unique_fiscal_continuity_summary_tenant",
+            ),
+        ),
+    ]
@@ -235,6 +235,115 @@ class FiscalDay(models.Model):
         return not self.is_closed
 
 
+class FiscalDayLedger(models.Model):
+    """
+    Running fiscal totals per tenant and fiscal day.
+    Updated in the same database transaction as each completed transaction
+    and payment, so X/Z reports read a single row instead of scanning sales.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey(
+        'tenants.Tenant',
+        on_delete=models.CASCADE,
+        related_name='fiscal_day_ledgers'
+    )
+    fiscal_date = models.DateField()
+
+    # Transaction Totals
+    transaction_count = models.IntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    total_tax = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+
+    # Payment Totals by Method Type
+    payment_count = models.IntegerField(default=0)
+    cash_amount = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    card_amount = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    transfer_amount = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    other_amount = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+
+    # Series Range (transaction fiscal series, in completion order)
+    first_series = models.CharField(max_length=50, null=True, blank=True)
+    last_series = models.CharField(max_length=50, null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'fiscal_day_ledger'
+        verbose_name = 'Fiscal Day Ledger'
+        verbose_name_plural = 'Fiscal Day Ledgers'
+        unique_together = [('tenant', 'fiscal_date')]
+        ordering = ['-fiscal_date']
+
+    def __str__(self):
+        return f"{self.tenant} - {self.fiscal_date} ({self.transaction_count} transactions)"
+
+
+class FiscalContinuitySummary(models.Model):
+    """
+    Immutable continuity summary of a fiscal series source for a closed day.
+    Written once per closed fiscal day so long audits only recompute open days.
+    """
+
+    SOURCES = [
+        ('fiscal_series', 'Fiscal Series'),
+        ('transaction', 'Transaction Fiscal Series'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey(
+        'tenants.Tenant',
+        on_delete=models.CASCADE,
+        related_name='fiscal_continuity_summaries'
+    )
+    fiscal_date = models.DateField()
+    source = models.CharField(max_length=20, choices=SOURCES)
+    event = models.ForeignKey(
+        'events.Event',
+        on_delete=models.CASCADE,
+        related_name='fiscal_continuity_summaries',
+        null=True,
+        blank=True
+    )
+
+    # Series Range
+    first_number = models.BigIntegerField(null=True, blank=True)
+    last_number = models.BigIntegerField(null=True, blank=True)
+    issued_count = models.IntegerField(default=0)
+
+    # Anomalies within the day
+    missing_ranges = models.JSONField(default=list)
+    duplicates = models.JSONField(default=list)
+    out_of_order = models.JSONField(default=list)
+
+    computed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'fiscal_continuity_summary'
+        verbose_name = 'Fiscal Continuity Summary'
+        verbose_name_plural = 'Fiscal Continuity Summaries'
+        constraints = [
+            # NULL events never compare equal, so tenant-wide summaries need their own constraint
+            models.UniqueConstraint(
+                fields=['tenant', 'fiscal_date', 'source', 'event'],
+                condition=models.Q(event__isnull=False),
+                name='unique_fiscal_continuity_summary_event'
+            ),
+            models.UniqueConstraint(
+                fields=['tenant', 'fiscal_date', 'source'],
+                condition=models.Q(event__isnull=True),
+                name='unique_fiscal_continuity_summary_tenant'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['tenant', 'fiscal_date']),
+        ]
+        ordering = ['fiscal_date']
+
+    def __str__(self):
+        return f"{self.fiscal_date} - {self.source} ({self.issued_count} issued)"
+
+
 class FiscalReport(models.Model):
     """
     Fiscal Reports model for X and Z reports.
@@ -345,7 +454,8 @@ class AuditLog(models.Model):
         null=True,
         blank=True
     )
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the action happens, not when the buffered entry is written
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
     
@@ -354,6 +464,16 @@ class AuditLog(models.Model):
     new_values = models.JSONField(default=dict, blank=True)
     description = models.TextField(blank=True)
     
+    # Tamper Evidence
+    batch = models.ForeignKey(
+        'AuditLogBatch',
+        on_delete=models.PROTECT,
+        related_name='entries',
+        null=True,
+        blank=True
+    )
+    entry_hash = models.CharField(max_length=64, blank=True)
+    
     class Meta:
         db_table = 'audit_log'
         verbose_name = 'Audit Log'
@@ -380,12 +500,43 @@ class AuditLog(models.Model):
                 self.timestamp = self.timestamp.astimezone(caracas_tz)
         
         # Make immutable - prevent updates
-        if self.pk:
+        if not self._state.adding:
             raise ValidationError("Audit logs are immutable and cannot be modified")
         
         super().save(*args, **kwargs)
 
 
+class AuditLogBatch(models.Model):
+    """
+    Batch of audit log entries written together.
+    Each batch hashes its entries and chains to the previous batch of the
+    tenant, so altering, removing or reordering entries breaks the chain.
+    """
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey(
+        'tenants.Tenant',
+        on_delete=models.CASCADE,
+        related_name='audit_log_batches'
+    )
+    sequence = models.PositiveBigIntegerField()
+    entry_count = models.PositiveIntegerField()
+    entries_hash = models.CharField(max_length=64)
+    previous_hash = models.CharField(max_length=64, blank=True)
+    batch_hash = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'audit_log_batch'
+        verbose_name = 'Audit Log Batch'
+        verbose_name_plural = 'Audit Log Batches'
+        unique_together = ['tenant', 'sequence']
+        ordering = ['tenant', 'sequence']
+    
+    def __str__(self):
+        return f"{self.tenant} - Audit batch #{self.sequence} ({self.entry_count} entries)"
+
+
 class TaxConfiguration(models.Model):
     """
     Tax Configuration model for tenant and event-level tax settings.
@@ -4,26 +4,34 @@ Fiscal Compliance Services for Venezuelan POS System.
 Provides business logic for:
 - Fiscal series generation and management
 - X/Z report generation
+- Fiscal day ledger maintenance
+- Fiscal series continuity audits
 - Tax calculations with deterministic methodology
 - Audit trail management
 """
 
+import re
+import logging
 import pytz
 from decimal import Decimal, ROUND_UP
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from typing import Dict, List, Optional, Tuple
 from django.db import transaction
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.db.models import Sum, Count, Q, Max, Min
+from django.db.models import Sum, Count, Q, Max, Min, F, Value, Window, BigIntegerField
+from django.db.models.functions import Cast, Coalesce, Lag, Right, TruncDate
 
 from .models import (
-    FiscalSeries, FiscalDay, FiscalReport, AuditLog,
-    TaxConfiguration, TaxCalculationHistory
+    FiscalSeries, FiscalDay, FiscalDayLedger, FiscalContinuitySummary,
+    FiscalReport, AuditLog, TaxConfiguration, TaxCalculationHistory
 )
+from .audit import audit_writer
+from .tax_resolver import tax_resolver
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 
 class FiscalSeriesService:
@@ -188,13 +196,557 @@ class FiscalDayService:
             raise ValidationError(f"Failed to close fiscal day: {str(e)}")
 
 
+class FiscalLedgerService:
+    """Service for maintaining the per-day fiscal ledger"""
+
+    # Payment method types mapped to ledger amount columns
+    METHOD_TYPE_COLUMNS = {
+        'cash': 'cash_amount',
+        'credit_card': 'card_amount',
+        'debit_card': 'card_amount',
+        'bank_transfer': 'transfer_amount',
+        'wire_transfer': 'transfer_amount',
+    }
+
+    TOTAL_FIELDS = [
+        'transaction_count', 'total_amount', 'total_tax', 'payment_count',
+        'cash_amount', 'card_amount', 'transfer_amount', 'other_amount',
+        'first_series', 'last_series',
+    ]
+
+    @staticmethod
+    def get_fiscal_date(moment=None):
+        """Get the fiscal date (America/Caracas) for a moment in time"""
+        caracas_tz = pytz.timezone('America/Caracas')
+        return (moment or timezone.now()).astimezone(caracas_tz).date()
+
+    @staticmethod
+    def get_method_column(method_type):
+        """Get the ledger column that accumulates a payment method type"""
+        return FiscalLedgerService.METHOD_TYPE_COLUMNS.get(
+            (method_type or '').lower(), 'other_amount'
+        )
+
+    @staticmethod
+    def _apply(tenant_id, fiscal_date, **changes):
+        """
+        Apply increments to a ledger row with a single UPDATE.
+
+        Note: This method should be called within a transaction.atomic() block
+        so the ledger commits or rolls back together with the sale.
+        """
+        FiscalDayLedger.objects.get_or_create(
+            tenant_id=tenant_id,
+            fiscal_date=fiscal_date
+        )
+        FiscalDayLedger.objects.filter(
+            tenant_id=tenant_id,
+            fiscal_date=fiscal_date
+        ).update(updated_at=timezone.now(), **changes)
+
+    @staticmethod
+    def record_transaction_completion(transaction_obj):
+        """Add a completed transaction to its fiscal day ledger"""
+        changes = {
+            'transaction_count': F('transaction_count') + 1,
+            'total_amount': F('total_amount') + transaction_obj.total_amount,
+            'total_tax': F('total_tax') + transaction_obj.tax_amount,
+        }
+        if transaction_obj.fiscal_series:
+            changes['first_series'] = Coalesce(
+                'first_series', Value(transaction_obj.fiscal_series)
+            )
+            changes['last_series'] = Value(transaction_obj.fiscal_series)
+
+        FiscalLedgerService._apply(
+            transaction_obj.tenant_id,
+            FiscalLedgerService.get_fiscal_date(transaction_obj.completed_at),
+            **changes
+        )
+
+    @staticmethod
+    def record_payment_completion(payment):
+        """Add a completed payment to its fiscal day ledger"""
+        column = FiscalLedgerService.get_method_column(
+            payment.payment_method.method_type
+        )
+        FiscalLedgerService._apply(
+            payment.tenant_id,
+            FiscalLedgerService.get_fiscal_date(payment.completed_at),
+            **{
+                'payment_count': F('payment_count') + 1,
+                column: F(column) + payment.amount,
+            }
+        )
+
+    @staticmethod
+    def check_day_open(tenant_id, fiscal_date):
+        """Refuse changes to a fiscal date that has already been closed"""
+        if FiscalDay.objects.filter(tenant_id=tenant_id, fiscal_date=fiscal_date, is_closed=True).exists():
+            raise ValidationError(f"Fiscal day {fiscal_date} is closed")
+
+    @staticmethod
+    def reverse_transaction_completion(transaction_obj):
+        """Take a cancelled completed transaction back out of its fiscal day ledger"""
+        fiscal_date = FiscalLedgerService.get_fiscal_date(transaction_obj.completed_at)
+        FiscalLedgerService.check_day_open(transaction_obj.tenant_id, fiscal_date)
+        FiscalLedgerService._apply(
+            transaction_obj.tenant_id,
+            fiscal_date,
+            transaction_count=F('transaction_count') - 1,
+            total_amount=F('total_amount') - transaction_obj.total_amount,
+            total_tax=F('total_tax') - transaction_obj.tax_amount,
+        )
+
+        # The series range cannot be decremented; recompute the day when
+        # the transaction was at either end of it
+        if transaction_obj.fiscal_series and FiscalDayLedger.objects.filter(
+            Q(first_series=transaction_obj.fiscal_series) | Q(last_series=transaction_obj.fiscal_series),
+            tenant_id=transaction_obj.tenant_id,
+            fiscal_date=fiscal_date
+        ).exists():
+            FiscalLedgerService.rebuild_ledger(transaction_obj.tenant, fiscal_date)
+
+    @staticmethod
+    def reverse_payment_completion(payment):
+        """Take a refunded completed payment back out of its fiscal day ledger"""
+        column = FiscalLedgerService.get_method_column(
+            payment.payment_method.method_type
+        )
+        fiscal_date = FiscalLedgerService.get_fiscal_date(payment.completed_at)
+        FiscalLedgerService.check_day_open(payment.tenant_id, fiscal_date)
+        FiscalLedgerService._apply(
+            payment.tenant_id,
+            fiscal_date,
+            **{
+                'payment_count': F('payment_count') - 1,
+                column: F(column) - payment.amount,
+            }
+        )
+
+    @staticmethod
+    def get_day_range(fiscal_date):
+        """Get the start and end datetimes of a fiscal date"""
+        caracas_tz = pytz.timezone('America/Caracas')
+        start_datetime = caracas_tz.localize(
+            datetime.combine(fiscal_date, datetime.min.time())
+        )
+        end_datetime = caracas_tz.localize(
+            datetime.combine(fiscal_date, datetime.max.time())
+        )
+        return start_datetime, end_datetime
+
+    @staticmethod
+    def recompute_totals(tenant, fiscal_date):
+        """
+        Recompute ledger totals for a fiscal date from source records.
+        Uses grouped aggregates; intended for verification and backfills.
+        """
+        from venezuelan_pos.apps.sales.models import Transaction
+        from venezuelan_pos.apps.payments.models import Payment
+
+        day_range = FiscalLedgerService.get_day_range(fiscal_date)
+
+        transactions = Transaction.objects.filter(
+            tenant=tenant,
+            status=Transaction.Status.COMPLETED,
+            completed_at__range=day_range
+        )
+        transaction_totals = transactions.aggregate(
+            total_amount=Sum('total_amount'),
+            total_tax=Sum('tax_amount'),
+            total_count=Count('id')
+        )
+        series = transactions.exclude(fiscal_series__isnull=True).order_by(
+            'completed_at', 'fiscal_series'
+        ).values_list('fiscal_series', flat=True)
+
+        totals = {
+            'transaction_count': transaction_totals['total_count'],
+            'total_amount': transaction_totals['total_amount'] or Decimal('0.00'),
+            'total_tax': transaction_totals['total_tax'] or Decimal('0.00'),
+            'payment_count': 0,
+            'cash_amount': Decimal('0.00'),
+            'card_amount': Decimal('0.00'),
+            'transfer_amount': Decimal('0.00'),
+            'other_amount': Decimal('0.00'),
+            'first_series': series.first(),
+            'last_series': series.last(),
+        }
+
+        payment_totals = Payment.objects.filter(
+            tenant=tenant,
+            status=Payment.Status.COMPLETED,
+            completed_at__range=day_range
+        ).values('payment_method__method_type').annotate(
+            amount=Sum('amount'),
+            count=Count('id')
+        )
+
+        for row in payment_totals:
+            column = FiscalLedgerService.get_method_column(
+                row['payment_method__method_type']
+            )
+            totals[column] += row['amount'] or Decimal('0.00')
+            totals['payment_count'] += row['count']
+
+        return totals
+
+    @staticmethod
+    def verify_ledger(tenant, fiscal_date):
+        """
+        Compare the ledger against a full recompute.
+        Returns a dict of mismatched fields as {field: (ledger, recomputed)}.
+        """
+        ledger = FiscalDayLedger.objects.filter(
+            tenant=tenant,
+            fiscal_date=fiscal_date
+        ).first() or FiscalDayLedger(tenant=tenant, fiscal_date=fiscal_date)
+        totals = FiscalLedgerService.recompute_totals(tenant, fiscal_date)
+
+        mismatches = {}
+        for field in FiscalLedgerService.TOTAL_FIELDS:
+            ledger_value = getattr(ledger, field)
+            if ledger_value != totals[field]:
+                mismatches[field] = (ledger_value, totals[field])
+
+        return mismatches
+
+    @staticmethod
+    def rebuild_ledger(tenant, fiscal_date):
+        """
+        Overwrite the ledger for a fiscal date with recomputed totals.
+        The row is locked before recomputing, so sales completing meanwhile
+        apply their increments on top of the rebuilt totals.
+        """
+        with transaction.atomic():
+            FiscalDayLedger.objects.get_or_create(tenant=tenant, fiscal_date=fiscal_date)
+            ledger = FiscalDayLedger.objects.select_for_update().get(
+                tenant=tenant,
+                fiscal_date=fiscal_date
+            )
+
+            totals = FiscalLedgerService.recompute_totals(tenant, fiscal_date)
+            for field, value in totals.items():
+                setattr(ledger, field, value)
+            ledger.save()
+
+        return ledger
+
+    @staticmethod
+    def get_ledger(tenant, fiscal_date):
+        """Get the ledger for a fiscal date, building it from source records if missing"""
+        ledger = FiscalDayLedger.objects.filter(
+            tenant=tenant,
+            fiscal_date=fiscal_date
+        ).first()
+
+        if ledger is None:
+            ledger = FiscalLedgerService.rebuild_ledger(tenant, fiscal_date)
+
+        return ledger
+
+
+class FiscalContinuityService:
+    """Service for fiscal series continuity audits over arbitrary periods"""
+
+    # Digits in the numeric part of a transaction fiscal series
+    SERIES_DIGITS = 8
+
+    @staticmethod
+    def _get_sources():
+        """Series sources with their number expression, issue time and partition"""
+        from venezuelan_pos.apps.sales.models import Transaction
+
+        return {
+            'fiscal_series': {
+                'queryset': FiscalSeries.objects.all(),
+                'number': F('series_number'),
+                'issued_at': 'issued_at',
+                'event': None,
+            },
+            'transaction': {
+                'queryset': Transaction.objects.filter(fiscal_series__isnull=False),
+                'number': Cast(
+                    Right('fiscal_series', FiscalContinuityService.SERIES_DIGITS),
+                    output_field=BigIntegerField()
+                ),
+                'issued_at': 'completed_at',
+                'event': 'event_id',
+            },
+        }
+
+    @staticmethod
+    def get_closed_dates(tenant, start_date, end_date):
+        """
+        Get the fiscal dates in a period that can no longer change.
+        A date is closed once it is in the past and no user fiscal day is open.
+        """
+        today = FiscalLedgerService.get_fiscal_date()
+        open_dates = set(FiscalDay.objects.filter(
+            tenant=tenant,
+            fiscal_date__range=(start_date, end_date),
+            is_closed=False
+        ).values_list('fiscal_date', flat=True))
+
+        closed_dates = []
+        day = start_date
+        while day <= end_date and day < today:
+            if day not in open_dates:
+                closed_dates.append(day)
+            day += timedelta(days=1)
+
+        return closed_dates
+
+    @staticmethod
+    def compute_day_summaries(tenant, fiscal_dates):
+        """
+        Compute continuity summaries for a set of fiscal dates.
+        Runs one grouped query and one windowed anomaly query per source.
+
+        Returns:
+            dict: {(fiscal_date, source, event_id): FiscalContinuitySummary (unsaved)}
+        """
+        summaries = {}
+        if not fiscal_dates:
+            return summaries
+
+        caracas_tz = pytz.timezone('America/Caracas')
+        period_start, _ = FiscalLedgerService.get_day_range(min(fiscal_dates))
+        _, period_end = FiscalLedgerService.get_day_range(max(fiscal_dates))
+
+        for source, config in FiscalContinuityService._get_sources().items():
+            issued_at = config['issued_at']
+            group = ['issued_date'] + ([config['event']] if config['event'] else [])
+            partition = [F(field) for field in group]
+
+            series = config['queryset'].filter(
+                tenant=tenant,
+                **{f'{issued_at}__range': (period_start, period_end)}
+            ).annotate(
+                issued_date=TruncDate(issued_at, tzinfo=caracas_tz),
+                number=config['number']
+            ).filter(issued_date__in=fiscal_dates)
+
+            for row in series.values(*group).annotate(
+                first_number=Min('number'),
+                last_number=Max('number'),
+                issued_count=Count('id')
+            ).order_by():
+                event_id = row.get(config['event']) if config['event'] else None
+                summaries[(row['issued_date'], source, event_id)] = FiscalContinuitySummary(
+                    tenant=tenant,
+                    fiscal_date=row['issued_date'],
+                    source=source,
+                    event_id=event_id,
+                    first_number=row['first_number'],
+                    last_number=row['last_number'],
+                    issued_count=row['issued_count']
+                )
+
+            # Rows that break continuity: jumps in number order, numbers lower
+            # than the one issued just before, and repeated numbers
+            anomalies = series.annotate(
+                number_step=F('number') - Window(
+                    expression=Lag('number'),
+                    partition_by=partition,
+                    order_by=F('number').asc()
+                ),
+                issue_step=F('number') - Window(
+                    expression=Lag('number'),
+                    partition_by=partition,
+                    order_by=[F(issued_at).asc(), F('id').asc()]
+                ),
+                occurrences=Window(
+                    expression=Count('id'),
+                    partition_by=partition + [F('number')]
+                )
+            ).filter(
+                Q(number_step__gt=1) | Q(issue_step__lt=0) | Q(occurrences__gt=1)
+            ).values_list(*group, 'number', 'number_step', 'issue_step', 'occurrences')
+
+            for row in anomalies.order_by().iterator():
+                issued_date = row[0]
+                event_id = row[1] if config['event'] else None
+                number, number_step, issue_step, occurrences = row[-4:]
+                summary = summaries[(issued_date, source, event_id)]
+
+                if number_step is not None and number_step > 1:
+                    summary.missing_ranges.append([number - number_step + 1, number - 1])
+                if issue_step is not None and issue_step < 0:
+                    summary.out_of_order.append(number)
+                if occurrences > 1 and number not in summary.duplicates:
+                    summary.duplicates.append(number)
+
+        # Keep a tenant-wide row for every date so days without sales are cached too
+        for fiscal_date in fiscal_dates:
+            summaries.setdefault(
+                (fiscal_date, 'fiscal_series', None),
+                FiscalContinuitySummary(
+                    tenant=tenant,
+                    fiscal_date=fiscal_date,
+                    source='fiscal_series'
+                )
+            )
+
+        for summary in summaries.values():
+            summary.missing_ranges.sort()
+            summary.duplicates.sort()
+            summary.out_of_order.sort()
+
+        return summaries
+
+    @staticmethod
+    def get_day_summaries(tenant, start_date, end_date):
+        """
+        Get continuity summaries for every fiscal date in a period.
+        Closed dates are read from (or written to) the immutable summary
+        table; open dates are always recomputed.
+
+        Returns:
+            tuple: (summaries dict keyed like compute_day_summaries, cached day count)
+        """
+        summaries = {}
+        for summary in FiscalContinuitySummary.objects.filter(
+            tenant=tenant,
+            fiscal_date__range=(start_date, end_date)
+        ):
+            summaries[(summary.fiscal_date, summary.source, summary.event_id)] = summary
+
+        cached_dates = {key[0] for key in summaries}
+        closed_dates = set(
+            FiscalContinuityService.get_closed_dates(tenant, start_date, end_date)
+        )
+
+        pending_dates = []
+        day = start_date
+        while day <= end_date:
+            if day not in cached_dates:
+                pending_dates.append(day)
+            day += timedelta(days=1)
+
+        computed = FiscalContinuityService.compute_day_summaries(tenant, pending_dates)
+
+        # Persist summaries for closed dates only; open dates may still change
+        FiscalContinuitySummary.objects.bulk_create(
+            [summary for key, summary in computed.items() if key[0] in closed_dates],
+            ignore_conflicts=True
+        )
+
+        summaries.update(computed)
+        return summaries, len(cached_dates)
+
+    @staticmethod
+    def _subtract_ranges(ranges, excluded):
+        """Split ranges into the parts outside and inside the excluded ranges"""
+        outside, inside = [], []
+        for start, end in ranges:
+            pieces = [[start, end]]
+            for excluded_start, excluded_end in excluded:
+                remaining = []
+                for piece_start, piece_end in pieces:
+                    if excluded_end < piece_start or excluded_start > piece_end:
+                        remaining.append([piece_start, piece_end])
+                        continue
+                    inside.append([max(piece_start, excluded_start), min(piece_end, excluded_end)])
+                    if piece_start < excluded_start:
+                        remaining.append([piece_start, excluded_start - 1])
+                    if piece_end > excluded_end:
+                        remaining.append([excluded_end + 1, piece_end])
+                pieces = remaining
+            outside.extend(pieces)
+        return sorted(outside), sorted(inside)
+
+    @staticmethod
+    def check_continuity(tenant, start_date, end_date, event=None):
+        """
+        Check fiscal series continuity per tenant and event over a period.
+
+        Combines per-day summaries and checks day boundaries: a day starting
+        above the previous day's last number leaves a missing range, and a
+        day starting at or below it is reported as out of order. Missing
+        transaction series inside unused offline block ranges are reported
+        separately, since those numbers were handed out but never sold.
+        """
+        from venezuelan_pos.apps.sales.models import OfflineBlock
+
+        summaries, cached_days = FiscalContinuityService.get_day_summaries(
+            tenant, start_date, end_date
+        )
+
+        partitions = {}
+        for (fiscal_date, source, event_id), summary in sorted(
+            summaries.items(), key=lambda item: item[0][0]
+        ):
+            if event and source == 'transaction' and event_id != event.id:
+                continue
+            if not summary.issued_count:
+                continue
+
+            partition = partitions.setdefault((source, event_id), {
+                'source': source,
+                'event_id': str(event_id) if event_id else None,
+                'first_number': summary.first_number,
+                'last_number': summary.last_number,
+                'issued_count': 0,
+                'missing_ranges': [],
+                'unused_block_ranges': [],
+                'duplicates': [],
+                'out_of_order': [],
+            })
+
+            if summary.first_number > partition['last_number'] + 1:
+                partition['missing_ranges'].append(
+                    [partition['last_number'] + 1, summary.first_number - 1]
+                )
+            elif partition['issued_count'] and summary.first_number <= partition['last_number']:
+                partition['out_of_order'].append(summary.first_number)
+
+            partition['first_number'] = min(partition['first_number'], summary.first_number)
+            partition['last_number'] = max(partition['last_number'], summary.last_number)
+            partition['issued_count'] += summary.issued_count
+            partition['missing_ranges'].extend(summary.missing_ranges)
+            partition['duplicates'].extend(summary.duplicates)
+            partition['out_of_order'].extend(summary.out_of_order)
+
+        unused_block_ranges = [
+            [current_series + 1, end_series]
+            for current_series, end_series in OfflineBlock.objects.filter(
+                tenant=tenant,
+                current_series__lt=F('end_series')
+            ).values_list('current_series', 'end_series')
+        ]
+
+        for partition in partitions.values():
+            if partition['source'] == 'transaction' and unused_block_ranges:
+                partition['missing_ranges'], partition['unused_block_ranges'] = (
+                    FiscalContinuityService._subtract_ranges(
+                        partition['missing_ranges'], unused_block_ranges
+                    )
+                )
+            partition['is_continuous'] = not (
+                partition['missing_ranges'] or partition['duplicates'] or partition['out_of_order']
+            )
+
+        return {
+            'tenant_id': str(tenant.id),
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'days_checked': (end_date - start_date).days + 1,
+            'days_cached': cached_days,
+            'partitions': list(partitions.values()),
+            'is_continuous': all(p['is_continuous'] for p in partitions.values())
+        }
+
+
 class FiscalReportService:
     """Service for generating fiscal reports"""
     
     @staticmethod
-    def generate_x_report(tenant, user, fiscal_date=None):
+    def generate_x_report(tenant, user, fiscal_date=None, verify=False):
         """
         Generate X-Report (daily summary without closing fiscal period).
+        Set verify=True to check the ledger against a full recompute first.
         """
         if fiscal_date is None:
             caracas_tz = pytz.timezone('America/Caracas')
@@ -204,13 +756,15 @@ class FiscalReportService:
             tenant=tenant,
             user=user,
             fiscal_date=fiscal_date,
-            report_type='X'
+            report_type='X',
+            verify=verify
         )
     
     @staticmethod
-    def generate_z_report(tenant, user, fiscal_date=None):
+    def generate_z_report(tenant, user, fiscal_date=None, verify=False):
         """
         Generate Z-Report (fiscal closure report).
+        Set verify=True to check the ledger against a full recompute first.
         """
         if fiscal_date is None:
             caracas_tz = pytz.timezone('America/Caracas')
@@ -220,68 +774,37 @@ class FiscalReportService:
             tenant=tenant,
             user=user,
             fiscal_date=fiscal_date,
-            report_type='Z'
+            report_type='Z',
+            verify=verify
         )
     
     @staticmethod
-    def _generate_report(tenant, user, fiscal_date, report_type):
-        """Internal method to generate fiscal reports"""
+    def _series_number(series):
+        """Extract the consecutive number from a transaction fiscal series"""
+        digits = re.search(r'(\d+)$', series or '')
+        return int(digits.group(1)) if digits else None
+    
+    @staticmethod
+    def _generate_report(tenant, user, fiscal_date, report_type, verify=False):
+        """
+        Internal method to generate fiscal reports.
+        Totals are read from the fiscal day ledger; pass verify=True to
+        recompute them from source records and repair the ledger on mismatch.
+        """
         try:
+            start_datetime, end_datetime = FiscalLedgerService.get_day_range(fiscal_date)
+            
+            if verify:
+                mismatches = FiscalLedgerService.verify_ledger(tenant, fiscal_date)
+                if mismatches:
+                    logger.warning(
+                        f"Fiscal ledger mismatch for {tenant} on {fiscal_date}: {mismatches}"
+                    )
+                    FiscalLedgerService.rebuild_ledger(tenant, fiscal_date)
+            
+            ledger = FiscalLedgerService.get_ledger(tenant, fiscal_date)
+            
             with transaction.atomic():
-                # Get date range for the fiscal date
-                caracas_tz = pytz.timezone('America/Caracas')
-                start_datetime = caracas_tz.localize(
-                    datetime.combine(fiscal_date, datetime.min.time())
-                )
-                end_datetime = caracas_tz.localize(
-                    datetime.combine(fiscal_date, datetime.max.time())
-                )
-                
-                # Get transactions for the period
-                from venezuelan_pos.apps.sales.models import Transaction
-                transactions = Transaction.objects.filter(
-                    tenant=tenant,
-                    created_at__range=(start_datetime, end_datetime),
-                    status='COMPLETED'
-                ).select_related('fiscal_series')
-                
-                # Calculate totals
-                totals = transactions.aggregate(
-                    total_amount=Sum('total_amount') or Decimal('0.00'),
-                    total_tax=Sum('tax_amount') or Decimal('0.00'),
-                    total_count=Count('id')
-                )
-                
-                # Calculate payment method totals
-                from venezuelan_pos.apps.payments.models import Payment
-                payments = Payment.objects.filter(
-                    transaction__in=transactions,
-                    status='COMPLETED'
-                )
-                
-                payment_totals = {
-                    'cash_amount': Decimal('0.00'),
-                    'card_amount': Decimal('0.00'),
-                    'transfer_amount': Decimal('0.00'),
-                    'other_amount': Decimal('0.00')
-                }
-                
-                for payment in payments:
-                    method_type = payment.payment_method.method_type.lower()
-                    if method_type == 'cash':
-                        payment_totals['cash_amount'] += payment.amount
-                    elif method_type in ['credit_card', 'debit_card']:
-                        payment_totals['card_amount'] += payment.amount
-                    elif method_type in ['bank_transfer', 'wire_transfer']:
-                        payment_totals['transfer_amount'] += payment.amount
-                    else:
-                        payment_totals['other_amount'] += payment.amount
-                
-                # Get fiscal series range
-                series_range = FiscalSeriesService.get_series_range_for_period(
-                    tenant, start_datetime, end_datetime
-                )
-                
                 # Prepare detailed report data
                 report_data = {
                     'period': {
@@ -290,21 +813,22 @@ class FiscalReportService:
                         'fiscal_date': fiscal_date.isoformat()
                     },
                     'transactions': {
-                        'total_count': totals['total_count'],
-                        'completed_count': transactions.count(),
-                        'total_amount': str(totals['total_amount']),
-                        'total_tax': str(totals['total_tax'])
+                        'total_count': ledger.transaction_count,
+                        'completed_count': ledger.transaction_count,
+                        'total_amount': str(ledger.total_amount),
+                        'total_tax': str(ledger.total_tax)
                     },
                     'payment_methods': {
-                        'cash': str(payment_totals['cash_amount']),
-                        'cards': str(payment_totals['card_amount']),
-                        'transfers': str(payment_totals['transfer_amount']),
-                        'other': str(payment_totals['other_amount'])
+                        'cash': str(ledger.cash_amount),
+                        'cards': str(ledger.card_amount),
+                        'transfers': str(ledger.transfer_amount),
+                        'other': str(ledger.other_amount),
+                        'count': ledger.payment_count
                     },
                     'fiscal_series': {
-                        'first': series_range.get('first_series'),
-                        'last': series_range.get('last_series'),
-                        'count': series_range.get('total_count', 0)
+                        'first': ledger.first_series,
+                        'last': ledger.last_series,
+                        'count': ledger.transaction_count
                     },
                     'generated_by': {
                         'user_id': str(user.id),
@@ -319,15 +843,15 @@ class FiscalReportService:
                     report_type=report_type,
                     user=user,
                     fiscal_date=fiscal_date,
-                    total_transactions=totals['total_count'],
-                    total_amount=totals['total_amount'],
-                    total_tax=totals['total_tax'],
-                    cash_amount=payment_totals['cash_amount'],
-                    card_amount=payment_totals['card_amount'],
-                    transfer_amount=payment_totals['transfer_amount'],
-                    other_amount=payment_totals['other_amount'],
-                    first_series=series_range.get('first_series'),
-                    last_series=series_range.get('last_series'),
+                    total_transactions=ledger.transaction_count,
+                    total_amount=ledger.total_amount,
+                    total_tax=ledger.total_tax,
+                    cash_amount=ledger.cash_amount,
+                    card_amount=ledger.card_amount,
+                    transfer_amount=ledger.transfer_amount,
+                    other_amount=ledger.other_amount,
+                    first_series=FiscalReportService._series_number(ledger.first_series),
+                    last_series=FiscalReportService._series_number(ledger.last_series),
                     report_data=report_data
                 )
                 
@@ -376,28 +900,26 @@ class TaxCalculationService:
     def calculate_taxes(base_amount, tenant, event=None, user=None, transaction=None):
         """
         Calculate taxes using deterministic round-up methodology.
+        Rules come from the memoized tax resolver, so no queries are issued.
         Returns tuple of (tax_amount, tax_details, tax_history_records)
         """
-        tax_configurations = TaxCalculationService.get_active_tax_configurations(tenant, event)
+        total_tax, breakdown = tax_resolver.calculate(
+            tenant.id, event.id if event else None, base_amount
+        )
         
-        if not tax_configurations:
+        if not breakdown:
             return Decimal('0.00'), [], []
         
-        total_tax = Decimal('0.00')
         tax_details = []
         tax_history_records = []
         
-        # Calculate each tax
-        for tax_config in tax_configurations:
-            tax_amount = tax_config.calculate_tax(base_amount)
-            total_tax += tax_amount
-            
+        for rule, tax_amount in breakdown:
             # Prepare tax detail
             tax_detail = {
-                'configuration_id': str(tax_config.id),
-                'name': tax_config.name,
-                'type': tax_config.tax_type,
-                'rate': str(tax_config.rate),
+                'configuration_id': rule.configuration_id,
+                'name': rule.name,
+                'type': rule.tax_type,
+                'rate': str(rule.rate),
                 'base_amount': str(base_amount),
                 'tax_amount': str(tax_amount)
             }
@@ -407,16 +929,13 @@ class TaxCalculationService:
             tax_history = TaxCalculationHistory(
                 tenant=tenant,
                 transaction=transaction,
-                tax_configuration=tax_config,
+                tax_configuration_id=rule.configuration_id,
                 base_amount=base_amount,
                 tax_amount=tax_amount,
                 calculated_by=user
             )
             tax_history_records.append(tax_history)
         
-        # Apply deterministic round-up to total
-        total_tax = total_tax.quantize(Decimal('0.01'), rounding=ROUND_UP)
-        
         return total_tax, tax_details, tax_history_records
     
     @staticmethod
@@ -482,27 +1001,33 @@ class AuditLogService:
     def log_action(tenant, user, action_type, object_type, object_id,
                    fiscal_series=None, old_values=None, new_values=None,
                    description="", ip_address=None, user_agent=None):
-        """Create audit log entry"""
+        """
+        Record an audit log entry.
+        The entry is queued and written in a hash-chained batch by the
+        audit writer, keeping audit overhead off the fiscal operation.
+        Returns the entry. Its id is assigned up front, but when Redis is
+        available the row is only saved by the next flush, so callers must
+        not query or reference it in the same request.
+        """
         try:
-            audit_log = AuditLog.objects.create(
+            audit_log = audit_writer.build_entry(
                 tenant=tenant,
                 user=user,
                 action_type=action_type,
                 object_type=object_type,
                 object_id=object_id,
                 fiscal_series=fiscal_series,
-                old_values=old_values or {},
-                new_values=new_values or {},
+                old_values=old_values,
+                new_values=new_values,
                 description=description,
                 ip_address=ip_address,
                 user_agent=user_agent
             )
+            audit_writer.enqueue(audit_log)
             return audit_log
             
         except Exception as e:
             # Log audit failures but don't break the main operation
-            import logging
-            logger = logging.getLogger(__name__)
             logger.error(f"Failed to create audit log: {str(e)}")
             return None
     
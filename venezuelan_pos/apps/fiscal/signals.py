@@ -0,0 +1,24 @@
+"""
+Django signals for fiscal cache invalidation.
+"""
+
+import logging
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import TaxConfiguration
+from .tax_resolver import tax_resolver
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=TaxConfiguration)
+@receiver(post_delete, sender=TaxConfiguration)
+def invalidate_tax_rules(sender, instance, **kwargs):
+    """
+    Invalidate compiled tax rules when a tax configuration changes.
+    Runs after commit so other processes can't recompile stale rows.
+    """
+    tenant_id = instance.tenant_id
+    transaction.on_commit(lambda: tax_resolver.invalidate(tenant_id))
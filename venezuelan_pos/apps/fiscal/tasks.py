@@ -0,0 +1,29 @@
+"""
+Celery tasks for fiscal compliance.
+"""
+
+import logging
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def flush_audit_log_buffer():
+    """
+    Write queued audit log entries in hash-chained batches.
+    Runs every few seconds so the audit trail lags operations only briefly.
+    """
+    try:
+        from .audit import audit_writer
+
+        written = audit_writer.flush()
+
+        if written > 0:
+            logger.info(f"Wrote {written} buffered audit log entries")
+
+        return written
+
+    except Exception as e:
+        logger.error(f"Error flushing audit log buffer: {e}")
+        return 0
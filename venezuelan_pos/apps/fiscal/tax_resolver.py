@@ -0,0 +1,291 @@
+"""
+Memoized tax rule resolver for checkout hot paths.
+Compiles active TaxConfiguration rows per tenant/event once, caches them
+in process and in the shared cache, and calculates taxes without queries.
+"""
+
+import logging
+import time
+from decimal import Decimal, ROUND_UP
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+CENT = Decimal('0.01')
+
+
+class TaxRule(NamedTuple):
+    """Compiled, immutable form of a TaxConfiguration."""
+    configuration_id: str
+    name: str
+    tax_type: str
+    rate: Decimal
+    fixed_amount: Decimal
+    effective_from: Optional[object]
+    effective_until: Optional[object]
+
+    def to_cache(self) -> Dict:
+        """JSON-safe form of the rule for the shared cache."""
+        return {
+            'configuration_id': self.configuration_id,
+            'name': self.name,
+            'tax_type': self.tax_type,
+            'rate': str(self.rate),
+            'fixed_amount': str(self.fixed_amount),
+            'effective_from': self.effective_from.isoformat() if self.effective_from else None,
+            'effective_until': self.effective_until.isoformat() if self.effective_until else None,
+        }
+
+    @classmethod
+    def from_cache(cls, data: Dict) -> 'TaxRule':
+        """Rebuild a rule from its cached form."""
+        return cls(
+            configuration_id=data['configuration_id'],
+            name=data['name'],
+            tax_type=data['tax_type'],
+            rate=Decimal(data['rate']),
+            fixed_amount=Decimal(data['fixed_amount']),
+            effective_from=parse_datetime(data['effective_from']) if data['effective_from'] else None,
+            effective_until=parse_datetime(data['effective_until']) if data['effective_until'] else None
+        )
+
+    def is_effective(self, at) -> bool:
+        """Check whether the rule applies at a moment in time."""
+        if self.effective_from and at < self.effective_from:
+            return False
+        if self.effective_until and at >= self.effective_until:
+            return False
+        return True
+
+    def calculate(self, base_amount: Decimal) -> Decimal:
+        """Calculate the tax with the same round-up method as TaxConfiguration."""
+        if self.tax_type == 'FIXED':
+            return self.fixed_amount
+
+        if self.tax_type == 'PERCENTAGE':
+            return (base_amount * self.rate).quantize(CENT, rounding=ROUND_UP)
+
+        if self.tax_type == 'COMPOUND':
+            tax_amount = base_amount * self.rate
+            return (tax_amount + tax_amount * self.rate).quantize(CENT, rounding=ROUND_UP)
+
+        return Decimal('0.00')
+
+    @property
+    def effective_rate(self) -> Decimal:
+        """Rate applied to the base amount (0 for fixed taxes)."""
+        if self.tax_type == 'PERCENTAGE':
+            return self.rate
+        if self.tax_type == 'COMPOUND':
+            return self.rate + self.rate * self.rate
+        return Decimal('0.00')
+
+
+class TaxRuleSet:
+    """Compiled tax rules that apply to one tenant/event."""
+
+    def __init__(self, rules: List[TaxRule]):
+        self.rules = rules
+
+    def active_rules(self, at=None) -> List[TaxRule]:
+        """Rules effective at a moment in time (default: now)."""
+        at = at or timezone.now()
+        return [rule for rule in self.rules if rule.is_effective(at)]
+
+    def composite_rate(self, at=None) -> Decimal:
+        """Combined percentage rate of all effective rules."""
+        return sum(
+            (rule.effective_rate for rule in self.active_rules(at)),
+            Decimal('0.0000')
+        )
+
+    def calculate(self, base_amount: Decimal, at=None) -> Tuple[Decimal, List[Tuple[TaxRule, Decimal]]]:
+        """
+        Calculate taxes for a base amount.
+        Returns (total_tax, [(rule, tax_amount), ...]).
+        """
+        breakdown = [(rule, rule.calculate(base_amount)) for rule in self.active_rules(at)]
+        total_tax = sum((amount for _, amount in breakdown), Decimal('0.00'))
+        return total_tax.quantize(CENT, rounding=ROUND_UP), breakdown
+
+    def calculate_many(self, amounts, at=None, include_fixed: bool = True) -> List[Decimal]:
+        """
+        Calculate the total tax for each base amount in one pass.
+        Set include_fixed=False to apply only rate-based taxes.
+        """
+        rules = [
+            rule for rule in self.active_rules(at)
+            if include_fixed or rule.tax_type != 'FIXED'
+        ]
+        return [
+            sum(
+                (rule.calculate(amount) for rule in rules),
+                Decimal('0.00')
+            ).quantize(CENT, rounding=ROUND_UP)
+            for amount in amounts
+        ]
+
+    def allocate(self, amounts, at=None) -> Tuple[Decimal, List[Decimal]]:
+        """
+        Calculate taxes on the sum of several base amounts, e.g. line items,
+        and split them across the amounts in proportion, to the cent.
+        Fixed taxes and rounding are shared out too, so the shares add up to
+        the total tax. Returns (total_tax, [share, ...]).
+        """
+        amounts = list(amounts)
+        base = sum(amounts, Decimal('0.00'))
+        total_tax, _ = self.calculate(base, at)
+        if not amounts:
+            return total_tax, []
+
+        if base:
+            shares = [(total_tax * amount / base).quantize(CENT) for amount in amounts]
+        else:
+            shares = [Decimal('0.00')] * len(amounts)
+
+        # The rounding remainder goes to the largest amount
+        largest = max(range(len(amounts)), key=lambda index: amounts[index])
+        shares[largest] += total_tax - sum(shares, Decimal('0.00'))
+        return total_tax, shares
+
+
+class TaxResolver:
+    """
+    Resolves compiled tax rules per tenant/event.
+    Rules are memoized in process and in the shared cache; saving or deleting
+    a TaxConfiguration bumps the tenant version, invalidating both.
+    """
+
+    CACHE_PREFIX = 'tax_rules'
+    CACHE_TIMEOUT = 24 * 3600
+
+    # Bound the in-process memo
+    MAX_LOCAL_ENTRIES = 1024
+
+    def __init__(self):
+        """Initialize the resolver."""
+        self._local: Dict[Tuple[str, str], Tuple[object, TaxRuleSet]] = {}
+
+    def _get_version_key(self, tenant_id) -> str:
+        """Generate the cache key holding a tenant's rule version."""
+        return f"{self.CACHE_PREFIX}:version:{tenant_id}"
+
+    def _get_rules_key(self, tenant_id, event_id, version) -> str:
+        """Generate the cache key holding compiled rules."""
+        return f"{self.CACHE_PREFIX}:{tenant_id}:{event_id or 'tenant'}:v{version}"
+
+    def _get_version(self, tenant_id):
+        """
+        Get the current rule version for a tenant, seeding it if missing.
+        Returns None when the cache is unavailable.
+        """
+        version_key = self._get_version_key(tenant_id)
+        try:
+            version = cache.get(version_key)
+            if version is None:
+                cache.add(version_key, time.time_ns(), None)
+                version = cache.get(version_key)
+            return version
+        except Exception as e:
+            logger.warning(f"Could not read tax rule version: {e}")
+            return None
+
+    def _compile(self, tenant_id, event_id) -> TaxRuleSet:
+        """Load and compile active tax configurations with a single query."""
+        from .models import TaxConfiguration
+
+        scope_filter = Q(scope='TENANT')
+        if event_id:
+            scope_filter |= Q(scope='EVENT', event_id=event_id)
+
+        configurations = TaxConfiguration.objects.filter(
+            scope_filter,
+            tenant_id=tenant_id,
+            is_active=True
+        ).order_by('-scope', '-created_at')
+
+        return TaxRuleSet([
+            TaxRule(
+                configuration_id=str(config.id),
+                name=config.name,
+                tax_type=config.tax_type,
+                rate=config.rate,
+                fixed_amount=config.fixed_amount,
+                effective_from=config.effective_from,
+                effective_until=config.effective_until
+            )
+            for config in configurations
+        ])
+
+    def get_rule_set(self, tenant_id, event_id=None) -> TaxRuleSet:
+        """
+        Get compiled tax rules for a tenant and optional event.
+        Without a version (cache unavailable) rules are compiled from the
+        database every time, since invalidations could not be seen.
+        """
+        tenant_id = str(tenant_id)
+        event_id = str(event_id) if event_id else None
+        local_key = (tenant_id, event_id)
+        version = self._get_version(tenant_id)
+
+        if version is None:
+            return self._compile(tenant_id, event_id)
+
+        memoized = self._local.get(local_key)
+        if memoized and memoized[0] == version:
+            return memoized[1]
+
+        rules_key = self._get_rules_key(tenant_id, event_id, version)
+        rule_set = None
+        try:
+            rules = cache.get(rules_key)
+            if rules is not None:
+                rule_set = TaxRuleSet([TaxRule.from_cache(rule) for rule in rules])
+        except Exception as e:
+            logger.warning(f"Could not read cached tax rules: {e}")
+
+        if rule_set is None:
+            rule_set = self._compile(tenant_id, event_id)
+            try:
+                cache.set(rules_key, [rule.to_cache() for rule in rule_set.rules], self.CACHE_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"Could not cache tax rules: {e}")
+
+        if len(self._local) >= self.MAX_LOCAL_ENTRIES:
+            self._local.clear()
+        self._local[local_key] = (version, rule_set)
+
+        return rule_set
+
+    def calculate(self, tenant_id, event_id, base_amount: Decimal, at=None):
+        """Calculate taxes for one base amount. See TaxRuleSet.calculate."""
+        return self.get_rule_set(tenant_id, event_id).calculate(base_amount, at)
+
+    def calculate_many(self, tenant_id, event_id, amounts, at=None, include_fixed: bool = True) -> List[Decimal]:
+        """Calculate taxes for many base amounts. See TaxRuleSet.calculate_many."""
+        return self.get_rule_set(tenant_id, event_id).calculate_many(amounts, at, include_fixed)
+
+    def allocate(self, tenant_id, event_id, amounts, at=None) -> Tuple[Decimal, List[Decimal]]:
+        """Calculate taxes on many base amounts together. See TaxRuleSet.allocate."""
+        return self.get_rule_set(tenant_id, event_id).allocate(amounts, at)
+
+    def invalidate(self, tenant_id) -> None:
+        """Invalidate compiled rules for a tenant in every process."""
+        tenant_id = str(tenant_id)
+
+        for key in [key for key in self._local if key[0] == tenant_id]:
+            self._local.pop(key, None)
+
+        try:
+            cache.set(self._get_version_key(tenant_id), time.time_ns(), None)
+        except Exception as e:
+            logger.warning(f"Could not bump tax rule version: {e}")
+
+
+# Global tax resolver instance
+tax_resolver = TaxResolver()
@@ -5,6 +5,8 @@ Tests for Fiscal Compliance System.
 import pytz
 from decimal import Decimal
 from datetime import datetime, date, timedelta
+from unittest import mock
+from django.db import IntegrityError, transaction
 from django.test import TestCase
 from django.utils import timezone
 from django.contrib.auth import get_user_model
@@ -16,11 +18,13 @@ from venezuelan_pos.apps.tenants.models import Tenant
 from venezuelan_pos.apps.events.models import Event
 from .models import (
     FiscalSeries, FiscalSeriesCounter, FiscalDay, FiscalReport,
-    AuditLog, TaxConfiguration, TaxCalculationHistory
+    AuditLog, AuditLogBatch, TaxConfiguration, TaxCalculationHistory,
+    FiscalContinuitySummary
 )
+from .audit import audit_writer, verify_audit_chain
 from .services import (
     FiscalSeriesService, FiscalDayService, FiscalReportService,
-    TaxCalculationService, FiscalComplianceService
+    TaxCalculationService, FiscalComplianceService, FiscalContinuityService
 )
 
 User = get_user_model()
@@ -407,6 +411,75 @@ class FiscalReportServiceTest(TestCase):
         self.assertEqual(z_report1.report_number, 1)
 
 
+class FiscalContinuityServiceTest(TestCase):
+    """Test FiscalContinuityService functionality"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(
+            name="Test Tenant",
+            slug="test-tenant",
+            configuration={}
+        )
+        self.today = timezone.now().astimezone(pytz.timezone('America/Caracas')).date()
+        self.yesterday = self.today - timedelta(days=1)
+
+    def _issue(self, series_number, issued_at):
+        return FiscalSeries.objects.create(
+            tenant=self.tenant,
+            series_number=series_number,
+            issued_at=issued_at
+        )
+
+    def test_continuity_gaps_and_cached_closed_days(self):
+        """Test missing ranges, out-of-order issuance and closed day caching"""
+        caracas_tz = pytz.timezone('America/Caracas')
+        yesterday_noon = caracas_tz.localize(
+            datetime.combine(self.yesterday, datetime.min.time())
+        ) + timedelta(hours=12)
+
+        # Yesterday: 1, 2, then 4 (3 is missing)
+        for offset, number in enumerate([1, 2, 4]):
+            self._issue(number, yesterday_noon + timedelta(minutes=offset))
+
+        # Today: 7 issued before 6 (5 is missing across the day boundary)
+        now = timezone.now()
+        self._issue(7, now - timedelta(seconds=2))
+        self._issue(6, now - timedelta(seconds=1))
+
+        result = FiscalContinuityService.check_continuity(
+            self.tenant, self.yesterday, self.today
+        )
+
+        self.assertFalse(result['is_continuous'])
+        self.assertEqual(result['days_cached'], 0)
+
+        partition = result['partitions'][0]
+        self.assertEqual(partition['source'], 'fiscal_series')
+        self.assertEqual(partition['issued_count'], 5)
+        self.assertEqual(partition['missing_ranges'], [[3, 3], [5, 5]])
+        self.assertEqual(partition['out_of_order'], [6])
+
+        # Only the closed day is stored as an immutable summary
+        self.assertEqual(
+            list(FiscalContinuitySummary.objects.values_list('fiscal_date', flat=True)),
+            [self.yesterday]
+        )
+
+        result = FiscalContinuityService.check_continuity(
+            self.tenant, self.yesterday, self.today
+        )
+        self.assertEqual(result['days_cached'], 1)
+        self.assertEqual(result['partitions'][0]['missing_ranges'], [[3, 3], [5, 5]])
+
+        # A NULL event does not let the same tenant-wide summary be stored twice
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            FiscalContinuitySummary.objects.create(
+                tenant=self.tenant,
+                fiscal_date=self.yesterday,
+                source='fiscal_series'
+            )
+
+
 class AuditLogModelTest(TestCase):
     """Test AuditLog model functionality"""
     
@@ -457,6 +530,72 @@ class AuditLogModelTest(TestCase):
         self.assertEqual(audit_log.timestamp.tzinfo.zone, caracas_tz.zone)
 
 
+class AuditChainTest(TestCase):
+    """Test batched, hash-chained audit log writing"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(
+            name="Test Tenant",
+            slug="test-tenant",
+            configuration={}
+        )
+
+    def _entry(self, object_id, **kwargs):
+        return audit_writer.build_entry(
+            tenant=self.tenant,
+            user=None,
+            action_type='CREATE',
+            object_type='TestObject',
+            object_id=object_id,
+            **kwargs
+        )
+
+    def test_batches_are_chained_and_verified(self):
+        """Test batch chaining and tamper detection"""
+        from .services import AuditLogService
+
+        AuditLogService.log_action(
+            tenant=self.tenant,
+            user=None,
+            action_type='VOID',
+            object_type='FiscalSeries',
+            object_id='1',
+            old_values={'voided_at': None, 'amount': Decimal('10.50')},
+            ip_address='::ffff:10.0.0.1'
+        )
+        batches = audit_writer.write_entries([self._entry(str(n)) for n in range(3)])
+
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(batches[0].sequence, 2)
+        self.assertEqual(batches[0].entry_count, 3)
+        first_batch = AuditLogBatch.objects.get(tenant=self.tenant, sequence=1)
+        self.assertEqual(batches[0].previous_hash, first_batch.batch_hash)
+        self.assertEqual(AuditLog.objects.filter(batch__isnull=False).count(), 4)
+        self.assertEqual(list(verify_audit_chain(self.tenant.id)), [])
+
+        tampered = AuditLog.objects.get(object_id='1', action_type='CREATE')
+        AuditLog.objects.filter(pk=tampered.pk).update(description="Changed")
+
+        issues = {issue['issue'] for issue in verify_audit_chain(self.tenant.id)}
+        self.assertEqual(issues, {'entry_modified', 'entries_hash_mismatch'})
+
+
+    def test_interrupted_flush_is_retried_without_duplicates(self):
+        """Test entries left in the processing list are written exactly once"""
+        entries = [self._entry(str(n)) for n in range(3)]
+        # The first entry was saved before the previous flush stopped
+        audit_writer.write_entries(entries[:1])
+
+        redis_client = mock.Mock()
+        redis_client.lrange.return_value = [audit_writer._serialize(entry) for entry in entries]
+
+        with mock.patch.object(audit_writer, '_redis_client', redis_client):
+            self.assertEqual(audit_writer._write_processing(), 2)
+
+        redis_client.ltrim.assert_called_once_with(audit_writer.PROCESSING_KEY, 3, -1)
+        self.assertEqual(AuditLog.objects.filter(tenant=self.tenant).count(), 3)
+        self.assertEqual(list(verify_audit_chain(self.tenant.id)), [])
+
 class FiscalComplianceAPITest(APITestCase):
     """Test Fiscal Compliance API endpoints"""
     
@@ -13,6 +13,7 @@ from django.core.exceptions import ValidationError
 from django.views.decorators.http import require_http_methods
 import json
 
+from venezuelan_pos.core.db_router import with_reporting_db
 from venezuelan_pos.apps.tenants.mixins import TenantRequiredMixin
 from .models import (
     FiscalSeries, FiscalDay, FiscalReport, AuditLog,
@@ -29,6 +30,7 @@ from .services import (
 
 
 @login_required
+@with_reporting_db
 def fiscal_dashboard(request):
     """Main fiscal compliance dashboard"""
     tenant = request.tenant
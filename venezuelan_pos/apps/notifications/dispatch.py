@@ -0,0 +1,146 @@
+"""
+Batched notification dispatch.
+Templates are fetched and compiled once per tenant and channel, logs are
+written with bulk_create and delivery is enqueued as one Celery task per
+group of logs, so large reminder runs cost a handful of queries and broker
+messages instead of several per recipient.
+"""
+
+import logging
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction as db_transaction
+from django.template import Context, Template
+
+from .models import NotificationLog, NotificationTemplate
+
+logger = logging.getLogger(__name__)
+
+
+class CompiledTemplate:
+    """Notification template with its subject and content parsed once."""
+
+    def __init__(self, template: NotificationTemplate):
+        self.template = template
+        self.content = Template(template.content)
+        self.subject = Template(template.subject) if template.subject else None
+
+    def render(self, context: Dict) -> Tuple[str, str]:
+        """Render (subject, content) for one recipient."""
+        context = Context(context)
+        subject = self.subject.render(context) if self.subject else ''
+        return subject, self.content.render(context)
+
+
+class NotificationBatchDispatcher:
+    """
+    Collects notifications and writes and enqueues them in batches.
+
+    Usage:
+        dispatcher = NotificationBatchDispatcher('payment_reminder', ['email'])
+        dispatcher.prefetch_templates(tenant_ids)
+        dispatcher.add(...)
+        dispatcher.dispatch()
+    """
+
+    # Logs delivered per Celery task
+    TASK_BATCH_SIZE = 100
+
+    def __init__(self, template_name: str, channels: Iterable[str]):
+        self.template_name = template_name
+        self.channels = list(channels)
+        self._templates: Dict[Tuple[str, str], Optional[CompiledTemplate]] = {}
+        self._pending: List[NotificationLog] = []
+
+    # Templates
+
+    def prefetch_templates(self, tenant_ids: Iterable) -> None:
+        """Fetch and compile the active templates of several tenants in one query."""
+        tenant_ids = {str(tenant_id) for tenant_id in tenant_ids} - {
+            tenant_id for tenant_id, _ in self._templates
+        }
+        if not tenant_ids:
+            return
+
+        for tenant_id in tenant_ids:
+            for channel in self.channels:
+                self._templates[(tenant_id, channel)] = None
+
+        templates = NotificationTemplate.objects.all_tenants().filter(
+            tenant_id__in=tenant_ids,
+            name=self.template_name,
+            template_type__in=self.channels,
+            is_active=True
+        )
+        for template in templates:
+            self._templates[(str(template.tenant_id), template.template_type)] = CompiledTemplate(template)
+
+    def get_template(self, tenant_id, channel: str) -> Optional[CompiledTemplate]:
+        """Compiled template for a tenant and channel, or None if it has none."""
+        key = (str(tenant_id), channel)
+        if key not in self._templates:
+            self.prefetch_templates([tenant_id])
+        return self._templates.get(key)
+
+    # Collecting
+
+    def add(self, tenant_id, channel: str, recipient: str, context: Dict,
+            customer=None, transaction=None, event=None) -> Optional[NotificationLog]:
+        """
+        Render a notification and queue its log for the next dispatch.
+        Returns None when the tenant has no active template for the channel.
+        """
+        compiled = self.get_template(tenant_id, channel)
+        if compiled is None:
+            logger.warning(f"Template not found: {self.template_name} ({channel}) for tenant {tenant_id}")
+            return None
+
+        subject, content = compiled.render(context)
+        log = NotificationLog(
+            id=uuid.uuid4(),
+            tenant_id=tenant_id,
+            template=compiled.template,
+            channel=channel,
+            recipient=recipient,
+            subject=subject,
+            content=content,
+            customer=customer,
+            transaction=transaction,
+            event=event
+        )
+        self._pending.append(log)
+        return log
+
+    # Dispatching
+
+    def dispatch(self) -> List[NotificationLog]:
+        """
+        Write queued logs in one bulk insert and enqueue their delivery in
+        groups of TASK_BATCH_SIZE once the surrounding transaction commits.
+        """
+        from .tasks import send_notification_batch
+
+        logs, self._pending = self._pending, []
+        if not logs:
+            return []
+
+        groups = []
+        for start in range(0, len(logs), self.TASK_BATCH_SIZE):
+            group = logs[start:start + self.TASK_BATCH_SIZE]
+            task_id = str(uuid.uuid4())
+            for log in group:
+                log.task_id = task_id
+            groups.append((task_id, [str(log.id) for log in group]))
+
+        NotificationLog.objects.bulk_create(logs)
+
+        for task_id, log_ids in groups:
+            db_transaction.on_commit(
+                lambda task_id=task_id, log_ids=log_ids: send_notification_batch.apply_async(
+                    args=[log_ids], task_id=task_id
+                )
+            )
+
+        logger.info(f"Queued {len(logs)} {self.template_name} notifications in {len(groups)} tasks")
+        return logs
@@ -208,6 +208,60 @@ def send_bulk_notifications(notification_data_list):
     return results
 
 
+@shared_task
+def send_notification_batch(log_ids):
+    """
+    Deliver a group of already rendered notifications.
+    Emails are sent here; SMS and WhatsApp messages are handed to their
+    channel tasks, which mark the logs sent or failed themselves.
+    
+    Args:
+        log_ids (list): NotificationLog IDs to deliver
+    """
+    from .models import NotificationLog
+    
+    sent_ids = []
+    queued = 0
+    failed = 0
+    
+    logs = NotificationLog.objects.all_tenants().filter(id__in=log_ids, status='pending')
+    
+    for log in logs:
+        try:
+            if log.channel == 'email':
+                send_mail(
+                    subject=log.subject,
+                    message=log.content,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    recipient_list=[log.recipient],
+                    fail_silently=False,
+                )
+                sent_ids.append(log.id)
+            elif log.channel == 'sms':
+                send_sms_notification.delay(log.recipient, log.content, log_id=str(log.id))
+                queued += 1
+            elif log.channel == 'whatsapp':
+                send_whatsapp_notification.delay(log.recipient, log.content, log_id=str(log.id))
+                queued += 1
+            else:
+                raise ValueError(f"Unsupported channel: {log.channel}")
+        except Exception as exc:
+            logger.error(f"Notification {log.id} to {log.recipient} failed: {exc}")
+            log.mark_failed(str(exc))
+            failed += 1
+    
+    if sent_ids:
+        NotificationLog.objects.all_tenants().filter(id__in=sent_ids).update(
+            status='sent',
+            sent_at=timezone.now()
+        )
+    
+    logger.info(
+        f"Notification batch delivered: {len(sent_ids)} sent, {queued} queued, {failed} failed"
+    )
+    return {"sent": len(sent_ids), "queued": queued, "failed": failed}
+
+
 @shared_task
 def cleanup_old_notification_logs():
     """
@@ -226,30 +280,14 @@ def cleanup_old_notification_logs():
 @shared_task
 def send_payment_reminder_notifications():
     """
-    Send payment reminder notifications for overdue payments.
+    Send payment reminder notifications for payment plans due within 24 hours.
     """
-    from venezuelan_pos.apps.payments.models import PaymentPlan
-    from .services import NotificationService
-    from datetime import timedelta
-    
-    # Find overdue payment plans
-    overdue_plans = PaymentPlan.objects.filter(
-        status='active',
-        expires_at__lt=timezone.now() + timedelta(days=1)  # Due within 24 hours
-    ).select_related('transaction__customer', 'transaction__event')
+    from venezuelan_pos.apps.payments.services import PaymentReminderService
     
-    notifications_sent = 0
-    
-    for plan in overdue_plans:
-        try:
-            notifications = NotificationService.send_payment_reminder(plan)
-            if notifications:
-                notifications_sent += len(notifications)
-        except Exception as e:
-            logger.error(f"Failed to send payment reminder for plan {plan.id}: {e}")
+    stats = PaymentReminderService.process_payment_reminders()
     
-    logger.info(f"Sent {notifications_sent} payment reminder notifications")
-    return {"notifications_sent": notifications_sent}
+    logger.info(f"Sent {stats['reminders_sent']} payment reminder notifications")
+    return {"notifications_sent": stats['reminders_sent']}
 
 
 @shared_task
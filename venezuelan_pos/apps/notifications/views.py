@@ -9,6 +9,7 @@ from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
 
+from venezuelan_pos.core.db_router import with_reporting_db
 from venezuelan_pos.apps.tenants.mixins import TenantViewMixin
 from .models import NotificationTemplate, NotificationLog, NotificationPreference
 from .serializers import (
@@ -93,6 +94,7 @@ class NotificationLogViewSet(TenantViewMixin, viewsets.ReadOnlyModelViewSet):
         ).select_related('template', 'customer', 'transaction', 'event')
     
     @action(detail=False, methods=['get'])
+    @with_reporting_db
     def stats(self, request):
         """Get notification statistics."""
         days = int(request.query_params.get('days', 30))
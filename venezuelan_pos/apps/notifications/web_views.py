@@ -12,12 +12,14 @@ from django.db.models import Q, Count
 from django.utils import timezone
 from datetime import timedelta
 
+from venezuelan_pos.core.db_router import with_reporting_db
 from .models import NotificationTemplate, NotificationLog, NotificationPreference
 from .forms import NotificationTemplateForm, NotificationPreferenceForm, SendNotificationForm
 from .services import NotificationService
 
 
 @login_required
+@with_reporting_db
 def notification_dashboard(request):
     """Notification management dashboard."""
     tenant = request.user.tenant
@@ -372,6 +374,7 @@ def preference_edit(request, preference_id):
 
 
 @login_required
+@with_reporting_db
 def analytics(request):
     """Notification analytics and statistics."""
     tenant = request.user.tenant
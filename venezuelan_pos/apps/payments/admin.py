@@ -2,7 +2,9 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from .models import PaymentMethod, PaymentPlan, Payment, PaymentReconciliation
+from .models import (
+    PaymentMethod, PaymentPlan, Payment, PaymentOutboxEvent, PaymentReconciliation, PaymentStatement
+)
 
 
 @admin.register(PaymentMethod)
@@ -242,6 +244,45 @@ class PaymentAdmin(admin.ModelAdmin):
     mark_as_failed.short_description = "Mark selected payments as failed"
 
 
+@admin.register(PaymentOutboxEvent)
+class PaymentOutboxEventAdmin(admin.ModelAdmin):
+    """Admin interface for PaymentOutboxEvent model."""
+    
+    list_display = [
+        'event_type', 'payment', 'status', 'attempts',
+        'available_at', 'created_at', 'processed_at'
+    ]
+    list_filter = ['status', 'event_type', 'tenant', 'created_at']
+    search_fields = ['payment__id', 'payment__external_transaction_id', 'last_error']
+    readonly_fields = [
+        'id', 'payment', 'event_type', 'payload', 'attempts',
+        'last_error', 'created_at', 'processed_at'
+    ]
+    ordering = ['-created_at']
+    
+    def get_queryset(self, request):
+        """Filter by tenant and optimize queries."""
+        qs = super().get_queryset(request)
+        qs = qs.select_related('payment', 'tenant')
+        if not request.user.is_superuser and hasattr(request.user, 'tenant'):
+            qs = qs.filter(tenant=request.user.tenant)
+        return qs
+    
+    actions = ['retry_events']
+    
+    def retry_events(self, request, queryset):
+        """Requeue failed events for processing."""
+        from django.utils import timezone
+        
+        updated = queryset.filter(status=PaymentOutboxEvent.Status.FAILED).update(
+            status=PaymentOutboxEvent.Status.PENDING,
+            attempts=0,
+            available_at=timezone.now()
+        )
+        self.message_user(request, f"Requeued {updated} outbox events.")
+    retry_events.short_description = "Retry selected failed events"
+
+
 @admin.register(PaymentReconciliation)
 class PaymentReconciliationAdmin(admin.ModelAdmin):
     """Admin interface for PaymentReconciliation model."""
@@ -349,4 +390,44 @@ class PaymentReconciliationAdmin(admin.ModelAdmin):
                 request, 
                 f"Successfully completed {updated} reconciliations."
             )
-    mark_as_completed.short_description = "Mark selected reconciliations as completed"
\ No newline at end of file
+    mark_as_completed.short_description = "Mark selected reconciliations as completed"
+
+
+@admin.register(PaymentStatement)
+class PaymentStatementAdmin(admin.ModelAdmin):
+    """Admin interface for PaymentStatement model."""
+    
+    list_display = [
+        'source_name', 'payment_method', 'period_start', 'period_end',
+        'line_count', 'total_amount', 'status', 'imported_at'
+    ]
+    list_filter = ['status', 'payment_method__method_type', 'tenant', 'period_end']
+    search_fields = ['source_name']
+    readonly_fields = [
+        'id', 'line_count', 'total_amount', 'status', 'imported_at', 'reconciled_at'
+    ]
+    ordering = ['-period_end']
+    
+    def get_queryset(self, request):
+        """Filter by tenant and optimize queries."""
+        qs = super().get_queryset(request)
+        qs = qs.select_related('payment_method', 'tenant')
+        if not request.user.is_superuser and hasattr(request.user, 'tenant'):
+            qs = qs.filter(tenant=request.user.tenant)
+        return qs
+    
+    actions = ['rebuild_reconciliations']
+    
+    def rebuild_reconciliations(self, request, queryset):
+        """Rebuild daily reconciliations from selected statements."""
+        from .reconciliation import ReconciliationService
+        
+        for statement in queryset:
+            ReconciliationService.build_daily_reconciliations(
+                tenant=statement.tenant,
+                period_start=statement.period_start,
+                period_end=statement.period_end,
+                statement=statement
+            )
+        self.message_user(request, f"Rebuilt reconciliations for {queryset.count()} statements.")
+    rebuild_reconciliations.short_description = "Rebuild daily reconciliations"
@@ -0,0 +1,188 @@
+"""
+Batched expiry of reservations and payment plans.
+Due rows are locked and updated with set-based queries in bounded chunks,
+each in its own short DB transaction, so a large backlog (e.g. after an
+outage) never holds locks on the reservation tables for long.
+"""
+
+import logging
+from typing import Dict, List, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from venezuelan_pos.apps.sales.cache import sales_cache
+from venezuelan_pos.apps.sales.models import Transaction, ReservedTicket
+from venezuelan_pos.apps.zones.models import Seat
+from .models import PaymentPlan
+
+logger = logging.getLogger(__name__)
+
+RESERVATION_FIELDS = ('id', 'seat_id', 'zone_id', 'zone__event_id', 'transaction_id')
+
+
+def _rows(model):
+    """
+    Unscoped queryset of a model. Expiry runs for every tenant, so all
+    queries go through the base manager rather than the tenant-scoped
+    or business-logic default managers.
+    """
+    return model._base_manager.all()
+
+
+class ExpiryService:
+    """Chunked, set-based expiry engine."""
+
+    # Rows expired per DB transaction
+    BATCH_SIZE = 500
+
+    @staticmethod
+    def _lock(queryset, fields, limit=None) -> List[Tuple]:
+        """Lock rows not held by another worker and return the requested fields."""
+        queryset = queryset.select_for_update(skip_locked=True, of=('self',)).values_list(*fields)
+        if limit is not None:
+            queryset = queryset[:limit]
+        return list(queryset)
+
+    @staticmethod
+    def _release_reservations(rows: List[Tuple], now) -> Dict[str, set]:
+        """
+        Expire locked reservations and release their reserved seats in bulk.
+        Returns the ids of everything touched, for cache invalidation.
+        """
+        touched = {
+            'seat_ids': {row[1] for row in rows if row[1]},
+            'zone_ids': {row[2] for row in rows},
+            'event_ids': {row[3] for row in rows},
+            'transaction_ids': {row[4] for row in rows},
+        }
+
+        _rows(ReservedTicket).filter(
+            id__in=[row[0] for row in rows]
+        ).update(status=ReservedTicket.Status.EXPIRED, updated_at=now)
+
+        # Only seats still reserved, and not held by another active
+        # reservation, go back on sale
+        touched['released_seats'] = _rows(Seat).filter(
+            id__in=touched['seat_ids'],
+            status=Seat.Status.RESERVED
+        ).exclude(
+            id__in=_rows(ReservedTicket).filter(
+                seat_id__in=touched['seat_ids'],
+                status=ReservedTicket.Status.ACTIVE
+            ).values('seat_id')
+        ).update(status=Seat.Status.AVAILABLE, updated_at=now)
+
+        return touched
+
+    @staticmethod
+    def _invalidate(touched: Dict[str, set]) -> None:
+        """Invalidate caches for one chunk with a single cache round trip."""
+        sales_cache.invalidate_availability_many(
+            seat_ids=touched['seat_ids'],
+            zone_ids=touched['zone_ids'],
+            event_ids=touched['event_ids'],
+            transaction_ids=touched['transaction_ids']
+        )
+
+    @classmethod
+    def expire_reservations(cls, now=None, batch_size: int = None) -> Dict[str, int]:
+        """
+        Expire active reservations past their reserved_until time.
+
+        Returns:
+            dict: Statistics about expired reservations
+        """
+        now = now or timezone.now()
+        batch_size = batch_size or cls.BATCH_SIZE
+        stats = {'expired_reservations': 0, 'released_seats': 0, 'batches': 0}
+
+        while True:
+            with transaction.atomic():
+                rows = cls._lock(
+                    _rows(ReservedTicket).filter(
+                        status=ReservedTicket.Status.ACTIVE,
+                        reserved_until__lte=now
+                    ).order_by('reserved_until'),
+                    RESERVATION_FIELDS,
+                    batch_size
+                )
+                if not rows:
+                    break
+
+                touched = cls._release_reservations(rows, now)
+
+            cls._invalidate(touched)
+            stats['expired_reservations'] += len(rows)
+            stats['released_seats'] += touched['released_seats']
+            stats['batches'] += 1
+
+            if len(rows) < batch_size:
+                break
+
+        return stats
+
+    @classmethod
+    def expire_payment_plans(cls, now=None, batch_size: int = None) -> Dict[str, int]:
+        """
+        Expire active payment plans past expires_at, releasing all active
+        reservations of their transactions and cancelling reserved transactions.
+
+        Returns:
+            dict: Statistics about expired payment plans
+        """
+        now = now or timezone.now()
+        batch_size = batch_size or cls.BATCH_SIZE
+        stats = {
+            'expired_payment_plans': 0,
+            'expired_reservations': 0,
+            'released_seats': 0,
+            'cancelled_transactions': 0,
+            'batches': 0,
+        }
+
+        while True:
+            with transaction.atomic():
+                plans = cls._lock(
+                    _rows(PaymentPlan).filter(
+                        status=PaymentPlan.Status.ACTIVE,
+                        expires_at__lte=now
+                    ).order_by('expires_at'),
+                    ('id', 'transaction_id'),
+                    batch_size
+                )
+                if not plans:
+                    break
+
+                transaction_ids = {plan[1] for plan in plans}
+
+                _rows(PaymentPlan).filter(
+                    id__in=[plan[0] for plan in plans]
+                ).update(status=PaymentPlan.Status.EXPIRED)
+
+                rows = cls._lock(
+                    _rows(ReservedTicket).filter(
+                        transaction_id__in=transaction_ids,
+                        status=ReservedTicket.Status.ACTIVE
+                    ),
+                    RESERVATION_FIELDS
+                )
+                touched = cls._release_reservations(rows, now)
+                touched['transaction_ids'] |= transaction_ids
+
+                cancelled = _rows(Transaction).filter(
+                    id__in=transaction_ids,
+                    status=Transaction.Status.RESERVED
+                ).update(status=Transaction.Status.CANCELLED, updated_at=now)
+
+            cls._invalidate(touched)
+            stats['expired_payment_plans'] += len(plans)
+            stats['expired_reservations'] += len(rows)
+            stats['released_seats'] += touched['released_seats']
+            stats['cancelled_transactions'] += cancelled
+            stats['batches'] += 1
+
+            if len(plans) < batch_size:
+                break
+
+        return stats
@@ -3,9 +3,14 @@ Fiscal integration services for payment completion.
 Handles fiscal series generation only when payments are fully completed.
 """
 
+import csv
+import json
 from decimal import Decimal
 from django.db import transaction, models
+from django.db.models import F, Value, Window
+from django.db.models.functions import Cast, Coalesce, Lag, Right
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 
 from .models import Payment, PaymentPlan
@@ -124,7 +129,7 @@ class FiscalCompletionService:
     """Service for handling fiscal completion of transactions."""
     
     @staticmethod
-    def complete_transaction_with_fiscal_validation(transaction_obj):
+    def complete_transaction_with_fiscal_validation(transaction_obj, notify=True):
         """
         Complete a transaction with fiscal validation.
 
@@ -132,6 +137,8 @@ class FiscalCompletionService:
 
         Args:
             transaction_obj: Transaction instance
+            notify: Send purchase notifications inline (False when the caller
+                queues them, e.g. through the payment outbox)
 
         Returns:
             dict: Completion result with fiscal details
@@ -153,7 +160,7 @@ class FiscalCompletionService:
 
         # Complete the transaction (this generates fiscal series)
         # Note: transaction.complete() also has an atomic block that needs to be removed
-        completed_transaction = transaction_obj.complete()
+        completed_transaction = transaction_obj.complete(notify=notify)
 
         # Log fiscal completion
         fiscal_details = {
@@ -173,13 +180,14 @@ class FiscalCompletionService:
         }
     
     @staticmethod
-    def handle_payment_completion_trigger(payment):
+    def handle_payment_completion_trigger(payment, notify=True):
         """
         Handle fiscal completion when a payment is completed.
         This is called from payment completion signals/services.
         
         Args:
             payment: Payment instance that was just completed
+            notify: Send purchase notifications inline
             
         Returns:
             dict: Result of fiscal completion attempt
@@ -192,7 +200,7 @@ class FiscalCompletionService:
                 # For payment plans, only complete when plan is fully paid
                 if payment.payment_plan.is_completed:
                     return FiscalCompletionService.complete_transaction_with_fiscal_validation(
-                        transaction_obj
+                        transaction_obj, notify=notify
                     )
                 else:
                     return {
@@ -203,7 +211,7 @@ class FiscalCompletionService:
             else:
                 # For direct payments, complete immediately if fully paid
                 return FiscalCompletionService.complete_transaction_with_fiscal_validation(
-                    transaction_obj
+                    transaction_obj, notify=notify
                 )
         
         except ValidationError as e:
@@ -213,6 +221,14 @@ class FiscalCompletionService:
                 'message': 'Fiscal validation failed'
             }
     
+    @staticmethod
+    def serialize_result(result):
+        """Convert a completion result to JSON-safe data for payment metadata."""
+        return json.loads(json.dumps(
+            {key: value for key, value in result.items() if key != 'transaction'},
+            cls=DjangoJSONEncoder
+        ))
+    
     @staticmethod
     def handle_payment_failure_trigger(payment):
         """
@@ -328,53 +344,214 @@ class FiscalAuditService:
         
         return audit_info
     
+    # Digits in the numeric part of a transaction fiscal series
+    # (see sales.FiscalSeriesManager.get_next_series)
+    SERIES_DIGITS = 8
+
+    INTEGRITY_FIELDS = [
+        'check', 'transaction_id', 'fiscal_series', 'issue', 'severity'
+    ]
+
     @staticmethod
-    def validate_fiscal_integrity(tenant=None):
+    def validate_fiscal_integrity(tenant=None, max_issues=None):
         """
         Validate fiscal integrity across transactions.
         
         Args:
             tenant: Optional tenant to filter by
+            max_issues: Optional cap on issues kept in the result list
             
         Returns:
             dict: Integrity validation results
         """
-        from django.db import models
+        transactions = Transaction.objects.all()
+        if tenant:
+            transactions = transactions.filter(tenant=tenant)
+        
+        integrity_issues = []
+        issues_count = 0
+        
+        for issue in FiscalAuditService.iter_integrity_issues(tenant=tenant):
+            issues_count += 1
+            if max_issues is None or len(integrity_issues) < max_issues:
+                integrity_issues.append(issue)
         
-        # Base queryset
+        return {
+            'total_transactions_checked': transactions.filter(
+                status=Transaction.Status.COMPLETED,
+                fiscal_series__isnull=False
+            ).count(),
+            'integrity_issues': integrity_issues,
+            'issues_count': issues_count,
+            'is_valid': issues_count == 0
+        }
+    
+    @staticmethod
+    def iter_integrity_issues(tenant=None, chunk_size=2000):
+        """
+        Stream fiscal integrity issues as dicts.
+        
+        Each check is a single grouped or windowed query whose rows are
+        streamed with iterator(), so memory stays flat for any tenant size.
+        
+        Args:
+            tenant: Optional tenant to filter by
+            chunk_size: Rows fetched per database round trip
+            
+        Yields:
+            dict: Issue with check, transaction_id, fiscal_series, issue and severity
+        """
         transactions = Transaction.objects.all()
         if tenant:
             transactions = transactions.filter(tenant=tenant)
         
-        # Find transactions with fiscal series but incomplete payments
-        completed_transactions = transactions.filter(
+        yield from FiscalAuditService._iter_payment_mismatches(transactions, chunk_size)
+        yield from FiscalAuditService._iter_series_gaps(transactions, chunk_size)
+        yield from FiscalAuditService._iter_series_duplicates(transactions, chunk_size)
+        yield from FiscalAuditService._iter_voided_series_mismatches(tenant, chunk_size)
+    
+    @staticmethod
+    def write_integrity_csv(output, tenant=None, chunk_size=2000):
+        """
+        Write fiscal integrity issues to a file-like object as CSV.
+        
+        Returns:
+            int: Number of issues written
+        """
+        writer = csv.DictWriter(output, fieldnames=FiscalAuditService.INTEGRITY_FIELDS)
+        writer.writeheader()
+        
+        issues_count = 0
+        for issue in FiscalAuditService.iter_integrity_issues(tenant, chunk_size):
+            writer.writerow(issue)
+            issues_count += 1
+        
+        return issues_count
+    
+    @staticmethod
+    def _series_number():
+        """Numeric part of the transaction fiscal series as a SQL expression."""
+        return Cast(
+            Right('fiscal_series', FiscalAuditService.SERIES_DIGITS),
+            output_field=models.BigIntegerField()
+        )
+    
+    @staticmethod
+    def _iter_payment_mismatches(transactions, chunk_size):
+        """Completed transactions whose completed payments don't cover the total."""
+        mismatches = transactions.filter(
             status=Transaction.Status.COMPLETED,
             fiscal_series__isnull=False
-        )
+        ).annotate(
+            paid_amount=Coalesce(
+                models.Sum(
+                    'payments__amount',
+                    filter=models.Q(payments__status=Payment.Status.COMPLETED)
+                ),
+                Value(Decimal('0.00')),
+                output_field=models.DecimalField(max_digits=10, decimal_places=2)
+            )
+        ).filter(
+            paid_amount__lt=F('total_amount')
+        ).values_list('id', 'fiscal_series', 'total_amount', 'paid_amount')
         
-        integrity_issues = []
+        for transaction_id, fiscal_series, total_amount, paid_amount in mismatches.iterator(chunk_size=chunk_size):
+            if paid_amount:
+                message = f"Insufficient payment. Paid: {paid_amount}, Required: {total_amount}"
+            else:
+                message = "No completed payments found"
+            
+            yield {
+                'check': 'payment_total',
+                'transaction_id': str(transaction_id),
+                'fiscal_series': fiscal_series,
+                'issue': message,
+                'severity': 'high'
+            }
+    
+    @staticmethod
+    def _iter_series_gaps(transactions, chunk_size):
+        """Missing consecutive numbers within each tenant/event series."""
+        gaps = transactions.filter(
+            fiscal_series__isnull=False
+        ).annotate(
+            series_number=FiscalAuditService._series_number(),
+            series_step=FiscalAuditService._series_number() - Coalesce(
+                Window(
+                    expression=Lag(FiscalAuditService._series_number()),
+                    partition_by=[F('tenant_id'), F('event_id')],
+                    order_by=FiscalAuditService._series_number().asc()
+                ),
+                Value(0)
+            )
+        ).filter(
+            series_step__gt=1
+        ).values_list('id', 'fiscal_series', 'series_number', 'series_step')
+        
+        for transaction_id, fiscal_series, series_number, series_step in gaps.iterator(chunk_size=chunk_size):
+            yield {
+                'check': 'series_gap',
+                'transaction_id': str(transaction_id),
+                'fiscal_series': fiscal_series,
+                'issue': (
+                    f"Fiscal series gap: {series_step - 1} number(s) missing "
+                    f"between {series_number - series_step} and {series_number}"
+                ),
+                'severity': 'high'
+            }
+    
+    @staticmethod
+    def _iter_series_duplicates(transactions, chunk_size):
+        """Series numbers issued more than once within a tenant/event series."""
+        duplicates = transactions.filter(
+            fiscal_series__isnull=False
+        ).annotate(
+            occurrences=Window(
+                expression=models.Count('id'),
+                partition_by=[F('tenant_id'), F('event_id'), FiscalAuditService._series_number()]
+            )
+        ).filter(
+            occurrences__gt=1
+        ).values_list('id', 'fiscal_series', 'occurrences')
+        
+        for transaction_id, fiscal_series, occurrences in duplicates.iterator(chunk_size=chunk_size):
+            yield {
+                'check': 'series_duplicate',
+                'transaction_id': str(transaction_id),
+                'fiscal_series': fiscal_series,
+                'issue': f"Fiscal series number issued {occurrences} times",
+                'severity': 'critical'
+            }
+    
+    @staticmethod
+    def _iter_voided_series_mismatches(tenant, chunk_size):
+        """Voided series on live transactions, or live series on voided transactions."""
+        from venezuelan_pos.apps.fiscal.models import FiscalSeries
         
-        for transaction_obj in completed_transactions:
-            try:
-                is_valid, message, _ = FiscalPaymentValidator.validate_payment_completion(transaction_obj)
-                if not is_valid:
-                    integrity_issues.append({
-                        'transaction_id': str(transaction_obj.id),
-                        'fiscal_series': transaction_obj.fiscal_series,
-                        'issue': message,
-                        'severity': 'high'
-                    })
-            except Exception as e:
-                integrity_issues.append({
-                    'transaction_id': str(transaction_obj.id),
-                    'fiscal_series': transaction_obj.fiscal_series,
-                    'issue': f"Validation error: {str(e)}",
-                    'severity': 'critical'
-                })
+        voided_states = [Transaction.Status.CANCELLED, Transaction.Status.REFUNDED]
         
-        return {
-            'total_transactions_checked': completed_transactions.count(),
-            'integrity_issues': integrity_issues,
-            'issues_count': len(integrity_issues),
-            'is_valid': len(integrity_issues) == 0
-        }
\ No newline at end of file
+        series = FiscalSeries.objects.filter(transaction__isnull=False)
+        if tenant:
+            series = series.filter(tenant=tenant)
+        
+        mismatches = series.filter(
+            models.Q(is_voided=True, transaction__status=Transaction.Status.COMPLETED) |
+            models.Q(is_voided=False, transaction__status__in=voided_states)
+        ).values_list(
+            'transaction_id', 'transaction__fiscal_series', 'series_number',
+            'is_voided', 'transaction__status'
+        )
+        
+        for transaction_id, fiscal_series, series_number, is_voided, status in mismatches.iterator(chunk_size=chunk_size):
+            if is_voided:
+                message = f"Voided fiscal series {series_number} on a {status} transaction"
+            else:
+                message = f"Active fiscal series {series_number} on a {status} transaction"
+            
+            yield {
+                'check': 'voided_series',
+                'transaction_id': str(transaction_id),
+                'fiscal_series': fiscal_series,
+                'issue': message,
+                'severity': 'critical'
+            }
@@ -17,6 +17,13 @@ class Command(BaseCommand):
             help='Show what would be cleaned up without actually doing it',
         )
         
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Rows expired per database transaction',
+        )
+        
         parser.add_argument(
             '--verbose',
             action='store_true',
@@ -40,7 +47,9 @@ class Command(BaseCommand):
         
         try:
             if not dry_run:
-                stats = ReservationService.cleanup_expired_reservations()
+                stats = ReservationService.cleanup_expired_reservations(
+                    batch_size=options['batch_size']
+                )
             else:
                 # For dry run, just count what would be cleaned up
                 from venezuelan_pos.apps.payments.models import PaymentPlan
@@ -0,0 +1,138 @@
+"""
+Management command to build daily payment reconciliations.
+Optionally imports an external CSV or JSON statement, matches it against
+payments and writes the discrepancies found as CSV.
+"""
+
+import os
+from datetime import date, timedelta
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from venezuelan_pos.apps.payments.models import PaymentMethod
+from venezuelan_pos.apps.payments.reconciliation import ReconciliationService
+
+
+class Command(BaseCommand):
+    help = 'Build daily payment reconciliations, optionally matching an external statement'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            type=str,
+            required=True,
+            help='Tenant slug to reconcile',
+        )
+
+        parser.add_argument(
+            '--start',
+            type=date.fromisoformat,
+            help='First day to reconcile, YYYY-MM-DD (default: yesterday)',
+        )
+
+        parser.add_argument(
+            '--end',
+            type=date.fromisoformat,
+            help='Last day to reconcile, YYYY-MM-DD (default: start)',
+        )
+
+        parser.add_argument(
+            '--payment-method',
+            type=str,
+            help='Payment method ID to reconcile (default: all methods)',
+        )
+
+        parser.add_argument(
+            '--statement',
+            type=str,
+            help='External statement file to import and match',
+        )
+
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'json'],
+            help='Statement format (default: from the file extension)',
+        )
+
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='CSV file to write statement discrepancies to (default: stdout)',
+        )
+
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=ReconciliationService.CHUNK_SIZE,
+            help='Statement lines matched per database round trip',
+        )
+
+    def handle(self, *args, **options):
+        from venezuelan_pos.apps.tenants.models import Tenant
+
+        try:
+            tenant = Tenant.objects.get(slug=options['tenant'])
+        except Tenant.DoesNotExist:
+            raise CommandError(f"Tenant '{options['tenant']}' not found")
+
+        payment_method = None
+        if options['payment_method']:
+            try:
+                payment_method = PaymentMethod.objects.get(tenant=tenant, id=options['payment_method'])
+            except (PaymentMethod.DoesNotExist, ValidationError):
+                raise CommandError(f"Payment method '{options['payment_method']}' not found")
+
+        period_start = options['start'] or timezone.localdate() - timedelta(days=1)
+        period_end = options['end'] or period_start
+
+        started_at = timezone.now()
+        statement = None
+
+        try:
+            if options['statement']:
+                statement_format = options['format'] or os.path.splitext(options['statement'])[1].lstrip('.').lower()
+                if statement_format == 'jsonl':
+                    statement_format = 'json'
+
+                with open(options['statement'], newline='') as stream:
+                    statement = ReconciliationService.import_statement(
+                        tenant=tenant,
+                        stream=stream,
+                        statement_format=statement_format,
+                        period_start=period_start,
+                        period_end=period_end,
+                        payment_method=payment_method,
+                        source_name=os.path.basename(options['statement']),
+                        chunk_size=options['chunk_size']
+                    )
+                self.stderr.write(f"Imported {statement.line_count} statement lines")
+
+            reconciliations = ReconciliationService.build_daily_reconciliations(
+                tenant=tenant,
+                period_start=period_start,
+                period_end=period_end,
+                payment_method=payment_method,
+                statement=statement
+            )
+        except (ValidationError, OSError) as e:
+            raise CommandError(str(e))
+
+        discrepancies = 0
+        if statement is not None:
+            if options['output']:
+                with open(options['output'], 'w', newline='') as output:
+                    discrepancies = ReconciliationService.write_discrepancies_csv(output, statement)
+            else:
+                discrepancies = ReconciliationService.write_discrepancies_csv(self.stdout, statement)
+
+        elapsed = (timezone.now() - started_at).total_seconds()
+        message = (
+            f"Reconciliation finished in {elapsed:.1f}s: {len(reconciliations)} daily reconciliation(s), "
+            f"{discrepancies} discrepancy(ies) found"
+        )
+
+        if discrepancies:
+            self.stderr.write(self.style.WARNING(message))
+        else:
+            self.stderr.write(self.style.SUCCESS(message))
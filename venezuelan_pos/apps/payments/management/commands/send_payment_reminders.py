@@ -17,6 +17,13 @@ class Command(BaseCommand):
             help='Show what reminders would be sent without actually sending them',
         )
         
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Payment plans processed per notification batch',
+        )
+        
         parser.add_argument(
             '--verbose',
             action='store_true',
@@ -40,7 +47,9 @@ class Command(BaseCommand):
         
         try:
             if not dry_run:
-                stats = PaymentReminderService.process_payment_reminders()
+                stats = PaymentReminderService.process_payment_reminders(
+                    batch_size=options['batch_size']
+                )
             else:
                 # For dry run, just count what would be sent
                 plans_needing_reminders = PaymentReminderService.get_payment_plans_needing_reminders()
@@ -67,6 +76,7 @@ class Command(BaseCommand):
             
             self.stdout.write(f"  - Reminders sent: {stats['reminders_sent']}")
             self.stdout.write(f"  - Reminders failed: {stats['reminders_failed']}")
+            self.stdout.write(f"  - Reminders skipped: {stats.get('reminders_skipped', 0)}")
             
             if verbose:
                 self.stdout.write(
@@ -0,0 +1,62 @@
+"""
+Management command to validate fiscal integrity and export issues as CSV.
+Intended for nightly runs.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from venezuelan_pos.apps.payments.fiscal_integration import FiscalAuditService
+
+
+class Command(BaseCommand):
+    help = 'Validate fiscal integrity (payments, series gaps/duplicates, voided series) and write issues as CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            type=str,
+            help='Tenant slug to validate (default: all tenants)',
+        )
+
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='CSV file to write issues to (default: stdout)',
+        )
+
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Rows fetched per database round trip',
+        )
+
+    def handle(self, *args, **options):
+        tenant = None
+        if options['tenant']:
+            from venezuelan_pos.apps.tenants.models import Tenant
+
+            try:
+                tenant = Tenant.objects.get(slug=options['tenant'])
+            except Tenant.DoesNotExist:
+                raise CommandError(f"Tenant '{options['tenant']}' not found")
+
+        started_at = timezone.now()
+
+        if options['output']:
+            with open(options['output'], 'w', newline='') as output:
+                issues_count = FiscalAuditService.write_integrity_csv(
+                    output, tenant=tenant, chunk_size=options['chunk_size']
+                )
+        else:
+            issues_count = FiscalAuditService.write_integrity_csv(
+                self.stdout, tenant=tenant, chunk_size=options['chunk_size']
+            )
+
+        elapsed = (timezone.now() - started_at).total_seconds()
+        message = f"Fiscal integrity check finished in {elapsed:.1f}s: {issues_count} issue(s) found"
+
+        if issues_count:
+            self.stderr.write(self.style.WARNING(message))
+        else:
+            self.stderr.write(self.style.SUCCESS(message))
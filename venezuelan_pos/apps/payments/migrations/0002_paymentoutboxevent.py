@@ -0,0 +1,172 @@
+# Generated by Django 5.0.14 on 2026-10-18 21:00
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+def dedupe_external_transaction_ids(apps, schema_editor):
+    """
+    Keep each tenant's external transaction id on one payment before the
+    unique constraint is added: the completed one, else the oldest. The
+    others have the id moved into their metadata.
+    """
+    Payment = apps.get_model("payments", "Payment")
+
+    duplicates = (
+        Payment.objects.exclude(external_transaction_id="")
+        .values("tenant_id", "external_transaction_id")
+        .annotate(count=models.Count("id"))
+        .filter(count__gt=1)
+    )
+
+    for duplicate in duplicates:
+        payments = Payment.objects.filter(
+            tenant_id=duplicate["tenant_id"],
+            external_transaction_id=duplicate["external_transaction_id"],
+        ).order_by(
+            models.Case(models.When(status="completed", then=0), default=1),
+            "created_at",
+        )
+
+        for payment in list(payments)[1:]:
+            payment.metadata = payment.metadata or {}
+            payment.metadata["duplicate_external_transaction_id"] = payment.external_transaction_id
+            payment.external_transaction_id = ""
+            payment.save(update_fields=["metadata", "external_transaction_id"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0001_initial"),
+        ("sales", "0003_cartitemlock_and_more"),
+        ("tenants", "0002_add_performance_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PaymentOutboxEvent",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "event_type",
+                    models.CharField(
+                        choices=[
+                            ("fiscal_audit", "Fiscal Audit"),
+                            ("purchase_confirmation", "Purchase Confirmation"),
+                            ("payment_received", "Payment Received Notification"),
+                            ("cache_invalidation", "Cache Invalidation"),
+                        ],
+                        help_text="Side effect to perform",
+                        max_length=30,
+                    ),
+                ),
+                (
+                    "payload",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="Data needed to perform the side effect",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("processed", "Processed"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        help_text="Processing status",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Number of processing attempts"
+                    ),
+                ),
+                (
+                    "last_error",
+                    models.TextField(
+                        blank=True, help_text="Error from the last failed attempt"
+                    ),
+                ),
+                (
+                    "available_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        help_text="Earliest time the event may be processed",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "processed_at",
+                    models.DateTimeField(
+                        blank=True, help_text="When the event was processed", null=True
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Payment Outbox Event",
+                "verbose_name_plural": "Payment Outbox Events",
+                "db_table": "payment_outbox_events",
+                "ordering": ["created_at"],
+            },
+        ),
+        migrations.RunPython(
+            dedupe_external_transaction_ids, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="payment",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("external_transaction_id", ""), _negated=True),
+                fields=("tenant", "external_transaction_id"),
+                name="unique_payment_external_transaction_id",
+            ),
+        ),
+        migrations.AddField(
+            model_name="paymentoutboxevent",
+            name="payment",
+            field=models.ForeignKey(
+                help_text="Payment whose state change produced this event",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="outbox_events",
+                to="payments.payment",
+            ),
+        ),
+        migrations.AddField(
+            model_name="paymentoutboxevent",
+            name="tenant",
+            field=models.ForeignKey(
+                help_text="Tenant this record belongs to",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="%(class)s_set",
+                to="tenants.tenant",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="paymentoutboxevent",
+            index=models.Index(
+                fields=["status", "available_at"], name="payment_out_status_795ab8_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="paymentoutboxevent",
+            index=models.Index(
+                fields=["payment", "event_type"], name="payment_out_payment_060fa7_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,242 @@
+# Generated by Django 5.0.14 on 2026-10-18 21:09
+
+import django.db.models.deletion
+import uuid
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0002_paymentoutboxevent"),
+        ("tenants", "0002_add_performance_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PaymentStatement",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "source_name",
+                    models.CharField(
+                        blank=True,
+                        help_text="Name of the imported statement file",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "period_start",
+                    models.DateField(
+                        help_text="First business date covered by the statement"
+                    ),
+                ),
+                (
+                    "period_end",
+                    models.DateField(
+                        help_text="Last business date covered by the statement"
+                    ),
+                ),
+                (
+                    "line_count",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Number of statement lines"
+                    ),
+                ),
+                (
+                    "total_amount",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        help_text="Sum of statement line amounts",
+                        max_digits=14,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("imported", "Imported"),
+                            ("reconciled", "Reconciled"),
+                        ],
+                        default="imported",
+                        help_text="Statement status",
+                        max_length=15,
+                    ),
+                ),
+                ("imported_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "reconciled_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="When daily reconciliations were last built from this statement",
+                        null=True,
+                    ),
+                ),
+                (
+                    "payment_method",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Payment method the statement covers (blank for mixed statements)",
+                        null=True,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="statements",
+                        to="payments.paymentmethod",
+                    ),
+                ),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        help_text="Tenant this record belongs to",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="%(class)s_set",
+                        to="tenants.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Payment Statement",
+                "verbose_name_plural": "Payment Statements",
+                "db_table": "payment_statements",
+                "ordering": ["-period_end", "-imported_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="PaymentStatementLine",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "line_number",
+                    models.PositiveIntegerField(
+                        help_text="Position of the line in the statement file"
+                    ),
+                ),
+                (
+                    "external_transaction_id",
+                    models.CharField(
+                        help_text="External transaction ID as reported by the statement",
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "amount",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Amount as reported by the statement",
+                        max_digits=12,
+                    ),
+                ),
+                (
+                    "posted_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="Posting time as reported by the statement",
+                        null=True,
+                    ),
+                ),
+                (
+                    "business_date",
+                    models.DateField(
+                        blank=True,
+                        help_text="Day the line is reconciled under",
+                        null=True,
+                    ),
+                ),
+                (
+                    "match_status",
+                    models.CharField(
+                        choices=[
+                            ("matched", "Matched"),
+                            ("amount_mismatch", "Amount Mismatch"),
+                            ("status_mismatch", "Payment Not Completed"),
+                            ("missing_in_system", "Missing in System"),
+                        ],
+                        help_text="Outcome of matching the line",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "payment",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Payment matched by external transaction ID",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="statement_lines",
+                        to="payments.payment",
+                    ),
+                ),
+                (
+                    "payment_method",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Payment method the line is reconciled under",
+                        null=True,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="+",
+                        to="payments.paymentmethod",
+                    ),
+                ),
+                (
+                    "statement",
+                    models.ForeignKey(
+                        help_text="Statement this line belongs to",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="lines",
+                        to="payments.paymentstatement",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Payment Statement Line",
+                "verbose_name_plural": "Payment Statement Lines",
+                "db_table": "payment_statement_lines",
+                "ordering": ["statement", "line_number"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="paymentstatement",
+            index=models.Index(
+                fields=["tenant", "period_start", "period_end"],
+                name="payment_sta_tenant__4ff6d2_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="paymentstatementline",
+            index=models.Index(
+                fields=["statement", "external_transaction_id"],
+                name="payment_sta_stateme_d454a0_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="paymentstatementline",
+            index=models.Index(
+                fields=["statement", "payment_method", "business_date"],
+                name="payment_sta_stateme_f54e1a_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="paymentstatementline",
+            index=models.Index(
+                fields=["statement", "match_status"],
+                name="payment_sta_stateme_15ebb3_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.0.14 on 2026-10-18 21:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0003_paymentstatement"),
+        ("sales", "0003_cartitemlock_and_more"),
+        ("tenants", "0002_add_performance_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="payment",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(
+                fields=["tenant", "updated_at"], name="payments_tenant__73e50b_idx"
+            ),
+        ),
+    ]
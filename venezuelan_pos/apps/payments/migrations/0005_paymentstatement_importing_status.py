@@ -0,0 +1,27 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0004_updated_at_watermarks"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="paymentstatement",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("importing", "Importing"),
+                    ("imported", "Imported"),
+                    ("reconciled", "Reconciled"),
+                ],
+                default="imported",
+                help_text="Statement status",
+                max_length=15,
+            ),
+        ),
+    ]
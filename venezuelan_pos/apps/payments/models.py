@@ -576,6 +576,7 @@ class Payment(TenantAwareModel):
         blank=True,
         help_text="When payment was completed"
     )
+    updated_at = models.DateTimeField(auto_now=True)
     
     # Additional data
     processor_response = models.JSONField(
@@ -608,6 +609,15 @@ class Payment(TenantAwareModel):
             models.Index(fields=['reference_number']),
             models.Index(fields=['external_transaction_id']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['tenant', 'updated_at']),
+        ]
+        constraints = [
+            # Idempotency key for processor callbacks
+            models.UniqueConstraint(
+                fields=['tenant', 'external_transaction_id'],
+                condition=~Q(external_transaction_id=''),
+                name='unique_payment_external_transaction_id'
+            ),
         ]
     
     def __str__(self):
@@ -667,34 +677,77 @@ class Payment(TenantAwareModel):
         """
         Mark payment as completed.
 
-        Note: This method should be called within a transaction.atomic() block
+        Idempotent per payment and external transaction id: completing an
+        already completed payment again (e.g. a retried webhook) is a no-op.
+        All state changes (payment, payment plan, transaction completion and
+        fiscal series) run in one DB transaction; notifications and cache
+        invalidation are written to the payment outbox and run after commit.
+
+        Returns:
+            bool: True if the payment was completed by this call
         """
-        self.status = self.Status.COMPLETED
-        self.completed_at = timezone.now()
+        with transaction.atomic():
+            current = Payment.objects.select_for_update().get(pk=self.pk)
 
-        if external_transaction_id:
-            self.external_transaction_id = external_transaction_id
+            if current.status == self.Status.COMPLETED:
+                if (external_transaction_id and
+                        current.external_transaction_id != external_transaction_id):
+                    raise ValidationError(
+                        "Payment was already completed with a different external transaction id"
+                    )
+                self.refresh_from_db()
+                return False
 
-        if processor_response:
-            self.processor_response = processor_response
+            if current.status not in [self.Status.PENDING, self.Status.PROCESSING]:
+                raise ValidationError("Payment cannot be completed in current status")
 
-        self.save(update_fields=[
-            'status', 'completed_at', 'external_transaction_id', 'processor_response'
-        ])
+            if external_transaction_id and Payment.objects.filter(
+                tenant_id=self.tenant_id,
+                external_transaction_id=external_transaction_id
+            ).exclude(pk=self.pk).exists():
+                raise ValidationError(
+                    f"External transaction id {external_transaction_id} is already used by another payment"
+                )
 
-        # Update payment plan if exists
-        if self.payment_plan:
-            self.payment_plan.add_payment(self.amount)
+            self.status = self.Status.COMPLETED
+            self.completed_at = timezone.now()
 
-            # Check if transaction should be completed
-            if self.payment_plan.is_completed:
-                self.transaction.complete()
-            else:
-                # Send payment received notification for partial payments
-                self._send_payment_received_notification()
-        else:
-            # For direct payments, transaction completion will handle purchase confirmation
-            pass
+            if external_transaction_id:
+                self.external_transaction_id = external_transaction_id
+
+            if processor_response:
+                self.processor_response = processor_response
+
+            self.save(update_fields=[
+                'status', 'completed_at', 'external_transaction_id', 'processor_response'
+            ])
+
+            # Update fiscal day ledger
+            from venezuelan_pos.apps.fiscal.services import FiscalLedgerService
+            FiscalLedgerService.record_payment_completion(self)
+
+            # Update payment plan if exists
+            if self.payment_plan:
+                self.payment_plan.add_payment(self.amount)
+
+            # Complete the transaction (fiscal series) once fully paid
+            from .fiscal_integration import FiscalCompletionService
+            fiscal_result = FiscalCompletionService.handle_payment_completion_trigger(
+                self, notify=False
+            )
+
+            if self.metadata is None:
+                self.metadata = {}
+            self.metadata['fiscal_completion'] = FiscalCompletionService.serialize_result(fiscal_result)
+            self.save(update_fields=['metadata'])
+
+            # Queue side effects for the outbox worker
+            from .outbox import payment_outbox
+            payment_outbox.enqueue_completion_effects(
+                self, transaction_completed=fiscal_result.get('success', False)
+            )
+
+        return True
     
     def _send_payment_received_notification(self):
         """Send payment received notification for partial payments."""
@@ -764,10 +817,96 @@ class Payment(TenantAwareModel):
         if refund_amount > self.amount:
             raise ValidationError("Refund amount cannot exceed payment amount")
         
-        # Create refund record (could be separate model in future)
-        self.status = self.Status.REFUNDED
-        self.notes = f"Refunded: {refund_amount} {self.currency}. Reason: {reason or 'N/A'}"
-        self.save(update_fields=['status', 'notes'])
+        # The whole payment is marked refunded and taken out of the ledger
+        if refund_amount < self.amount:
+            raise ValidationError("Partial refunds are not supported")
+        
+        with transaction.atomic():
+            current = Payment.objects.select_for_update().get(pk=self.pk)
+            if current.status != self.Status.COMPLETED:
+                raise ValidationError("Can only refund completed payments")
+            
+            # Create refund record (could be separate model in future)
+            self.status = self.Status.REFUNDED
+            self.notes = f"Refunded: {refund_amount} {self.currency}. Reason: {reason or 'N/A'}"
+            self.save(update_fields=['status', 'notes'])
+            
+            # A refunded payment no longer counts towards its fiscal day
+            from venezuelan_pos.apps.fiscal.services import FiscalLedgerService
+            FiscalLedgerService.reverse_payment_completion(self)
+
+
+class PaymentOutboxEvent(TenantAwareModel):
+    """
+    Side effect of a payment state change, written in the same DB
+    transaction as the change and processed later by the outbox worker.
+    """
+    
+    class EventType(models.TextChoices):
+        FISCAL_AUDIT = 'fiscal_audit', 'Fiscal Audit'
+        PURCHASE_CONFIRMATION = 'purchase_confirmation', 'Purchase Confirmation'
+        PAYMENT_RECEIVED = 'payment_received', 'Payment Received Notification'
+        CACHE_INVALIDATION = 'cache_invalidation', 'Cache Invalidation'
+    
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        PROCESSED = 'processed', 'Processed'
+        FAILED = 'failed', 'Failed'
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    payment = models.ForeignKey(
+        Payment,
+        on_delete=models.CASCADE,
+        related_name='outbox_events',
+        help_text="Payment whose state change produced this event"
+    )
+    event_type = models.CharField(
+        max_length=30,
+        choices=EventType.choices,
+        help_text="Side effect to perform"
+    )
+    payload = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Data needed to perform the side effect"
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+        help_text="Processing status"
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of processing attempts"
+    )
+    last_error = models.TextField(
+        blank=True,
+        help_text="Error from the last failed attempt"
+    )
+    available_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="Earliest time the event may be processed"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the event was processed"
+    )
+    
+    class Meta:
+        db_table = 'payment_outbox_events'
+        verbose_name = 'Payment Outbox Event'
+        verbose_name_plural = 'Payment Outbox Events'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+            models.Index(fields=['payment', 'event_type']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_event_type_display()} for payment {self.payment_id} - {self.get_status_display()}"
 
 
 class PaymentReconciliation(TenantAwareModel):
@@ -956,8 +1095,8 @@ class PaymentReconciliation(TenantAwareModel):
         """Create a daily reconciliation record."""
         from datetime import datetime, time
         
-        start_datetime = datetime.combine(reconciliation_date, time.min)
-        end_datetime = datetime.combine(reconciliation_date, time.max)
+        start_datetime = timezone.make_aware(datetime.combine(reconciliation_date, time.min))
+        end_datetime = timezone.make_aware(datetime.combine(reconciliation_date, time.max))
         
         reconciliation = cls.objects.create(
             tenant=tenant,
@@ -973,4 +1112,156 @@ class PaymentReconciliation(TenantAwareModel):
         reconciliation.calculate_system_totals()
         reconciliation.save()
         
-        return reconciliation
\ No newline at end of file
+        return reconciliation
+
+
+class PaymentStatement(TenantAwareModel):
+    """
+    External bank or processor statement imported for reconciliation.
+    Lines are matched against payments by external transaction ID at import.
+    """
+    
+    class Status(models.TextChoices):
+        IMPORTING = 'importing', 'Importing'
+        IMPORTED = 'imported', 'Imported'
+        RECONCILED = 'reconciled', 'Reconciled'
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    
+    # Source and scope
+    source_name = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="Name of the imported statement file"
+    )
+    payment_method = models.ForeignKey(
+        PaymentMethod,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='statements',
+        help_text="Payment method the statement covers (blank for mixed statements)"
+    )
+    period_start = models.DateField(
+        help_text="First business date covered by the statement"
+    )
+    period_end = models.DateField(
+        help_text="Last business date covered by the statement"
+    )
+    
+    # Totals
+    line_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of statement lines"
+    )
+    total_amount = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text="Sum of statement line amounts"
+    )
+    
+    status = models.CharField(
+        max_length=15,
+        choices=Status.choices,
+        default=Status.IMPORTED,
+        help_text="Statement status"
+    )
+    
+    # Timestamps
+    imported_at = models.DateTimeField(auto_now_add=True)
+    reconciled_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When daily reconciliations were last built from this statement"
+    )
+    
+    class Meta:
+        db_table = 'payment_statements'
+        verbose_name = 'Payment Statement'
+        verbose_name_plural = 'Payment Statements'
+        ordering = ['-period_end', '-imported_at']
+        indexes = [
+            models.Index(fields=['tenant', 'period_start', 'period_end']),
+        ]
+    
+    def __str__(self):
+        return f"Statement {self.source_name or self.id} ({self.period_start} - {self.period_end})"
+
+
+class PaymentStatementLine(models.Model):
+    """
+    Single external statement line and the outcome of matching it to a payment.
+    """
+    
+    class MatchStatus(models.TextChoices):
+        MATCHED = 'matched', 'Matched'
+        AMOUNT_MISMATCH = 'amount_mismatch', 'Amount Mismatch'
+        STATUS_MISMATCH = 'status_mismatch', 'Payment Not Completed'
+        MISSING_IN_SYSTEM = 'missing_in_system', 'Missing in System'
+    
+    statement = models.ForeignKey(
+        PaymentStatement,
+        on_delete=models.CASCADE,
+        related_name='lines',
+        help_text="Statement this line belongs to"
+    )
+    line_number = models.PositiveIntegerField(
+        help_text="Position of the line in the statement file"
+    )
+    external_transaction_id = models.CharField(
+        max_length=100,
+        help_text="External transaction ID as reported by the statement"
+    )
+    amount = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        help_text="Amount as reported by the statement"
+    )
+    posted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Posting time as reported by the statement"
+    )
+    
+    # Match outcome
+    payment = models.ForeignKey(
+        Payment,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='statement_lines',
+        help_text="Payment matched by external transaction ID"
+    )
+    payment_method = models.ForeignKey(
+        PaymentMethod,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='+',
+        help_text="Payment method the line is reconciled under"
+    )
+    business_date = models.DateField(
+        null=True,
+        blank=True,
+        help_text="Day the line is reconciled under"
+    )
+    match_status = models.CharField(
+        max_length=20,
+        choices=MatchStatus.choices,
+        help_text="Outcome of matching the line"
+    )
+    
+    class Meta:
+        db_table = 'payment_statement_lines'
+        verbose_name = 'Payment Statement Line'
+        verbose_name_plural = 'Payment Statement Lines'
+        ordering = ['statement', 'line_number']
+        indexes = [
+            models.Index(fields=['statement', 'external_transaction_id']),
+            models.Index(fields=['statement', 'payment_method', 'business_date']),
+            models.Index(fields=['statement', 'match_status']),
+        ]
+    
+    def __str__(self):
+        return f"Line {self.line_number}: {self.external_transaction_id} ({self.amount})"
@@ -0,0 +1,172 @@
+"""
+Payment outbox.
+Side effects of payment completion (fiscal audit, notifications and cache
+invalidation) are stored in the same DB transaction as the state change
+and processed by a worker, so request latency does not include them and
+retried processor callbacks never repeat them.
+"""
+
+import logging
+from datetime import timedelta
+from typing import List
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Payment, PaymentOutboxEvent
+
+logger = logging.getLogger(__name__)
+
+
+class PaymentOutboxService:
+    """Writes and drains payment outbox events."""
+
+    # Events processed per DB transaction
+    BATCH_SIZE = 100
+
+    # Give up on an event after this many attempts
+    MAX_ATTEMPTS = 5
+
+    # Base retry delay, doubled after every failed attempt
+    RETRY_DELAY_SECONDS = 30
+
+    # Writing
+
+    def enqueue_completion_effects(self, payment: Payment, transaction_completed: bool) -> List[PaymentOutboxEvent]:
+        """
+        Queue the side effects of a completed payment.
+        Must be called inside the DB transaction that completed the payment.
+        """
+        event_types = [PaymentOutboxEvent.EventType.CACHE_INVALIDATION]
+
+        if transaction_completed:
+            event_types += [
+                PaymentOutboxEvent.EventType.FISCAL_AUDIT,
+                PaymentOutboxEvent.EventType.PURCHASE_CONFIRMATION,
+            ]
+        elif payment.payment_plan_id:
+            event_types.append(PaymentOutboxEvent.EventType.PAYMENT_RECEIVED)
+
+        events = PaymentOutboxEvent.objects.bulk_create([
+            PaymentOutboxEvent(
+                tenant_id=payment.tenant_id,
+                payment=payment,
+                event_type=event_type,
+                payload={'transaction_id': str(payment.transaction_id)}
+            )
+            for event_type in event_types
+        ])
+
+        transaction.on_commit(self._schedule_drain)
+        return events
+
+    @staticmethod
+    def _schedule_drain():
+        """Ask a worker to drain the outbox; the beat schedule is the fallback."""
+        try:
+            from .tasks import process_payment_outbox
+            process_payment_outbox.delay()
+        except Exception as e:
+            logger.warning(f"Could not schedule payment outbox processing: {e}")
+
+    # Processing
+
+    def drain(self, batch_size: int = None) -> int:
+        """
+        Process pending outbox events until none are due.
+        Returns the number of events processed successfully.
+        """
+        batch_size = batch_size or self.BATCH_SIZE
+        processed = 0
+
+        while True:
+            with transaction.atomic():
+                events = list(
+                    PaymentOutboxEvent.objects.all_tenants().select_for_update(skip_locked=True).filter(
+                        status=PaymentOutboxEvent.Status.PENDING,
+                        available_at__lte=timezone.now()
+                    ).select_related(
+                        'payment', 'payment__transaction', 'payment__payment_plan'
+                    ).order_by('created_at')[:batch_size]
+                )
+
+                for event in events:
+                    if self._process_event(event):
+                        processed += 1
+
+            if len(events) < batch_size:
+                return processed
+
+    def _process_event(self, event: PaymentOutboxEvent) -> bool:
+        """Run one event's side effect and record the outcome."""
+        event.attempts += 1
+
+        try:
+            # Savepoint so a failing side effect only rolls back its own writes
+            with transaction.atomic():
+                self._handlers[event.event_type](self, event)
+        except Exception as e:
+            logger.error(f"Payment outbox event {event.id} ({event.event_type}) failed: {e}")
+            event.last_error = str(e)
+            if event.attempts >= self.MAX_ATTEMPTS:
+                event.status = PaymentOutboxEvent.Status.FAILED
+            else:
+                delay = self.RETRY_DELAY_SECONDS * (2 ** (event.attempts - 1))
+                event.available_at = timezone.now() + timedelta(seconds=delay)
+            event.save(update_fields=['attempts', 'last_error', 'status', 'available_at'])
+            return False
+
+        event.status = PaymentOutboxEvent.Status.PROCESSED
+        event.processed_at = timezone.now()
+        event.save(update_fields=['attempts', 'status', 'processed_at'])
+        return True
+
+    # Handlers
+
+    def _handle_fiscal_audit(self, event: PaymentOutboxEvent) -> None:
+        """Record the fiscal completion in the audit trail."""
+        from venezuelan_pos.apps.fiscal.services import AuditLogService
+
+        transaction_obj = event.payment.transaction
+        AuditLogService.log_action(
+            tenant=transaction_obj.tenant,
+            user=None,
+            action_type='CREATE',
+            object_type='Transaction',
+            object_id=str(transaction_obj.id),
+            new_values={
+                'fiscal_series': transaction_obj.fiscal_series,
+                'total_amount': transaction_obj.total_amount,
+                'payment_id': str(event.payment_id),
+            },
+            description=f"Completed transaction with fiscal series {transaction_obj.fiscal_series}"
+        )
+
+    def _handle_purchase_confirmation(self, event: PaymentOutboxEvent) -> None:
+        """Send purchase confirmation and ticket delivery notifications."""
+        from venezuelan_pos.apps.notifications.services import NotificationService
+
+        transaction_obj = event.payment.transaction
+        NotificationService.send_purchase_confirmation(transaction_obj)
+        NotificationService.send_ticket_delivery(transaction_obj)
+
+    def _handle_payment_received(self, event: PaymentOutboxEvent) -> None:
+        """Send the payment received notification for a partial payment."""
+        event.payment._send_payment_received_notification()
+
+    def _handle_cache_invalidation(self, event: PaymentOutboxEvent) -> None:
+        """Invalidate cached transaction, seat and availability data."""
+        from venezuelan_pos.apps.sales.cache import sales_cache
+
+        sales_cache.invalidate_transaction_caches(event.payment.transaction)
+
+    _handlers = {
+        PaymentOutboxEvent.EventType.FISCAL_AUDIT.value: _handle_fiscal_audit,
+        PaymentOutboxEvent.EventType.PURCHASE_CONFIRMATION.value: _handle_purchase_confirmation,
+        PaymentOutboxEvent.EventType.PAYMENT_RECEIVED.value: _handle_payment_received,
+        PaymentOutboxEvent.EventType.CACHE_INVALIDATION.value: _handle_cache_invalidation,
+    }
+
+
+# Global payment outbox instance
+payment_outbox = PaymentOutboxService()
@@ -0,0 +1,498 @@
+"""
+Streaming payment reconciliation.
+External statements (CSV, JSON array or JSON lines) are read row by row and
+matched against payments in fixed-size chunks: each chunk becomes a hash
+table keyed by external transaction ID, probed with one indexed IN query, so
+memory use is bounded by the chunk size rather than the statement size.
+Daily reconciliations for every payment method are then built from two
+grouped queries over the whole period.
+"""
+
+import csv
+import json
+import logging
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import (
+    Payment, PaymentMethod, PaymentReconciliation, PaymentStatement, PaymentStatementLine
+)
+
+logger = logging.getLogger(__name__)
+
+# Accepted statement column names, in order of preference
+FIELD_ALIASES = {
+    'external_transaction_id': ('external_transaction_id', 'transaction_id', 'reference', 'id'),
+    'amount': ('amount', 'value'),
+    'posted_at': ('posted_at', 'date', 'timestamp'),
+}
+
+# Largest single statement object buffered by the JSON reader, in characters
+MAX_JSON_OBJECT_SIZE = 1024 * 1024
+
+DISCREPANCY_FIELDS = [
+    'issue', 'line_number', 'external_transaction_id', 'payment_id',
+    'statement_amount', 'system_amount', 'details',
+]
+
+
+# Statement readers
+
+def read_csv_statement(stream) -> Iterator[Dict]:
+    """Yield CSV statement rows as dicts."""
+    yield from csv.DictReader(stream)
+
+
+def read_json_statement(stream, read_size: int = 65536,
+                        max_object_size: int = MAX_JSON_OBJECT_SIZE) -> Iterator[Dict]:
+    """
+    Yield objects from a JSON array or JSON lines statement.
+    The stream is decoded incrementally, so the statement is never
+    loaded into memory as a whole; at most one object of up to
+    max_object_size characters is buffered, and anything larger is
+    rejected as invalid.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    offset = 0  # Stream offset of buffer[0], for error messages
+    eof = False
+
+    while True:
+        # Skip whitespace and array punctuation between objects
+        while position < len(buffer) and buffer[position] in ' \t\r\n,[]':
+            position += 1
+
+        if position < len(buffer):
+            try:
+                obj, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as e:
+                # Usually the object is cut off by the end of the chunk; it is
+                # invalid once the stream is exhausted or the object too large
+                if eof or len(buffer) - position > max_object_size:
+                    raise ValidationError(
+                        f"Invalid JSON statement near offset {offset + e.pos}: {e.msg}"
+                    )
+            else:
+                if not isinstance(obj, dict):
+                    raise ValidationError("JSON statements must contain objects")
+                position = end
+                yield obj
+                continue
+        elif eof:
+            return
+
+        chunk = stream.read(read_size)
+        if isinstance(chunk, bytes):
+            chunk = chunk.decode('utf-8')
+        eof = not chunk
+        offset += position
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+STATEMENT_READERS = {
+    'csv': read_csv_statement,
+    'json': read_json_statement,
+}
+
+
+def _field(row: Dict, name: str):
+    """Return the first present alias of a statement field."""
+    for alias in FIELD_ALIASES[name]:
+        value = row.get(alias)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def _parse_posted_at(value) -> Optional[datetime]:
+    """Parse a statement posting date or datetime as an aware datetime."""
+    if value is None:
+        return None
+    parsed = parse_datetime(str(value))
+    if parsed is None:
+        parsed_date = parse_date(str(value))
+        if parsed_date is None:
+            raise ValueError(f"invalid date '{value}'")
+        parsed = datetime.combine(parsed_date, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def parse_statement_rows(rows: Iterable[Dict]) -> Iterator[Tuple[int, str, Decimal, Optional[datetime]]]:
+    """Normalize raw statement rows into (line_number, external_id, amount, posted_at)."""
+    for line_number, row in enumerate(rows, start=1):
+        external_id = _field(row, 'external_transaction_id')
+        amount = _field(row, 'amount')
+
+        if external_id is None or amount is None:
+            raise ValidationError(f"Statement line {line_number} has no transaction ID or amount")
+
+        try:
+            amount = Decimal(str(amount)).quantize(Decimal('0.01'))
+            posted_at = _parse_posted_at(_field(row, 'posted_at'))
+        except (InvalidOperation, ValueError) as e:
+            raise ValidationError(f"Statement line {line_number} is invalid: {e}")
+
+        yield line_number, str(external_id).strip(), amount, posted_at
+
+
+def _day_bounds(day: date) -> Tuple[datetime, datetime]:
+    """Aware start of a business day and start of the next one."""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+
+
+class ReconciliationService:
+    """Statement import, matching and daily reconciliation."""
+
+    # Statement lines matched per indexed lookup / bulk insert
+    CHUNK_SIZE = 5000
+
+    # Import
+
+    @classmethod
+    def import_statement(cls, tenant, stream, statement_format: str, period_start: date,
+                         period_end: date, payment_method: PaymentMethod = None,
+                         source_name: str = '', chunk_size: int = None) -> PaymentStatement:
+        """
+        Stream a statement into the database, matching every line to a
+        payment by external transaction ID as it is read.
+        Each chunk is committed on its own, so a large statement does not
+        hold locks for the whole import; the statement stays 'importing'
+        until its last chunk is in and is deleted if the import fails.
+        """
+        if statement_format not in STATEMENT_READERS:
+            raise ValidationError(f"Unsupported statement format '{statement_format}'")
+        if period_start > period_end:
+            raise ValidationError("Statement period start must not be after its end")
+
+        chunk_size = chunk_size or cls.CHUNK_SIZE
+        rows = parse_statement_rows(STATEMENT_READERS[statement_format](stream))
+
+        statement = PaymentStatement.objects.create(
+            tenant=tenant,
+            payment_method=payment_method,
+            period_start=period_start,
+            period_end=period_end,
+            source_name=source_name,
+            status=PaymentStatement.Status.IMPORTING
+        )
+
+        line_count = 0
+        total_amount = Decimal('0.00')
+        chunk = []
+
+        try:
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    with transaction.atomic():
+                        cls._match_chunk(statement, chunk)
+                    chunk = []
+                line_count += 1
+                total_amount += row[2]
+
+            if chunk:
+                with transaction.atomic():
+                    cls._match_chunk(statement, chunk)
+        except Exception:
+            statement.delete()
+            raise
+
+        statement.line_count = line_count
+        statement.total_amount = total_amount
+        statement.status = PaymentStatement.Status.IMPORTED
+        statement.save(update_fields=['line_count', 'total_amount', 'status'])
+
+        logger.info(
+            f"Imported statement {statement.id} for tenant {tenant.id}: {line_count} lines"
+        )
+        return statement
+
+    @staticmethod
+    def _match_chunk(statement: PaymentStatement, chunk: List[Tuple]) -> None:
+        """Hash join one chunk of statement lines against payments and store it."""
+        payments = {
+            row['external_transaction_id']: row
+            for row in Payment.objects.filter(
+                tenant_id=statement.tenant_id,
+                external_transaction_id__in={external_id for _, external_id, _, _ in chunk}
+            ).values('id', 'external_transaction_id', 'amount', 'status', 'payment_method_id', 'completed_at')
+        }
+
+        lines = []
+        for line_number, external_id, amount, posted_at in chunk:
+            payment = payments.get(external_id)
+            line = PaymentStatementLine(
+                statement=statement,
+                line_number=line_number,
+                external_transaction_id=external_id,
+                amount=amount,
+                posted_at=posted_at,
+                payment_method_id=statement.payment_method_id
+            )
+
+            if payment is None:
+                line.match_status = PaymentStatementLine.MatchStatus.MISSING_IN_SYSTEM
+            else:
+                line.payment_id = payment['id']
+                line.payment_method_id = payment['payment_method_id']
+                if payment['status'] != Payment.Status.COMPLETED:
+                    line.match_status = PaymentStatementLine.MatchStatus.STATUS_MISMATCH
+                elif payment['amount'] != amount:
+                    line.match_status = PaymentStatementLine.MatchStatus.AMOUNT_MISMATCH
+                else:
+                    line.match_status = PaymentStatementLine.MatchStatus.MATCHED
+
+            # Completed payments are reconciled on their completion day
+            reconciled_at = (payment or {}).get('completed_at') or posted_at
+            if reconciled_at is not None:
+                line.business_date = timezone.localdate(reconciled_at)
+
+            lines.append(line)
+
+        PaymentStatementLine.objects.bulk_create(lines)
+
+    # Daily reconciliations
+
+    @staticmethod
+    def _system_totals(tenant, period_start: date, period_end: date,
+                       payment_method: PaymentMethod = None) -> Dict[Tuple, Dict]:
+        """Completed payment totals per (payment method, day) in one grouped query."""
+        start, _ = _day_bounds(period_start)
+        _, end = _day_bounds(period_end)
+
+        payments = Payment.objects.filter(
+            tenant=tenant,
+            status=Payment.Status.COMPLETED,
+            completed_at__gte=start,
+            completed_at__lt=end
+        )
+        if payment_method is not None:
+            payments = payments.filter(payment_method=payment_method)
+
+        rows = payments.annotate(
+            day=TruncDate('completed_at', tzinfo=timezone.get_current_timezone())
+        ).values('payment_method_id', 'day').annotate(
+            total=Sum('amount'),
+            count=Count('id')
+        ).order_by()
+
+        return {(row['payment_method_id'], row['day']): row for row in rows}
+
+    @staticmethod
+    def _statement_totals(statement: PaymentStatement) -> Dict[Tuple, Dict]:
+        """
+        Statement totals and match outcomes per (payment method, day) in one
+        grouped query.
+        """
+        totals = {}
+        rows = statement.lines.filter(
+            payment_method__isnull=False,
+            business_date__isnull=False
+        ).values('payment_method_id', 'business_date', 'match_status').annotate(
+            total=Sum('amount'),
+            count=Count('id')
+        ).order_by()
+
+        for row in rows:
+            bucket = totals.setdefault((row['payment_method_id'], row['business_date']), {
+                'total': Decimal('0.00'),
+                'count': 0,
+                'match_counts': {},
+            })
+            bucket['total'] += row['total']
+            bucket['count'] += row['count']
+            bucket['match_counts'][row['match_status']] = row['count']
+
+        return totals
+
+    @classmethod
+    def build_daily_reconciliations(cls, tenant, period_start: date, period_end: date,
+                                    payment_method: PaymentMethod = None,
+                                    statement: PaymentStatement = None) -> List[PaymentReconciliation]:
+        """
+        Create or refresh daily reconciliations for every active payment
+        method and day of the period. When a statement is given its totals
+        become the external side and each reconciliation is completed.
+        """
+        if statement is not None:
+            if statement.status == PaymentStatement.Status.IMPORTING:
+                raise ValidationError(f"Statement {statement.id} is still being imported")
+            period_start, period_end = statement.period_start, statement.period_end
+            payment_method = payment_method or statement.payment_method
+
+        system = cls._system_totals(tenant, period_start, period_end, payment_method)
+        external = cls._statement_totals(statement) if statement is not None else {}
+
+        if payment_method is not None:
+            method_ids = {payment_method.id}
+        else:
+            method_ids = set(
+                PaymentMethod.objects.active_for_tenant(tenant).values_list('id', flat=True)
+            )
+            method_ids |= {key[0] for key in system} | {key[0] for key in external}
+
+        existing = {
+            (reconciliation.payment_method_id, reconciliation.reconciliation_date): reconciliation
+            for reconciliation in PaymentReconciliation.objects.all_tenants().filter(
+                tenant=tenant,
+                payment_method_id__in=method_ids,
+                reconciliation_date__range=(period_start, period_end)
+            )
+        }
+
+        now = timezone.now()
+        to_create, to_update = [], []
+        day = period_start
+
+        while day <= period_end:
+            start, next_start = _day_bounds(day)
+
+            for method_id in method_ids:
+                key = (method_id, day)
+                reconciliation = existing.get(key)
+                if reconciliation is None:
+                    reconciliation = PaymentReconciliation(
+                        tenant=tenant,
+                        payment_method_id=method_id,
+                        reconciliation_date=day
+                    )
+                    to_create.append(reconciliation)
+                else:
+                    to_update.append(reconciliation)
+
+                totals = system.get(key, {})
+                reconciliation.start_datetime = start
+                reconciliation.end_datetime = next_start - timedelta(microseconds=1)
+                reconciliation.system_total = totals.get('total') or Decimal('0.00')
+                reconciliation.system_transaction_count = totals.get('count', 0)
+
+                if statement is not None:
+                    statement_totals = external.get(key, {})
+                    reconciliation.external_total = statement_totals.get('total', Decimal('0.00'))
+                    reconciliation.external_transaction_count = statement_totals.get('count', 0)
+                    reconciliation.discrepancy_amount = abs(
+                        reconciliation.system_total - reconciliation.external_total
+                    )
+                    reconciliation.reconciliation_data = {
+                        'statement_id': str(statement.id),
+                        'match_counts': statement_totals.get('match_counts', {}),
+                    }
+
+                    if (reconciliation.has_discrepancy or
+                            reconciliation.external_transaction_count != reconciliation.system_transaction_count):
+                        reconciliation.status = PaymentReconciliation.Status.DISCREPANCY
+                    else:
+                        reconciliation.status = PaymentReconciliation.Status.COMPLETED
+                    reconciliation.completed_at = now
+
+            day += timedelta(days=1)
+
+        with transaction.atomic():
+            PaymentReconciliation.objects.bulk_create(to_create)
+            PaymentReconciliation.objects.bulk_update(to_update, [
+                'start_datetime', 'end_datetime', 'system_total', 'system_transaction_count',
+                'external_total', 'external_transaction_count', 'discrepancy_amount',
+                'reconciliation_data', 'status', 'completed_at',
+            ])
+
+            if statement is not None:
+                statement.status = PaymentStatement.Status.RECONCILED
+                statement.reconciled_at = now
+                statement.save(update_fields=['status', 'reconciled_at'])
+
+        return to_create + to_update
+
+    # Discrepancies
+
+    @staticmethod
+    def iter_discrepancies(statement: PaymentStatement, chunk_size: int = 2000) -> Iterator[Dict]:
+        """
+        Yield one dict per discrepancy between a statement and the system:
+        unmatched, mismatched and duplicate statement lines, and completed
+        payments of the period that the statement does not contain.
+        """
+        lines = statement.lines.exclude(
+            match_status=PaymentStatementLine.MatchStatus.MATCHED
+        ).select_related('payment').order_by('line_number')
+
+        for line in lines.iterator(chunk_size=chunk_size):
+            details = ''
+            if line.match_status == PaymentStatementLine.MatchStatus.STATUS_MISMATCH:
+                details = f"payment status is {line.payment.status}"
+            yield {
+                'issue': line.match_status,
+                'line_number': line.line_number,
+                'external_transaction_id': line.external_transaction_id,
+                'payment_id': str(line.payment_id) if line.payment_id else '',
+                'statement_amount': line.amount,
+                'system_amount': line.payment.amount if line.payment_id else '',
+                'details': details,
+            }
+
+        duplicates = statement.lines.values('external_transaction_id').annotate(
+            count=Count('id')
+        ).filter(count__gt=1).order_by('external_transaction_id')
+
+        for row in duplicates.iterator(chunk_size=chunk_size):
+            yield {
+                'issue': 'duplicate_in_statement',
+                'line_number': '',
+                'external_transaction_id': row['external_transaction_id'],
+                'payment_id': '',
+                'statement_amount': '',
+                'system_amount': '',
+                'details': f"{row['count']} lines",
+            }
+
+        start, _ = _day_bounds(statement.period_start)
+        _, end = _day_bounds(statement.period_end)
+        missing = Payment.objects.filter(
+            tenant_id=statement.tenant_id,
+            status=Payment.Status.COMPLETED,
+            completed_at__gte=start,
+            completed_at__lt=end
+        ).exclude(
+            Exists(statement.lines.filter(payment_id=OuterRef('pk')))
+        ).order_by('completed_at').values('id', 'external_transaction_id', 'amount')
+        if statement.payment_method_id:
+            missing = missing.filter(payment_method_id=statement.payment_method_id)
+
+        for row in missing.iterator(chunk_size=chunk_size):
+            yield {
+                'issue': 'missing_in_statement',
+                'line_number': '',
+                'external_transaction_id': row['external_transaction_id'],
+                'payment_id': str(row['id']),
+                'statement_amount': '',
+                'system_amount': row['amount'],
+                'details': '',
+            }
+
+    @classmethod
+    def write_discrepancies_csv(cls, output, statement: PaymentStatement, chunk_size: int = 2000) -> int:
+        """
+        Stream discrepancies as CSV rows to a file-like object.
+        Returns the number of discrepancies written.
+        """
+        writer = csv.DictWriter(output, fieldnames=DISCREPANCY_FIELDS)
+        writer.writeheader()
+
+        count = 0
+        for discrepancy in cls.iter_discrepancies(statement, chunk_size=chunk_size):
+            writer.writerow(discrepancy)
+            count += 1
+
+        return count
@@ -367,6 +367,11 @@ class PaymentProcessingService:
         """
         Process a payment and handle completion logic.
 
+        Completion is idempotent per payment and external transaction id,
+        so processor callbacks may be retried safely. Fiscal completion runs
+        in the same DB transaction; notifications and cache invalidation are
+        processed by the payment outbox worker after commit.
+
         Args:
             payment: Payment instance
             external_transaction_id: External transaction ID
@@ -374,26 +379,13 @@ class PaymentProcessingService:
 
         Returns:
             Payment instance
-
-        Note: This method should be called within a transaction.atomic() block
         """
         try:
-            # Mark payment as completed
             payment.mark_completed(
                 external_transaction_id=external_transaction_id,
                 processor_response=processor_response
             )
 
-            # Handle fiscal completion using fiscal integration service
-            fiscal_result = FiscalCompletionService.handle_payment_completion_trigger(payment)
-
-            # Store fiscal completion result in payment metadata
-            if payment.metadata is None:
-                payment.metadata = {}
-            # Convert Decimal objects to strings for JSON serialization
-            payment.metadata['fiscal_completion'] = convert_decimals_to_str(fiscal_result)
-            payment.save(update_fields=['metadata'])
-
             return payment
         except ValidationError as e:
             # Re-raise validation errors from payment plan
@@ -472,46 +464,31 @@ class ReservationService:
     """Service for managing ticket reservations."""
     
     @staticmethod
-    def cleanup_expired_reservations():
+    def cleanup_expired_reservations(batch_size=None):
         """
         Clean up expired reservations and payment plans.
         This should be run periodically (e.g., via Celery task).
+        Expiry runs in bounded chunks, each in its own short DB transaction.
+        
+        Args:
+            batch_size: Rows expired per chunk (default: ExpiryService.BATCH_SIZE)
         
         Returns:
             dict: Statistics about cleaned up reservations
         """
-        now = timezone.now()
-        stats = {
-            'expired_reservations': 0,
-            'expired_payment_plans': 0,
-            'released_seats': 0
-        }
+        from .expiry import ExpiryService
         
-        with transaction.atomic():
-            # Find expired reservations
-            expired_reservations = ReservedTicket.objects.filter(
-                status=ReservedTicket.Status.ACTIVE,
-                reserved_until__lte=now
-            )
-            
-            for reservation in expired_reservations:
-                reservation.expire()
-                stats['expired_reservations'] += 1
-                
-                if reservation.seat:
-                    stats['released_seats'] += 1
-            
-            # Find expired payment plans
-            expired_plans = PaymentPlan.objects.filter(
-                status=PaymentPlan.Status.ACTIVE,
-                expires_at__lte=now
-            )
-            
-            for plan in expired_plans:
-                PaymentPlanService.expire_payment_plan(plan)
-                stats['expired_payment_plans'] += 1
+        now = timezone.now()
+        reservation_stats = ExpiryService.expire_reservations(now=now, batch_size=batch_size)
+        plan_stats = ExpiryService.expire_payment_plans(now=now, batch_size=batch_size)
         
-        return stats
+        return {
+            'expired_reservations': (
+                reservation_stats['expired_reservations'] + plan_stats['expired_reservations']
+            ),
+            'expired_payment_plans': plan_stats['expired_payment_plans'],
+            'released_seats': reservation_stats['released_seats'] + plan_stats['released_seats']
+        }
     
     @staticmethod
     def extend_reservation(reservation, new_expiry_time):
@@ -547,6 +524,9 @@ class ReservationService:
 class PaymentReminderService:
     """Service for managing payment reminders."""
     
+    # Payment plans processed per batch of notification logs
+    BATCH_SIZE = 500
+    
     @staticmethod
     def get_payment_plans_needing_reminders():
         """
@@ -562,13 +542,52 @@ class PaymentReminderService:
             status=PaymentPlan.Status.ACTIVE,
             expires_at__lte=reminder_threshold,
             expires_at__gt=timezone.now()
-        ).select_related('transaction', 'customer')
+        ).exclude(
+            transaction__event__event_configuration__send_payment_reminders=False
+        ).select_related(
+            'transaction', 'transaction__event', 'customer', 'customer__notification_preferences'
+        )
+    
+    @staticmethod
+    def _wants_reminder(customer):
+        """Check whether a customer can and wants to receive email reminders."""
+        prefs = getattr(customer, 'notification_preferences', None)
+        if prefs and (not prefs.payment_reminders or not prefs.email_enabled):
+            return False
+        return bool(customer.email)
+    
+    @staticmethod
+    def _queue_reminder(dispatcher, payment_plan):
+        """
+        Render a reminder for a payment plan into the dispatcher.
+        
+        Returns:
+            NotificationLog: Unsaved log, or None if the tenant has no template
+        """
+        customer = payment_plan.customer
+        context = {
+            'customer': customer,
+            'payment_plan': payment_plan,
+            'transaction': payment_plan.transaction,
+            'event': payment_plan.transaction.event,
+            'remaining_balance': payment_plan.remaining_balance,
+            'next_payment_date': payment_plan.expires_at,
+        }
+        
+        return dispatcher.add(
+            tenant_id=payment_plan.tenant_id,
+            channel='email',
+            recipient=customer.email,
+            context=context,
+            customer=customer,
+            transaction=payment_plan.transaction,
+            event=payment_plan.transaction.event
+        )
     
     @staticmethod
     def send_payment_reminder(payment_plan):
         """
         Send payment reminder for a payment plan.
-        This would integrate with the notification system.
         
         Args:
             payment_plan: PaymentPlan instance
@@ -576,42 +595,67 @@ class PaymentReminderService:
         Returns:
             bool: True if reminder was sent successfully
         """
-        # This would integrate with the notification system
-        # For now, just return True as a placeholder
-        
-        # Example integration:
-        # from venezuelan_pos.apps.notifications.services import NotificationService
-        # 
-        # NotificationService.send_payment_reminder(
-        #     customer=payment_plan.customer,
-        #     payment_plan=payment_plan,
-        #     channels=['email', 'sms']
-        # )
+        from venezuelan_pos.apps.notifications.dispatch import NotificationBatchDispatcher
+        
+        if not PaymentReminderService._wants_reminder(payment_plan.customer):
+            return False
         
+        dispatcher = NotificationBatchDispatcher('payment_reminder', ['email'])
+        if PaymentReminderService._queue_reminder(dispatcher, payment_plan) is None:
+            return False
+        
+        dispatcher.dispatch()
         return True
     
     @staticmethod
-    def process_payment_reminders():
+    def _dispatch_reminders(dispatcher, plans, stats):
+        """Queue reminders for a chunk of plans and dispatch them together."""
+        dispatcher.prefetch_templates({plan.tenant_id for plan in plans})
+        
+        for plan in plans:
+            if not PaymentReminderService._wants_reminder(plan.customer):
+                stats['reminders_skipped'] += 1
+                continue
+            try:
+                if PaymentReminderService._queue_reminder(dispatcher, plan) is not None:
+                    stats['reminders_sent'] += 1
+                else:
+                    stats['reminders_failed'] += 1
+            except Exception:
+                stats['reminders_failed'] += 1
+        
+        dispatcher.dispatch()
+    
+    @staticmethod
+    def process_payment_reminders(batch_size=None):
         """
         Process all payment reminders that need to be sent.
+        Plans are read in chunks; each chunk's notification logs are written
+        with one bulk insert and delivered by grouped Celery tasks.
         
         Returns:
             dict: Statistics about reminders sent
         """
+        from venezuelan_pos.apps.notifications.dispatch import NotificationBatchDispatcher
+        
+        batch_size = batch_size or PaymentReminderService.BATCH_SIZE
         plans_needing_reminders = PaymentReminderService.get_payment_plans_needing_reminders()
+        dispatcher = NotificationBatchDispatcher('payment_reminder', ['email'])
         
         stats = {
             'reminders_sent': 0,
-            'reminders_failed': 0
+            'reminders_failed': 0,
+            'reminders_skipped': 0
         }
         
-        for plan in plans_needing_reminders:
-            try:
-                if PaymentReminderService.send_payment_reminder(plan):
-                    stats['reminders_sent'] += 1
-                else:
-                    stats['reminders_failed'] += 1
-            except Exception:
-                stats['reminders_failed'] += 1
+        chunk = []
+        for plan in plans_needing_reminders.iterator(chunk_size=batch_size):
+            chunk.append(plan)
+            if len(chunk) >= batch_size:
+                PaymentReminderService._dispatch_reminders(dispatcher, chunk, stats)
+                chunk = []
+        
+        if chunk:
+            PaymentReminderService._dispatch_reminders(dispatcher, chunk, stats)
         
         return stats
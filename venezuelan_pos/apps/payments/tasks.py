@@ -0,0 +1,29 @@
+"""
+Celery tasks for payments.
+"""
+
+import logging
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def process_payment_outbox():
+    """
+    Process pending payment outbox events.
+    Scheduled after every payment completion and by beat as a fallback.
+    """
+    try:
+        from .outbox import payment_outbox
+
+        processed = payment_outbox.drain()
+
+        if processed > 0:
+            logger.info(f"Processed {processed} payment outbox events")
+
+        return processed
+
+    except Exception as e:
+        logger.error(f"Error processing payment outbox: {e}")
+        return 0
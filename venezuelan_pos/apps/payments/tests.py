@@ -4,11 +4,12 @@ from django.utils import timezone
 from decimal import Decimal
 from datetime import timedelta
 
-from venezuelan_pos.apps.tenants.models import Tenant
+from venezuelan_pos.apps.tenants.models import Tenant, User
 from venezuelan_pos.apps.customers.models import Customer
 from venezuelan_pos.apps.events.models import Event, Venue
 from venezuelan_pos.apps.sales.models import Transaction
-from .models import PaymentMethod, PaymentPlan, Payment, PaymentReconciliation
+from venezuelan_pos.apps.tickets.models import DigitalTicket
+from .models import PaymentMethod, PaymentPlan, Payment, PaymentOutboxEvent, PaymentReconciliation
 from .services import PaymentPlanService
 from venezuelan_pos.apps.events.models import EventConfiguration
 
@@ -178,6 +179,22 @@ class PaymentPlanTestCase(TestCase):
         self.assertEqual(payment_plan.remaining_balance, Decimal('0.00'))
         self.assertEqual(payment_plan.status, PaymentPlan.Status.COMPLETED)
     
+    def test_completed_plan_completes_transaction(self):
+        """Plans completed outside a payment still complete their transaction."""
+        payment_plan = PaymentPlan.create_flexible_plan(
+            transaction=self.transaction,
+            customer=self.customer,
+            expires_at=timezone.now() + timedelta(days=30)
+        )
+        self.transaction.refresh_from_db()
+        self.assertEqual(self.transaction.status, Transaction.Status.RESERVED)
+        
+        payment_plan.status = PaymentPlan.Status.COMPLETED
+        payment_plan.save()
+        
+        self.transaction.refresh_from_db()
+        self.assertEqual(self.transaction.status, Transaction.Status.COMPLETED)
+    
     def test_service_installment_plan_requires_configuration(self):
         """Service should respect event configuration flags."""
         self.event_config.partial_payments_enabled = False
@@ -208,6 +225,139 @@ class PaymentPlanTestCase(TestCase):
         self.assertEqual(self.transaction.status, Transaction.Status.RESERVED)
         self.assertEqual(self.transaction.transaction_type, Transaction.TransactionType.PARTIAL_PAYMENT)
     
+    def test_batched_expiry_releases_seats(self):
+        """Expired plans and reservations are released in bounded batches."""
+        from venezuelan_pos.apps.sales.models import ReservedTicket
+        from venezuelan_pos.apps.zones.models import Zone, Seat
+        from .services import ReservationService
+
+        zone = Zone.objects.create(
+            tenant=self.tenant,
+            event=self.event,
+            name="VIP Zone",
+            zone_type=Zone.ZoneType.NUMBERED,
+            capacity=4,
+            rows=1,
+            seats_per_row=4,
+            base_price=Decimal('100.00')
+        )
+        seats = list(Seat.objects.all_tenants().filter(zone=zone).order_by('seat_number'))
+        Seat.objects.all_tenants().filter(zone=zone).update(status=Seat.Status.RESERVED)
+
+        PaymentPlan.create_installment_plan(
+            transaction=self.transaction,
+            customer=self.customer,
+            installment_count=2,
+            expires_at=timezone.now() - timedelta(minutes=5)
+        )
+        other_transaction = Transaction.objects.create(
+            tenant=self.tenant,
+            event=self.event,
+            customer=self.customer,
+            total_amount=Decimal('100.00')
+        )
+        for index, seat in enumerate(seats):
+            ReservedTicket.objects.create(
+                tenant=self.tenant,
+                transaction=self.transaction if index == 0 else other_transaction,
+                zone=zone,
+                seat=seat,
+                # The plan's reservation is still within its hold time
+                reserved_until=timezone.now() + timedelta(
+                    hours=1 if index == 0 else -1
+                )
+            )
+        # A newer reservation still holds the second seat
+        held = ReservedTicket.objects.create(
+            tenant=self.tenant,
+            transaction=Transaction.objects.create(
+                tenant=self.tenant,
+                event=self.event,
+                customer=self.customer,
+                total_amount=Decimal('100.00')
+            ),
+            zone=zone,
+            seat=seats[1],
+            reserved_until=timezone.now() + timedelta(hours=1)
+        )
+
+        stats = ReservationService.cleanup_expired_reservations(batch_size=2)
+
+        self.assertEqual(stats, {
+            'expired_reservations': 4,
+            'expired_payment_plans': 1,
+            'released_seats': 3
+        })
+        self.assertEqual(
+            list(Seat.objects.all_tenants().filter(zone=zone).exclude(status=Seat.Status.AVAILABLE)),
+            [seats[1]]
+        )
+        self.assertEqual(
+            list(ReservedTicket.objects.all_tenants().filter(status=ReservedTicket.Status.ACTIVE)),
+            [held]
+        )
+        self.transaction.refresh_from_db()
+        self.assertEqual(self.transaction.status, Transaction.Status.CANCELLED)
+        self.assertEqual(self.transaction.payment_plan.status, PaymentPlan.Status.EXPIRED)
+
+    def test_payment_reminders_are_dispatched_in_batches(self):
+        """Reminders render templates once and bulk create grouped logs."""
+        from venezuelan_pos.apps.notifications.models import (
+            NotificationLog, NotificationPreference, NotificationTemplate
+        )
+        from .services import PaymentReminderService
+
+        NotificationTemplate.objects.create(
+            tenant=self.tenant,
+            name='payment_reminder',
+            template_type='email',
+            subject='Reminder for {{ event.name }}',
+            content='{{ customer.name }} owes {{ remaining_balance }}'
+        )
+        opted_out = Customer.objects.create(
+            tenant=self.tenant,
+            name="Jane",
+            surname="Roe",
+            email="jane@example.com",
+            phone="+584121234568"
+        )
+        NotificationPreference.objects.create(
+            tenant=self.tenant,
+            customer=opted_out,
+            payment_reminders=False
+        )
+
+        for customer in [self.customer, self.customer, opted_out]:
+            transaction_obj = Transaction.objects.create(
+                tenant=self.tenant,
+                event=self.event,
+                customer=customer,
+                total_amount=Decimal('100.00')
+            )
+            PaymentPlan.create_flexible_plan(
+                transaction=transaction_obj,
+                customer=customer,
+                expires_at=timezone.now() + timedelta(hours=2)
+            )
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            stats = PaymentReminderService.process_payment_reminders(batch_size=2)
+
+        self.assertEqual(stats, {
+            'reminders_sent': 2,
+            'reminders_failed': 0,
+            'reminders_skipped': 1
+        })
+
+        logs = NotificationLog.objects.all_tenants().filter(tenant=self.tenant)
+        self.assertEqual(logs.count(), 2)
+        self.assertEqual(len(callbacks), len({log.task_id for log in logs}))
+        for log in logs:
+            self.assertEqual(log.recipient, self.customer.email)
+            self.assertEqual(log.subject, 'Reminder for Test Event')
+            self.assertTrue(log.content.startswith('John owes 100'))
+            self.assertEqual(log.status, 'pending')
+
     def test_installment_plan_validation(self):
         """Test installment plan payment validation."""
         expires_at = timezone.now() + timedelta(days=30)
@@ -330,6 +480,46 @@ class PaymentTestCase(TestCase):
         self.assertEqual(payment.external_transaction_id, "EXT123")
         self.assertIsNotNone(payment.completed_at)
     
+    def test_payment_completion_is_idempotent(self):
+        """Test retried completion is a no-op and side effects go to the outbox."""
+        from .outbox import payment_outbox
+
+        payment = Payment.objects.create(
+            tenant=self.tenant,
+            transaction=self.transaction,
+            payment_method=self.payment_method,
+            amount=Decimal('100.00')
+        )
+
+        self.assertTrue(payment.mark_completed(external_transaction_id="EXT456"))
+        self.assertFalse(payment.mark_completed(external_transaction_id="EXT456"))
+
+        with self.assertRaises(ValidationError):
+            payment.mark_completed(external_transaction_id="EXT789")
+
+        self.transaction.refresh_from_db()
+        self.assertEqual(self.transaction.status, Transaction.Status.COMPLETED)
+        self.assertTrue(payment.metadata['fiscal_completion']['success'])
+
+        events = PaymentOutboxEvent.objects.all_tenants().filter(payment=payment)
+        self.assertEqual(
+            sorted(events.values_list('event_type', flat=True)),
+            ['cache_invalidation', 'fiscal_audit', 'purchase_confirmation']
+        )
+
+        payment_outbox.drain()
+
+        self.assertFalse(events.exclude(status=PaymentOutboxEvent.Status.PROCESSED).exists())
+
+        other = Payment.objects.create(
+            tenant=self.tenant,
+            transaction=self.transaction,
+            payment_method=self.payment_method,
+            amount=Decimal('100.00')
+        )
+        with self.assertRaises(ValidationError):
+            other.mark_completed(external_transaction_id="EXT456")
+
     def test_payment_failure(self):
         """Test payment failure."""
         payment = Payment.objects.create(
@@ -348,6 +538,115 @@ class PaymentTestCase(TestCase):
         self.assertEqual(payment.status, Payment.Status.FAILED)
         self.assertEqual(payment.notes, "Card declined")
 
+    def test_refund_and_cancellation_reverse_fiscal_ledger(self):
+        """Test refunds and cancelled sales are taken back out of the fiscal day ledger."""
+        from venezuelan_pos.apps.fiscal.services import FiscalLedgerService
+
+        payment = Payment.objects.create(
+            tenant=self.tenant,
+            transaction=self.transaction,
+            payment_method=self.payment_method,
+            amount=Decimal('100.00')
+        )
+        payment.mark_completed(external_transaction_id="EXT321")
+
+        fiscal_date = FiscalLedgerService.get_fiscal_date(payment.completed_at)
+        ledger = FiscalLedgerService.get_ledger(self.tenant, fiscal_date)
+        self.assertEqual(ledger.transaction_count, 1)
+        self.assertEqual(ledger.cash_amount, Decimal('100.00'))
+
+        with self.assertRaises(ValidationError):
+            payment.refund(refund_amount=Decimal('40.00'))
+        
+        payment.refund(reason="Customer request")
+        ledger.refresh_from_db()
+        self.assertEqual(ledger.payment_count, 0)
+        self.assertEqual(ledger.cash_amount, Decimal('0.00'))
+        self.assertEqual(FiscalLedgerService.verify_ledger(self.tenant, fiscal_date), {})
+
+        self.transaction.refresh_from_db()
+        with self.assertRaises(ValidationError):
+            self.transaction.cancel(reason="Refunded")
+        
+        user = User.objects.create_user(username="cashier", password="testpass123", tenant=self.tenant)
+        self.transaction.cancel(user=user, reason="Refunded")
+        ledger.refresh_from_db()
+        self.assertEqual(ledger.transaction_count, 0)
+        self.assertEqual(ledger.total_amount, Decimal('0.00'))
+        self.assertIsNone(ledger.last_series)
+        self.assertEqual(FiscalLedgerService.verify_ledger(self.tenant, fiscal_date), {})
+        self.assertFalse(
+            self.transaction.digital_tickets.exclude(status=DigitalTicket.Status.CANCELLED).exists()
+        )
+
+        with self.assertRaises(ValidationError):
+            self.transaction.cancel(user=user)
+
+    def test_closed_fiscal_day_is_not_reversed(self):
+        """Test refunds of a closed fiscal day are refused."""
+        from venezuelan_pos.apps.fiscal.models import FiscalDay
+        from venezuelan_pos.apps.fiscal.services import FiscalLedgerService
+
+        payment = Payment.objects.create(
+            tenant=self.tenant,
+            transaction=self.transaction,
+            payment_method=self.payment_method,
+            amount=Decimal('100.00')
+        )
+        payment.mark_completed(external_transaction_id="EXT654")
+
+        user = User.objects.create_user(username="cashier", password="testpass123", tenant=self.tenant)
+        FiscalDay.objects.create(
+            tenant=self.tenant,
+            user=user,
+            fiscal_date=FiscalLedgerService.get_fiscal_date(payment.completed_at),
+            opened_at=payment.completed_at,
+            is_closed=True,
+            closed_at=timezone.now()
+        )
+
+        with self.assertRaises(ValidationError):
+            payment.refund()
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, Payment.Status.COMPLETED)
+
+    def test_fiscal_integrity_issues(self):
+        """Test set-based fiscal integrity checks."""
+        from .fiscal_integration import FiscalAuditService
+
+        self.transaction.status = Transaction.Status.COMPLETED
+        self.transaction.fiscal_series = "00000001"
+        self.transaction.save()
+        Payment.objects.create(
+            tenant=self.tenant,
+            transaction=self.transaction,
+            payment_method=self.payment_method,
+            amount=Decimal('100.00'),
+            status=Payment.Status.COMPLETED
+        )
+
+        # Skips series 2 and has no payments
+        unpaid = Transaction.objects.create(
+            tenant=self.tenant,
+            event=self.event,
+            customer=self.customer,
+            total_amount=Decimal('50.00'),
+            status=Transaction.Status.COMPLETED,
+            fiscal_series="00000003"
+        )
+
+        issues = list(FiscalAuditService.iter_integrity_issues(tenant=self.tenant))
+
+        self.assertEqual(
+            sorted((issue['check'], issue['transaction_id']) for issue in issues),
+            [('payment_total', str(unpaid.id)), ('series_gap', str(unpaid.id))]
+        )
+
+        results = FiscalAuditService.validate_fiscal_integrity(tenant=self.tenant)
+        self.assertEqual(results['total_transactions_checked'], 2)
+        self.assertEqual(results['issues_count'], 2)
+        self.assertFalse(results['is_valid'])
+
 
 class PaymentReconciliationTestCase(TestCase):
     """Test cases for PaymentReconciliation model."""
@@ -417,3 +716,127 @@ class PaymentReconciliationTestCase(TestCase):
         self.assertEqual(reconciliation.status, PaymentReconciliation.Status.COMPLETED)
         self.assertIsNotNone(reconciliation.completed_at)
         self.assertFalse(reconciliation.has_discrepancy)
+
+    def test_statement_reconciliation(self):
+        """Test streaming statement matching and grouped daily reconciliation."""
+        import io
+        from .models import PaymentStatement, PaymentStatementLine
+        from .reconciliation import ReconciliationService, read_json_statement
+
+        customer = Customer.objects.create(
+            tenant=self.tenant,
+            name="John",
+            surname="Doe",
+            email="john@example.com",
+            phone="+584121234567"
+        )
+        venue = Venue.objects.create(tenant=self.tenant, name="Test Venue", address="Test Address")
+        event = Event.objects.create(
+            tenant=self.tenant,
+            name="Test Event",
+            venue=venue,
+            start_date=timezone.now() + timedelta(days=30),
+            end_date=timezone.now() + timedelta(days=30, hours=3)
+        )
+        transaction_obj = Transaction.objects.create(
+            tenant=self.tenant,
+            event=event,
+            customer=customer,
+            total_amount=Decimal('200.00')
+        )
+
+        payments = {}
+        for external_id, amount, status in [
+            ('EXT-1', '100.00', Payment.Status.COMPLETED),
+            ('EXT-2', '50.00', Payment.Status.COMPLETED),
+            ('EXT-3', '30.00', Payment.Status.COMPLETED),
+            ('EXT-4', '20.00', Payment.Status.PENDING),
+        ]:
+            payments[external_id] = Payment.objects.create(
+                tenant=self.tenant,
+                transaction=transaction_obj,
+                payment_method=self.payment_method,
+                amount=Decimal(amount),
+                status=status,
+                external_transaction_id=external_id,
+                completed_at=timezone.now() if status == Payment.Status.COMPLETED else None
+            )
+
+        statement_csv = (
+            "external_transaction_id,amount\n"
+            "EXT-1,100.00\n"
+            "EXT-2,45.00\n"
+            "EXT-4,20.00\n"
+            "EXT-9,10.00\n"
+            "EXT-1,100.00\n"
+        )
+        today = timezone.localdate()
+
+        statement = ReconciliationService.import_statement(
+            tenant=self.tenant,
+            stream=io.StringIO(statement_csv),
+            statement_format='csv',
+            period_start=today,
+            period_end=today,
+            chunk_size=2
+        )
+        self.assertEqual(statement.line_count, 5)
+        self.assertEqual(statement.total_amount, Decimal('275.00'))
+        self.assertEqual(statement.status, PaymentStatement.Status.IMPORTED)
+        self.assertEqual(
+            statement.lines.filter(match_status=PaymentStatementLine.MatchStatus.MATCHED).count(), 2
+        )
+
+        issues = sorted(
+            (issue['issue'], issue['external_transaction_id'])
+            for issue in ReconciliationService.iter_discrepancies(statement)
+        )
+        self.assertEqual(issues, [
+            ('amount_mismatch', 'EXT-2'),
+            ('duplicate_in_statement', 'EXT-1'),
+            ('missing_in_statement', 'EXT-3'),
+            ('missing_in_system', 'EXT-9'),
+            ('status_mismatch', 'EXT-4'),
+        ])
+
+        reconciliations = ReconciliationService.build_daily_reconciliations(
+            tenant=self.tenant,
+            period_start=today,
+            period_end=today,
+            statement=statement
+        )
+        self.assertEqual(len(reconciliations), 1)
+
+        reconciliation = PaymentReconciliation.objects.all_tenants().get(
+            tenant=self.tenant, payment_method=self.payment_method, reconciliation_date=today
+        )
+        self.assertEqual(reconciliation.system_total, Decimal('180.00'))
+        self.assertEqual(reconciliation.system_transaction_count, 3)
+        self.assertEqual(reconciliation.external_total, Decimal('245.00'))
+        self.assertEqual(reconciliation.discrepancy_amount, Decimal('65.00'))
+        self.assertEqual(reconciliation.status, PaymentReconciliation.Status.DISCREPANCY)
+
+        # JSON arrays are decoded incrementally across reads
+        rows = list(read_json_statement(
+            io.StringIO('[{"reference": "EXT-1", "amount": 100}, {"reference": "EXT-2", "amount": "45.00"}]'),
+            read_size=7
+        ))
+        self.assertEqual([row['reference'] for row in rows], ['EXT-1', 'EXT-2'])
+
+        # Invalid JSON is a parse error, and the buffer never outgrows one object
+        with self.assertRaises(ValidationError):
+            list(read_json_statement(io.StringIO('[{"reference": "EXT-1", "amount": }]'), read_size=7))
+        with self.assertRaises(ValidationError):
+            list(read_json_statement(io.StringIO('{"reference": "' + 'x' * 100), read_size=7, max_object_size=32))
+
+        # A failed import drops the chunks it already committed
+        with self.assertRaises(ValidationError):
+            ReconciliationService.import_statement(
+                tenant=self.tenant,
+                stream=io.StringIO("external_transaction_id,amount\nEXT-1,100.00\nEXT-2,45.00\nEXT-3,abc\n"),
+                statement_format='csv',
+                period_start=today,
+                period_end=today,
+                chunk_size=2
+            )
+        self.assertEqual(PaymentStatement.objects.all_tenants().filter(tenant=self.tenant).count(), 1)
@@ -2,6 +2,7 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.core.exceptions import ValidationError
 from django.db.models import Sum, Count, Avg, Q
 from django.utils import timezone
 from decimal import Decimal
@@ -344,10 +345,15 @@ class PaymentViewSet(TenantViewMixin, viewsets.ModelViewSet):
     
     @action(detail=True, methods=['post'])
     def mark_completed(self, request, pk=None):
-        """Mark payment as completed."""
+        """
+        Mark payment as completed.
+        Retries for an already completed payment return the payment unchanged.
+        """
         payment = self.get_object()
         
-        if payment.status not in [Payment.Status.PENDING, Payment.Status.PROCESSING]:
+        if payment.status not in [
+            Payment.Status.PENDING, Payment.Status.PROCESSING, Payment.Status.COMPLETED
+        ]:
             return Response(
                 {'error': 'Payment cannot be completed in current status'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -356,11 +362,17 @@ class PaymentViewSet(TenantViewMixin, viewsets.ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        PaymentProcessingService.process_payment(
-            payment=payment,
-            external_transaction_id=serializer.validated_data.get('external_transaction_id'),
-            processor_response=serializer.validated_data.get('processor_response')
-        )
+        try:
+            PaymentProcessingService.process_payment(
+                payment=payment,
+                external_transaction_id=serializer.validated_data.get('external_transaction_id'),
+                processor_response=serializer.validated_data.get('processor_response')
+            )
+        except ValidationError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         response_serializer = PaymentSerializer(payment)
         return Response(response_serializer.data)
@@ -14,6 +14,7 @@ from django.utils import timezone
 from decimal import Decimal
 from datetime import datetime, timedelta
 
+from venezuelan_pos.core.db_router import with_reporting_db
 from venezuelan_pos.apps.tenants.middleware import TenantRequiredMixin
 from venezuelan_pos.apps.sales.models import Transaction
 from .models import PaymentMethod, PaymentPlan, Payment, PaymentReconciliation
@@ -27,6 +28,7 @@ from .fiscal_integration import FiscalAuditService
 
 
 @login_required
+@with_reporting_db
 def payment_dashboard(request):
     """Payment processing dashboard."""
     # Get summary statistics
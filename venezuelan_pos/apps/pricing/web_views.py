@@ -14,6 +14,7 @@ from django.db import transaction
 from decimal import Decimal
 import json
 
+from venezuelan_pos.core.db_router import with_reporting_db
 from .models import PriceStage, RowPricing, PriceHistory, StageTransition
 from .forms import (
     PriceStageForm, RowPricingForm, BulkRowPricingForm,
@@ -25,6 +26,7 @@ from venezuelan_pos.apps.zones.models import Zone, Seat
 
 
 @login_required
+@with_reporting_db
 def pricing_dashboard(request):
     """Pricing dashboard with current stage indicators and overview."""
     
@@ -640,6 +642,7 @@ def stage_transition_monitoring(request):
 
 
 @login_required
+@with_reporting_db
 def stage_performance_analytics(request, event_id):
     """Stage performance analytics with transition history and sales tracking."""
     
@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils import timezone
-from .models import SalesReport, OccupancyAnalysis, ReportSchedule
+from .models import SalesReport, OccupancyAnalysis, ReportSchedule, SalesRollup, ReportJob
 
 
 @admin.register(SalesReport)
@@ -413,4 +413,73 @@ class ReportScheduleAdmin(admin.ModelAdmin):
         
         if count > 0:
             self.message_user(request, f"{count} schedules executed successfully.")
-    execute_now.short_description = "Execute selected schedules now"
\ No newline at end of file
+    execute_now.short_description = "Execute selected schedules now"
+
+
+@admin.register(SalesRollup)
+class SalesRollupAdmin(admin.ModelAdmin):
+    """Django admin interface for SalesRollup (read only)."""
+    
+    list_display = [
+        'bucket_start',
+        'event',
+        'zone',
+        'payment_method',
+        'tickets',
+        'transaction_count',
+        'revenue',
+    ]
+    list_filter = ['tenant', 'event']
+    date_hierarchy = 'bucket_start'
+    ordering = ['-bucket_start']
+    
+    def get_queryset(self, request):
+        """Optimize queries and filter by tenant."""
+        qs = super().get_queryset(request).select_related('event', 'zone', 'payment_method')
+        if not request.user.is_superuser and hasattr(request.user, 'tenant'):
+            qs = qs.filter(tenant=request.user.tenant)
+        return qs
+    
+    def has_add_permission(self, request):
+        """Rollups are maintained by the rollup service."""
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        """Rollups are maintained by the rollup service."""
+        return False
+
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    """Django admin interface for ReportJob (read only)."""
+    
+    list_display = [
+        'id',
+        'job_type',
+        'report',
+        'status',
+        'progress',
+        'result_size',
+        'requested_by',
+        'created_at',
+        'finished_at',
+    ]
+    list_filter = ['job_type', 'status', 'created_at']
+    search_fields = ['report__name', 'task_id']
+    exclude = ['result']
+    ordering = ['-created_at']
+    
+    def get_queryset(self, request):
+        """Optimize queries and filter by tenant."""
+        qs = super().get_queryset(request).select_related('report', 'requested_by').defer('result')
+        if not request.user.is_superuser and hasattr(request.user, 'tenant'):
+            qs = qs.filter(tenant=request.user.tenant)
+        return qs
+    
+    def has_add_permission(self, request):
+        """Jobs are created by the report job service."""
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        """Jobs are updated by report workers."""
+        return False
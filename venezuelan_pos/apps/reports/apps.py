@@ -10,5 +10,4 @@ class ReportsConfig(AppConfig):
     
     def ready(self):
         """Import signals when app is ready."""
-        # Import any signals here if needed in the future
-        pass
\ No newline at end of file
+        import venezuelan_pos.apps.reports.signals
\ No newline at end of file
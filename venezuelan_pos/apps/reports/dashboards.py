@@ -0,0 +1,280 @@
+"""
+Dashboard snapshots.
+Tenant and event dashboard figures are computed together with a few
+conditional aggregates on the reporting database and cached with the time
+they were taken. Sales, payments and reservations mark the affected
+snapshots stale; refreshes are debounced, so a burst of sales costs one
+recomputation per snapshot instead of one per dashboard page load. A
+refresh waits out the reporting database's allowed replication lag, so it
+always sees the changes that scheduled it.
+"""
+
+import logging
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Min, Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from venezuelan_pos.core.db_router import get_routing_setting, with_reporting_db
+
+from .timeseries import _day_start
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_CACHE_PREFIX = "dashboard_snapshot"
+
+
+class DashboardSnapshotService:
+    """
+    Builds, caches and refreshes tenant and event dashboard snapshots.
+
+    Usage:
+        snapshot = dashboard_snapshots.get_tenant_snapshot(tenant)
+        snapshot['as_of'], snapshot['today_sales'], ...
+    """
+
+    TENANT = 'tenant'
+    EVENT = 'event'
+
+    # Snapshot key covering every tenant, shown to admin users
+    ALL_TENANTS = 'all'
+
+    # Snapshots older than this are rebuilt on read
+    MAX_AGE = 300
+
+    # Changes within this window share one refresh
+    DEBOUNCE_SECONDS = 10
+
+    @staticmethod
+    def _cache_key(scope: str, object_id) -> str:
+        return f"{SNAPSHOT_CACHE_PREFIX}:{scope}:{object_id}"
+
+    @staticmethod
+    def _pending_key(scope: str, object_id) -> str:
+        return f"{SNAPSHOT_CACHE_PREFIX}:pending:{scope}:{object_id}"
+
+    # Cached form
+
+    @staticmethod
+    def _dump(snapshot: Dict) -> Dict:
+        """Snapshot as cached; as_of keeps its microseconds, which JSON would drop."""
+        return {**snapshot, 'as_of': snapshot['as_of'].isoformat()}
+
+    def _load(self, scope: str, snapshot: Optional[Dict]) -> Optional[Dict]:
+        """Restore the dates, Decimals and ids the JSON cache stores as strings."""
+        if snapshot is None:
+            return None
+
+        def parsed(value, parse):
+            return parse(value) if isinstance(value, str) else value
+
+        snapshot['as_of'] = parsed(snapshot['as_of'], parse_datetime)
+        if scope == self.TENANT:
+            snapshot['day'] = parsed(snapshot['day'], parse_date)
+            for field in ['today_revenue', 'recent_revenue']:
+                snapshot[field] = parsed(snapshot[field], Decimal)
+        else:
+            sales = snapshot['sales']
+            for field in ['total_revenue', 'average_transaction_value']:
+                sales[field] = parsed(sales[field], Decimal)
+            for field in ['first_sale', 'last_sale']:
+                sales[field] = parsed(sales[field], parse_datetime)
+            for zone in snapshot['zones']:
+                zone['id'] = parsed(zone['id'], uuid.UUID)
+        return snapshot
+
+    # Reading
+
+    def get_tenant_snapshot(self, tenant=None) -> Dict:
+        """Sales, reservation and event figures of a tenant, or of all tenants if None."""
+        tenant_id = tenant.id if tenant is not None else self.ALL_TENANTS
+        snapshot = self._load(self.TENANT, cache.get(self._cache_key(self.TENANT, tenant_id)))
+
+        # Today's figures restart at local midnight
+        if snapshot is None or snapshot['day'] != timezone.localdate():
+            snapshot = self.refresh(self.TENANT, tenant_id, force=True)
+        return snapshot
+
+    def get_event_snapshot(self, event) -> Dict:
+        """Sales and capacity figures of an event."""
+        snapshot = self._load(self.EVENT, cache.get(self._cache_key(self.EVENT, event.id)))
+        if snapshot is None:
+            snapshot = self.refresh(self.EVENT, event.id, force=True)
+        return snapshot
+
+    # Building
+
+    @staticmethod
+    @with_reporting_db
+    def build_tenant_snapshot(tenant_id=None) -> Dict:
+        """Compute a tenant snapshot (all tenants if tenant_id is None)."""
+        from venezuelan_pos.apps.events.models import Event
+        from venezuelan_pos.apps.sales.models import ReservedTicket, Transaction
+        from venezuelan_pos.apps.tenants.models import User
+
+        now = timezone.now()
+        today = timezone.localdate()
+        today_start = _day_start(today)
+        thirty_days_ago = now - timedelta(days=30)
+
+        # Base managers: filtered explicitly by tenant, not by the thread-local one
+        transactions = Transaction._base_manager.all()
+        reservations = ReservedTicket._base_manager.all()
+        events = Event._base_manager.all()
+        users = User.objects.filter(is_active=True)
+        if tenant_id is not None:
+            transactions = transactions.filter(tenant_id=tenant_id)
+            reservations = reservations.filter(tenant_id=tenant_id)
+            events = events.filter(tenant_id=tenant_id)
+            users = users.filter(tenant_id=tenant_id)
+
+        completed_today = Q(status=Transaction.Status.COMPLETED, created_at__gte=today_start)
+        completed_recently = Q(status=Transaction.Status.COMPLETED, created_at__gte=thirty_days_ago)
+        sales = transactions.aggregate(
+            today_sales=Count('id', filter=completed_today),
+            today_revenue=Sum('total_amount', filter=completed_today),
+            pending_transactions=Count('id', filter=Q(status=Transaction.Status.PENDING)),
+            recent_transactions=Count('id', filter=completed_recently),
+            recent_revenue=Sum('total_amount', filter=completed_recently)
+        )
+
+        return {
+            'as_of': now,
+            'day': today,
+            'today_sales': sales['today_sales'],
+            'today_revenue': sales['today_revenue'] or Decimal('0.00'),
+            'pending_transactions': sales['pending_transactions'],
+            'recent_transactions': sales['recent_transactions'],
+            'recent_revenue': sales['recent_revenue'] or Decimal('0.00'),
+            'active_reservations': reservations.filter(
+                status=ReservedTicket.Status.ACTIVE,
+                reserved_until__gt=now
+            ).count(),
+            'active_events': events.filter(status=Event.Status.ACTIVE).count(),
+            'total_users': users.count(),
+        }
+
+    @staticmethod
+    @with_reporting_db
+    def build_event_snapshot(event_id) -> Dict:
+        """Compute an event snapshot."""
+        from venezuelan_pos.apps.sales.models import Transaction, TransactionItem
+        from venezuelan_pos.apps.zones.models import Seat, Zone
+
+        zones = list(
+            Zone._base_manager.filter(event_id=event_id).annotate(
+                total_seats=Count('seats'),
+                available_seats=Count('seats', filter=Q(seats__status=Seat.Status.AVAILABLE)),
+                sold_seats=Count('seats', filter=Q(seats__status=Seat.Status.SOLD)),
+                reserved_seats=Count('seats', filter=Q(seats__status=Seat.Status.RESERVED))
+            ).values(
+                'id', 'name', 'zone_type', 'capacity',
+                'total_seats', 'available_seats', 'sold_seats', 'reserved_seats'
+            ).order_by('display_order', 'name')
+        )
+
+        sales = Transaction._base_manager.filter(
+            event_id=event_id,
+            status=Transaction.Status.COMPLETED
+        ).aggregate(
+            total_revenue=Sum('total_amount'),
+            total_transactions=Count('id'),
+            average_transaction_value=Avg('total_amount'),
+            first_sale=Min('completed_at'),
+            last_sale=Max('completed_at')
+        )
+        # Counted apart from the aggregate above so item rows do not inflate revenue
+        sales['total_tickets'] = TransactionItem._base_manager.filter(
+            transaction__event_id=event_id,
+            transaction__status=Transaction.Status.COMPLETED
+        ).aggregate(total=Sum('quantity'))['total'] or 0
+        sales['total_revenue'] = sales['total_revenue'] or Decimal('0.00')
+
+        capacity = {
+            'total_capacity': sum(zone['capacity'] for zone in zones),
+            'total_seats': sum(zone['total_seats'] for zone in zones),
+            'sold_seats': sum(zone['sold_seats'] for zone in zones),
+            'available_seats': sum(zone['available_seats'] for zone in zones),
+        }
+        occupancy_rate = 0
+        if capacity['total_seats']:
+            occupancy_rate = capacity['sold_seats'] / capacity['total_seats'] * 100
+
+        return {
+            'as_of': timezone.now(),
+            'zones': zones,
+            'sales': sales,
+            'capacity': capacity,
+            'occupancy_rate': round(occupancy_rate, 2),
+        }
+
+    # Refreshing
+
+    def refresh(self, scope: str, object_id, force: bool = False) -> Optional[Dict]:
+        """
+        Rebuild and cache a snapshot.
+        Unless forced, snapshots nobody has viewed recently are left to be
+        built on their next read. Returns the new snapshot, if any.
+        """
+        key = self._cache_key(scope, object_id)
+        if not force and cache.get(key) is None:
+            return None
+
+        if scope == self.TENANT:
+            snapshot = self.build_tenant_snapshot(None if object_id == self.ALL_TENANTS else object_id)
+        elif scope == self.EVENT:
+            snapshot = self.build_event_snapshot(object_id)
+        else:
+            raise ValueError(f"Unknown dashboard snapshot scope: {scope}")
+
+        cache.set(key, self._dump(snapshot), self.MAX_AGE)
+        return snapshot
+
+    def mark_stale(self, tenant_id, event_id=None) -> None:
+        """
+        Schedule refreshes of the snapshots a change affects, once the
+        surrounding transaction commits. A snapshot already scheduled within
+        DEBOUNCE_SECONDS is not scheduled again.
+        """
+        targets = [(self.TENANT, tenant_id), (self.TENANT, self.ALL_TENANTS)]
+        if event_id is not None:
+            targets.append((self.EVENT, event_id))
+
+        for scope, object_id in targets:
+            try:
+                pending = cache.add(self._pending_key(scope, object_id), True, self.DEBOUNCE_SECONDS)
+            except Exception as e:
+                # Runs in post_save: the snapshot ages out after MAX_AGE instead
+                logger.warning(f"Could not mark dashboard snapshot stale: {e}")
+                continue
+            if pending:
+                transaction.on_commit(
+                    lambda scope=scope, object_id=object_id: self._schedule(scope, object_id)
+                )
+
+    def _schedule(self, scope: str, object_id) -> None:
+        """Enqueue a debounced refresh, dropping the snapshot if Celery is unavailable."""
+        from .tasks import refresh_dashboard_snapshot
+
+        # Changes debounced into this refresh are at most DEBOUNCE_SECONDS
+        # old; the reporting database may lag up to MAX_REPLICA_LAG behind
+        countdown = self.DEBOUNCE_SECONDS + get_routing_setting('MAX_REPLICA_LAG')
+
+        try:
+            refresh_dashboard_snapshot.apply_async(
+                args=[scope, str(object_id)],
+                countdown=countdown
+            )
+        except Exception as e:
+            logger.warning(f"Could not schedule dashboard snapshot refresh, dropping it: {e}")
+            cache.delete(self._cache_key(scope, object_id))
+
+
+# Global dashboard snapshot instance
+dashboard_snapshots = DashboardSnapshotService()
@@ -0,0 +1,444 @@
+"""
+Streaming data exports.
+Rows are read with values_list() and iterator(chunk_size=...) and written
+to a StreamingHttpResponse as CSV, JSON or XLSX, optionally gzip-compressed
+on the fly, so memory use stays flat however many rows are exported.
+"""
+
+import csv
+import json
+import re
+import zlib
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from venezuelan_pos.core.db_router import using_reporting_db
+
+# Rows fetched per database round trip
+CHUNK_SIZE = 2000
+
+# Bytes buffered before a chunk is sent to the client
+STREAM_BUFFER_SIZE = 64 * 1024
+
+
+class ExportDataset:
+    """
+    An exportable model: its columns, default columns and filter fields,
+    and the column that moves forward whenever a row changes.
+    """
+
+    def __init__(self, name: str, model_label: str, columns: Dict[str, Tuple[str, str]],
+                 default_columns: Sequence[str], date_field: str, event_field: str,
+                 status_field: Optional[str] = 'status', watermark_field: str = 'updated_at'):
+        self.name = name
+        self.model_label = model_label
+        self.columns = columns
+        self.default_columns = list(default_columns)
+        self.date_field = date_field
+        self.event_field = event_field
+        self.status_field = status_field
+        self.watermark_field = watermark_field
+
+    @property
+    def model(self):
+        from django.apps import apps
+        return apps.get_model(self.model_label)
+
+    def get_queryset(self, tenant, filters: Optional[Dict] = None):
+        """Tenant rows matching export filters, oldest first."""
+        filters = filters or {}
+        # Base manager: filtered explicitly by tenant, not by the thread-local one
+        queryset = self.model._base_manager.filter(tenant=tenant)
+
+        if filters.get('start_date'):
+            queryset = queryset.filter(**{f'{self.date_field}__gte': filters['start_date']})
+        if filters.get('end_date'):
+            queryset = queryset.filter(**{f'{self.date_field}__lte': filters['end_date']})
+        if filters.get('event_id'):
+            queryset = queryset.filter(**{self.event_field: filters['event_id']})
+        if filters.get('status') and self.status_field:
+            queryset = queryset.filter(**{self.status_field: filters['status']})
+
+        return queryset.order_by(self.date_field, 'pk')
+
+    def resolve_columns(self, columns: Optional[Iterable[str]] = None) -> List[str]:
+        """Validated column keys, defaulting to the dataset's default columns."""
+        columns = list(columns or self.default_columns)
+        unknown = [column for column in columns if column not in self.columns]
+        if unknown:
+            raise ValueError(f"Unknown columns for {self.name}: {', '.join(unknown)}")
+        return columns
+
+    def iter_rows(self, queryset, columns: Sequence[str]) -> Iterator[tuple]:
+        """Stream the selected columns of a queryset as tuples."""
+        lookups = [self.columns[column][0] for column in columns]
+        return queryset.values_list(*lookups).iterator(chunk_size=CHUNK_SIZE)
+
+
+DATASETS = {
+    dataset.name: dataset
+    for dataset in [
+        ExportDataset(
+            name='transactions',
+            model_label='sales.Transaction',
+            columns={
+                'id': ('id', 'Transaction ID'),
+                'fiscal_series': ('fiscal_series', 'Fiscal Series'),
+                'event': ('event__name', 'Event'),
+                'customer': ('customer__email', 'Customer'),
+                'transaction_type': ('transaction_type', 'Type'),
+                'status': ('status', 'Status'),
+                'currency': ('currency', 'Currency'),
+                'subtotal_amount': ('subtotal_amount', 'Subtotal'),
+                'tax_amount': ('tax_amount', 'Tax'),
+                'total_amount': ('total_amount', 'Total'),
+                'created_at': ('created_at', 'Created At'),
+                'completed_at': ('completed_at', 'Completed At'),
+            },
+            default_columns=[
+                'id', 'fiscal_series', 'event', 'customer', 'status',
+                'subtotal_amount', 'tax_amount', 'total_amount', 'created_at', 'completed_at'
+            ],
+            date_field='created_at',
+            event_field='event_id'
+        ),
+        ExportDataset(
+            name='items',
+            model_label='sales.TransactionItem',
+            columns={
+                'id': ('id', 'Item ID'),
+                'transaction': ('transaction_id', 'Transaction ID'),
+                'fiscal_series': ('transaction__fiscal_series', 'Fiscal Series'),
+                'event': ('transaction__event__name', 'Event'),
+                'zone': ('zone__name', 'Zone'),
+                'row': ('seat__row_number', 'Row'),
+                'seat': ('seat__seat_number', 'Seat'),
+                'item_type': ('item_type', 'Type'),
+                'quantity': ('quantity', 'Quantity'),
+                'unit_price': ('unit_price', 'Unit Price'),
+                'subtotal_price': ('subtotal_price', 'Subtotal'),
+                'tax_amount': ('tax_amount', 'Tax'),
+                'total_price': ('total_price', 'Total'),
+                'created_at': ('created_at', 'Created At'),
+            },
+            default_columns=[
+                'id', 'transaction', 'fiscal_series', 'zone', 'row', 'seat',
+                'quantity', 'unit_price', 'total_price', 'created_at'
+            ],
+            date_field='created_at',
+            event_field='transaction__event_id',
+            status_field='transaction__status'
+        ),
+        ExportDataset(
+            name='payments',
+            model_label='payments.Payment',
+            columns={
+                'id': ('id', 'Payment ID'),
+                'transaction': ('transaction_id', 'Transaction ID'),
+                'payment_method': ('payment_method__name', 'Payment Method'),
+                'amount': ('amount', 'Amount'),
+                'processing_fee': ('processing_fee', 'Processing Fee'),
+                'net_amount': ('net_amount', 'Net Amount'),
+                'currency': ('currency', 'Currency'),
+                'reference_number': ('reference_number', 'Reference'),
+                'external_transaction_id': ('external_transaction_id', 'External ID'),
+                'status': ('status', 'Status'),
+                'created_at': ('created_at', 'Created At'),
+                'completed_at': ('completed_at', 'Completed At'),
+            },
+            default_columns=[
+                'id', 'transaction', 'payment_method', 'amount', 'currency',
+                'reference_number', 'status', 'created_at', 'completed_at'
+            ],
+            date_field='created_at',
+            event_field='transaction__event_id'
+        ),
+        ExportDataset(
+            name='tickets',
+            model_label='tickets.DigitalTicket',
+            columns={
+                'id': ('id', 'Ticket ID'),
+                'ticket_number': ('ticket_number', 'Ticket Number'),
+                'transaction': ('transaction_id', 'Transaction ID'),
+                'event': ('event__name', 'Event'),
+                'customer': ('customer__email', 'Customer'),
+                'zone': ('zone__name', 'Zone'),
+                'row': ('seat__row_number', 'Row'),
+                'seat': ('seat__seat_number', 'Seat'),
+                'ticket_type': ('ticket_type', 'Type'),
+                'total_price': ('total_price', 'Price'),
+                'status': ('status', 'Status'),
+                'usage_count': ('usage_count', 'Uses'),
+                'first_used_at': ('first_used_at', 'First Used At'),
+                'created_at': ('created_at', 'Created At'),
+            },
+            default_columns=[
+                'ticket_number', 'event', 'customer', 'zone', 'row', 'seat',
+                'total_price', 'status', 'usage_count', 'created_at'
+            ],
+            date_field='created_at',
+            event_field='event_id'
+        ),
+        ExportDataset(
+            name='validation_logs',
+            model_label='tickets.TicketValidationLog',
+            columns={
+                'id': ('id', 'Log ID'),
+                'ticket_number': ('ticket__ticket_number', 'Ticket Number'),
+                'event': ('ticket__event__name', 'Event'),
+                'validation_system_id': ('validation_system_id', 'Validation System'),
+                'validation_result': ('validation_result', 'Valid'),
+                'validation_method': ('validation_method', 'Method'),
+                'usage_count_after': ('usage_count_after', 'Uses After'),
+                'validation_location': ('validation_location', 'Location'),
+                'ip_address': ('ip_address', 'IP Address'),
+                'validated_at': ('validated_at', 'Validated At'),
+            },
+            default_columns=[
+                'ticket_number', 'event', 'validation_system_id', 'validation_result',
+                'validation_method', 'validation_location', 'validated_at'
+            ],
+            date_field='validated_at',
+            event_field='ticket__event_id',
+            status_field=None,
+            # Validation logs are never updated
+            watermark_field='validated_at'
+        ),
+    ]
+}
+
+
+def _cell(value):
+    """Plain representation of a cell for CSV and XLSX."""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (bool, int, float, Decimal, str)):
+        return value
+    return str(value)
+
+
+# Writers
+
+class _Echo:
+    """File-like object returning what is written, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def write_csv(headers: Sequence[str], rows: Iterable[Sequence]) -> Iterator[str]:
+    """CSV lines for a header and rows."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow([_cell(value) for value in row])
+
+
+def write_json(columns: Sequence[str], rows: Iterable[Sequence]) -> Iterator[str]:
+    """A JSON array of objects, one row at a time."""
+    yield '['
+    separator = '\n'
+    for row in rows:
+        yield separator + json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder)
+        separator = ',\n'
+    yield '\n]\n'
+
+
+_XML_ILLEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+class _ZipStream:
+    """Unseekable sink for zipfile whose written bytes are drained by a generator."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _xlsx_row(values: Sequence) -> str:
+    """A worksheet row of inline strings and numbers."""
+    cells = []
+    for value in values:
+        value = _cell(value)
+        if isinstance(value, bool):
+            cells.append(f'<c t="b"><v>{int(value)}</v></c>')
+        elif isinstance(value, (int, float, Decimal)):
+            cells.append(f'<c><v>{value}</v></c>')
+        else:
+            text = escape(_XML_ILLEGAL.sub('', str(value)))
+            cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return f'<row>{"".join(cells)}</row>'
+
+
+def write_xlsx(headers: Sequence[str], rows: Iterable[Sequence], sheet_name: str = 'Export') -> Iterator[bytes]:
+    """
+    A single-sheet XLSX workbook written as a streamed zip archive.
+    The worksheet is compressed as it is produced and never held in memory.
+    """
+    sink = _ZipStream()
+
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', _XLSX_CONTENT_TYPES)
+        archive.writestr('_rels/.rels', _XLSX_ROOT_RELS)
+        archive.writestr('xl/workbook.xml', _XLSX_WORKBOOK.format(name=escape(sheet_name[:31])))
+        archive.writestr('xl/_rels/workbook.xml.rels', _XLSX_WORKBOOK_RELS)
+        yield sink.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', mode='w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(headers).encode('utf-8'))
+
+            for row in rows:
+                sheet.write(_xlsx_row(row).encode('utf-8'))
+                data = sink.drain()
+                if data:
+                    yield data
+
+            sheet.write(b'</sheetData></worksheet>')
+
+    yield sink.drain()
+
+
+# Responses
+
+FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'json': ('application/json', 'json'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+}
+
+
+def _buffered(chunks: Iterable, size: int = STREAM_BUFFER_SIZE) -> Iterator[bytes]:
+    """Join small chunks into blocks of at least `size` bytes."""
+    buffer = []
+    buffered = 0
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        if not chunk:
+            continue
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= size:
+            yield b''.join(buffer)
+            buffer = []
+            buffered = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def _gzipped(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Gzip-compress a byte stream on the fly."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def accepts_gzip(request) -> bool:
+    """Whether the client accepts a gzip-encoded response."""
+    return 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+
+
+def stream_response(chunks: Iterable, file_format: str, filename: str, gzip: bool = False) -> StreamingHttpResponse:
+    """A downloadable streaming response, gzip-encoded when requested."""
+    content_type, extension = FORMATS[file_format]
+    stream = _buffered(chunks)
+    if gzip:
+        stream = _gzipped(stream)
+
+    response = StreamingHttpResponse(stream, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{extension}"'
+    response['Vary'] = 'Accept-Encoding'
+    if gzip:
+        response['Content-Encoding'] = 'gzip'
+    return response
+
+
+def export_queryset(dataset: ExportDataset, queryset, file_format: str = 'csv',
+                    columns: Optional[Iterable[str]] = None, gzip: bool = False,
+                    filename: Optional[str] = None) -> StreamingHttpResponse:
+    """Stream the selected columns of a dataset queryset as a file download."""
+    columns = dataset.resolve_columns(columns)
+    headers = [dataset.columns[column][1] for column in columns]
+    # Rows are read while the response streams, after the view returns
+    rows = dataset.iter_rows(using_reporting_db(queryset), columns)
+
+    if file_format == 'csv':
+        chunks = write_csv(headers, rows)
+    elif file_format == 'json':
+        chunks = write_json(columns, rows)
+    elif file_format == 'xlsx':
+        chunks = write_xlsx(headers, rows, sheet_name=dataset.name)
+    else:
+        raise ValueError(f"Unsupported export format: {file_format}")
+
+    filename = filename or f"{dataset.name}_{timezone.localtime():%Y%m%d_%H%M%S}"
+    return stream_response(chunks, file_format, filename, gzip=gzip)
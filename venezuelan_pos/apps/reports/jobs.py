@@ -0,0 +1,255 @@
+"""
+Background report jobs.
+Requests enqueue a ReportJob and return immediately; a Celery worker
+generates the report one section at a time, recording progress after each,
+and stores the result compressed. A beat task enqueues due ReportSchedules.
+"""
+
+import json
+import logging
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from venezuelan_pos.core.db_router import use_reporting_db
+
+from .models import ReportJob, ReportSchedule, SalesReport
+from .services import ReportService, SALES_REPORT_SECTIONS
+
+logger = logging.getLogger(__name__)
+
+
+def _json_filters(filters: Optional[Dict]) -> Dict:
+    """Report filters with dates and UUIDs as strings, safe to store as JSON."""
+    serialized = {}
+    for key, value in (filters or {}).items():
+        if isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        elif isinstance(value, uuid.UUID):
+            value = str(value)
+        serialized[key] = value
+    return serialized
+
+
+class ReportJobService:
+    """Enqueues and runs background report jobs."""
+
+    # Schedules enqueued per beat run
+    SCHEDULE_BATCH_SIZE = 100
+
+    # Running jobs older than this are assumed lost with their worker
+    RUNNING_TIMEOUT = timedelta(hours=1)
+
+    @staticmethod
+    def enqueue_sales_report(tenant, report_type, name, filters=None, requested_by=None,
+                             schedule=None, **report_fields) -> ReportJob:
+        """
+        Create a sales report in generating status and a job that fills it in.
+        The Celery task is sent once the surrounding transaction commits.
+        """
+        from .tasks import generate_report_job
+
+        filters = _json_filters(filters)
+        report = SalesReport.objects.create(
+            tenant=tenant,
+            name=name,
+            report_type=report_type,
+            filters=filters,
+            status=SalesReport.Status.GENERATING,
+            generated_by=requested_by,
+            **report_fields
+        )
+
+        job = ReportJob.objects.create(
+            tenant=tenant,
+            job_type=ReportJob.JobType.SALES_REPORT,
+            report=report,
+            schedule=schedule,
+            task_id=str(uuid.uuid4()),
+            requested_by=requested_by
+        )
+
+        transaction.on_commit(
+            lambda: generate_report_job.apply_async(args=[str(job.id)], task_id=job.task_id)
+        )
+
+        logger.info(f"Queued report job {job.id} for report {report.id}")
+        return job
+
+    @staticmethod
+    def _update(job: ReportJob, **fields) -> None:
+        """Persist job fields immediately so pollers see them."""
+        for field, value in fields.items():
+            setattr(job, field, value)
+        ReportJob.objects.all_tenants().filter(id=job.id).update(**fields)
+
+    @staticmethod
+    def run(job_id) -> Optional[ReportJob]:
+        """
+        Generate a queued job's report section by section.
+        Returns the finished job, or None if it was already taken.
+        """
+        claimed = ReportJob.objects.all_tenants().filter(
+            id=job_id,
+            status=ReportJob.Status.QUEUED
+        ).update(status=ReportJob.Status.RUNNING, started_at=timezone.now())
+        if not claimed:
+            logger.info(f"Report job {job_id} is not queued, skipping")
+            return None
+
+        job = ReportJob.objects.all_tenants().select_related('report', 'report__tenant').get(id=job_id)
+        report = job.report
+
+        try:
+            detailed_data = {'base_statistics': {}, 'breakdowns': {}}
+            sections = ReportService.iter_sales_report_sections(report.tenant, report.filters)
+
+            with use_reporting_db():
+                for section, data in sections:
+                    if section == 'base_statistics':
+                        detailed_data[section] = data
+                    else:
+                        detailed_data['breakdowns'][section] = data
+
+                    done = SALES_REPORT_SECTIONS.index(section) + 1
+                    ReportJobService._update(job, progress=done * 100 // len(SALES_REPORT_SECTIONS))
+
+            job.set_result(detailed_data)
+
+            # The report keeps the base statistics and a reference to the
+            # job; the breakdowns stay in the job's compressed result
+            base = detailed_data['base_statistics']
+            with transaction.atomic():
+                report.total_transactions = base['total_transactions']
+                report.total_revenue = base['total_revenue']
+                report.total_tickets = base['total_tickets']
+                report.average_ticket_price = base['average_ticket_price']
+                report.detailed_data = {
+                    'base_statistics': json.loads(json.dumps(base, cls=DjangoJSONEncoder)),
+                    'result_job_id': str(job.id),
+                }
+                report.status = SalesReport.Status.COMPLETED
+                report.completed_at = timezone.now()
+                report.save(update_fields=[
+                    'total_transactions', 'total_revenue', 'total_tickets',
+                    'average_ticket_price', 'detailed_data', 'status', 'completed_at'
+                ])
+
+                job.status = ReportJob.Status.COMPLETED
+                job.progress = 100
+                job.finished_at = timezone.now()
+                job.save(update_fields=['status', 'progress', 'result', 'result_size', 'finished_at'])
+
+            logger.info(
+                f"Report job {job.id} completed ({job.result_size} bytes, "
+                f"{len(job.result)} compressed)"
+            )
+
+        except Exception as e:
+            logger.error(f"Report job {job.id} failed: {e}")
+            report.mark_failed()
+            ReportJobService._update(
+                job,
+                status=ReportJob.Status.FAILED,
+                error_message=str(e),
+                finished_at=timezone.now()
+            )
+
+        return job
+
+    @classmethod
+    def fail_stuck_jobs(cls, now=None) -> int:
+        """
+        Fail jobs that have been running for longer than RUNNING_TIMEOUT,
+        e.g. because their worker died, along with their reports.
+
+        Returns:
+            int: Number of jobs failed
+        """
+        now = now or timezone.now()
+
+        with transaction.atomic():
+            jobs = list(
+                ReportJob.objects.all_tenants().select_for_update(skip_locked=True).filter(
+                    status=ReportJob.Status.RUNNING,
+                    started_at__lt=now - cls.RUNNING_TIMEOUT
+                ).values_list('id', 'report_id')
+            )
+            if not jobs:
+                return 0
+
+            ReportJob.objects.all_tenants().filter(id__in=[job[0] for job in jobs]).update(
+                status=ReportJob.Status.FAILED,
+                error_message="Timed out while running",
+                finished_at=now
+            )
+            SalesReport.objects.filter(
+                id__in=[job[1] for job in jobs if job[1]],
+                status=SalesReport.Status.GENERATING
+            ).update(status=SalesReport.Status.FAILED)
+
+        logger.warning(f"Failed {len(jobs)} report jobs stuck in running")
+        return len(jobs)
+
+    @staticmethod
+    def enqueue_schedule(schedule: ReportSchedule, now=None) -> ReportJob:
+        """
+        Enqueue a schedule's report and advance it to its first run after now.
+        Runs missed while no worker was around are covered by this one job.
+        """
+        now = now or timezone.now()
+        job = ReportJobService.enqueue_sales_report(
+            tenant=schedule.tenant,
+            report_type=schedule.report_type,
+            name=f"{schedule.name} - {now.strftime('%Y-%m-%d')}",
+            filters=schedule.report_filters,
+            requested_by=schedule.created_by,
+            schedule=schedule,
+            export_formats=schedule.export_formats
+        )
+
+        schedule.last_run = now
+        schedule.next_run = schedule.calculate_next_run()
+        while schedule.next_run <= now:
+            schedule.next_run = schedule.calculate_next_run()
+        schedule.save(update_fields=['last_run', 'next_run'])
+
+        return job
+
+    @classmethod
+    def enqueue_due_schedules(cls, now=None) -> int:
+        """
+        Enqueue every active schedule whose next run has passed.
+        Schedules are locked while they are advanced past now, so each
+        schedule gets at most one job per call and concurrent beat runs
+        never enqueue the same run twice.
+
+        Returns:
+            int: Number of jobs enqueued
+        """
+        now = now or timezone.now()
+        enqueued = 0
+
+        while True:
+            with transaction.atomic():
+                schedules = list(
+                    ReportSchedule.objects.all_tenants().select_for_update(
+                        skip_locked=True, of=('self',)
+                    ).filter(
+                        status=ReportSchedule.Status.ACTIVE,
+                        next_run__lte=now
+                    ).select_related('tenant', 'created_by').order_by('next_run')[:cls.SCHEDULE_BATCH_SIZE]
+                )
+
+                for schedule in schedules:
+                    cls.enqueue_schedule(schedule, now=now)
+
+            enqueued += len(schedules)
+            if len(schedules) < cls.SCHEDULE_BATCH_SIZE:
+                break
+
+        return enqueued
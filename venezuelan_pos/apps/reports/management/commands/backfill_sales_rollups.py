@@ -0,0 +1,63 @@
+"""
+Management command to rebuild hourly sales rollups from raw transactions.
+Run after deploying rollups, or to repair a period after data corrections.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from venezuelan_pos.apps.reports.rollups import sales_rollups
+
+
+def _parse_day(value):
+    """Parse a YYYY-MM-DD argument as the aware start of that day."""
+    try:
+        return timezone.make_aware(datetime.combine(datetime.strptime(value, '%Y-%m-%d').date(), time.min))
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    help = 'Rebuild hourly sales rollups for a period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            type=str,
+            help='Tenant slug to backfill (default: all tenants)',
+        )
+
+        parser.add_argument(
+            '--start',
+            type=str,
+            help='First day to rebuild, YYYY-MM-DD (default: first completed sale)',
+        )
+
+        parser.add_argument(
+            '--end',
+            type=str,
+            help='Last day to rebuild, YYYY-MM-DD (default: today)',
+        )
+
+    def handle(self, *args, **options):
+        tenant = None
+        if options['tenant']:
+            from venezuelan_pos.apps.tenants.models import Tenant
+
+            try:
+                tenant = Tenant.objects.get(slug=options['tenant'])
+            except Tenant.DoesNotExist:
+                raise CommandError(f"Tenant '{options['tenant']}' not found")
+
+        start = _parse_day(options['start']) if options['start'] else None
+        end = _parse_day(options['end']) + timedelta(days=1) - timedelta(microseconds=1) if options['end'] else None
+
+        started_at = timezone.now()
+        stats = sales_rollups.backfill(tenant=tenant, start=start, end=end)
+
+        elapsed = (timezone.now() - started_at).total_seconds()
+        self.stderr.write(self.style.SUCCESS(
+            f"Sales rollup backfill finished in {elapsed:.1f}s: "
+            f"{stats['tenants']} tenant(s), {stats['windows']} window(s), {stats['facts']} fact row(s)"
+        ))
@@ -0,0 +1,133 @@
+# Generated by Django 5.0.14 on 2026-10-18 21:18
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0003_add_payment_methods_to_event_configuration"),
+        ("payments", "0003_paymentstatement"),
+        ("reports", "0001_initial"),
+        ("tenants", "0002_add_performance_indexes"),
+        ("zones", "0005_zone_map_color"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SalesRollup",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "bucket_start",
+                    models.DateTimeField(
+                        help_text="Start of the hour the sales were completed in"
+                    ),
+                ),
+                (
+                    "tickets",
+                    models.PositiveIntegerField(default=0, help_text="Tickets sold"),
+                ),
+                (
+                    "item_count",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Transaction items sold"
+                    ),
+                ),
+                (
+                    "transaction_count",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Completed transactions"
+                    ),
+                ),
+                (
+                    "subtotal",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        help_text="Revenue before taxes",
+                        max_digits=14,
+                    ),
+                ),
+                (
+                    "tax",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        help_text="Tax collected",
+                        max_digits=14,
+                    ),
+                ),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        help_text="Revenue including taxes",
+                        max_digits=14,
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "event",
+                    models.ForeignKey(
+                        help_text="Event sold",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sales_rollups",
+                        to="events.event",
+                    ),
+                ),
+                (
+                    "payment_method",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Payment method (null when no completed payment is recorded)",
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sales_rollups",
+                        to="payments.paymentmethod",
+                    ),
+                ),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        help_text="Tenant this record belongs to",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="%(class)s_set",
+                        to="tenants.tenant",
+                    ),
+                ),
+                (
+                    "zone",
+                    models.ForeignKey(
+                        help_text="Zone sold",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sales_rollups",
+                        to="zones.zone",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Sales Rollup",
+                "verbose_name_plural": "Sales Rollups",
+                "db_table": "sales_rollups_hourly",
+                "ordering": ["bucket_start"],
+                "indexes": [
+                    models.Index(
+                        fields=["tenant", "bucket_start"],
+                        name="sales_rollu_tenant__68464c_idx",
+                    ),
+                    models.Index(
+                        fields=["event", "bucket_start"],
+                        name="sales_rollu_event_i_dce46c_idx",
+                    ),
+                    models.Index(
+                        fields=["zone", "bucket_start"],
+                        name="sales_rollu_zone_id_c30aad_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,148 @@
+# Generated by Django 5.0.14 on 2026-10-18 21:31
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reports", "0002_salesrollup"),
+        ("tenants", "0002_add_performance_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReportJob",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "job_type",
+                    models.CharField(
+                        choices=[("sales_report", "Sales Report")],
+                        default="sales_report",
+                        help_text="Kind of report generated",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("queued", "Queued"),
+                            ("running", "Running"),
+                            ("completed", "Completed"),
+                            ("failed", "Failed"),
+                        ],
+                        default="queued",
+                        help_text="Current job status",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "progress",
+                    models.PositiveSmallIntegerField(
+                        default=0, help_text="Completion percentage (0-100)"
+                    ),
+                ),
+                (
+                    "task_id",
+                    models.CharField(
+                        blank=True, help_text="Celery task ID", max_length=255
+                    ),
+                ),
+                (
+                    "error_message",
+                    models.TextField(
+                        blank=True, help_text="Error message if generation failed"
+                    ),
+                ),
+                (
+                    "result",
+                    models.BinaryField(
+                        blank=True, help_text="Compressed report result", null=True
+                    ),
+                ),
+                (
+                    "result_size",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Uncompressed result size in bytes"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "report",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Report filled in by this job",
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="jobs",
+                        to="reports.salesreport",
+                    ),
+                ),
+                (
+                    "requested_by",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="User who requested this job",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="report_jobs",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "schedule",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Schedule that enqueued this job",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="jobs",
+                        to="reports.reportschedule",
+                    ),
+                ),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        help_text="Tenant this record belongs to",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="%(class)s_set",
+                        to="tenants.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Report Job",
+                "verbose_name_plural": "Report Jobs",
+                "db_table": "report_jobs",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["tenant", "status", "created_at"],
+                        name="report_jobs_tenant__be8ee8_idx",
+                    ),
+                    models.Index(
+                        fields=["report"], name="report_jobs_report__cd9789_idx"
+                    ),
+                    models.Index(
+                        fields=["requested_by"], name="report_jobs_request_f38415_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:12
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def drop_stale_rollups(apps, schema_editor):
+    """
+    Rows built before item_total existed would report a zero average
+    ticket price; drop them so reports read raw sales until
+    backfill_sales_rollups rebuilds them.
+    """
+    SalesRollup = apps.get_model("reports", "SalesRollup")
+    SalesRollup.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reports", "0003_reportjob"),
+        ("zones", "0005_zone_map_color"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="salesrollup",
+            name="item_total",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=Decimal("0.00"),
+                help_text="Sum of the transaction items' total prices",
+                max_digits=14,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="salesrollup",
+            name="zone",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Zone sold (null for transactions without items)",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="sales_rollups",
+                to="zones.zone",
+            ),
+        ),
+        migrations.RunPython(drop_stale_rollups, migrations.RunPython.noop),
+    ]
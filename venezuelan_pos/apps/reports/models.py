@@ -3,6 +3,7 @@ from decimal import Decimal
 from django.db import models
 from django.core.exceptions import ValidationError
 from django.utils import timezone
+from django.utils.functional import cached_property
 from django.db.models import Sum, Count, Avg, Q, F
 from venezuelan_pos.apps.tenants.models import TenantAwareModel
 from venezuelan_pos.apps.events.models import Event
@@ -17,42 +18,27 @@ class SalesReportManager(models.Manager):
         """
         Create a new sales report with calculated data.
         """
-        from venezuelan_pos.apps.sales.models import Transaction, TransactionItem
+        from .rollups import SalesRollupService
         
         # Default filters
         if filters is None:
             filters = {}
         
-        # Base queryset for transactions
-        transactions_qs = Transaction.objects.filter(
-            tenant=tenant,
-            status=Transaction.Status.COMPLETED
-        )
-        
-        # Apply filters
-        if filters.get('start_date'):
-            transactions_qs = transactions_qs.filter(completed_at__gte=filters['start_date'])
-        if filters.get('end_date'):
-            transactions_qs = transactions_qs.filter(completed_at__lte=filters['end_date'])
-        if filters.get('event_id'):
-            transactions_qs = transactions_qs.filter(event_id=filters['event_id'])
-        if filters.get('zone_id'):
-            transactions_qs = transactions_qs.filter(items__zone_id=filters['zone_id'])
-        if filters.get('operator_id'):
-            transactions_qs = transactions_qs.filter(created_by_id=filters['operator_id'])
-        
-        # Calculate aggregated data
-        aggregated_data = transactions_qs.aggregate(
-            total_transactions=Count('id'),
-            total_revenue=Sum('total_amount'),
-            total_tickets=Sum('items__quantity'),
-            average_ticket_price=Avg('total_amount')
+        # Aggregate hourly sales rollups matching the filters
+        totals = SalesRollupService.totals(
+            SalesRollupService.get_facts(tenant, filters),
+            SalesRollupService.get_live_facts(tenant, filters)
         )
         
-        # Handle None values
-        for key, value in aggregated_data.items():
-            if value is None:
-                aggregated_data[key] = 0 if 'total_' in key or 'average_' in key else 0
+        aggregated_data = {
+            'total_transactions': totals['transaction_count'],
+            'total_revenue': totals['revenue'],
+            'total_tickets': totals['tickets'],
+            'average_ticket_price': (
+                totals['revenue'] / totals['transaction_count']
+                if totals['transaction_count'] else Decimal('0.00')
+            ),
+        }
         
         # Create report
         report = self.create(
@@ -258,6 +244,21 @@ class SalesReport(TenantAwareModel):
         self.completed_at = timezone.now()
         self.save(update_fields=['status', 'completed_at'])
     
+    @cached_property
+    def full_detailed_data(self):
+        """
+        Detailed report data including breakdowns. Reports generated by a
+        background job store only their base statistics and the job id;
+        the breakdowns are read from the job's compressed result.
+        """
+        job_id = (self.detailed_data or {}).get('result_job_id')
+        if job_id:
+            job = ReportJob.objects.all_tenants().filter(id=job_id).only('result').first()
+            result = job.get_result() if job is not None else None
+            if result is not None:
+                return result
+        return self.detailed_data
+    
     def mark_failed(self):
         """Mark report as failed."""
         self.status = self.Status.FAILED
@@ -678,28 +679,241 @@ class ReportSchedule(TenantAwareModel):
             return self.next_run + timedelta(days=1)
     
     def execute(self):
-        """Execute the scheduled report generation."""
-        # This would be called by a Celery task
+        """
+        Enqueue the scheduled report and advance the schedule.
+        Returns the report, which a Celery worker fills in.
+        """
+        from .jobs import ReportJobService
+        
         try:
-            # Generate the report
-            report = SalesReport.objects.create_sales_report(
-                tenant=self.tenant,
-                report_type=self.report_type,
-                filters=self.report_filters,
-                name=f"{self.name} - {timezone.now().strftime('%Y-%m-%d')}",
-                generated_by=self.created_by
-            )
-            
-            # Update schedule
-            self.last_run = timezone.now()
-            self.next_run = self.calculate_next_run()
-            self.save(update_fields=['last_run', 'next_run'])
-            
-            return report
+            return ReportJobService.enqueue_schedule(self).report
             
         except Exception as e:
             # Log error but don't fail the schedule
             import logging
             logger = logging.getLogger(__name__)
             logger.error(f"Failed to execute scheduled report {self.id}: {e}")
-            return None
\ No newline at end of file
+            return None
+
+
+class SalesRollup(TenantAwareModel):
+    """
+    Hourly sales fact row keyed by tenant, event, zone and payment method.
+    Maintained from completed transactions by the rollup service; reports
+    read these instead of raw transactions and items.
+    
+    A transaction is attributed to the payment method that paid most of it
+    and is counted once, under the first of its zones, so transaction
+    counts add up across zones. Money measures add up to the transaction
+    totals, split across zones in proportion to the zones' item totals.
+    Transactions without items are kept under a null zone.
+    """
+    
+    id = models.BigAutoField(primary_key=True)
+    
+    # Dimensions
+    bucket_start = models.DateTimeField(
+        help_text="Start of the hour the sales were completed in"
+    )
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='sales_rollups',
+        help_text="Event sold"
+    )
+    zone = models.ForeignKey(
+        Zone,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='sales_rollups',
+        help_text="Zone sold (null for transactions without items)"
+    )
+    payment_method = models.ForeignKey(
+        'payments.PaymentMethod',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='sales_rollups',
+        help_text="Payment method (null when no completed payment is recorded)"
+    )
+    
+    # Measures
+    tickets = models.PositiveIntegerField(
+        default=0,
+        help_text="Tickets sold"
+    )
+    item_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Transaction items sold"
+    )
+    item_total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text="Sum of the transaction items' total prices"
+    )
+    transaction_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Completed transactions"
+    )
+    subtotal = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text="Revenue before taxes"
+    )
+    tax = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text="Tax collected"
+    )
+    revenue = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text="Revenue including taxes"
+    )
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'sales_rollups_hourly'
+        verbose_name = 'Sales Rollup'
+        verbose_name_plural = 'Sales Rollups'
+        ordering = ['bucket_start']
+        indexes = [
+            models.Index(fields=['tenant', 'bucket_start']),
+            models.Index(fields=['event', 'bucket_start']),
+            models.Index(fields=['zone', 'bucket_start']),
+        ]
+    
+    def __str__(self):
+        return f"Sales {self.bucket_start:%Y-%m-%d %H:00} - {self.zone_id}"
+
+
+class ReportJob(TenantAwareModel):
+    """
+    Background report generation job.
+    Requests enqueue a job and poll it; a Celery worker generates the report
+    section by section, recording progress, and stores the result compressed.
+    """
+    
+    class JobType(models.TextChoices):
+        SALES_REPORT = 'sales_report', 'Sales Report'
+    
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Queued'
+        RUNNING = 'running', 'Running'
+        COMPLETED = 'completed', 'Completed'
+        FAILED = 'failed', 'Failed'
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    
+    job_type = models.CharField(
+        max_length=20,
+        choices=JobType.choices,
+        default=JobType.SALES_REPORT,
+        help_text="Kind of report generated"
+    )
+    report = models.ForeignKey(
+        SalesReport,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='jobs',
+        help_text="Report filled in by this job"
+    )
+    schedule = models.ForeignKey(
+        ReportSchedule,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='jobs',
+        help_text="Schedule that enqueued this job"
+    )
+    
+    # Progress
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.QUEUED,
+        help_text="Current job status"
+    )
+    progress = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Completion percentage (0-100)"
+    )
+    task_id = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="Celery task ID"
+    )
+    error_message = models.TextField(
+        blank=True,
+        help_text="Error message if generation failed"
+    )
+    
+    # Result (zlib-compressed JSON)
+    result = models.BinaryField(
+        null=True,
+        blank=True,
+        help_text="Compressed report result"
+    )
+    result_size = models.PositiveIntegerField(
+        default=0,
+        help_text="Uncompressed result size in bytes"
+    )
+    
+    requested_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='report_jobs',
+        help_text="User who requested this job"
+    )
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'report_jobs'
+        verbose_name = 'Report Job'
+        verbose_name_plural = 'Report Jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['tenant', 'status', 'created_at']),
+            models.Index(fields=['report']),
+            models.Index(fields=['requested_by']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_job_type_display()} job {self.id} ({self.status})"
+    
+    @property
+    def is_finished(self):
+        """Check if the job is no longer queued or running."""
+        return self.status in (self.Status.COMPLETED, self.Status.FAILED)
+    
+    def set_result(self, data):
+        """Serialize and compress a result."""
+        import json
+        import zlib
+        from django.core.serializers.json import DjangoJSONEncoder
+        
+        payload = json.dumps(data, cls=DjangoJSONEncoder).encode('utf-8')
+        self.result = zlib.compress(payload, 6)
+        self.result_size = len(payload)
+    
+    def get_result(self):
+        """Decompress and deserialize the stored result, or None."""
+        import json
+        import zlib
+        
+        if self.result is None:
+            return None
+        return json.loads(zlib.decompress(bytes(self.result)).decode('utf-8'))
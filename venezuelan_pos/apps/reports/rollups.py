@@ -0,0 +1,473 @@
+"""
+Hourly sales rollups.
+Completed sales mark their (tenant, hour) bucket dirty; a periodic task
+rebuilds dirty buckets from raw transactions with a couple of grouped
+queries, and a backfill rebuilds whole periods. Report generators read
+the hourly fact rows, so their cost scales with time buckets rather than
+with the number of raw sales rows; partial hours at the ends of a date
+range, and tenants without rollups yet, are read from raw sales.
+"""
+
+import logging
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pytz
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from redis.exceptions import ConnectionError, TimeoutError
+
+from .models import SalesRollup
+
+logger = logging.getLogger(__name__)
+
+BUCKET = timedelta(hours=1)
+
+MEASURES = ['tickets', 'item_count', 'item_total', 'transaction_count', 'subtotal', 'tax', 'revenue']
+
+MONEY_MEASURES = {'item_total', 'subtotal', 'tax', 'revenue'}
+
+
+def bucket_start(value: datetime) -> datetime:
+    """Start of the UTC hour a datetime falls in."""
+    return value.astimezone(pytz.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _zero(measure: str):
+    """Empty value of a measure."""
+    return Decimal('0.00') if measure in MONEY_MEASURES else 0
+
+
+def _as_datetime(value) -> datetime:
+    """Coerce a report date filter (datetime, date or ISO string) to an aware datetime."""
+    if isinstance(value, str):
+        value = parse_datetime(value) or parse_date(value)
+        if value is None:
+            raise ValidationError("Invalid report date filter")
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, time.min)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def _allocate(amount: Decimal, weights: List[Decimal]) -> List[Decimal]:
+    """
+    Split an amount across weights in proportion, to the cent.
+    The rounding remainder goes to the last share so the shares add up
+    to the amount; without weights the amount is split evenly.
+    """
+    total = sum(weights)
+    if not total:
+        weights = [Decimal('1')] * len(weights)
+        total = Decimal(len(weights))
+
+    shares = [
+        (amount * weight / total).quantize(Decimal('0.01'))
+        for weight in weights[:-1]
+    ]
+    shares.append(amount - sum(shares, Decimal('0.00')))
+    return shares
+
+
+class SalesRollupService:
+    """
+    Maintains and reads hourly sales fact rows.
+    Dirty buckets are queued in a Redis set; without Redis each one is
+    rebuilt in its own Celery task after the sale commits.
+    """
+
+    DIRTY_KEY = "sales_rollup:dirty"
+
+    # Dirty buckets popped per Redis round trip
+    BATCH_SIZE = 200
+
+    # Period rebuilt per DB transaction during backfills
+    BACKFILL_WINDOW = timedelta(days=1)
+
+    def __init__(self):
+        """Initialize the rollup service."""
+        self._redis_client = None
+
+        # Try to get direct Redis client for set operations
+        try:
+            from django_redis import get_redis_connection
+            self._redis_client = get_redis_connection('default')
+        except Exception as e:
+            logger.warning(f"Could not get Redis client: {e}")
+
+    # Dirty buckets
+
+    def mark_dirty(self, tenant_id, completed_at: Optional[datetime]) -> None:
+        """
+        Queue the bucket of a completed sale for rebuilding once the
+        surrounding DB transaction commits.
+        """
+        if completed_at is None:
+            return
+
+        start = bucket_start(completed_at)
+
+        if self._redis_client is None:
+            transaction.on_commit(lambda: self._enqueue(tenant_id, start))
+            return
+
+        member = f"{tenant_id}|{start.isoformat()}"
+        transaction.on_commit(lambda: self._push(member, tenant_id, start))
+
+    def _push(self, member: str, tenant_id, start: datetime) -> None:
+        """Add a bucket to the dirty set, rebuilding it in a task on failure."""
+        try:
+            self._redis_client.sadd(self.DIRTY_KEY, member)
+        except (ConnectionError, TimeoutError) as e:
+            logger.warning(f"Redis unavailable, rebuilding sales rollup in a task: {e}")
+            self._enqueue(tenant_id, start)
+
+    def _enqueue(self, tenant_id, start: datetime) -> None:
+        """Rebuild a single bucket in a Celery task, or directly if Celery is unavailable."""
+        from .tasks import refresh_sales_rollup_bucket
+
+        try:
+            refresh_sales_rollup_bucket.delay(str(tenant_id), start.isoformat())
+        except Exception as e:
+            logger.warning(f"Could not enqueue sales rollup rebuild, rebuilding directly: {e}")
+            self.refresh_window(tenant_id, start, start + BUCKET)
+
+    def refresh_dirty(self, max_buckets: Optional[int] = None) -> int:
+        """
+        Rebuild queued buckets.
+        Returns the number of buckets rebuilt.
+        """
+        if self._redis_client is None:
+            return 0
+
+        refreshed = 0
+        while max_buckets is None or refreshed < max_buckets:
+            size = self.BATCH_SIZE
+            if max_buckets is not None:
+                size = min(size, max_buckets - refreshed)
+
+            try:
+                members = self._redis_client.spop(self.DIRTY_KEY, size)
+            except (ConnectionError, TimeoutError) as e:
+                logger.warning(f"Could not read dirty sales rollups: {e}")
+                break
+
+            if not members:
+                break
+
+            for index, member in enumerate(members):
+                if isinstance(member, bytes):
+                    member = member.decode('utf-8')
+                tenant_id, start = member.split('|', 1)
+                start = datetime.fromisoformat(start)
+
+                try:
+                    self.refresh_window(tenant_id, start, start + BUCKET)
+                except Exception:
+                    # Requeue what was not rebuilt so the next run retries it
+                    self._redis_client.sadd(self.DIRTY_KEY, *members[index:])
+                    raise
+
+            refreshed += len(members)
+
+        return refreshed
+
+    # Building
+
+    @staticmethod
+    def compute_facts(tenant_id, start: datetime, end: datetime) -> List[SalesRollup]:
+        """Build the fact rows of a tenant's sales completed in [start, end)."""
+        return SalesRollupService._build_facts(tenant_id, [(start, end)])
+
+    @staticmethod
+    def _build_facts(tenant_id, windows: List[Tuple], event_id=None) -> List[SalesRollup]:
+        """
+        Build the fact rows of a tenant's sales completed in any of the
+        (start, end) windows; either bound may be None for an open end.
+        Transactions without items are kept under a null zone.
+        """
+        from venezuelan_pos.apps.payments.models import Payment
+        from venezuelan_pos.apps.sales.models import Transaction
+
+        completed = Q()
+        for start, end in windows:
+            window = Q()
+            if start is not None:
+                window &= Q(completed_at__gte=start)
+            if end is not None:
+                window &= Q(completed_at__lt=end)
+            completed |= window
+
+        sales = Transaction.objects.filter(
+            completed,
+            tenant_id=tenant_id,
+            status=Transaction.Status.COMPLETED
+        )
+        if event_id:
+            sales = sales.filter(event_id=event_id)
+
+        rows_qs = sales.values(
+            'id', 'event_id', 'completed_at', 'items__zone_id',
+            'subtotal_amount', 'tax_amount', 'total_amount'
+        ).annotate(
+            tickets=Sum('items__quantity'),
+            item_count=Count('items__id'),
+            weight=Sum('items__total_price')
+        ).order_by('id', 'items__zone_id')
+
+        # Payment method that paid most of each transaction
+        methods: Dict = {}
+        payments = Payment.objects.filter(
+            tenant_id=tenant_id,
+            status=Payment.Status.COMPLETED,
+            transaction__in=sales
+        ).values('transaction_id', 'payment_method_id').annotate(amount=Sum('amount')).order_by()
+
+        for row in payments:
+            current = methods.get(row['transaction_id'])
+            if current is None or row['amount'] > current[1]:
+                methods[row['transaction_id']] = (row['payment_method_id'], row['amount'])
+
+        facts: Dict = {}
+
+        def add(rows):
+            # Money measures come from the transaction totals; its items
+            # only split them across zones
+            first = rows[0]
+            method = methods.get(first['id'])
+            weights = [row['weight'] or Decimal('0.00') for row in rows]
+            amounts = {
+                measure: _allocate(first[field] or Decimal('0.00'), weights)
+                for measure, field in [
+                    ('subtotal', 'subtotal_amount'), ('tax', 'tax_amount'), ('revenue', 'total_amount')
+                ]
+            }
+
+            for index, row in enumerate(rows):
+                key = (
+                    bucket_start(first['completed_at']),
+                    first['event_id'],
+                    row['items__zone_id'],
+                    method[0] if method else None,
+                )
+                fact = facts.get(key)
+                if fact is None:
+                    fact = facts[key] = SalesRollup(
+                        tenant_id=tenant_id,
+                        bucket_start=key[0],
+                        event_id=key[1],
+                        zone_id=key[2],
+                        payment_method_id=key[3]
+                    )
+
+                fact.tickets += row['tickets'] or 0
+                fact.item_count += row['item_count']
+                fact.item_total += row['weight'] or Decimal('0.00')
+                fact.subtotal += amounts['subtotal'][index]
+                fact.tax += amounts['tax'][index]
+                fact.revenue += amounts['revenue'][index]
+
+                # Count each transaction once, under its first zone
+                if index == 0:
+                    fact.transaction_count += 1
+
+        rows = []
+        for row in rows_qs.iterator(chunk_size=2000):
+            if rows and row['id'] != rows[0]['id']:
+                add(rows)
+                rows = []
+            rows.append(row)
+        if rows:
+            add(rows)
+
+        return list(facts.values())
+
+    def refresh_window(self, tenant_id, start: datetime, end: datetime) -> int:
+        """
+        Replace a tenant's fact rows in [start, end) with freshly computed ones.
+        Returns the number of fact rows written.
+        """
+        from venezuelan_pos.apps.tenants.models import Tenant
+
+        with transaction.atomic():
+            # Serialize rebuilds of the same tenant
+            list(Tenant.objects.select_for_update().filter(id=tenant_id).values_list('id', flat=True))
+
+            SalesRollup.objects.all_tenants().filter(
+                tenant_id=tenant_id,
+                bucket_start__gte=start,
+                bucket_start__lt=end
+            ).delete()
+
+            facts = self.compute_facts(tenant_id, start, end)
+            SalesRollup.objects.bulk_create(facts, batch_size=1000)
+
+        return len(facts)
+
+    def backfill(self, tenant=None, start: datetime = None, end: datetime = None) -> Dict[str, int]:
+        """
+        Rebuild fact rows for a period, one BACKFILL_WINDOW at a time.
+        Defaults to everything from the first completed sale until now.
+
+        Returns:
+            dict: Statistics about the backfill
+        """
+        from venezuelan_pos.apps.sales.models import Transaction
+        from venezuelan_pos.apps.tenants.models import Tenant
+
+        tenants = [tenant] if tenant is not None else list(Tenant.objects.all())
+        stats = {'tenants': 0, 'windows': 0, 'facts': 0}
+
+        for current_tenant in tenants:
+            period_start = start
+            if period_start is None:
+                first = Transaction.objects.filter(
+                    tenant=current_tenant,
+                    status=Transaction.Status.COMPLETED,
+                    completed_at__isnull=False
+                ).order_by('completed_at').values_list('completed_at', flat=True).first()
+                if first is None:
+                    continue
+                period_start = first
+
+            window_start = bucket_start(period_start)
+            period_end = end or timezone.now()
+
+            while window_start <= period_end:
+                window_end = window_start + self.BACKFILL_WINDOW
+                stats['facts'] += self.refresh_window(current_tenant.id, window_start, window_end)
+                stats['windows'] += 1
+                window_start = window_end
+
+            stats['tenants'] += 1
+
+        return stats
+
+    # Reading
+
+    @staticmethod
+    def _date_range(filters: Dict) -> Tuple:
+        """
+        Resolve report date filters to (start, end, first, last): the
+        half-open range [start, end) of completion times (end_date is
+        inclusive) and the bounds [first, last) of the whole hours inside
+        it. Unfiltered ends are None.
+        """
+        start = end = first = last = None
+        if filters.get('start_date'):
+            start = _as_datetime(filters['start_date'])
+            first = bucket_start(start)
+            if first < start:
+                first += BUCKET
+        if filters.get('end_date'):
+            end = _as_datetime(filters['end_date']) + timedelta(microseconds=1)
+            last = bucket_start(end)
+        return start, end, first, last
+
+    @staticmethod
+    def get_facts(tenant, filters: Optional[Dict] = None):
+        """
+        Fact rows of a tenant matching report filters.
+        Only hours that lie wholly inside the date filters are included;
+        get_live_facts covers the partial hours at either end. Sales show
+        up here once their hour is rebuilt from the dirty set.
+        """
+        filters = filters or {}
+        if filters.get('operator_id'):
+            raise ValidationError("Sales are not attributed to operators")
+
+        start, end, first, last = SalesRollupService._date_range(filters)
+        facts = SalesRollup.objects.all_tenants().filter(tenant=tenant)
+
+        if first is not None:
+            facts = facts.filter(bucket_start__gte=first)
+        if last is not None:
+            facts = facts.filter(bucket_start__lt=last)
+        if filters.get('event_id'):
+            facts = facts.filter(event_id=filters['event_id'])
+        if filters.get('zone_id'):
+            facts = facts.filter(zone_id=filters['zone_id'])
+
+        return facts
+
+    @staticmethod
+    def get_live_facts(tenant, filters: Optional[Dict] = None) -> List[SalesRollup]:
+        """
+        Unsaved fact rows built from raw sales for what get_facts leaves
+        out: the partial hours at either end of the date filters, or the
+        whole range while the tenant has no rollups yet (before a backfill).
+        """
+        filters = filters or {}
+        start, end, first, last = SalesRollupService._date_range(filters)
+
+        if not SalesRollup.objects.all_tenants().filter(tenant=tenant).exists():
+            windows = [(start, end)]
+        elif first is not None and last is not None and first > last:
+            # The range lies within a single hour
+            windows = [(start, end)]
+        else:
+            windows = []
+            if start is not None and start < first:
+                windows.append((start, first))
+            if end is not None and last < end:
+                windows.append((last, end))
+
+        if not windows:
+            return []
+
+        facts = SalesRollupService._build_facts(tenant.id, windows, event_id=filters.get('event_id'))
+        if filters.get('zone_id'):
+            facts = [fact for fact in facts if str(fact.zone_id) == str(filters['zone_id'])]
+        return facts
+
+    @staticmethod
+    def totals(facts, live: Iterable[SalesRollup] = ()) -> Dict:
+        """Sum all measures of a fact queryset and of unsaved fact rows."""
+        totals = facts.aggregate(**{measure: Sum(measure) for measure in MEASURES})
+        for measure in MEASURES:
+            if totals[measure] is None:
+                totals[measure] = _zero(measure)
+            totals[measure] += sum((getattr(fact, measure) for fact in live), _zero(measure))
+        return totals
+
+    @staticmethod
+    def group(facts, live: Iterable[SalesRollup], dimension: str) -> Dict:
+        """
+        Sum all measures of a fact queryset and of unsaved fact rows per
+        value of a dimension field, or per local date for 'day'.
+        """
+        if dimension == 'day':
+            rows = facts.annotate(
+                day=TruncDate('bucket_start', tzinfo=timezone.get_current_timezone())
+            ).values('day')
+        else:
+            rows = facts.values(dimension)
+
+        groups = {}
+        for row in rows.annotate(**{measure: Sum(measure) for measure in MEASURES}).order_by():
+            groups[row[dimension]] = {
+                measure: row[measure] if row[measure] is not None else _zero(measure)
+                for measure in MEASURES
+            }
+
+        for fact in live:
+            if dimension == 'day':
+                key = timezone.localtime(fact.bucket_start).date()
+            else:
+                key = getattr(fact, dimension)
+            sums = groups.setdefault(key, {measure: _zero(measure) for measure in MEASURES})
+            for measure in MEASURES:
+                sums[measure] += getattr(fact, measure)
+
+        return groups
+
+
+# Global sales rollup instance
+sales_rollups = SalesRollupService()
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from django.utils import timezone
-from .models import SalesReport, OccupancyAnalysis, ReportSchedule
+from .models import SalesReport, OccupancyAnalysis, ReportSchedule, ReportJob
 
 
 class SalesReportSerializer(serializers.ModelSerializer):
@@ -10,6 +10,7 @@ class SalesReportSerializer(serializers.ModelSerializer):
     is_completed = serializers.ReadOnlyField()
     is_failed = serializers.ReadOnlyField()
     generated_by_name = serializers.CharField(source='generated_by.get_full_name', read_only=True)
+    detailed_data = serializers.SerializerMethodField()
     
     class Meta:
         model = SalesReport
@@ -49,6 +50,12 @@ class SalesReportSerializer(serializers.ModelSerializer):
             'updated_at'
         ]
     
+    def get_detailed_data(self, obj):
+        """Full detailed data of a single report; lists show the stored summary."""
+        if isinstance(self.parent, serializers.ListSerializer):
+            return obj.detailed_data
+        return obj.full_detailed_data
+    
     def validate(self, data):
         """Validate report data."""
         if data.get('period_start') and data.get('period_end'):
@@ -99,7 +106,9 @@ class SalesReportCreateSerializer(serializers.Serializer):
         return data
     
     def create(self, validated_data):
-        """Create a new sales report."""
+        """Enqueue a job generating the sales report; returns the job."""
+        from .jobs import ReportJobService
+        
         # Extract filter data
         filters = {}
         filter_fields = ['start_date', 'end_date', 'event_id', 'zone_id', 'operator_id']
@@ -110,15 +119,41 @@ class SalesReportCreateSerializer(serializers.Serializer):
         # Get tenant from context
         tenant = self.context['request'].user.tenant
         
-        # Create report
-        report = SalesReport.objects.create_sales_report(
+        return ReportJobService.enqueue_sales_report(
             tenant=tenant,
             filters=filters,
-            generated_by=self.context['request'].user,
+            requested_by=self.context['request'].user,
+            period_start=filters.get('start_date'),
+            period_end=filters.get('end_date'),
             **validated_data
         )
-        
-        return report
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    """Serializer for ReportJob model."""
+    
+    is_finished = serializers.ReadOnlyField()
+    report_name = serializers.CharField(source='report.name', read_only=True)
+    
+    class Meta:
+        model = ReportJob
+        fields = [
+            'id',
+            'job_type',
+            'report',
+            'report_name',
+            'schedule',
+            'status',
+            'is_finished',
+            'progress',
+            'error_message',
+            'result_size',
+            'requested_by',
+            'created_at',
+            'started_at',
+            'finished_at'
+        ]
+        read_only_fields = fields
 
 
 class OccupancyAnalysisSerializer(serializers.ModelSerializer):
@@ -333,6 +368,46 @@ class ReportExportSerializer(serializers.Serializer):
         return value
 
 
+class DataExportSerializer(serializers.Serializer):
+    """Serializer for streaming data export requests."""
+    
+    file_format = serializers.ChoiceField(
+        choices=[
+            ('csv', 'CSV'),
+            ('json', 'JSON'),
+            ('xlsx', 'XLSX')
+        ],
+        default='csv'
+    )
+    columns = serializers.CharField(
+        required=False,
+        help_text="Comma-separated columns to export (default: the dataset's default columns)"
+    )
+    start_date = serializers.DateTimeField(required=False)
+    end_date = serializers.DateTimeField(required=False)
+    event_id = serializers.UUIDField(required=False)
+    status = serializers.CharField(required=False, max_length=20)
+    
+    def validate_columns(self, value):
+        """Split and validate the requested columns."""
+        dataset = self.context['dataset']
+        columns = [column.strip() for column in value.split(',') if column.strip()]
+        try:
+            return dataset.resolve_columns(columns)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+    
+    def validate(self, data):
+        """Validate export request data."""
+        if data.get('start_date') and data.get('end_date'):
+            if data['start_date'] >= data['end_date']:
+                raise serializers.ValidationError({
+                    'end_date': 'End date must be after start date'
+                })
+        
+        return data
+
+
 class HeatMapDataSerializer(serializers.Serializer):
     """Serializer for heat map data."""
     
@@ -1,186 +1,235 @@
+import hashlib
+import logging
+import statistics
+import uuid
+from bisect import bisect_left, bisect_right
 from decimal import Decimal
-from django.db.models import Sum, Count, Avg, Q, F
+from django.core.cache import cache
+from django.db.models import Sum, Count, Avg, Max, Q, F
 from django.utils import timezone
 from datetime import timedelta
+from venezuelan_pos.core.db_router import with_reporting_db
+from venezuelan_pos.core.query_budget import query_budget
 from .models import SalesReport, OccupancyAnalysis
 
+logger = logging.getLogger(__name__)
+
+# Heat maps are invalidated on every sale; the timeout only bounds staleness
+# when a sale bypasses the model signals (e.g. queryset updates)
+HEAT_MAP_CACHE_PREFIX = "heat_map"
+HEAT_MAP_CACHE_TIMEOUT = 3600
+
+# Seat statuses are cached per zone apart from the sales layer, dropped on
+# seat and reservation saves and kept only briefly, since bulk reservation
+# expiry updates seats without signals
+HEAT_MAP_STATUS_CACHE_PREFIX = "heat_map_status"
+HEAT_MAP_STATUS_CACHE_TIMEOUT = 30
+
+# Comparative analyses are keyed by a fingerprint of the zone set and
+# invalidated on every sale of the zones' tenant
+COMPARATIVE_ANALYSIS_CACHE_PREFIX = "comparative_analysis"
+COMPARATIVE_ANALYSIS_CACHE_TIMEOUT = 3600
+
+# Metrics ranked across the zones of a comparative analysis
+COMPARATIVE_METRICS = (
+    'fill_rate', 'sales_velocity', 'revenue_velocity', 'avg_ticket_price',
+    'sales_growth', 'revenue_growth', 'revenue_per_capacity',
+)
+
+# Sections of a sales report, in generation order
+SALES_REPORT_SECTIONS = ('base_statistics', 'by_event', 'by_zone', 'by_day', 'by_payment_method')
+
 
 class ReportService:
     """Service class for report generation and analytics."""
     
     @staticmethod
+    @with_reporting_db
+    @query_budget(max_queries=12)
     def generate_sales_report_data(tenant, filters=None):
         """
         Generate comprehensive sales report data with detailed breakdowns.
+        Reads hourly sales rollups, so the cost grows with the number of
+        hours covered rather than with the number of sales; partial hours
+        at the ends of the date range are read from raw sales.
+        """
+        detailed_data = {
+            'base_statistics': {},
+            'breakdowns': {}
+        }
+        
+        for section, data in ReportService.iter_sales_report_sections(tenant, filters):
+            if section == 'base_statistics':
+                detailed_data[section] = data
+            else:
+                detailed_data['breakdowns'][section] = data
+        
+        return detailed_data
+    
+    @staticmethod
+    def iter_sales_report_sections(tenant, filters=None):
+        """
+        Yield (section, data) for each section of a sales report in
+        SALES_REPORT_SECTIONS order, computing one section at a time.
+        Breakdowns made redundant by the filters are skipped.
         """
-        from venezuelan_pos.apps.sales.models import Transaction, TransactionItem
         from venezuelan_pos.apps.events.models import Event
+        from venezuelan_pos.apps.payments.models import PaymentMethod
         from venezuelan_pos.apps.zones.models import Zone
+        from .rollups import SalesRollupService, _as_datetime
         
         if filters is None:
             filters = {}
         
-        # Base queryset for completed transactions
-        transactions_qs = Transaction.objects.filter(
-            tenant=tenant,
-            status=Transaction.Status.COMPLETED
-        )
-        
-        # Apply filters
-        if filters.get('start_date'):
-            transactions_qs = transactions_qs.filter(completed_at__gte=filters['start_date'])
-        if filters.get('end_date'):
-            transactions_qs = transactions_qs.filter(completed_at__lte=filters['end_date'])
-        if filters.get('event_id'):
-            transactions_qs = transactions_qs.filter(event_id=filters['event_id'])
-        if filters.get('operator_id'):
-            transactions_qs = transactions_qs.filter(created_by_id=filters['operator_id'])
+        facts = SalesRollupService.get_facts(tenant, filters)
+        live = SalesRollupService.get_live_facts(tenant, filters)
+        totals = SalesRollupService.totals(facts, live)
         
         # Base aggregations
-        base_stats = transactions_qs.aggregate(
-            total_transactions=Count('id'),
-            total_revenue=Sum('total_amount'),
-            total_subtotal=Sum('subtotal_amount'),
-            total_tax=Sum('tax_amount'),
-            average_transaction_value=Avg('total_amount')
-        )
-        
-        # Handle None values
-        for key, value in base_stats.items():
-            if value is None:
-                base_stats[key] = 0 if 'total_' in key or 'average_' in key else 0
-        
-        # Get total tickets sold
-        items_qs = TransactionItem.objects.filter(
-            transaction__in=transactions_qs
-        )
-        
-        if filters.get('zone_id'):
-            items_qs = items_qs.filter(zone_id=filters['zone_id'])
-        
-        ticket_stats = items_qs.aggregate(
-            total_tickets=Sum('quantity'),
-            average_ticket_price=Avg('total_price')
-        )
-        
-        base_stats.update({
-            'total_tickets': ticket_stats['total_tickets'] or 0,
-            'average_ticket_price': ticket_stats['average_ticket_price'] or Decimal('0.00')
-        })
-        
-        # Detailed breakdowns
-        detailed_data = {
-            'base_statistics': base_stats,
-            'breakdowns': {}
+        transactions = totals['transaction_count']
+        base_stats = {
+            'total_transactions': transactions,
+            'total_revenue': totals['revenue'],
+            'total_subtotal': totals['subtotal'],
+            'total_tax': totals['tax'],
+            'average_transaction_value': totals['revenue'] / transactions if transactions else 0,
+            'total_tickets': totals['tickets'],
+            'average_ticket_price': (
+                totals['item_total'] / totals['item_count'] if totals['item_count'] else Decimal('0.00')
+            ),
         }
+        yield 'base_statistics', base_stats
         
         # Event breakdown
         if not filters.get('event_id'):  # Only if not filtering by specific event
-            event_breakdown = []
-            events = Event.objects.filter(
-                tenant=tenant,
-                transactions__in=transactions_qs
-            ).distinct()
-            
-            for event in events:
-                event_transactions = transactions_qs.filter(event=event)
-                event_stats = event_transactions.aggregate(
-                    transactions=Count('id'),
-                    revenue=Sum('total_amount'),
-                    tickets=Sum('items__quantity')
-                )
-                
-                event_breakdown.append({
-                    'event_id': str(event.id),
-                    'event_name': event.name,
-                    'transactions': event_stats['transactions'] or 0,
-                    'revenue': float(event_stats['revenue'] or 0),
-                    'tickets': event_stats['tickets'] or 0
-                })
+            groups = SalesRollupService.group(facts, live, 'event_id')
+            event_names = dict(
+                Event.objects.filter(id__in=list(groups)).values_list('id', 'name')
+            )
             
-            detailed_data['breakdowns']['by_event'] = event_breakdown
+            yield 'by_event', [
+                {
+                    'event_id': str(event_id),
+                    'event_name': event_names.get(event_id, ''),
+                    'transactions': sums['transaction_count'],
+                    'revenue': float(sums['revenue']),
+                    'tickets': sums['tickets']
+                }
+                for event_id, sums in groups.items()
+            ]
         
         # Zone breakdown
         if not filters.get('zone_id'):  # Only if not filtering by specific zone
-            zone_breakdown = []
+            groups = SalesRollupService.group(facts, live, 'zone_id')
             zones = Zone.objects.filter(
-                tenant=tenant,
-                transaction_items__transaction__in=transactions_qs
-            ).distinct()
+                id__in=[zone_id for zone_id in groups if zone_id]
+            ).select_related('event').in_bulk()
             
-            for zone in zones:
-                zone_items = items_qs.filter(zone=zone)
-                zone_stats = zone_items.aggregate(
-                    tickets=Sum('quantity'),
-                    revenue=Sum('total_price')
-                )
-                
+            zone_breakdown = []
+            for zone_id, sums in groups.items():
+                zone = zones.get(zone_id)
+                if zone is None:
+                    continue
+                tickets = sums['tickets']
                 zone_breakdown.append({
                     'zone_id': str(zone.id),
                     'zone_name': zone.name,
                     'event_name': zone.event.name,
-                    'tickets': zone_stats['tickets'] or 0,
-                    'revenue': float(zone_stats['revenue'] or 0),
+                    'tickets': tickets,
+                    'revenue': float(sums['revenue']),
                     'capacity': zone.capacity,
-                    'fill_rate': (zone_stats['tickets'] or 0) / zone.capacity * 100 if zone.capacity > 0 else 0
+                    'fill_rate': tickets / zone.capacity * 100 if zone.capacity > 0 else 0
                 })
             
-            detailed_data['breakdowns']['by_zone'] = zone_breakdown
+            yield 'by_zone', zone_breakdown
         
         # Daily breakdown (for date range reports)
         if filters.get('start_date') and filters.get('end_date'):
+            days = SalesRollupService.group(facts, live, 'day')
+            
             daily_breakdown = []
-            current_date = filters['start_date'].date()
-            end_date = filters['end_date'].date()
+            current_date = _as_datetime(filters['start_date']).date()
+            end_date = _as_datetime(filters['end_date']).date()
             
             while current_date <= end_date:
-                day_transactions = transactions_qs.filter(
-                    completed_at__date=current_date
-                )
-                day_stats = day_transactions.aggregate(
-                    transactions=Count('id'),
-                    revenue=Sum('total_amount'),
-                    tickets=Sum('items__quantity')
-                )
-                
+                day_stats = days.get(current_date, {})
                 daily_breakdown.append({
                     'date': current_date.isoformat(),
-                    'transactions': day_stats['transactions'] or 0,
-                    'revenue': float(day_stats['revenue'] or 0),
-                    'tickets': day_stats['tickets'] or 0
+                    'transactions': day_stats.get('transaction_count') or 0,
+                    'revenue': float(day_stats.get('revenue') or 0),
+                    'tickets': day_stats.get('tickets') or 0
                 })
-                
                 current_date += timedelta(days=1)
             
-            detailed_data['breakdowns']['by_day'] = daily_breakdown
+            yield 'by_day', daily_breakdown
         
         # Payment method breakdown
-        payment_breakdown = []
-        from venezuelan_pos.apps.payments.models import Payment
-        
-        payments = Payment.objects.filter(
-            transaction__in=transactions_qs,
-            status='completed'
-        ).values('payment_method__name').annotate(
-            count=Count('id'),
-            total_amount=Sum('amount')
+        groups = SalesRollupService.group(facts, live, 'payment_method_id')
+        method_names = dict(
+            PaymentMethod.objects.filter(
+                id__in=[method_id for method_id in groups if method_id]
+            ).values_list('id', 'name')
         )
         
-        for payment in payments:
-            payment_breakdown.append({
-                'method': payment['payment_method__name'] or 'Unknown',
-                'count': payment['count'],
-                'amount': float(payment['total_amount'] or 0)
-            })
-        
-        detailed_data['breakdowns']['by_payment_method'] = payment_breakdown
-        
-        return detailed_data
+        yield 'by_payment_method', [
+            {
+                'method': method_names.get(method_id) or 'Unknown',
+                'count': sums['transaction_count'],
+                'amount': float(sums['revenue'])
+            }
+            for method_id, sums in groups.items()
+        ]
+    
+    @staticmethod
+    def _heat_map_cache_key(zone_id, event_id=None):
+        """Cache key of a zone's heat map, optionally for a single event."""
+        return f"{HEAT_MAP_CACHE_PREFIX}:{zone_id}:{event_id or 'all'}"
     
     @staticmethod
+    def _heat_map_status_cache_key(zone_id):
+        """Cache key of a zone's seat statuses."""
+        return f"{HEAT_MAP_STATUS_CACHE_PREFIX}:{zone_id}"
+    
+    @staticmethod
+    def invalidate_heat_map_statuses(zone_ids):
+        """Drop cached seat statuses of the given zones."""
+        keys = {ReportService._heat_map_status_cache_key(zone_id) for zone_id in zone_ids if zone_id}
+        
+        if keys:
+            try:
+                cache.delete_many(list(keys))
+            except Exception as e:
+                logger.warning(f"Could not invalidate heat map statuses: {e}")
+    
+    @staticmethod
+    def invalidate_heat_maps(zone_event_pairs):
+        """
+        Drop cached heat maps of the given (zone_id, event_id) pairs, both the
+        per-event and the all-events variants.
+        """
+        keys = set()
+        for zone_id, event_id in zone_event_pairs:
+            keys.add(ReportService._heat_map_cache_key(zone_id))
+            if event_id:
+                keys.add(ReportService._heat_map_cache_key(zone_id, event_id))
+        
+        if keys:
+            try:
+                cache.delete_many(list(keys))
+            except Exception as e:
+                logger.warning(f"Could not invalidate heat maps: {e}")
+    
+    @staticmethod
+    @with_reporting_db
+    @query_budget(max_queries=3)
     def generate_occupancy_heat_map(zone, event=None):
         """
         Generate detailed heat map data for a numbered zone.
+        Sales are read with one grouped query per zone and joined against the
+        seat grid in memory; results stay cached until the next sale. Seat
+        statuses are cached separately for a short time and laid over the
+        grid on every call. Grid rows and seats are keyed by strings, as
+        they come back from the JSON cache.
         """
         from venezuelan_pos.apps.zones.models import Seat
         from venezuelan_pos.apps.sales.models import TransactionItem
@@ -190,18 +239,56 @@ class ReportService:
                 'error': 'Heat maps are only available for numbered zones'
             }
         
+        cache_key = ReportService._heat_map_cache_key(zone.id, event.id if event else None)
+        status_key = ReportService._heat_map_status_cache_key(zone.id)
+        try:
+            cached = cache.get_many([cache_key, status_key])
+        except Exception as e:
+            logger.warning(f"Could not read cached heat map: {e}")
+            cached = {}
+        
+        heat_map = cached.get(cache_key)
+        if heat_map is not None:
+            statuses = cached.get(status_key)
+            if statuses is None:
+                statuses = {}
+                for row_number, seat_number, status in Seat.objects.filter(zone=zone).values_list(
+                    'row_number', 'seat_number', 'status'
+                ):
+                    statuses.setdefault(str(row_number), {})[str(seat_number)] = status
+                ReportService._cache_heat_map(status_key, statuses, HEAT_MAP_STATUS_CACHE_TIMEOUT)
+            
+            for row, row_statuses in statuses.items():
+                row_cells = heat_map['grid'].get(row, {})
+                for seat, status in row_statuses.items():
+                    if seat in row_cells:
+                        row_cells[seat]['status'] = status
+            return heat_map
+        
         # Get all seats in the zone
-        seats = Seat.objects.filter(zone=zone).order_by('row_number', 'seat_number')
+        seats = Seat.objects.filter(zone=zone).order_by('row_number', 'seat_number').values_list(
+            'id', 'row_number', 'seat_number', 'status', 'price_modifier'
+        )
         
-        # Get transaction items for this zone
+        # Sales per seat for this zone
         items_qs = TransactionItem.objects.filter(
             zone=zone,
+            seat__isnull=False,
             transaction__status='completed'
         )
         
         if event:
             items_qs = items_qs.filter(transaction__event=event)
         
+        seat_sales = {
+            row['seat_id']: row
+            for row in items_qs.values('seat_id').annotate(
+                sales_count=Count('id'),
+                total_revenue=Sum('total_price'),
+                last_sold=Max('transaction__completed_at')
+            ).order_by()
+        }
+        
         # Build heat map structure
         heat_map = {
             'zone_id': str(zone.id),
@@ -217,10 +304,10 @@ class ReportService:
         # Initialize grid with all seats
         for row in range(1, zone.rows + 1):
             seats_in_row = zone.get_seats_for_row(row)
-            heat_map['grid'][row] = {}
+            row_cells = heat_map['grid'][str(row)] = {}
             
             for seat_num in range(1, seats_in_row + 1):
-                heat_map['grid'][row][seat_num] = {
+                row_cells[str(seat_num)] = {
                     'status': 'available',
                     'price': float(zone.base_price),
                     'sales_count': 0,
@@ -230,60 +317,66 @@ class ReportService:
                     'demand_level': 'low'
                 }
         
-        # Update with actual seat data and calculate popularity
+        # First pass: join seats with their sales
         row_popularity = {}
+        seat_cells = []
+        statuses = {}
         max_sales_count = 0
         
-        for seat in seats:
-            if seat.row_number in heat_map['grid'] and seat.seat_number in heat_map['grid'][seat.row_number]:
-                # Get sales data for this seat
-                seat_items = items_qs.filter(seat=seat)
-                sales_count = seat_items.count()
-                total_revenue = sum(float(item.total_price) for item in seat_items)
-                
-                # Track max sales for normalization
-                max_sales_count = max(max_sales_count, sales_count)
-                
-                # Get last sale date
-                last_sale = seat_items.order_by('-transaction__completed_at').first()
-                last_sold = last_sale.transaction.completed_at.isoformat() if last_sale else None
-                
-                # Calculate popularity score (0-100)
-                popularity_score = (sales_count / max(max_sales_count, 1)) * 100
-                
-                # Determine demand level
-                if popularity_score >= 80:
-                    demand_level = 'very_high'
-                elif popularity_score >= 60:
-                    demand_level = 'high'
-                elif popularity_score >= 40:
-                    demand_level = 'medium'
-                elif popularity_score >= 20:
-                    demand_level = 'low'
-                else:
-                    demand_level = 'very_low'
-                
-                heat_map['grid'][seat.row_number][seat.seat_number] = {
-                    'status': seat.status,
-                    'price': float(seat.calculated_price),
-                    'sales_count': sales_count,
-                    'total_revenue': total_revenue,
-                    'last_sold': last_sold,
-                    'popularity_score': round(popularity_score, 2),
-                    'demand_level': demand_level
+        for seat_id, row_number, seat_number, status, price_modifier in seats:
+            statuses.setdefault(str(row_number), {})[str(seat_number)] = status
+            
+            row_cells = heat_map['grid'].get(str(row_number))
+            if row_cells is None or str(seat_number) not in row_cells:
+                continue
+            
+            sales = seat_sales.get(seat_id)
+            sales_count = sales['sales_count'] if sales else 0
+            total_revenue = float(sales['total_revenue'] or 0) if sales else 0.0
+            last_sold = sales['last_sold'].isoformat() if sales and sales['last_sold'] else None
+            max_sales_count = max(max_sales_count, sales_count)
+            
+            cell = row_cells[str(seat_number)] = {
+                'status': status,
+                'price': float(zone.base_price * (1 + price_modifier / 100)),
+                'sales_count': sales_count,
+                'total_revenue': total_revenue,
+                'last_sold': last_sold,
+                'popularity_score': 0.0,
+                'demand_level': 'very_low'
+            }
+            seat_cells.append(cell)
+            
+            # Track row popularity
+            if row_number not in row_popularity:
+                row_popularity[row_number] = {
+                    'sales_count': 0,
+                    'total_revenue': 0.0,
+                    'seat_count': 0
                 }
-                
-                # Track row popularity
-                if seat.row_number not in row_popularity:
-                    row_popularity[seat.row_number] = {
-                        'sales_count': 0,
-                        'total_revenue': 0.0,
-                        'seat_count': 0
-                    }
-                
-                row_popularity[seat.row_number]['sales_count'] += sales_count
-                row_popularity[seat.row_number]['total_revenue'] += total_revenue
-                row_popularity[seat.row_number]['seat_count'] += 1
+            
+            row_popularity[row_number]['sales_count'] += sales_count
+            row_popularity[row_number]['total_revenue'] += total_revenue
+            row_popularity[row_number]['seat_count'] += 1
+        
+        # Second pass: normalize popularity (0-100) against the busiest seat
+        for cell in seat_cells:
+            popularity_score = (cell['sales_count'] / max(max_sales_count, 1)) * 100
+            
+            # Determine demand level
+            if popularity_score >= 80:
+                demand_level = 'very_high'
+            elif popularity_score >= 60:
+                demand_level = 'high'
+            elif popularity_score >= 40:
+                demand_level = 'medium'
+            elif popularity_score >= 20:
+                demand_level = 'low'
+            else:
+                demand_level = 'very_low'
+            
+            cell['popularity_score'] = round(popularity_score, 2)
+            cell['demand_level'] = demand_level
         
         # Calculate row-level popularity metrics
         for row_num, row_data in row_popularity.items():
@@ -331,34 +424,70 @@ class ReportService:
                                    key=lambda r: row_popularity[r]['sales_count']) if row_popularity else None
         }
         
+        ReportService._cache_heat_map(cache_key, heat_map, HEAT_MAP_CACHE_TIMEOUT)
+        ReportService._cache_heat_map(status_key, statuses, HEAT_MAP_STATUS_CACHE_TIMEOUT)
         return heat_map
     
+    @staticmethod
+    def _cache_heat_map(key, value, timeout):
+        """Cache a heat map layer, logging cache failures."""
+        try:
+            cache.set(key, value, timeout)
+        except Exception as e:
+            logger.warning(f"Could not cache heat map: {e}")
+    
     @staticmethod
     def calculate_zone_performance_metrics(zone, event=None, period_days=30):
         """
         Calculate comprehensive performance metrics for a zone.
         """
-        from venezuelan_pos.apps.sales.models import TransactionItem
-        from datetime import datetime, timedelta
+        return ReportService.calculate_zones_performance_metrics([zone], event, period_days)[zone.id]
+    
+    @staticmethod
+    @with_reporting_db
+    @query_budget(max_queries=2)
+    def calculate_zones_performance_metrics(zones, event=None, period_days=30):
+        """
+        Calculate performance metrics for several zones at once.
+        Uses one grouped query however many zones are given.
         
-        # Get sales data for the zone
-        items_qs = TransactionItem.objects.filter(
-            zone=zone,
-            transaction__status='completed'
-        )
+        Returns:
+            dict: Performance metrics keyed by zone id
+        """
+        from .timeseries import SalesTimeSeries
         
-        if event:
-            items_qs = items_qs.filter(transaction__event=event)
+        zones = list(zones)
+        series = SalesTimeSeries(zones, event)
         
-        # Calculate period-based metrics
+        # Current and previous period totals, daily sales pattern (last
+        # 7 days) and peak sales times
         period_start = timezone.now() - timedelta(days=period_days)
-        recent_items = items_qs.filter(transaction__completed_at__gte=period_start)
+        previous_period_start = period_start - timedelta(days=period_days)
+        today = timezone.localdate()
+        totals, daily, hourly = series.performance_totals(
+            period_start, previous_period_start,
+            today - timedelta(days=7), today - timedelta(days=1)
+        )
         
-        # Basic metrics
-        total_sold = items_qs.aggregate(total=Sum('quantity'))['total'] or 0
-        recent_sold = recent_items.aggregate(total=Sum('quantity'))['total'] or 0
-        total_revenue = items_qs.aggregate(total=Sum('total_price'))['total'] or Decimal('0.00')
-        recent_revenue = recent_items.aggregate(total=Sum('total_price'))['total'] or Decimal('0.00')
+        return {
+            zone.id: ReportService._build_zone_performance_metrics(
+                zone, totals[zone.id], daily[zone.id], hourly[zone.id], period_days
+            )
+            for zone in zones
+        }
+    
+    @staticmethod
+    def _build_zone_performance_metrics(zone, totals, daily, hourly_distribution, period_days):
+        """
+        Derive rates, growth and the performance score of a zone from its
+        aggregated sales.
+        """
+        total_sold = totals['total_sold']
+        recent_sold = totals['recent_sold']
+        total_revenue = totals['total_revenue']
+        recent_revenue = totals['recent_revenue']
+        previous_sold = totals['previous_sold']
+        previous_revenue = totals['previous_revenue']
         
         # Calculate rates
         fill_rate = (total_sold / zone.capacity * 100) if zone.capacity > 0 else 0
@@ -369,44 +498,67 @@ class ReportService:
         avg_ticket_price = float(total_revenue) / total_sold if total_sold > 0 else 0
         recent_avg_price = float(recent_revenue) / recent_sold if recent_sold > 0 else 0
         
-        # Calculate trends (compare with previous period)
-        previous_period_start = period_start - timedelta(days=period_days)
-        previous_items = items_qs.filter(
-            transaction__completed_at__gte=previous_period_start,
-            transaction__completed_at__lt=period_start
-        )
-        
-        previous_sold = previous_items.aggregate(total=Sum('quantity'))['total'] or 0
-        previous_revenue = previous_items.aggregate(total=Sum('total_price'))['total'] or Decimal('0.00')
-        
-        # Calculate growth rates
+        # Calculate growth rates (compared with the previous period)
         sales_growth = ((recent_sold - previous_sold) / previous_sold * 100) if previous_sold > 0 else 0
         revenue_growth = ((float(recent_revenue) - float(previous_revenue)) / float(previous_revenue) * 100) if previous_revenue > 0 else 0
         
-        # Calculate daily sales pattern (last 7 days)
-        daily_sales = []
-        for i in range(7):
-            day_start = timezone.now() - timedelta(days=i+1)
-            day_end = day_start + timedelta(days=1)
-            day_sales = items_qs.filter(
-                transaction__completed_at__gte=day_start,
-                transaction__completed_at__lt=day_end
-            ).aggregate(total=Sum('quantity'))['total'] or 0
-            
-            daily_sales.append({
-                'date': day_start.date().isoformat(),
-                'sales': day_sales
-            })
-        
-        # Calculate peak sales times (if we have hourly data)
-        hourly_distribution = {}
-        for item in recent_items.select_related('transaction'):
-            hour = item.transaction.completed_at.hour
-            hourly_distribution[hour] = hourly_distribution.get(hour, 0) + item.quantity
+        # Most recent day first
+        daily_sales = [
+            {
+                'date': day['bucket'].date().isoformat(),
+                'sales': day['tickets']
+            }
+            for day in reversed(daily)
+        ]
         
         peak_hour = max(hourly_distribution.keys(), key=lambda h: hourly_distribution[h]) if hourly_distribution else None
         
-        # Performance ranking factors
+        performance_score, performance_grade, performance_category = ReportService._performance_score(
+            fill_rate, sales_velocity, sales_growth, avg_ticket_price, float(zone.base_price)
+        )
+        
+        # Calculate efficiency metrics
+        capacity_utilization = (total_sold / zone.capacity) if zone.capacity > 0 else 0
+        revenue_per_capacity = float(total_revenue) / zone.capacity if zone.capacity > 0 else 0
+        
+        return {
+            'zone_id': str(zone.id),
+            'zone_name': zone.name,
+            'zone_type': zone.zone_type,
+            'capacity': zone.capacity,
+            'total_sold': total_sold,
+            'recent_sold': recent_sold,
+            'available_capacity': zone.capacity - total_sold,
+            'total_revenue': float(total_revenue),
+            'recent_revenue': float(recent_revenue),
+            'fill_rate': round(fill_rate, 2),
+            'capacity_utilization': round(capacity_utilization * 100, 2),
+            'sales_velocity': round(sales_velocity, 2),
+            'revenue_velocity': round(revenue_velocity, 2),
+            'revenue_per_capacity': round(revenue_per_capacity, 2),
+            'avg_ticket_price': round(avg_ticket_price, 2),
+            'recent_avg_price': round(recent_avg_price, 2),
+            'sales_growth': round(sales_growth, 2),
+            'revenue_growth': round(revenue_growth, 2),
+            'performance_score': performance_score,
+            'performance_grade': performance_grade,
+            'performance_category': performance_category,
+            'daily_sales_pattern': daily_sales,
+            'peak_sales_hour': peak_hour,
+            'hourly_distribution': hourly_distribution,
+            'period_days': period_days,
+            'analysis_date': timezone.now().isoformat()
+        }
+    
+    @staticmethod
+    def _performance_score(fill_rate, sales_velocity, sales_growth, avg_ticket_price, base_price_float):
+        """
+        Score a zone from 0 to 100 on fill rate, velocity, growth and price
+        efficiency.
+        
+        Returns:
+            tuple: (score, grade, category)
+        """
         performance_score = 0
         
         # Fill rate score (0-40 points)
@@ -454,7 +606,6 @@ class ReportService:
             performance_score += 2
         
         # Revenue efficiency score (0-10 points)
-        base_price_float = float(zone.base_price)
         if avg_ticket_price >= base_price_float * 1.2:
             performance_score += 10
         elif avg_ticket_price >= base_price_float * 1.1:
@@ -493,49 +644,114 @@ class ReportService:
             performance_grade = 'F'
             performance_category = 'Very Poor'
         
-        # Calculate efficiency metrics
-        capacity_utilization = (total_sold / zone.capacity) if zone.capacity > 0 else 0
-        revenue_per_capacity = float(total_revenue) / zone.capacity if zone.capacity > 0 else 0
+        return performance_score, performance_grade, performance_category
+    
+    @staticmethod
+    def _comparative_generation_key(tenant_id):
+        """Cache key of the token that invalidates a tenant's comparative analyses."""
+        return f"{COMPARATIVE_ANALYSIS_CACHE_PREFIX}:generation:{tenant_id}"
+    
+    @staticmethod
+    def invalidate_comparative_analyses(tenant_id):
+        """
+        Invalidate every cached comparative analysis of a tenant by replacing
+        its generation token, which is part of the cache key.
+        """
+        try:
+            cache.set(ReportService._comparative_generation_key(tenant_id), uuid.uuid4().hex, None)
+        except Exception as e:
+            logger.warning(f"Could not invalidate comparative analyses: {e}")
+    
+    @staticmethod
+    def _comparative_analysis_cache_key(zones, event=None, period_days=30):
+        """
+        Cache key of a comparative analysis: a fingerprint of the zone set,
+        the event, the period and the generation tokens of the zones' tenants.
+        """
+        generation_keys = sorted({
+            ReportService._comparative_generation_key(zone.tenant_id) for zone in zones
+        })
+        generations = cache.get_many(generation_keys)
+        for key in generation_keys:
+            if key not in generations:
+                # A fresh token, so an evicted one never revives older entries
+                cache.add(key, uuid.uuid4().hex, None)
+                generations[key] = cache.get(key)
+        fingerprint = '|'.join([
+            # Edited zones (capacity, base price) get a new fingerprint
+            ','.join(sorted(f"{zone.id}@{zone.updated_at.isoformat()}" for zone in zones)),
+            str(event.id) if event else 'all',
+            str(period_days),
+            ','.join(f"{key}={value}" for key, value in sorted(generations.items())),
+        ])
+        digest = hashlib.sha1(fingerprint.encode()).hexdigest()
+        return f"{COMPARATIVE_ANALYSIS_CACHE_PREFIX}:{digest}"
+    
+    @staticmethod
+    def _distribution_scores(values):
+        """
+        Percentile rank (share of values below, ties counted half) and
+        z-score of each value, in one sorted pass.
         
-        return {
-            'zone_id': str(zone.id),
-            'zone_name': zone.name,
-            'zone_type': zone.zone_type,
-            'capacity': zone.capacity,
-            'total_sold': total_sold,
-            'recent_sold': recent_sold,
-            'available_capacity': zone.capacity - total_sold,
-            'total_revenue': float(total_revenue),
-            'recent_revenue': float(recent_revenue),
-            'fill_rate': round(fill_rate, 2),
-            'capacity_utilization': round(capacity_utilization * 100, 2),
-            'sales_velocity': round(sales_velocity, 2),
-            'revenue_velocity': round(revenue_velocity, 2),
-            'revenue_per_capacity': round(revenue_per_capacity, 2),
-            'avg_ticket_price': round(avg_ticket_price, 2),
-            'recent_avg_price': round(recent_avg_price, 2),
-            'sales_growth': round(sales_growth, 2),
-            'revenue_growth': round(revenue_growth, 2),
-            'performance_score': performance_score,
-            'performance_grade': performance_grade,
-            'performance_category': performance_category,
-            'daily_sales_pattern': daily_sales,
-            'peak_sales_hour': peak_hour,
-            'hourly_distribution': hourly_distribution,
-            'period_days': period_days,
-            'analysis_date': timezone.now().isoformat()
+        Returns:
+            tuple: (percentile ranks, z-scores, statistics)
+        """
+        count = len(values)
+        if not count:
+            return [], [], {'mean': 0, 'std_dev': 0, 'min': 0, 'max': 0}
+        
+        ordered = sorted(values)
+        mean = statistics.fmean(values)
+        std_dev = statistics.pstdev(values, mean)
+        
+        percentile_ranks = []
+        for value in values:
+            below = bisect_left(ordered, value)
+            ties = bisect_right(ordered, value) - below
+            percentile_ranks.append((below + ties / 2) / count * 100)
+        z_scores = [(value - mean) / std_dev if std_dev > 0 else 0 for value in values]
+        
+        return percentile_ranks, z_scores, {
+            'mean': round(mean, 2),
+            'std_dev': round(std_dev, 2),
+            'min': round(ordered[0], 2),
+            'max': round(ordered[-1], 2),
         }
     
     @staticmethod
-    def generate_comparative_analysis(zones, event=None):
+    @with_reporting_db
+    @query_budget(max_queries=1)
+    def generate_comparative_analysis(zones, event=None, period_days=30):
         """
         Generate comparative analysis across multiple zones.
+        Each zone gets the metrics of calculate_zone_performance_metrics,
+        read for the whole set with one grouped query; percentile ranks
+        and z-scores are then derived metric by metric across the set.
+        Results are cached until the next sale of one of the zones' tenants.
         """
-        analysis_data = []
+        zones = list(zones)
+        cache_key = ReportService._comparative_analysis_cache_key(zones, event, period_days)
+        analysis = cache.get(cache_key)
+        if analysis is not None:
+            # JSON turns the hour keys of the distributions into strings
+            for data in analysis['zones']:
+                data['hourly_distribution'] = {
+                    int(hour): tickets for hour, tickets in data['hourly_distribution'].items()
+                }
+            return analysis
         
-        for zone in zones:
-            metrics = ReportService.calculate_zone_performance_metrics(zone, event)
-            analysis_data.append(metrics)
+        metrics = ReportService.calculate_zones_performance_metrics(zones, event, period_days)
+        analysis_data = [metrics[zone.id] for zone in zones]
+        
+        # Position of each zone within the set, metric by metric
+        metric_statistics = {}
+        for metric in COMPARATIVE_METRICS:
+            values = [data[metric] for data in analysis_data]
+            percentile_ranks, z_scores, metric_statistics[metric] = ReportService._distribution_scores(values)
+            for data, percentile_rank, z_score in zip(analysis_data, percentile_ranks, z_scores):
+                data[metric] = round(data[metric], 2)
+                data.setdefault('percentile_ranks', {})[metric] = round(percentile_rank, 2)
+                data.setdefault('z_scores', {})[metric] = round(z_score, 2)
         
         # Sort by performance score
         analysis_data.sort(key=lambda x: x['performance_score'], reverse=True)
@@ -555,15 +771,21 @@ class ReportService:
             'total_sold': total_sold,
             'total_revenue': total_revenue,
             'overall_fill_rate': (total_sold / total_capacity * 100) if total_capacity > 0 else 0,
-            'average_performance_score': sum(data['performance_score'] for data in analysis_data) / len(analysis_data) if analysis_data else 0
+            'average_performance_score': sum(data['performance_score'] for data in analysis_data) / len(analysis_data) if analysis_data else 0,
+            'metric_statistics': metric_statistics
         }
         
-        return {
+        analysis = {
             'summary': summary,
-            'zones': analysis_data
+            'zones': analysis_data,
+            'generated_at': timezone.now().isoformat()
         }
+        cache.set(cache_key, analysis, COMPARATIVE_ANALYSIS_CACHE_TIMEOUT)
+        return analysis
     
     @staticmethod
+    @with_reporting_db
+    @query_budget(max_queries=5)
     def generate_zone_popularity_ranking(event=None, tenant=None, limit=None):
         """
         Generate zone popularity ranking based on multiple metrics.
@@ -578,10 +800,12 @@ class ReportService:
         if event:
             zones_qs = zones_qs.filter(event=event)
         
+        zones = list(zones_qs.select_related('event'))
+        zone_metrics = ReportService.calculate_zones_performance_metrics(zones, event)
         ranking_data = []
         
-        for zone in zones_qs:
-            metrics = ReportService.calculate_zone_performance_metrics(zone, event)
+        for zone in zones:
+            metrics = zone_metrics[zone.id]
             
             # Calculate popularity score based on multiple factors
             popularity_score = 0
@@ -658,47 +882,36 @@ class ReportService:
         }
     
     @staticmethod
+    @with_reporting_db
+    @query_budget(max_queries=2)
     def generate_occupancy_trends(zone, days=30):
         """
         Generate occupancy trends over time for a specific zone.
         """
-        from venezuelan_pos.apps.sales.models import TransactionItem
-        from datetime import datetime, timedelta
+        from .timeseries import SalesTimeSeries
+        
+        last_day = timezone.localdate()
+        first_day = last_day - timedelta(days=days)
         
-        end_date = timezone.now()
-        start_date = end_date - timedelta(days=days)
+        # Daily sales data, one grouped query with empty days filled in
+        series = SalesTimeSeries([zone]).daily_series(first_day, last_day)[zone.id]
         
-        # Get daily sales data
         daily_data = []
-        current_date = start_date.date()
+        cumulative_sold = 0
         
-        while current_date <= end_date.date():
-            day_start = timezone.make_aware(datetime.combine(current_date, datetime.min.time()))
-            day_end = day_start + timedelta(days=1)
-            
-            day_sales = TransactionItem.objects.filter(
-                zone=zone,
-                transaction__status='completed',
-                transaction__completed_at__gte=day_start,
-                transaction__completed_at__lt=day_end
-            ).aggregate(
-                tickets_sold=Sum('quantity'),
-                revenue=Sum('total_price')
-            )
-            
-            tickets_sold = day_sales['tickets_sold'] or 0
-            revenue = float(day_sales['revenue'] or 0)
+        for day in series:
+            tickets_sold = day['tickets']
+            revenue = float(day['revenue'])
             fill_rate = (tickets_sold / zone.capacity * 100) if zone.capacity > 0 else 0
+            cumulative_sold += tickets_sold
             
             daily_data.append({
-                'date': current_date.isoformat(),
+                'date': day['bucket'].date().isoformat(),
                 'tickets_sold': tickets_sold,
                 'revenue': revenue,
                 'fill_rate': round(fill_rate, 2),
-                'cumulative_sold': sum(d['tickets_sold'] for d in daily_data) + tickets_sold
+                'cumulative_sold': cumulative_sold
             })
-            
-            current_date += timedelta(days=1)
         
         # Calculate trend metrics
         if len(daily_data) >= 2:
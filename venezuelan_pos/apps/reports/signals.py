@@ -0,0 +1,88 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from venezuelan_pos.apps.payments.models import Payment
+from venezuelan_pos.apps.sales.models import ReservedTicket, Transaction, TransactionItem
+from venezuelan_pos.apps.zones.models import Seat
+from .dashboards import dashboard_snapshots
+from .rollups import sales_rollups
+from .services import ReportService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Transaction)
+def mark_sales_rollup_on_transaction_save(sender, instance, **kwargs):
+    """Rebuild the hourly sales rollup of a completed transaction."""
+    if instance.completed_at:
+        sales_rollups.mark_dirty(instance.tenant_id, instance.completed_at)
+
+
+@receiver(post_save, sender=Transaction)
+def invalidate_heat_maps_on_transaction_save(sender, instance, update_fields=None, **kwargs):
+    """
+    Drop cached heat maps of the zones a completed transaction sold in.
+    Only saves that can change what heat maps count (completion and
+    status changes) look up the zones.
+    """
+    if update_fields is not None and not {'status', 'completed_at'} & set(update_fields):
+        return
+    if instance.completed_at:
+        zone_ids = set(instance.items.values_list('zone_id', flat=True))
+        ReportService.invalidate_heat_maps((zone_id, instance.event_id) for zone_id in zone_ids)
+
+
+@receiver(post_save, sender=Transaction)
+def invalidate_comparative_analyses_on_transaction_save(sender, instance, **kwargs):
+    """Drop cached comparative analyses of the tenant a completed transaction sold in."""
+    if instance.completed_at:
+        ReportService.invalidate_comparative_analyses(instance.tenant_id)
+
+
+@receiver(post_save, sender=Transaction)
+def mark_dashboards_stale_on_transaction_save(sender, instance, **kwargs):
+    """Refresh the dashboard snapshots a sale shows up in."""
+    dashboard_snapshots.mark_stale(instance.tenant_id, instance.event_id)
+
+
+@receiver(post_save, sender=TransactionItem)
+@receiver(post_delete, sender=TransactionItem)
+def mark_sales_rollup_on_item_change(sender, instance, **kwargs):
+    """Rebuild the hourly sales rollup and drop cached heat maps and comparative analyses when items of a completed transaction change."""
+    try:
+        completed_at = instance.transaction.completed_at
+    except Transaction.DoesNotExist:
+        return
+    if completed_at:
+        sales_rollups.mark_dirty(instance.tenant_id, completed_at)
+        ReportService.invalidate_heat_maps([(instance.zone_id, instance.transaction.event_id)])
+        ReportService.invalidate_comparative_analyses(instance.tenant_id)
+
+
+@receiver(post_save, sender=Payment)
+def mark_sales_rollup_on_payment_completion(sender, instance, **kwargs):
+    """Rebuild the hourly sales rollup when a completed transaction gets a payment."""
+    if instance.status == Payment.Status.COMPLETED and instance.transaction.completed_at:
+        sales_rollups.mark_dirty(instance.tenant_id, instance.transaction.completed_at)
+
+
+@receiver(post_save, sender=Payment)
+def mark_dashboards_stale_on_payment_save(sender, instance, **kwargs):
+    """Refresh the dashboard snapshots of a paid transaction."""
+    if instance.status == Payment.Status.COMPLETED:
+        dashboard_snapshots.mark_stale(instance.tenant_id, instance.transaction.event_id)
+
+
+@receiver(post_save, sender=ReservedTicket)
+@receiver(post_delete, sender=ReservedTicket)
+def mark_dashboards_stale_on_reservation_change(sender, instance, **kwargs):
+    """Refresh the tenant dashboard snapshots that count active reservations."""
+    dashboard_snapshots.mark_stale(instance.tenant_id)
+
+
+@receiver(post_save, sender=Seat)
+@receiver(post_save, sender=ReservedTicket)
+@receiver(post_delete, sender=ReservedTicket)
+def invalidate_heat_map_statuses_on_seat_change(sender, instance, **kwargs):
+    """Drop the cached seat statuses heat maps lay over their zone's grid."""
+    ReportService.invalidate_heat_map_statuses([instance.zone_id])
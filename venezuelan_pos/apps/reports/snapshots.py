@@ -0,0 +1,300 @@
+"""
+Columnar analytics snapshots.
+Rows of the export datasets are written to Parquet or Arrow IPC files on
+local disk, partitioned Hive-style by tenant and date:
+
+    <root>/<dataset>/tenant=<tenant id>/date=<YYYY-MM-DD>/part-<run>.parquet
+
+Each run reads, from the reporting database, only the rows whose watermark
+column (updated_at) moved past the previous run's watermark, so BI tools
+can work off the files instead of the OLTP database. A changed row is
+written again in a later part file; readers keep the version with the
+latest watermark per id. Changes made with queryset.update() do not move
+updated_at and are only picked up when the row is next saved.
+"""
+
+import json
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from venezuelan_pos.core.db_router import using_reporting_db
+
+from .exports import CHUNK_SIZE, DATASETS, ExportDataset
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    'parquet': '.parquet',
+    'arrow': '.arrow',
+}
+
+# Rows written per Parquet row group / Arrow record batch
+BATCH_SIZE = 10000
+
+# Rows saved this recently may belong to transactions that have not
+# committed yet; they are left for the next run
+LATE_COMMIT_WINDOW = timedelta(minutes=1)
+
+WATERMARKS_FILE = '_watermarks.json'
+
+INTEGER_FIELDS = {
+    'AutoField', 'BigAutoField', 'SmallAutoField', 'IntegerField', 'BigIntegerField',
+    'SmallIntegerField', 'PositiveIntegerField', 'PositiveBigIntegerField',
+    'PositiveSmallIntegerField',
+}
+
+
+def _pyarrow():
+    """Import pyarrow, which snapshots need and the rest of the system does not."""
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ImproperlyConfigured("Analytics snapshots require pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+def _resolve_field(model, lookup: str):
+    """Model field a values_list() lookup such as 'transaction__event__name' reads."""
+    parts = lookup.split('__')
+    for part in parts[:-1]:
+        model = model._meta.get_field(part).related_model
+    field = model._meta.get_field(parts[-1])
+    if field.is_relation:
+        field = field.target_field
+    return field
+
+
+def _arrow_type(field):
+    """Arrow type of a Django field."""
+    pa = _pyarrow()
+    internal_type = field.get_internal_type()
+    if internal_type == 'DecimalField':
+        return pa.decimal128(field.max_digits, field.decimal_places)
+    if internal_type == 'DateTimeField':
+        return pa.timestamp('us', tz='UTC')
+    if internal_type == 'DateField':
+        return pa.date32()
+    if internal_type in INTEGER_FIELDS:
+        return pa.int64()
+    if internal_type == 'BooleanField':
+        return pa.bool_()
+    if internal_type == 'FloatField':
+        return pa.float64()
+    return pa.string()
+
+
+def _arrow_value(value):
+    """Convert values Arrow cannot take as they come from the database."""
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, cls=DjangoJSONEncoder)
+    return value
+
+
+class _PartitionWriter:
+    """
+    Writes one partition file in batches. The file appears under its final
+    name only once closed, so readers never see a partial part.
+    """
+
+    def __init__(self, path: Path, schema, file_format: str):
+        pa = _pyarrow()
+        self.path = path
+        self.schema = schema
+        self.rows = 0
+        self._tmp_path = path.with_name(f".{path.name}.tmp")
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        if file_format == 'parquet':
+            self._writer = pa.parquet.ParquetWriter(str(self._tmp_path), schema, compression='zstd')
+        else:
+            self._sink = pa.OSFile(str(self._tmp_path), 'wb')
+            self._writer = pa.ipc.new_file(self._sink, schema)
+        self._format = file_format
+
+    def write(self, columns: List[list]) -> None:
+        pa = _pyarrow()
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, self.schema)],
+            schema=self.schema
+        )
+        self._writer.write_batch(batch)
+        self.rows += batch.num_rows
+
+    def close(self) -> None:
+        self._writer.close()
+        if self._format != 'parquet':
+            self._sink.close()
+        os.replace(self._tmp_path, self.path)
+
+
+class AnalyticsSnapshotService:
+    """
+    Writes incremental columnar snapshots of the export datasets.
+
+    Usage:
+        service = AnalyticsSnapshotService('/var/lib/pos/analytics', 'parquet')
+        stats = service.run(['transactions', 'items'])
+    """
+
+    def __init__(self, root=None, file_format: Optional[str] = None):
+        self.root = Path(root or settings.ANALYTICS_SNAPSHOT_DIR)
+        self.file_format = file_format or settings.ANALYTICS_SNAPSHOT_FORMAT
+        if self.file_format not in FORMATS:
+            raise ValueError(f"Unsupported snapshot format: {self.file_format}")
+
+    # Watermarks
+
+    def load_watermarks(self) -> Dict[str, Dict[str, str]]:
+        """{dataset: {tenant_id: ISO watermark}} of the last completed runs."""
+        path = self.root / WATERMARKS_FILE
+        if not path.exists():
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def save_watermarks(self, watermarks: Dict[str, Dict[str, str]]) -> None:
+        """Replace the watermark file atomically."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.root / f".{WATERMARKS_FILE}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(watermarks, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.root / WATERMARKS_FILE)
+
+    # Writing
+
+    @staticmethod
+    def snapshot_lookups(dataset: ExportDataset) -> Dict[str, str]:
+        """{column: lookup} of every dataset column plus the date and watermark fields."""
+        lookups = {column: lookup for column, (lookup, _) in dataset.columns.items()}
+        for field in (dataset.date_field, dataset.watermark_field):
+            if field not in lookups.values():
+                lookups[field] = field
+        return lookups
+
+    def schema(self, dataset: ExportDataset, lookups: Dict[str, str]):
+        """Arrow schema of a dataset's snapshot columns."""
+        pa = _pyarrow()
+        model = dataset.model
+        return pa.schema([
+            pa.field(column, _arrow_type(_resolve_field(model, lookup)))
+            for column, lookup in lookups.items()
+        ])
+
+    def write_increment(self, dataset: ExportDataset, tenant, since: Optional[datetime],
+                        until: datetime, run_id: str) -> int:
+        """
+        Write a tenant's rows whose watermark is in (since, until] to one
+        part file per local date. Returns the number of rows written.
+        """
+        lookups = self.snapshot_lookups(dataset)
+        schema = self.schema(dataset, lookups)
+        date_index = list(lookups.values()).index(dataset.date_field)
+
+        # Base manager: filtered explicitly by tenant, not by the thread-local one
+        queryset = dataset.model._base_manager.filter(
+            tenant=tenant,
+            **{f'{dataset.watermark_field}__lte': until}
+        )
+        if since is not None:
+            queryset = queryset.filter(**{f'{dataset.watermark_field}__gt': since})
+        rows = using_reporting_db(queryset).order_by(dataset.date_field, 'pk').values_list(
+            *lookups.values()
+        ).iterator(chunk_size=CHUNK_SIZE)
+
+        written = 0
+        writer = None
+        current_date = None
+        columns = [[] for _ in lookups]
+
+        def flush():
+            if columns[0]:
+                writer.write(columns)
+                for values in columns:
+                    values.clear()
+
+        try:
+            for row in rows:
+                row_date = timezone.localdate(row[date_index]) if row[date_index] else None
+                if writer is None or row_date != current_date:
+                    if writer is not None:
+                        flush()
+                        writer.close()
+                        written += writer.rows
+                    current_date = row_date
+                    partition = current_date.isoformat() if current_date else 'unknown'
+                    path = (
+                        self.root / dataset.name / f"tenant={tenant.id}" / f"date={partition}"
+                        / f"part-{run_id}{FORMATS[self.file_format]}"
+                    )
+                    writer = _PartitionWriter(path, schema, self.file_format)
+
+                for values, value in zip(columns, row):
+                    values.append(_arrow_value(value))
+                if len(columns[0]) >= BATCH_SIZE:
+                    flush()
+
+            if writer is not None:
+                flush()
+                writer.close()
+                written += writer.rows
+                writer = None
+        finally:
+            if writer is not None and writer._tmp_path.exists():
+                writer._tmp_path.unlink()
+
+        return written
+
+    def run(self, datasets: Optional[Iterable[str]] = None, tenants=None, now=None) -> Dict[str, int]:
+        """
+        Write every dataset's new rows for each tenant and advance the
+        watermarks. Watermarks are saved after each tenant, so an
+        interrupted run resumes where it stopped.
+
+        Returns:
+            dict: Rows written per dataset
+        """
+        from venezuelan_pos.apps.tenants.models import Tenant
+
+        dataset_names = list(datasets or DATASETS)
+        unknown = [name for name in dataset_names if name not in DATASETS]
+        if unknown:
+            raise ValueError(f"Unknown snapshot datasets: {', '.join(unknown)}")
+
+        tenants = list(tenants) if tenants is not None else list(Tenant.objects.all())
+        until = (now or timezone.now()) - LATE_COMMIT_WINDOW
+        run_id = until.strftime('%Y%m%dT%H%M%S')
+        watermarks = self.load_watermarks()
+        stats = {}
+
+        for name in dataset_names:
+            dataset = DATASETS[name]
+            dataset_watermarks = watermarks.setdefault(name, {})
+            stats[name] = 0
+
+            for tenant in tenants:
+                since = dataset_watermarks.get(str(tenant.id))
+                since = parse_datetime(since) if since else None
+                if since is not None and since >= until:
+                    continue
+
+                stats[name] += self.write_increment(dataset, tenant, since, until, run_id)
+                dataset_watermarks[str(tenant.id)] = until.isoformat()
+                self.save_watermarks(watermarks)
+
+            logger.info(f"Analytics snapshot of {name}: {stats[name]} rows up to {until.isoformat()}")
+
+        return stats
@@ -0,0 +1,124 @@
+"""
+Celery tasks for reports and analytics.
+"""
+
+import logging
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def refresh_sales_rollups():
+    """
+    Rebuild hourly sales rollups marked dirty by completed sales.
+    Runs every minute so reports lag sales only briefly.
+    """
+    try:
+        from .rollups import sales_rollups
+
+        refreshed = sales_rollups.refresh_dirty()
+
+        if refreshed > 0:
+            logger.info(f"Rebuilt {refreshed} hourly sales rollups")
+
+        return refreshed
+
+    except Exception as e:
+        logger.error(f"Error refreshing sales rollups: {e}")
+        return 0
+
+
+@shared_task
+def refresh_sales_rollup_bucket(tenant_id, start):
+    """
+    Rebuild one hourly sales rollup bucket.
+    Queued by completed sales when the Redis dirty set is unavailable.
+    """
+    try:
+        from datetime import datetime
+        from .rollups import BUCKET, sales_rollups
+
+        start = datetime.fromisoformat(start)
+        return sales_rollups.refresh_window(tenant_id, start, start + BUCKET)
+
+    except Exception as e:
+        logger.error(f"Error refreshing sales rollup {tenant_id} {start}: {e}")
+        return 0
+
+
+@shared_task
+def generate_report_job(job_id):
+    """
+    Generate the report of a queued report job.
+    """
+    try:
+        from .jobs import ReportJobService
+
+        job = ReportJobService.run(job_id)
+
+        if job is not None:
+            logger.info(f"Report job {job_id} finished with status {job.status}")
+
+        return job.status if job is not None else None
+
+    except Exception as e:
+        logger.error(f"Error running report job {job_id}: {e}")
+        return None
+
+
+@shared_task
+def run_due_report_schedules():
+    """
+    Fail report jobs stuck in running, then enqueue report jobs for
+    schedules whose next run has passed.
+    """
+    try:
+        from .jobs import ReportJobService
+
+        ReportJobService.fail_stuck_jobs()
+        enqueued = ReportJobService.enqueue_due_schedules()
+
+        if enqueued > 0:
+            logger.info(f"Enqueued {enqueued} scheduled report jobs")
+
+        return enqueued
+
+    except Exception as e:
+        logger.error(f"Error running due report schedules: {e}")
+        return 0
+
+
+@shared_task
+def refresh_dashboard_snapshot(scope, object_id):
+    """
+    Rebuild a dashboard snapshot after a debounced sale, payment or
+    reservation change.
+    """
+    try:
+        from .dashboards import dashboard_snapshots
+
+        snapshot = dashboard_snapshots.refresh(scope, object_id)
+        return snapshot is not None
+
+    except Exception as e:
+        logger.error(f"Error refreshing {scope} dashboard snapshot {object_id}: {e}")
+        return False
+
+
+@shared_task
+def export_analytics_snapshots():
+    """
+    Write new and changed sales, payment and ticket rows to the
+    columnar analytics snapshots.
+    """
+    try:
+        from .snapshots import AnalyticsSnapshotService
+
+        stats = AnalyticsSnapshotService().run()
+        logger.info(f"Exported analytics snapshots: {stats}")
+        return stats
+
+    except Exception as e:
+        logger.error(f"Error exporting analytics snapshots: {e}")
+        return {}
@@ -1,5 +1,7 @@
 from decimal import Decimal
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from rest_framework.test import APITestCase
 from rest_framework import status
@@ -8,7 +10,7 @@ from venezuelan_pos.apps.events.models import Event, Venue
 from venezuelan_pos.apps.zones.models import Zone
 from venezuelan_pos.apps.customers.models import Customer
 from venezuelan_pos.apps.sales.models import Transaction, TransactionItem
-from .models import SalesReport, OccupancyAnalysis, ReportSchedule
+from .models import SalesReport, OccupancyAnalysis, ReportSchedule, ReportJob
 from .services import ReportService
 
 
@@ -277,12 +279,14 @@ class SalesReportAPITest(APITestCase):
         
         response = self.client.post(url, data, format='json')
         
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         self.assertEqual(SalesReport.objects.count(), 1)
         
         report = SalesReport.objects.first()
         self.assertEqual(report.name, 'API Test Report')
         self.assertEqual(report.generated_by, self.user)
+        self.assertEqual(response.data['report'], report.id)
+        self.assertEqual(response.data['status'], 'queued')
     
     def test_filter_sales_reports(self):
         """Test filtering sales reports."""
@@ -383,28 +387,42 @@ class ReportServiceTest(TestCase):
             email="customer@example.com",
             phone="+584121234567"
         )
+        
+        # Rebuild sales rollups inline instead of through Celery, and keep
+        # committed sales from scheduling dashboard refreshes
+        from unittest import mock
+        from .tasks import refresh_dashboard_snapshot, refresh_sales_rollup_bucket
+        for patcher in [
+            mock.patch.object(
+                refresh_sales_rollup_bucket, 'delay', side_effect=lambda *args: refresh_sales_rollup_bucket(*args)
+            ),
+            mock.patch.object(refresh_dashboard_snapshot, 'apply_async'),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
     
     def test_generate_sales_report_data(self):
         """Test generating sales report data."""
         # Create test transaction
-        transaction = Transaction.objects.create(
-            tenant=self.tenant,
-            event=self.event,
-            customer=self.customer,
-            status=Transaction.Status.COMPLETED,
-            total_amount=Decimal('100.00'),
-            completed_at=timezone.now()
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            transaction = Transaction.objects.create(
+                tenant=self.tenant,
+                event=self.event,
+                customer=self.customer,
+                status=Transaction.Status.COMPLETED,
+                total_amount=Decimal('100.00'),
+                completed_at=timezone.now()
+            )
         
-        TransactionItem.objects.create(
-            tenant=self.tenant,
-            transaction=transaction,
-            zone=self.zone,
-            quantity=2,
-            unit_price=Decimal('50.00'),
-            subtotal_price=Decimal('100.00'),
-            total_price=Decimal('100.00')
-        )
+            TransactionItem.objects.create(
+                tenant=self.tenant,
+                transaction=transaction,
+                zone=self.zone,
+                quantity=2,
+                unit_price=Decimal('50.00'),
+                subtotal_price=Decimal('100.00'),
+                total_price=Decimal('100.00')
+            )
         
         # Generate report data
         report_data = ReportService.generate_sales_report_data(self.tenant)
@@ -447,4 +465,638 @@ class ReportServiceTest(TestCase):
         self.assertEqual(metrics['capacity'], 100)
         self.assertEqual(metrics['total_sold'], 5)
         self.assertEqual(metrics['fill_rate'], 5.0)  # 5/100 * 100
-        self.assertGreater(metrics['performance_score'], 0)
\ No newline at end of file
+        self.assertGreater(metrics['performance_score'], 0)
+    
+    def test_comparative_analysis(self):
+        """Test comparative analysis ranks zones against each other and is cached until the next sale."""
+        from django.core.cache import cache
+        from django.test import override_settings
+        from django.test.utils import CaptureQueriesContext
+        from django.db import connection
+        
+        zones = [self.zone] + [
+            Zone.objects.create(
+                tenant=self.tenant,
+                event=self.event,
+                name=f"Zone {i}",
+                zone_type=Zone.ZoneType.GENERAL,
+                capacity=100,
+                base_price=Decimal('50.00')
+            )
+            for i in range(2)
+        ]
+        
+        def sell(zone, quantity):
+            transaction = Transaction.objects.create(
+                tenant=self.tenant,
+                event=self.event,
+                customer=self.customer,
+                status=Transaction.Status.COMPLETED,
+                total_amount=Decimal('50.00') * quantity,
+                completed_at=timezone.now()
+            )
+            TransactionItem.objects.create(
+                tenant=self.tenant,
+                transaction=transaction,
+                zone=zone,
+                quantity=quantity,
+                unit_price=Decimal('50.00'),
+                subtotal_price=Decimal('50.00') * quantity,
+                total_price=Decimal('50.00') * quantity
+            )
+        
+        sell(zones[0], 10)
+        sell(zones[1], 30)
+        
+        with override_settings(CACHES={'default': {'BACKEND': 'venezuelan_pos.core.cache_backends.JSONLocMemCache'}}):
+            cache.clear()
+            
+            with CaptureQueriesContext(connection) as queries:
+                analysis = ReportService.generate_comparative_analysis(zones, self.event)
+            # Profiling middleware may EXPLAIN queries; count only the queries themselves
+            grouped = [q for q in queries if q['sql'].startswith('SELECT') and 'transaction_items' in q['sql']]
+            self.assertEqual(len(grouped), 1)
+            
+            by_name = {zone['zone_name']: zone for zone in analysis['zones']}
+            self.assertEqual(by_name['Zone 0']['fill_rate'], 30.0)
+            self.assertEqual(by_name['Zone 0']['capacity_utilization'], 30.0)
+            self.assertEqual(by_name['Zone 0']['recent_avg_price'], 50.0)
+            zone_0 = by_name['Zone 0']
+            self.assertEqual(zone_0['hourly_distribution'], {zone_0['peak_sales_hour']: 30})
+            self.assertEqual(len(zone_0['daily_sales_pattern']), 7)
+            self.assertIn('analysis_date', zone_0)
+            self.assertEqual(by_name['Zone 0']['percentile_ranks']['fill_rate'], 83.33)
+            self.assertEqual(by_name['Test Zone']['percentile_ranks']['fill_rate'], 50.0)
+            self.assertEqual(by_name['Zone 1']['percentile_ranks']['fill_rate'], 16.67)
+            self.assertEqual(by_name['Test Zone']['z_scores']['fill_rate'], -0.27)
+            self.assertEqual(by_name['Zone 0']['z_scores']['fill_rate'], 1.34)
+            self.assertEqual(analysis['summary']['metric_statistics']['fill_rate']['mean'], 13.33)
+            self.assertEqual(analysis['zones'][0]['zone_name'], 'Zone 0')
+            self.assertEqual(analysis['summary']['total_sold'], 40)
+            
+            # Same zone set, in any order, is served from cache
+            with self.assertNumQueries(0):
+                cached = ReportService.generate_comparative_analysis(list(reversed(zones)), self.event)
+            self.assertEqual(cached, analysis)
+            
+            sell(zones[2], 5)
+            refreshed = ReportService.generate_comparative_analysis(zones, self.event)
+            self.assertEqual(refreshed['summary']['total_sold'], 45)
+            cache.clear()
+    
+    def test_sales_rollups_match_raw_sales(self):
+        """Test hourly rollups attribute sales and survive a backfill."""
+        from venezuelan_pos.apps.payments.models import Payment, PaymentMethod
+        from .models import SalesRollup
+        from .rollups import sales_rollups
+        
+        other_zone = Zone.objects.create(
+            tenant=self.tenant,
+            event=self.event,
+            name="Other Zone",
+            zone_type=Zone.ZoneType.GENERAL,
+            capacity=50,
+            base_price=Decimal('20.00')
+        )
+        cash = PaymentMethod.objects.create(
+            tenant=self.tenant,
+            method_type=PaymentMethod.MethodType.CASH,
+            name="Cash"
+        )
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            transaction = Transaction.objects.create(
+                tenant=self.tenant,
+                event=self.event,
+                customer=self.customer,
+                status=Transaction.Status.COMPLETED,
+                subtotal_amount=Decimal('120.00'),
+                tax_amount=Decimal('19.21'),
+                total_amount=Decimal('139.21'),
+                completed_at=timezone.now()
+            )
+            for zone, quantity, price in [(self.zone, 2, Decimal('50.00')), (other_zone, 1, Decimal('20.00'))]:
+                TransactionItem.objects.create(
+                    tenant=self.tenant,
+                    transaction=transaction,
+                    zone=zone,
+                    quantity=quantity,
+                    unit_price=price,
+                    subtotal_price=price * quantity,
+                    total_price=price * quantity
+                )
+            Payment.objects.create(
+                tenant=self.tenant,
+                transaction=transaction,
+                payment_method=cash,
+                amount=Decimal('139.21'),
+                status=Payment.Status.COMPLETED,
+                completed_at=timezone.now()
+            )
+        
+        facts = SalesRollup.objects.all_tenants().filter(tenant=self.tenant)
+        self.assertEqual(facts.count(), 2)
+        self.assertEqual(sum(fact.transaction_count for fact in facts), 1)
+        self.assertEqual(sum(fact.tickets for fact in facts), 3)
+        
+        # Money measures add up to the transaction totals, split by zone
+        self.assertEqual(sum(fact.tax for fact in facts), Decimal('19.21'))
+        self.assertEqual(sum(fact.revenue for fact in facts), Decimal('139.21'))
+        self.assertEqual(facts.get(zone=other_zone).subtotal, Decimal('20.00'))
+        self.assertTrue(all(fact.payment_method_id == cash.id for fact in facts))
+        
+        # A backfill rebuilds the same rows
+        facts.delete()
+        stats = sales_rollups.backfill(tenant=self.tenant)
+        self.assertEqual(stats['facts'], 2)
+        
+        report_data = ReportService.generate_sales_report_data(self.tenant, {
+            'start_date': timezone.now() - timezone.timedelta(days=1),
+            'end_date': timezone.now() + timezone.timedelta(hours=1),
+        })
+        base = report_data['base_statistics']
+        self.assertEqual(base['total_transactions'], 1)
+        self.assertEqual(base['total_revenue'], Decimal('139.21'))
+        self.assertEqual(base['total_tax'], Decimal('19.21'))
+        self.assertEqual(base['total_tickets'], 3)
+        self.assertEqual(sum(day['tickets'] for day in report_data['breakdowns']['by_day']), 3)
+        self.assertEqual(report_data['breakdowns']['by_payment_method'], [
+            {'method': 'Cash', 'count': 1, 'amount': 139.21}
+        ])
+    
+    def test_sales_report_reads_partial_hours_from_raw_sales(self):
+        """Test reports cover sales missing from rollups: before a backfill, in partial hours and without items."""
+        from .models import SalesRollup
+        from .rollups import bucket_start
+        
+        hour = bucket_start(timezone.now()) - timezone.timedelta(hours=3)
+        
+        def sell(completed_at, items=()):
+            transaction = Transaction.objects.create(
+                tenant=self.tenant,
+                event=self.event,
+                customer=self.customer,
+                status=Transaction.Status.COMPLETED,
+                subtotal_amount=Decimal('110.00'),
+                tax_amount=Decimal('11.00'),
+                total_amount=Decimal('121.00'),
+                completed_at=completed_at
+            )
+            for quantity, price in items:
+                TransactionItem.objects.create(
+                    tenant=self.tenant,
+                    transaction=transaction,
+                    zone=self.zone,
+                    quantity=quantity,
+                    unit_price=price,
+                    subtotal_price=price * quantity,
+                    total_price=price * quantity
+                )
+        
+        sell(hour + timezone.timedelta(minutes=10), [(1, Decimal('40.00')), (1, Decimal('70.00'))])
+        sell(hour + timezone.timedelta(minutes=50))
+        sell(hour + timezone.timedelta(hours=1, minutes=30), [(2, Decimal('55.00'))])
+        
+        filters = {
+            'start_date': hour + timezone.timedelta(minutes=30),
+            'end_date': hour + timezone.timedelta(hours=1, minutes=45),
+        }
+        
+        # No rollups yet: everything is read from raw sales
+        self.assertFalse(SalesRollup.objects.all_tenants().filter(tenant=self.tenant).exists())
+        everything = ReportService.generate_sales_report_data(self.tenant)['base_statistics']
+        self.assertEqual(everything['total_transactions'], 3)
+        self.assertEqual(everything['total_tickets'], 4)
+        self.assertEqual(everything['average_ticket_price'], Decimal('110.00') * 2 / 3)
+        
+        # Rollups cover whole hours only; the ends of the range come from raw sales
+        from .rollups import sales_rollups
+        sales_rollups.backfill(tenant=self.tenant, start=hour, end=hour + timezone.timedelta(hours=2))
+        self.assertTrue(SalesRollup.objects.all_tenants().filter(tenant=self.tenant, zone__isnull=True).exists())
+        
+        report_data = ReportService.generate_sales_report_data(self.tenant, filters)
+        base = report_data['base_statistics']
+        self.assertEqual(base['total_transactions'], 2)
+        self.assertEqual(base['total_revenue'], Decimal('242.00'))
+        self.assertEqual(base['total_tickets'], 2)
+        self.assertEqual(base['average_ticket_price'], Decimal('110.00'))
+        self.assertEqual(report_data['breakdowns']['by_event'][0]['transactions'], 2)
+        self.assertEqual(report_data['breakdowns']['by_zone'][0]['tickets'], 2)
+        
+        # A range within a single hour
+        within = ReportService.generate_sales_report_data(self.tenant, {
+            'start_date': hour,
+            'end_date': hour + timezone.timedelta(minutes=20),
+        })['base_statistics']
+        self.assertEqual(within['total_transactions'], 1)
+    
+    def test_occupancy_heat_map_uses_grouped_queries(self):
+        """Test heat maps read sales per zone in one grouped query."""
+        from venezuelan_pos.apps.zones.models import Seat
+        
+        zone = Zone.objects.create(
+            tenant=self.tenant,
+            event=self.event,
+            name="Numbered Zone",
+            zone_type=Zone.ZoneType.NUMBERED,
+            rows=2,
+            seats_per_row=3,
+            capacity=6,
+            base_price=Decimal('50.00')
+        )
+        front_seat = Seat.objects.get(zone=zone, row_number=1, seat_number=1)
+        front_seat.price_modifier = Decimal('10.00')
+        front_seat.save()
+        back_seat = Seat.objects.get(zone=zone, row_number=2, seat_number=3)
+        
+        for seat in [front_seat, front_seat, back_seat]:
+            transaction = Transaction.objects.create(
+                tenant=self.tenant,
+                event=self.event,
+                customer=self.customer,
+                status=Transaction.Status.COMPLETED,
+                total_amount=Decimal('50.00'),
+                completed_at=timezone.now()
+            )
+            TransactionItem.objects.create(
+                tenant=self.tenant,
+                transaction=transaction,
+                zone=zone,
+                seat=seat,
+                quantity=1,
+                unit_price=Decimal('50.00'),
+                subtotal_price=Decimal('50.00'),
+                total_price=Decimal('50.00')
+            )
+        
+        with CaptureQueriesContext(connection) as queries:
+            heat_map = ReportService.generate_occupancy_heat_map(zone, self.event)
+        
+        sales_queries = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and 'transaction_items' in query['sql']
+        ]
+        self.assertEqual(len(sales_queries), 1)
+        
+        front = heat_map['grid']['1']['1']
+        self.assertEqual(front['price'], 55.0)
+        self.assertEqual(front['sales_count'], 2)
+        self.assertEqual(front['total_revenue'], 100.0)
+        self.assertEqual(front['popularity_score'], 100.0)
+        self.assertEqual(front['demand_level'], 'very_high')
+        
+        # Scores are normalized against the busiest seat, not a running max
+        back = heat_map['grid']['2']['3']
+        self.assertEqual(back['popularity_score'], 50.0)
+        self.assertEqual(back['demand_level'], 'medium')
+        self.assertEqual(heat_map['summary']['total_sold'], 3)
+        self.assertEqual(heat_map['summary']['most_popular_row'], 1)
+        
+        # Cached heat maps keep their grid keys and follow seat status changes
+        from django.core.cache import cache
+        from django.test import override_settings
+        with override_settings(CACHES={'default': {'BACKEND': 'venezuelan_pos.core.cache_backends.JSONLocMemCache'}}):
+            ReportService.generate_occupancy_heat_map(zone, self.event)
+            with CaptureQueriesContext(connection) as queries:
+                cached = ReportService.generate_occupancy_heat_map(zone, self.event)
+            self.assertEqual(len(queries.captured_queries), 0)
+            self.assertEqual(cached['grid']['1']['1']['sales_count'], 2)
+            
+            back_seat.status = Seat.Status.RESERVED
+            back_seat.save()
+            cached = ReportService.generate_occupancy_heat_map(zone, self.event)
+            self.assertEqual(cached['grid']['2']['3']['status'], Seat.Status.RESERVED)
+            self.assertEqual(cached['grid']['2']['3']['sales_count'], 1)
+            cache.clear()
+    
+    def test_zone_metrics_use_grouped_time_series(self):
+        """Test zone rankings and trends cost a fixed number of sales queries."""
+        zones = [self.zone] + [
+            Zone.objects.create(
+                tenant=self.tenant,
+                event=self.event,
+                name=f"Zone {index}",
+                zone_type=Zone.ZoneType.GENERAL,
+                capacity=100,
+                base_price=Decimal('50.00')
+            )
+            for index in range(3)
+        ]
+        
+        for days_ago, zone, quantity in [(0, zones[0], 4), (2, zones[0], 2), (2, zones[1], 1)]:
+            transaction = Transaction.objects.create(
+                tenant=self.tenant,
+                event=self.event,
+                customer=self.customer,
+                status=Transaction.Status.COMPLETED,
+                total_amount=Decimal('50.00') * quantity,
+                completed_at=timezone.now() - timezone.timedelta(days=days_ago)
+            )
+            TransactionItem.objects.create(
+                tenant=self.tenant,
+                transaction=transaction,
+                zone=zone,
+                quantity=quantity,
+                unit_price=Decimal('50.00'),
+                subtotal_price=Decimal('50.00') * quantity,
+                total_price=Decimal('50.00') * quantity
+            )
+        
+        with CaptureQueriesContext(connection) as queries:
+            ranking = ReportService.generate_zone_popularity_ranking(event=self.event, tenant=self.tenant)
+        
+        sales_queries = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and 'transaction_items' in query['sql']
+        ]
+        self.assertEqual(len(sales_queries), 1)
+        self.assertEqual(ranking['summary']['total_zones'], 4)
+        self.assertEqual(ranking['ranking'][0]['zone_id'], str(zones[0].id))
+        self.assertEqual(ranking['summary']['total_sold'], 7)
+        
+        metrics = ReportService.calculate_zone_performance_metrics(zones[0])
+        self.assertEqual(metrics['recent_sold'], 6)
+        self.assertEqual(len(metrics['daily_sales_pattern']), 7)
+        self.assertEqual(sum(day['sales'] for day in metrics['daily_sales_pattern']), 2)
+        self.assertEqual(sum(metrics['hourly_distribution'].values()), 6)
+        
+        # Days without sales are filled in
+        trends = ReportService.generate_occupancy_trends(zones[0], days=5)
+        self.assertEqual(len(trends['daily_data']), 6)
+        self.assertEqual(trends['daily_data'][-1]['cumulative_sold'], 6)
+        self.assertEqual(trends['summary']['total_tickets_sold'], 6)
+    
+    def test_report_jobs_generate_reports_in_background(self):
+        """Test report jobs are queued, generated by workers and scheduled."""
+        from .jobs import ReportJobService
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            transaction = Transaction.objects.create(
+                tenant=self.tenant,
+                event=self.event,
+                customer=self.customer,
+                status=Transaction.Status.COMPLETED,
+                total_amount=Decimal('100.00'),
+                completed_at=timezone.now()
+            )
+            TransactionItem.objects.create(
+                tenant=self.tenant,
+                transaction=transaction,
+                zone=self.zone,
+                quantity=2,
+                unit_price=Decimal('50.00'),
+                subtotal_price=Decimal('100.00'),
+                total_price=Decimal('100.00')
+            )
+        
+        with self.captureOnCommitCallbacks() as callbacks:
+            job = ReportJobService.enqueue_sales_report(
+                tenant=self.tenant,
+                report_type=SalesReport.ReportType.CUSTOM,
+                name="Background Report",
+                filters={
+                    'start_date': timezone.now() - timezone.timedelta(days=1),
+                    'end_date': timezone.now() + timezone.timedelta(hours=1)
+                },
+                requested_by=self.user
+            )
+        
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(job.status, ReportJob.Status.QUEUED)
+        self.assertEqual(job.report.status, SalesReport.Status.GENERATING)
+        
+        job = ReportJobService.run(job.id)
+        self.assertEqual(job.status, ReportJob.Status.COMPLETED)
+        self.assertEqual(job.progress, 100)
+        self.assertLess(len(job.result), job.result_size)
+        self.assertEqual(job.get_result()['base_statistics']['total_tickets'], 2)
+        self.assertEqual(sum(day['tickets'] for day in job.get_result()['breakdowns']['by_day']), 2)
+        
+        report = SalesReport.objects.get(id=job.report_id)
+        self.assertTrue(report.is_completed)
+        self.assertEqual(report.total_revenue, Decimal('100.00'))
+        
+        # The report stores a summary; breakdowns are read from the job
+        self.assertEqual(report.detailed_data['result_job_id'], str(job.id))
+        self.assertNotIn('breakdowns', report.detailed_data)
+        self.assertEqual(report.full_detailed_data, job.get_result())
+        
+        # A job runs only once
+        self.assertIsNone(ReportJobService.run(job.id))
+        
+        # Jobs lost with their worker are failed by the sweep
+        stuck = ReportJobService.enqueue_sales_report(
+            tenant=self.tenant,
+            report_type=SalesReport.ReportType.CUSTOM,
+            name="Stuck Report"
+        )
+        ReportJob.objects.filter(id=stuck.id).update(
+            status=ReportJob.Status.RUNNING,
+            started_at=timezone.now() - ReportJobService.RUNNING_TIMEOUT - timezone.timedelta(minutes=1)
+        )
+        self.assertEqual(ReportJobService.fail_stuck_jobs(), 1)
+        stuck.refresh_from_db()
+        self.assertEqual(stuck.status, ReportJob.Status.FAILED)
+        self.assertEqual(stuck.report.status, SalesReport.Status.FAILED)
+        self.assertEqual(ReportJobService.fail_stuck_jobs(), 0)
+        
+        schedule = ReportSchedule.objects.create(
+            tenant=self.tenant,
+            name="Daily Sales",
+            report_type=SalesReport.ReportType.DAILY,
+            frequency=ReportSchedule.Frequency.DAILY,
+            next_run=timezone.now() - timezone.timedelta(days=3, minutes=5),
+            created_by=self.user
+        )
+        
+        # Runs missed for days still enqueue a single job
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertEqual(ReportJobService.enqueue_due_schedules(), 1)
+        
+        self.assertEqual(len(callbacks), 1)
+        schedule.refresh_from_db()
+        self.assertGreater(schedule.next_run, timezone.now())
+        self.assertEqual(schedule.jobs.count(), 1)
+        self.assertEqual(ReportJobService.enqueue_due_schedules(), 0)
+    
+    def test_dashboard_snapshots(self):
+        """Test dashboard snapshots are cached and refreshed once per burst of sales."""
+        from unittest import mock
+        from django.core.cache import cache
+        from django.test import override_settings
+        from venezuelan_pos.apps.events.optimizations import EventQueryOptimizer
+        from .dashboards import dashboard_snapshots
+        
+        def sell(amount):
+            transaction = Transaction.objects.create(
+                tenant=self.tenant,
+                event=self.event,
+                customer=self.customer,
+                status=Transaction.Status.COMPLETED,
+                total_amount=amount,
+                completed_at=timezone.now()
+            )
+            TransactionItem.objects.create(
+                tenant=self.tenant,
+                transaction=transaction,
+                zone=self.zone,
+                quantity=2,
+                unit_price=amount / 2,
+                subtotal_price=amount,
+                total_price=amount
+            )
+        
+        with override_settings(CACHES={'default': {'BACKEND': 'venezuelan_pos.core.cache_backends.JSONLocMemCache'}}):
+            sell(Decimal('100.00'))
+            cache.clear()
+            
+            snapshot = dashboard_snapshots.get_tenant_snapshot(self.tenant)
+            self.assertEqual(snapshot['today_sales'], 1)
+            self.assertEqual(snapshot['today_revenue'], Decimal('100.00'))
+            self.assertEqual(snapshot['total_users'], 1)
+            
+            # Served from cache until refreshed
+            with self.assertNumQueries(0):
+                self.assertEqual(dashboard_snapshots.get_tenant_snapshot(self.tenant)['as_of'], snapshot['as_of'])
+            
+            # A burst of sales schedules one refresh per snapshot
+            with mock.patch('venezuelan_pos.apps.reports.tasks.refresh_dashboard_snapshot.apply_async') as apply_async:
+                with self.captureOnCommitCallbacks(execute=True):
+                    sell(Decimal('60.00'))
+                    sell(Decimal('40.00'))
+            
+            scheduled = sorted(call.kwargs['args'][0] + ':' + call.kwargs['args'][1] for call in apply_async.call_args_list)
+            self.assertEqual(scheduled, sorted([
+                f'tenant:{self.tenant.id}', 'tenant:all', f'event:{self.event.id}'
+            ]))
+            
+            # Refreshes wait until the reporting database has caught up
+            self.assertTrue(all(call.kwargs['countdown'] >= 30 for call in apply_async.call_args_list))
+            
+            # Only snapshots someone has viewed are rebuilt
+            self.assertIsNone(dashboard_snapshots.refresh('event', str(self.event.id)))
+            refreshed = dashboard_snapshots.refresh('tenant', self.tenant.id)
+            self.assertEqual(refreshed['today_sales'], 3)
+            self.assertEqual(dashboard_snapshots.get_tenant_snapshot(self.tenant), refreshed)
+            
+            metrics = EventQueryOptimizer.get_event_performance_metrics(self.event)
+            self.assertEqual(metrics['sales']['total_revenue'], Decimal('200.00'))
+            self.assertEqual(metrics['sales']['total_tickets'], 6)
+            self.assertEqual(metrics['capacity']['total_capacity'], 100)
+            
+            # Snapshots read back from the cache keep their types
+            cached = dashboard_snapshots.get_event_snapshot(self.event)
+            self.assertEqual(cached['sales']['total_revenue'], Decimal('200.00'))
+            self.assertEqual(cached['as_of'].isoformat(), metrics['last_updated'])
+            
+            # A cache outage does not fail sales
+            with mock.patch.object(cache, 'add', side_effect=ConnectionError("Redis is down")):
+                sell(Decimal('10.00'))
+            cache.clear()
+    
+    def test_analytics_snapshots(self):
+        """Test columnar snapshots are partitioned and only write changed rows."""
+        import tempfile
+        from pathlib import Path
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+        from .snapshots import AnalyticsSnapshotService
+        
+        transaction = Transaction.objects.create(
+            tenant=self.tenant,
+            event=self.event,
+            customer=self.customer,
+            status=Transaction.Status.PENDING,
+            total_amount=Decimal('100.00')
+        )
+        TransactionItem.objects.create(
+            tenant=self.tenant,
+            transaction=transaction,
+            zone=self.zone,
+            quantity=2,
+            unit_price=Decimal('50.00'),
+            subtotal_price=Decimal('100.00'),
+            total_price=Decimal('100.00')
+        )
+        now = timezone.now() + timezone.timedelta(minutes=5)
+        
+        with tempfile.TemporaryDirectory() as root:
+            service = AnalyticsSnapshotService(root, 'parquet')
+            stats = service.run(['transactions', 'items'], tenants=[self.tenant], now=now)
+            self.assertEqual(stats, {'transactions': 1, 'items': 1})
+            
+            partition = (
+                Path(root) / 'transactions' / f'tenant={self.tenant.id}'
+                / f'date={timezone.localdate(transaction.created_at).isoformat()}'
+            )
+            table = pyarrow.parquet.read_table(next(partition.glob('*.parquet')))
+            self.assertEqual(table.column('id').to_pylist(), [str(transaction.id)])
+            self.assertEqual(table.column('total_amount').to_pylist(), [Decimal('100.00')])
+            self.assertEqual(table.column('event').to_pylist(), ['Test Event'])
+            
+            # Nothing changed since the last watermark
+            stats = service.run(['transactions', 'items'], tenants=[self.tenant], now=now + timezone.timedelta(minutes=5))
+            self.assertEqual(stats, {'transactions': 0, 'items': 0})
+            
+            # A changed row is written again in a new part
+            Transaction._base_manager.filter(id=transaction.id).update(
+                status=Transaction.Status.COMPLETED,
+                updated_at=now + timezone.timedelta(minutes=6)
+            )
+            stats = service.run(['transactions'], tenants=[self.tenant], now=now + timezone.timedelta(minutes=10))
+            self.assertEqual(stats, {'transactions': 1})
+            
+            parts = sorted(partition.glob('*.parquet'))
+            self.assertEqual(len(parts), 2)
+            self.assertEqual(pyarrow.parquet.read_table(parts[-1]).column('status').to_pylist(), ['completed'])
+            self.assertEqual(list(partition.glob('.*.tmp')), [])
+            
+            # Arrow IPC files carry the same columns
+            arrow_root = Path(root) / 'arrow'
+            AnalyticsSnapshotService(arrow_root, 'arrow').run(['items'], tenants=[self.tenant], now=now)
+            arrow_file = next((arrow_root / 'items').rglob('*.arrow'))
+            with pyarrow.OSFile(str(arrow_file)) as source:
+                items = pyarrow.ipc.open_file(source).read_all()
+            self.assertEqual(items.column('quantity').to_pylist(), [2])
+            self.assertEqual(items.column('transaction').to_pylist(), [str(transaction.id)])
+    
+    def test_streaming_exports(self):
+        """Test datasets stream as CSV, JSON, gzip and XLSX with column selection."""
+        import gzip
+        import io
+        import json
+        import zipfile
+        from .exports import DATASETS, export_queryset
+        
+        for index in range(3):
+            Transaction.objects.create(
+                tenant=self.tenant,
+                event=self.event,
+                customer=self.customer,
+                status=Transaction.Status.COMPLETED,
+                total_amount=Decimal('10.00') * (index + 1),
+                completed_at=timezone.now()
+            )
+        
+        dataset = DATASETS['transactions']
+        queryset = dataset.get_queryset(self.tenant, {'event_id': self.event.id})
+        
+        response = export_queryset(dataset, queryset, 'csv', columns=['id', 'total_amount'])
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(lines[0], 'Transaction ID,Total')
+        self.assertEqual([line.split(',')[1] for line in lines[1:]], ['10.00', '20.00', '30.00'])
+        
+        response = export_queryset(dataset, queryset, 'json', columns=['status'], gzip=True)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        rows = json.loads(gzip.decompress(b''.join(response.streaming_content)))
+        self.assertEqual(rows, [{'status': 'completed'}] * 3)
+        
+        response = export_queryset(dataset, queryset, 'xlsx')
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        sheet = archive.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        self.assertEqual(sheet.count('<row>'), 4)
+        self.assertIn('<v>30.00</v>', sheet)
+        
+        with self.assertRaises(ValueError):
+            dataset.resolve_columns(['password'])
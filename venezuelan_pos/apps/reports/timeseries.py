@@ -0,0 +1,199 @@
+"""
+Grouped sales time series.
+Sales of many zones are bucketed by day or hour with a single grouped query
+(TruncDay/TruncHour), and empty buckets are filled in afterwards in Python,
+so trend and velocity metrics cost a fixed number of queries no matter how
+many zones or days they cover.
+"""
+
+from datetime import datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Tuple
+
+from django.db.models import Q, Sum
+from django.db.models.functions import ExtractHour, TruncDay, TruncHour
+from django.utils import timezone
+
+TRUNCATIONS = {
+    'day': (TruncDay, timedelta(days=1)),
+    'hour': (TruncHour, timedelta(hours=1)),
+}
+
+
+def _day_start(day) -> datetime:
+    """Aware start of a local calendar day."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def fill_gaps(buckets: Dict[datetime, Dict], start: datetime, end: datetime,
+              step: timedelta, empty: Dict) -> List[Dict]:
+    """
+    Expand sparse buckets into a dense series over [start, end).
+    Missing buckets get a copy of `empty`; each entry carries its 'bucket'.
+    """
+    series = []
+    current = start
+    while current < end:
+        values = buckets.get(current)
+        entry = dict(values) if values is not None else dict(empty)
+        entry['bucket'] = current
+        series.append(entry)
+        if step >= timedelta(days=1):
+            # Calendar buckets advance in local wall time
+            current = current + step
+        else:
+            current = current.astimezone(dt_timezone.utc) + step
+    return series
+
+
+class SalesTimeSeries:
+    """
+    Completed sales of a set of zones, queried as grouped aggregates.
+
+    Usage:
+        series = SalesTimeSeries(zones, event)
+        buckets = series.buckets('day', start, end)
+        totals, daily, hourly = series.performance_totals(
+            period_start, previous_start, first_day, last_day
+        )
+    """
+
+    def __init__(self, zones: Iterable, event=None):
+        self.zone_ids = [zone.id for zone in zones]
+        self.event = event
+
+    def items(self):
+        """Completed transaction items of the zones."""
+        from venezuelan_pos.apps.sales.models import TransactionItem
+
+        items = TransactionItem.objects.filter(
+            zone_id__in=self.zone_ids,
+            transaction__status='completed'
+        )
+        if self.event:
+            items = items.filter(transaction__event=self.event)
+        return items
+
+    def buckets(self, truncation: str, start: datetime, end: datetime) -> Dict:
+        """
+        Tickets and revenue per zone and bucket in [start, end), in one query.
+
+        Returns:
+            dict: {zone_id: {bucket_start: {'tickets': int, 'revenue': Decimal}}}
+        """
+        trunc, _ = TRUNCATIONS[truncation]
+        rows = self.items().filter(
+            transaction__completed_at__gte=start,
+            transaction__completed_at__lt=end
+        ).annotate(
+            bucket=trunc('transaction__completed_at')
+        ).values('zone_id', 'bucket').annotate(
+            tickets=Sum('quantity'),
+            revenue=Sum('total_price')
+        ).order_by()
+
+        result = {zone_id: {} for zone_id in self.zone_ids}
+        for row in rows:
+            result[row['zone_id']][row['bucket']] = {
+                'tickets': row['tickets'] or 0,
+                'revenue': row['revenue'] or Decimal('0.00'),
+            }
+        return result
+
+    def series(self, truncation: str, start: datetime, end: datetime) -> Dict[str, List[Dict]]:
+        """Dense per-zone series over [start, end) with empty buckets filled in."""
+        _, step = TRUNCATIONS[truncation]
+        empty = {'tickets': 0, 'revenue': Decimal('0.00')}
+        return {
+            zone_id: fill_gaps(zone_buckets, start, end, step, empty)
+            for zone_id, zone_buckets in self.buckets(truncation, start, end).items()
+        }
+
+    def daily_series(self, first_day, last_day) -> Dict[str, List[Dict]]:
+        """Dense per-zone series of local calendar days first_day..last_day."""
+        return self.series('day', _day_start(first_day), _day_start(last_day + timedelta(days=1)))
+
+    def performance_totals(self, period_start: datetime, previous_start: datetime,
+                           first_day, last_day) -> Tuple[Dict, Dict, Dict]:
+        """
+        Everything zone performance metrics read, per zone, in one query of
+        conditional aggregates:
+        - all-time, current period ([period_start, now)) and previous period
+          ([previous_start, period_start)) totals
+        - a dense series of local calendar days first_day..last_day
+        - tickets per hour of day (UTC) since period_start
+
+        Returns:
+            tuple: (totals, daily, hourly), where totals is
+            {zone_id: {'total_sold': ..., 'recent_revenue': ...}}, daily is
+            {zone_id: [{'bucket', 'tickets', 'revenue'}]} and hourly is
+            {zone_id: {hour: tickets}}
+        """
+        recent = Q(transaction__completed_at__gte=period_start)
+        previous = Q(
+            transaction__completed_at__gte=previous_start,
+            transaction__completed_at__lt=period_start
+        )
+        aggregates = {
+            'total_sold': Sum('quantity'),
+            'total_revenue': Sum('total_price'),
+            'recent_sold': Sum('quantity', filter=recent),
+            'recent_revenue': Sum('total_price', filter=recent),
+            'previous_sold': Sum('quantity', filter=previous),
+            'previous_revenue': Sum('total_price', filter=previous),
+        }
+
+        days = []
+        day = first_day
+        while day <= last_day:
+            days.append(_day_start(day))
+            day += timedelta(days=1)
+        for index, start in enumerate(days):
+            window = Q(
+                transaction__completed_at__gte=start,
+                transaction__completed_at__lt=_day_start(start.date() + timedelta(days=1))
+            )
+            aggregates[f'day_{index}_tickets'] = Sum('quantity', filter=window)
+            aggregates[f'day_{index}_revenue'] = Sum('total_price', filter=window)
+
+        for hour in range(24):
+            aggregates[f'hour_{hour}'] = Sum('quantity', filter=recent & Q(hour=hour))
+
+        rows = self.items().annotate(
+            hour=ExtractHour('transaction__completed_at', tzinfo=dt_timezone.utc)
+        ).values('zone_id').annotate(**aggregates).order_by()
+
+        empty = {
+            'total_sold': 0, 'total_revenue': Decimal('0.00'),
+            'recent_sold': 0, 'recent_revenue': Decimal('0.00'),
+            'previous_sold': 0, 'previous_revenue': Decimal('0.00'),
+        }
+        totals = {zone_id: dict(empty) for zone_id in self.zone_ids}
+        daily = {
+            zone_id: [{'tickets': 0, 'revenue': Decimal('0.00'), 'bucket': start} for start in days]
+            for zone_id in self.zone_ids
+        }
+        hourly = {zone_id: {} for zone_id in self.zone_ids}
+
+        for row in rows:
+            zone_id = row['zone_id']
+            totals[zone_id] = {
+                key: row[key] if row[key] is not None else default
+                for key, default in empty.items()
+            }
+            daily[zone_id] = [
+                {
+                    'tickets': row[f'day_{index}_tickets'] or 0,
+                    'revenue': row[f'day_{index}_revenue'] or Decimal('0.00'),
+                    'bucket': start,
+                }
+                for index, start in enumerate(days)
+            ]
+            hourly[zone_id] = {
+                hour: row[f'hour_{hour}']
+                for hour in range(24)
+                if row[f'hour_{hour}'] is not None
+            }
+
+        return totals, daily, hourly
@@ -1,16 +1,20 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import SalesReportViewSet, OccupancyAnalysisViewSet, ReportScheduleViewSet
+from .views import (
+    SalesReportViewSet, OccupancyAnalysisViewSet, ReportScheduleViewSet, ReportJobViewSet, DataExportView
+)
 
 # Create router for API endpoints
 router = DefaultRouter()
 router.register(r'sales-reports', SalesReportViewSet, basename='salesreport')
 router.register(r'occupancy-analysis', OccupancyAnalysisViewSet, basename='occupancyanalysis')
 router.register(r'schedules', ReportScheduleViewSet, basename='reportschedule')
+router.register(r'jobs', ReportJobViewSet, basename='reportjob')
 
 app_name = 'reports'
 
 urlpatterns = [
     # API endpoints
     path('api/', include(router.urls)),
+    path('api/exports/<str:dataset>/', DataExportView.as_view(), name='data_export'),
 ]
\ No newline at end of file
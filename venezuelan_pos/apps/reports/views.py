@@ -1,23 +1,27 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.http import HttpResponse
+from rest_framework.views import APIView
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponse
 from django.utils import timezone
 from django.db.models import Q
-from .models import SalesReport, OccupancyAnalysis, ReportSchedule
+from venezuelan_pos.core.db_router import with_reporting_db
+from .models import SalesReport, OccupancyAnalysis, ReportSchedule, ReportJob
 from .serializers import (
     SalesReportSerializer,
     SalesReportCreateSerializer,
     OccupancyAnalysisSerializer,
     OccupancyAnalysisCreateSerializer,
     ReportScheduleSerializer,
+    ReportJobSerializer,
     ReportExportSerializer,
+    DataExportSerializer,
     HeatMapDataSerializer
 )
 from venezuelan_pos.apps.tenants.mixins import TenantViewMixin
-import json
-import csv
-import io
+from .exports import DATASETS, accepts_gzip, export_queryset, stream_response, write_csv
+from .jobs import ReportJobService
 
 
 class SalesReportViewSet(TenantViewMixin, viewsets.ModelViewSet):
@@ -70,9 +74,13 @@ class SalesReportViewSet(TenantViewMixin, viewsets.ModelViewSet):
         
         return queryset.select_related('generated_by').order_by('-created_at')
     
-    def perform_create(self, serializer):
-        """Set tenant when creating report."""
-        serializer.save()
+    def create(self, request, *args, **kwargs):
+        """Enqueue report generation and return the job to poll."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = serializer.save()
+        
+        return Response(ReportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
     
     @action(detail=True, methods=['post'])
     def export(self, request, pk=None):
@@ -117,22 +125,18 @@ class SalesReportViewSet(TenantViewMixin, viewsets.ModelViewSet):
         
         if include_details:
             data['filters'] = report.filters
-            data['detailed_data'] = report.detailed_data
+            data['detailed_data'] = report.full_detailed_data
         
-        response = HttpResponse(
-            json.dumps(data, indent=2),
-            content_type='application/json'
+        return stream_response(
+            DjangoJSONEncoder(indent=2).iterencode(data),
+            'json',
+            f'report_{report.id}',
+            gzip=accepts_gzip(self.request)
         )
-        response['Content-Disposition'] = f'attachment; filename="report_{report.id}.json"'
-        return response
     
     def _export_csv(self, report, include_details):
         """Export report as CSV."""
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write header
-        writer.writerow([
+        headers = [
             'Report ID',
             'Name',
             'Type',
@@ -144,26 +148,27 @@ class SalesReportViewSet(TenantViewMixin, viewsets.ModelViewSet):
             'Average Ticket Price',
             'Generated At',
             'Generated By'
-        ])
-        
-        # Write data
-        writer.writerow([
+        ]
+        row = [
             str(report.id),
             report.name,
             report.get_report_type_display(),
-            report.period_start.strftime('%Y-%m-%d %H:%M:%S') if report.period_start else '',
-            report.period_end.strftime('%Y-%m-%d %H:%M:%S') if report.period_end else '',
+            report.period_start,
+            report.period_end,
             report.total_transactions,
             float(report.total_revenue),
             report.total_tickets,
             float(report.average_ticket_price),
-            report.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+            report.created_at,
             report.generated_by.get_full_name() if report.generated_by else ''
-        ])
+        ]
         
-        response = HttpResponse(output.getvalue(), content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="report_{report.id}.csv"'
-        return response
+        return stream_response(
+            write_csv(headers, [row]),
+            'csv',
+            f'report_{report.id}',
+            gzip=accepts_gzip(self.request)
+        )
     
     def _export_pdf(self, report, include_details):
         """Export report as PDF."""
@@ -189,6 +194,7 @@ Generated By: {report.generated_by.get_full_name() if report.generated_by else '
         return response
     
     @action(detail=False, methods=['get'])
+    @with_reporting_db
     def summary(self, request):
         """Get summary statistics for reports."""
         queryset = self.get_queryset()
@@ -261,6 +267,7 @@ class OccupancyAnalysisViewSet(TenantViewMixin, viewsets.ModelViewSet):
         serializer.save()
     
     @action(detail=False, methods=['post'])
+    @with_reporting_db
     def heat_map(self, request):
         """Generate heat map data for a zone."""
         serializer = HeatMapDataSerializer(data=request.data, context={'request': request})
@@ -310,6 +317,7 @@ class OccupancyAnalysisViewSet(TenantViewMixin, viewsets.ModelViewSet):
         return heat_map_data
     
     @action(detail=False, methods=['get'])
+    @with_reporting_db
     def performance_ranking(self, request):
         """Get performance ranking of zones."""
         event_id = request.query_params.get('event_id')
@@ -343,6 +351,7 @@ class OccupancyAnalysisViewSet(TenantViewMixin, viewsets.ModelViewSet):
         return Response(ranking_data)
     
     @action(detail=False, methods=['post'])
+    @with_reporting_db
     def zone_metrics(self, request):
         """Get detailed performance metrics for a specific zone."""
         zone_id = request.data.get('zone_id')
@@ -391,6 +400,7 @@ class OccupancyAnalysisViewSet(TenantViewMixin, viewsets.ModelViewSet):
         return Response(metrics)
     
     @action(detail=False, methods=['post'])
+    @with_reporting_db
     def occupancy_trends(self, request):
         """Get occupancy trends for a zone over time."""
         zone_id = request.data.get('zone_id')
@@ -425,6 +435,7 @@ class OccupancyAnalysisViewSet(TenantViewMixin, viewsets.ModelViewSet):
         return Response(trends)
     
     @action(detail=False, methods=['post'])
+    @with_reporting_db
     def comparative_analysis(self, request):
         """Generate comparative analysis across multiple zones."""
         zone_ids = request.data.get('zone_ids', [])
@@ -519,17 +530,12 @@ class ReportScheduleViewSet(TenantViewMixin, viewsets.ModelViewSet):
             )
         
         try:
-            report = schedule.execute()
-            if report:
-                return Response({
-                    'message': 'Schedule executed successfully',
-                    'report_id': str(report.id)
-                })
-            else:
-                return Response(
-                    {'error': 'Schedule execution failed'},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
+            job = ReportJobService.enqueue_schedule(schedule)
+            return Response({
+                'message': 'Schedule report queued',
+                'report_id': str(job.report_id),
+                'job_id': str(job.id)
+            }, status=status.HTTP_202_ACCEPTED)
         except Exception as e:
             return Response(
                 {'error': f'Execution failed: {str(e)}'},
@@ -566,4 +572,72 @@ class ReportScheduleViewSet(TenantViewMixin, viewsets.ModelViewSet):
         return Response({
             'count': due_schedules.count(),
             'schedules': serializer.data
-        })
\ No newline at end of file
+        })
+
+
+class ReportJobViewSet(TenantViewMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet for background report jobs.
+    Clients poll a job for progress and fetch its result once completed.
+    """
+    
+    queryset = ReportJob.objects.all()
+    serializer_class = ReportJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        """Filter queryset by tenant and status."""
+        queryset = super().get_queryset()
+        
+        status_filter = self.request.query_params.get('status')
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+        
+        # The compressed result is only loaded by the result action
+        if self.action != 'result':
+            queryset = queryset.defer('result')
+        
+        return queryset.select_related('report').order_by('-created_at')
+    
+    @action(detail=True, methods=['get'])
+    def result(self, request, pk=None):
+        """Get the decompressed result of a completed job."""
+        job = self.get_object()
+        
+        if job.status != ReportJob.Status.COMPLETED:
+            return Response(
+                {'error': 'Report job has not completed', 'status': job.status},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        return Response(job.get_result())
+
+
+class DataExportView(TenantViewMixin, APIView):
+    """
+    Streaming export of transactions, items, payments, tickets or
+    validation logs as CSV, JSON or XLSX, gzip-encoded when accepted.
+    """
+    
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request, dataset):
+        """Stream the tenant's rows of a dataset."""
+        export_dataset = DATASETS.get(dataset)
+        if export_dataset is None:
+            raise Http404(f"Unknown export dataset: {dataset}")
+        
+        serializer = DataExportSerializer(data=request.query_params, context={'dataset': export_dataset})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        params = serializer.validated_data
+        queryset = export_dataset.get_queryset(request.tenant, params)
+        
+        return export_queryset(
+            export_dataset,
+            queryset,
+            file_format=params['file_format'],
+            columns=params.get('columns'),
+            gzip=accepts_gzip(request)
+        )
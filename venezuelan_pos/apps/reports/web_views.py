@@ -10,11 +10,13 @@ from django.views.decorators.csrf import csrf_exempt
 from datetime import datetime, timedelta
 import json
 
+from venezuelan_pos.core.db_router import with_reporting_db
 from .models import SalesReport, OccupancyAnalysis, ReportSchedule
 from .forms import (
     SalesReportForm, OccupancyAnalysisForm, ReportScheduleForm,
     ReportFilterForm, HeatMapConfigForm, CustomReportBuilderForm
 )
+from .jobs import ReportJobService
 from .services import ReportService
 from venezuelan_pos.apps.events.models import Event
 from venezuelan_pos.apps.zones.models import Zone
@@ -22,6 +24,7 @@ from venezuelan_pos.apps.sales.models import Transaction, TransactionItem
 
 
 @login_required
+@with_reporting_db
 def dashboard(request):
     """Reports and analytics dashboard."""
     
@@ -198,28 +201,19 @@ def sales_report_create(request):
             # Get filters from form
             filters = form.get_filters()
             
-            # Create report using manager method
-            report = SalesReport.objects.create_sales_report(
+            # Generate the report in the background
+            job = ReportJobService.enqueue_sales_report(
                 tenant=request.user.tenant,
                 report_type=form.cleaned_data['report_type'],
                 filters=filters,
                 name=form.cleaned_data['name'],
+                requested_by=request.user,
                 period_start=filters.get('start_date'),
-                period_end=filters.get('end_date'),
-                generated_by=request.user
-            )
-            
-            # Generate detailed data
-            detailed_data = ReportService.generate_sales_report_data(
-                tenant=request.user.tenant,
-                filters=filters
+                period_end=filters.get('end_date')
             )
             
-            report.detailed_data = detailed_data
-            report.mark_completed()
-            
-            messages.success(request, f'Reporte "{report.name}" generado exitosamente.')
-            return redirect('reports:sales_report_detail', report_id=report.id)
+            messages.success(request, f'Reporte "{job.report.name}" en cola de generación.')
+            return redirect('reports:sales_report_detail', report_id=job.report_id)
     else:
         form = SalesReportForm(user=request.user)
     
@@ -598,7 +592,7 @@ def report_schedule_execute(request, schedule_id):
     try:
         report = schedule.execute()
         if report:
-            messages.success(request, f'Programación ejecutada exitosamente. Reporte generado: {report.name}')
+            messages.success(request, f'Programación ejecutada exitosamente. Reporte en cola: {report.name}')
         else:
             messages.error(request, 'Error al ejecutar la programación.')
     except Exception as e:
@@ -630,6 +624,7 @@ def report_schedule_toggle_status(request, schedule_id):
 
 
 @login_required
+@with_reporting_db
 def analytics_dashboard(request):
     """Advanced analytics dashboard with real-time metrics."""
     
@@ -737,6 +732,7 @@ def analytics_dashboard(request):
 # AJAX endpoints for real-time data
 
 @login_required
+@with_reporting_db
 def ajax_zone_performance(request):
     """AJAX endpoint for zone performance data."""
     
@@ -766,6 +762,7 @@ def ajax_zone_performance(request):
 
 
 @login_required
+@with_reporting_db
 def ajax_heat_map_data(request):
     """AJAX endpoint for heat map data."""
     
@@ -799,6 +796,7 @@ def ajax_heat_map_data(request):
 
 
 @login_required
+@with_reporting_db
 def ajax_sales_trends(request):
     """AJAX endpoint for sales trends data."""
     
@@ -850,6 +848,7 @@ def ajax_sales_trends(request):
 
 
 @login_required
+@with_reporting_db
 def ajax_real_time_metrics(request):
     """AJAX endpoint for real-time dashboard metrics."""
     
@@ -128,7 +128,7 @@ class TransactionAdmin(admin.ModelAdmin):
             return False
         return super().has_delete_permission(request, obj)
     
-    actions = ['complete_transactions', 'cancel_transactions']
+    actions = ['complete_transactions', 'cancel_transactions', 'export_csv']
     
     def complete_transactions(self, request, queryset):
         """Complete selected pending transactions."""
@@ -163,6 +163,13 @@ class TransactionAdmin(admin.ModelAdmin):
                 f"Successfully cancelled {cancelled} transactions."
             )
     cancel_transactions.short_description = "Cancel selected transactions"
+    
+    def export_csv(self, request, queryset):
+        """Stream selected transactions as CSV."""
+        from venezuelan_pos.apps.reports.exports import DATASETS, export_queryset
+        
+        return export_queryset(DATASETS['transactions'], queryset.order_by('created_at', 'pk'))
+    export_csv.short_description = "Export selected transactions as CSV"
 
 
 @admin.register(TransactionItem)
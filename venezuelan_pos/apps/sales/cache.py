@@ -4,8 +4,10 @@ Provides real-time ticket status caching, seat availability caching,
 and cache invalidation for ticket purchases and payments.
 """
 
+import asyncio
 import json
 import logging
+import time
 from typing import Dict, List, Optional, Any, Union
 from decimal import Decimal
 from datetime import datetime, timedelta
@@ -16,8 +18,12 @@ from django.utils import timezone
 from django.db import transaction
 
 import redis
+import redis.asyncio
+from asgiref.sync import sync_to_async
 from redis.exceptions import ConnectionError, TimeoutError
 
+from venezuelan_pos.core.instrumentation import record_cache_access
+
 from .models import Transaction, TransactionItem, ReservedTicket
 from ..zones.models import Zone, Seat
 from ..events.models import Event
@@ -51,6 +57,7 @@ class SalesCacheService:
         """Initialize the cache service."""
         self.cache = cache
         self._redis_client = None
+        self._async_redis_clients = {}
         
         # Try to get direct Redis client for advanced operations
         try:
@@ -154,7 +161,7 @@ class SalesCacheService:
             }
             
             # Add transaction items
-            for item in transaction.items.all():
+            for item in transaction.items.select_related('zone', 'seat'):
                 item_data = {
                     'id': str(item.id),
                     'zone_id': str(item.zone.id),
@@ -199,10 +206,12 @@ class SalesCacheService:
         key = self._get_cache_key(self.SEAT_AVAILABILITY_PREFIX, seat_id)
         return self._safe_cache_delete(key)
     
-    def cache_seat_availability(self, seat: Seat) -> bool:
+    def cache_seat_availability(self, seat: Seat, reservations: Optional[Dict] = None) -> bool:
         """
         Cache seat availability data.
         Includes status, pricing, and reservation information.
+        Callers caching many seats pass their active reservations by seat id
+        instead of having each seat look its own up.
         """
         try:
             availability_data = {
@@ -219,11 +228,14 @@ class SalesCacheService:
             }
             
             # Check for active reservations
-            active_reservations = ReservedTicket.objects.filter(
-                seat=seat,
-                status=ReservedTicket.Status.ACTIVE,
-                reserved_until__gt=timezone.now()
-            ).first()
+            if reservations is not None:
+                active_reservations = reservations.get(seat.id)
+            else:
+                active_reservations = ReservedTicket.objects.filter(
+                    seat=seat,
+                    status=ReservedTicket.Status.ACTIVE,
+                    reserved_until__gt=timezone.now()
+                ).first()
             
             if active_reservations:
                 availability_data.update({
@@ -304,6 +316,15 @@ class SalesCacheService:
             }
             
             if zone.zone_type == Zone.ZoneType.NUMBERED:
+                # Active reservations of the whole zone in one query
+                reservations = {}
+                for reservation in ReservedTicket.objects.filter(
+                    seat__zone=zone,
+                    status=ReservedTicket.Status.ACTIVE,
+                    reserved_until__gt=timezone.now()
+                ):
+                    reservations.setdefault(reservation.seat_id, reservation)
+                
                 # Cache individual seat data
                 for seat in zone.seats.all():
                     seat_key = f"{seat.row_number}_{seat.seat_number}"
@@ -317,7 +338,7 @@ class SalesCacheService:
                     }
                     
                     # Also cache individual seat
-                    self.cache_seat_availability(seat)
+                    self.cache_seat_availability(seat, reservations)
             
             # Cache zone data
             key = self._get_cache_key(self.ZONE_AVAILABILITY_PREFIX, str(zone.id))
@@ -425,11 +446,11 @@ class SalesCacheService:
         success &= self.invalidate_seat_availability(str(seat.id))
         
         # Invalidate zone cache
-        zone_key = self._get_cache_key(self.ZONE_AVAILABILITY_PREFIX, str(seat.zone.id))
+        zone_key = self._get_cache_key(self.ZONE_AVAILABILITY_PREFIX, str(seat.zone_id))
         success &= self._safe_cache_delete(zone_key)
         
         # Invalidate event cache
-        event_key = self._get_cache_key(self.EVENT_AVAILABILITY_PREFIX, str(seat.zone.event.id))
+        event_key = self._get_cache_key(self.EVENT_AVAILABILITY_PREFIX, str(seat.zone.event_id))
         success &= self._safe_cache_delete(event_key)
         
         return success
@@ -446,13 +467,13 @@ class SalesCacheService:
         success &= self._safe_cache_delete(zone_key)
         
         # Invalidate event cache
-        event_key = self._get_cache_key(self.EVENT_AVAILABILITY_PREFIX, str(zone.event.id))
+        event_key = self._get_cache_key(self.EVENT_AVAILABILITY_PREFIX, str(zone.event_id))
         success &= self._safe_cache_delete(event_key)
         
         # Invalidate all seat caches in this zone
         if zone.zone_type == Zone.ZoneType.NUMBERED:
-            for seat in zone.seats.all():
-                success &= self.invalidate_seat_availability(str(seat.id))
+            for seat_id in zone.seats.values_list('id', flat=True):
+                success &= self.invalidate_seat_availability(str(seat_id))
         
         return success
     
@@ -489,7 +510,7 @@ class SalesCacheService:
             success &= self.invalidate_ticket_status(transaction.fiscal_series)
         
         # Invalidate seat caches for all items
-        for item in transaction.items.all():
+        for item in transaction.items.select_related('seat__zone', 'zone'):
             if item.seat:
                 success &= self.invalidate_seat_caches(item.seat)
             else:
@@ -500,6 +521,28 @@ class SalesCacheService:
     
     # Batch Operations
     
+    def invalidate_availability_many(self, seat_ids=(), zone_ids=(), event_ids=(),
+                                     transaction_ids=()) -> bool:
+        """
+        Invalidate availability caches for many objects in one cache round trip.
+        Used by bulk operations that bypass model signals.
+        """
+        keys = (
+            [self._get_cache_key(self.SEAT_AVAILABILITY_PREFIX, seat_id) for seat_id in seat_ids] +
+            [self._get_cache_key(self.ZONE_AVAILABILITY_PREFIX, zone_id) for zone_id in zone_ids] +
+            [self._get_cache_key(self.EVENT_AVAILABILITY_PREFIX, event_id) for event_id in event_ids] +
+            [self._get_cache_key(self.TRANSACTION_PREFIX, transaction_id) for transaction_id in transaction_ids]
+        )
+        if not keys:
+            return True
+        
+        try:
+            self.cache.delete_many(keys)
+            return True
+        except (ConnectionError, TimeoutError) as e:
+            logger.warning(f"Cache bulk delete failed for {len(keys)} keys: {e}")
+            return False
+    
     def warm_event_caches(self, event: Event) -> bool:
         """
         Warm up all caches for an event.
@@ -544,6 +587,103 @@ class SalesCacheService:
             logger.error(f"Failed to clear all caches: {e}")
             return False
     
+    # Async Access
+    
+    def _get_async_redis_client(self):
+        """
+        redis.asyncio client on the cache's Redis server for the running
+        event loop, or None when the cache is not django-redis.
+        """
+        # django-redis exposes its client, which makes keys and decodes values
+        if not hasattr(self.cache, 'client'):
+            return None
+        
+        loop = asyncio.get_running_loop()
+        client = self._async_redis_clients.get(loop)
+        if client is None:
+            location = settings.CACHES['default']['LOCATION']
+            if isinstance(location, (list, tuple)):
+                location = location[0]
+            pool = redis.asyncio.ConnectionPool.from_url(location, **self._async_redis_pool_kwargs())
+            client = redis.asyncio.Redis(connection_pool=pool)
+            # Connections belong to the loop that opened them
+            self._async_redis_clients = {loop: client}
+        return client
+    
+    @staticmethod
+    def _async_redis_pool_kwargs() -> Dict[str, Any]:
+        """
+        Connection pool settings of the default cache's OPTIONS, read the
+        way django-redis reads them: pool size, retries and socket
+        timeouts. Sync-only objects (retry policies, connection and
+        parser classes) do not carry over to redis.asyncio and are left out.
+        """
+        options = settings.CACHES['default'].get('OPTIONS', {})
+        
+        kwargs = {
+            key: value
+            for key, value in options.get('CONNECTION_POOL_KWARGS', {}).items()
+            if key not in ('retry', 'connection_class', 'parser_class')
+        }
+        if options.get('SOCKET_TIMEOUT') is not None:
+            kwargs['socket_timeout'] = options['SOCKET_TIMEOUT']
+        if options.get('SOCKET_CONNECT_TIMEOUT') is not None:
+            kwargs['socket_connect_timeout'] = options['SOCKET_CONNECT_TIMEOUT']
+        if options.get('PASSWORD'):
+            kwargs['password'] = options['PASSWORD']
+        return kwargs
+    
+    async def _async_cache_get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Read several keys without blocking the event loop.
+        Goes straight to Redis when available, decoding values the way
+        django-redis stored them; otherwise uses the cache's async API.
+        """
+        if not keys:
+            return {}
+        
+        client = self._get_async_redis_client()
+        try:
+            if client is None:
+                return await self.cache.aget_many(keys)
+            
+            start = time.perf_counter()
+            values = await client.mget([self.cache.client.make_key(key) for key in keys])
+            found = {
+                key: self.cache.client.decode(value)
+                for key, value in zip(keys, values)
+                if value is not None
+            }
+            record_cache_access(
+                hits=len(found), misses=len(keys) - len(found), duration=time.perf_counter() - start
+            )
+            return found
+        except (ConnectionError, TimeoutError) as e:
+            logger.warning(f"Async cache get failed for {len(keys)} keys: {e}")
+            return {}
+    
+    async def aget_ticket_status(self, fiscal_series: str) -> Optional[Dict]:
+        """Async get_ticket_status()."""
+        key = self._get_cache_key(self.TICKET_STATUS_PREFIX, fiscal_series)
+        return (await self._async_cache_get_many([key])).get(key)
+    
+    async def aget_bulk_seat_availability(self, seat_ids: List[str]) -> Dict[str, Dict]:
+        """Cached availability of several seats in one round trip, by seat id."""
+        keys = {
+            self._get_cache_key(self.SEAT_AVAILABILITY_PREFIX, seat_id): seat_id
+            for seat_id in seat_ids
+        }
+        cached = await self._async_cache_get_many(list(keys))
+        return {keys[key]: data for key, data in cached.items() if data}
+    
+    async def aget_zone_seat_availability(self, zone_id: str) -> Optional[Dict]:
+        """Async get_zone_seat_availability(); misses are rebuilt in a worker thread."""
+        key = self._get_cache_key(self.ZONE_AVAILABILITY_PREFIX, zone_id)
+        cached_data = (await self._async_cache_get_many([key])).get(key)
+        if cached_data:
+            return cached_data
+        return await sync_to_async(self.get_zone_seat_availability)(zone_id)
+    
     # Health Check
     
     def health_check(self) -> Dict[str, Any]:
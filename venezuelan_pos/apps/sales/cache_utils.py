@@ -5,7 +5,8 @@ Provides decorators and helper functions for caching with fallback to database.
 
 import functools
 import logging
-from typing import Callable, Any, Optional, Dict
+from typing import Callable, Any, Optional, Dict, List
+from asgiref.sync import sync_to_async
 from django.core.cache import cache
 from django.db import models
 from django.utils import timezone
@@ -190,4 +191,33 @@ def get_ticket_status_cached(fiscal_series: str) -> Optional[Dict]:
         return None
     except Exception as e:
         logger.error(f"Failed to get ticket status for {fiscal_series}: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+async def aget_seat_availability_cached(seat_ids: List[str]) -> Dict[str, Optional[Dict]]:
+    """
+    Async availability of several seats, by seat id.
+    Cached seats are read in one round trip; the rest are loaded and cached
+    in a worker thread. Unknown seats map to None.
+    """
+    results = await sales_cache.aget_bulk_seat_availability(seat_ids)
+    
+    missing = [seat_id for seat_id in seat_ids if seat_id not in results]
+    if missing:
+        loaded = await sync_to_async(
+            lambda: {seat_id: get_seat_availability_cached(seat_id) for seat_id in missing}
+        )()
+        results.update(loaded)
+    
+    return {seat_id: results.get(seat_id) for seat_id in seat_ids}
+
+
+async def aget_ticket_status_cached(fiscal_series: str) -> Optional[Dict]:
+    """
+    Async get_ticket_status_cached(): cache hits never leave the event
+    loop, misses are loaded from the database in a worker thread.
+    """
+    cached_data = await sales_cache.aget_ticket_status(fiscal_series)
+    if cached_data:
+        return cached_data
+    return await sync_to_async(get_ticket_status_cached)(fiscal_series)
@@ -14,13 +14,17 @@ from rest_framework.views import APIView
 
 from django.utils import timezone
 from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from venezuelan_pos.core.async_views import AsyncAPIView, async_api_view
 
 from .cache import sales_cache
 from .cache_utils import (
+    aget_seat_availability_cached,
+    aget_ticket_status_cached,
     get_seat_availability_cached,
     get_zone_availability_cached,
     get_event_availability_cached,
-    get_ticket_status_cached
 )
 from .models import Transaction
 from ..zones.models import Seat, Zone
@@ -29,24 +33,24 @@ from ..events.models import Event
 logger = logging.getLogger(__name__)
 
 
-class TicketValidationAPIView(APIView):
+class TicketValidationAPIView(AsyncAPIView):
     """
     High-performance ticket validation endpoint.
     Uses Redis cache with database fallback for real-time validation.
+    Async: cache hits are served without holding a worker thread.
     """
-    permission_classes = [IsAuthenticated]
     
-    def get(self, request, fiscal_series):
+    async def get(self, request, fiscal_series):
         """
         Validate ticket by fiscal series number.
         Returns cached ticket data or queries database on cache miss.
         """
         try:
             # Get ticket status from cache with database fallback
-            ticket_data = get_ticket_status_cached(fiscal_series)
+            ticket_data = await aget_ticket_status_cached(fiscal_series)
             
             if not ticket_data:
-                return Response({
+                return JsonResponse({
                     'error': 'Ticket not found',
                     'fiscal_series': fiscal_series
                 }, status=status.HTTP_404_NOT_FOUND)
@@ -55,14 +59,14 @@ class TicketValidationAPIView(APIView):
             ticket_data['validated_at'] = timezone.now().isoformat()
             ticket_data['cache_hit'] = True
             
-            return Response({
+            return JsonResponse({
                 'status': 'valid',
                 'ticket': ticket_data
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
             logger.error(f"Ticket validation error for {fiscal_series}: {e}")
-            return Response({
+            return JsonResponse({
                 'error': 'Validation failed',
                 'message': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -227,40 +231,38 @@ class CacheManagementAPIView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def bulk_seat_availability(request):
+@require_GET
+@async_api_view
+async def bulk_seat_availability(request):
     """
     Get availability for multiple seats in a single request.
-    Optimized for seat selection interfaces.
+    Optimized for seat selection interfaces: cached seats are read in one
+    Redis round trip without holding a worker thread.
     """
     try:
         seat_ids = request.GET.get('seat_ids', '').split(',')
         seat_ids = [sid.strip() for sid in seat_ids if sid.strip()]
         
         if not seat_ids:
-            return Response({
+            return JsonResponse({
                 'error': 'seat_ids parameter required'
             }, status=status.HTTP_400_BAD_REQUEST)
         
         if len(seat_ids) > 100:  # Limit to prevent abuse
-            return Response({
+            return JsonResponse({
                 'error': 'Maximum 100 seats per request'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        results = {}
-        for seat_id in seat_ids:
-            availability_data = get_seat_availability_cached(seat_id)
-            results[seat_id] = availability_data
+        results = await aget_seat_availability_cached(seat_ids)
         
-        return Response({
+        return JsonResponse({
             'seats': results,
             'timestamp': timezone.now().isoformat()
         })
         
     except Exception as e:
         logger.error(f"Bulk seat availability error: {e}")
-        return Response({
+        return JsonResponse({
             'error': 'Failed to get bulk seat availability',
             'message': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.14 on 2026-10-18 21:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0001_initial"),
+        ("events", "0003_add_payment_methods_to_event_configuration"),
+        ("sales", "0003_cartitemlock_and_more"),
+        ("tenants", "0002_add_performance_indexes"),
+        ("zones", "0005_zone_map_color"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["tenant", "updated_at"], name="transaction_tenant__973097_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transactionitem",
+            index=models.Index(
+                fields=["tenant", "updated_at"], name="transaction_tenant__776711_idx"
+            ),
+        ),
+    ]
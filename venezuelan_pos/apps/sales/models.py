@@ -160,15 +160,24 @@ class TransactionManager(models.Manager):
             **kwargs
         )
 
+        # Resolve tax rules from the memoized resolver (no queries when cached)
+        from venezuelan_pos.apps.fiscal.tax_resolver import tax_resolver
+        tax_rules = tax_resolver.get_rule_set(tenant.id, event.id if event else None)
+        tax_rate = tax_rules.composite_rate().quantize(Decimal('0.0001'))
+
+        # Transaction taxes are calculated on the whole subtotal, exactly like
+        # TaxCalculationService does for the checkout summary, and shared out
+        # so the items add up to the transaction
+        subtotals = [item_data['unit_price'] * item_data['quantity'] for item_data in items_data]
+        total_tax, item_taxes = tax_rules.allocate(subtotals)
+
         # Bulk create transaction items
         items_to_create = []
         subtotal = Decimal('0.00')
 
-        for item_data in items_data:
+        for item_data, subtotal_price, tax_amount in zip(items_data, subtotals, item_taxes):
             unit_price = item_data['unit_price']
             quantity = item_data['quantity']
-            subtotal_price = unit_price * quantity
-            tax_amount = subtotal_price * Decimal('0.16')  # 16% IVA
             total_price = subtotal_price + tax_amount
 
             subtotal += subtotal_price
@@ -181,7 +190,7 @@ class TransactionManager(models.Manager):
                 quantity=quantity,
                 unit_price=unit_price,
                 subtotal_price=subtotal_price,
-                tax_rate=Decimal('0.1600'),
+                tax_rate=tax_rate,
                 tax_amount=tax_amount,
                 total_price=total_price,
                 item_type=TransactionItem.ItemType.NUMBERED_SEAT if item_data.get('seat') else TransactionItem.ItemType.GENERAL_ADMISSION
@@ -190,14 +199,10 @@ class TransactionManager(models.Manager):
         # Bulk create all items at once
         TransactionItem.objects.bulk_create(items_to_create)
 
-        # Calculate totals from items
-        total_tax = sum(item.tax_amount for item in items_to_create)
-        total_amount = sum(item.total_price for item in items_to_create)
-
         # Update totals
         transaction_obj.subtotal_amount = subtotal
         transaction_obj.tax_amount = total_tax
-        transaction_obj.total_amount = total_amount
+        transaction_obj.total_amount = subtotal + total_tax
         transaction_obj.save(update_fields=['subtotal_amount', 'tax_amount', 'total_amount'])
 
         return transaction_obj
@@ -222,15 +227,20 @@ class TransactionManager(models.Manager):
         transaction_obj.completed_at = timezone.now()
         transaction_obj.save(update_fields=['fiscal_series', 'status', 'completed_at'])
         
+        # Update fiscal day ledger (critical operation, same DB transaction)
+        from venezuelan_pos.apps.fiscal.services import FiscalLedgerService
+        FiscalLedgerService.record_transaction_completion(transaction_obj)
+        
         # Note: Seat status updates and notifications moved to calling function
         # for better control and performance
         
         return transaction_obj
 
-    def complete_transaction(self, transaction_obj):
+    def complete_transaction(self, transaction_obj, notify=True):
         """
         Complete a transaction by generating fiscal series.
         Only called when payment is fully completed.
+        Set notify=False when the caller delivers purchase notifications itself.
 
         Note: This method should be called within a transaction.atomic() block
         """
@@ -249,6 +259,10 @@ class TransactionManager(models.Manager):
         transaction_obj.completed_at = timezone.now()
         transaction_obj.save(update_fields=['fiscal_series', 'status', 'completed_at'])
 
+        # Update fiscal day ledger
+        from venezuelan_pos.apps.fiscal.services import FiscalLedgerService
+        FiscalLedgerService.record_transaction_completion(transaction_obj)
+
         # Update seat statuses to SOLD
         for item in transaction_obj.items.all():
             if item.seat:
@@ -256,7 +270,8 @@ class TransactionManager(models.Manager):
                 item.seat.save(update_fields=['status'])
 
         # Send purchase confirmation notification
-        self._send_purchase_confirmation(transaction_obj)
+        if notify:
+            self._send_purchase_confirmation(transaction_obj)
 
         return transaction_obj
     
@@ -428,6 +443,7 @@ class Transaction(TenantAwareModel):
             models.Index(fields=['fiscal_series']),
             models.Index(fields=['created_at']),
             models.Index(fields=['offline_block_id']),
+            models.Index(fields=['tenant', 'updated_at']),
         ]
     
     def __str__(self):
@@ -503,12 +519,59 @@ class Transaction(TenantAwareModel):
         """Check if transaction can be completed."""
         return self.status in [self.Status.PENDING, self.Status.RESERVED]
     
-    def complete(self):
+    def complete(self, notify=True):
         """Complete the transaction."""
         if not self.can_be_completed():
             raise ValidationError("Transaction cannot be completed in current status")
         
-        return Transaction.objects.complete_transaction(self)
+        return Transaction.objects.complete_transaction(self, notify=notify)
+    
+    def cancel(self, user=None, reason=''):
+        """
+        Cancel the transaction.
+        A completed sale is taken back out of its fiscal day ledger, its
+        fiscal series record is voided by the given user, its tickets are
+        cancelled and its seats are released. Sales of a closed fiscal
+        day cannot be cancelled.
+        """
+        from venezuelan_pos.apps.fiscal.models import FiscalSeries
+        from venezuelan_pos.apps.fiscal.services import FiscalLedgerService, FiscalSeriesService
+        from venezuelan_pos.apps.tickets.models import DigitalTicket
+        
+        with transaction.atomic():
+            current = Transaction.objects.select_for_update().get(pk=self.pk)
+            if current.status in [self.Status.CANCELLED, self.Status.REFUNDED]:
+                raise ValidationError("Transaction cannot be cancelled in current status")
+            
+            was_completed = current.status == self.Status.COMPLETED
+            if was_completed and user is None:
+                raise ValidationError("Cancelling a completed transaction requires a user")
+            
+            self.status = self.Status.CANCELLED
+            self.save(update_fields=['status', 'updated_at'])
+            
+            if not was_completed:
+                return self
+            
+            FiscalLedgerService.reverse_transaction_completion(self)
+            
+            series_record = FiscalSeries.objects.filter(transaction=self, is_voided=False).first()
+            if series_record:
+                FiscalSeriesService.void_fiscal_series(
+                    series_record.id, user, reason or "Transaction cancelled"
+                )
+            
+            self.digital_tickets.filter(status=DigitalTicket.Status.ACTIVE).update(
+                status=DigitalTicket.Status.CANCELLED,
+                updated_at=timezone.now()
+            )
+            
+            for item in self.items.select_related('seat'):
+                if item.seat and item.seat.status == Seat.Status.SOLD:
+                    item.seat.status = Seat.Status.AVAILABLE
+                    item.seat.save(update_fields=['status'])
+        
+        return self
 
 
 class TransactionItem(TenantAwareModel):
@@ -612,6 +675,7 @@ class TransactionItem(TenantAwareModel):
             models.Index(fields=['tenant', 'transaction']),
             models.Index(fields=['zone']),
             models.Index(fields=['seat']),
+            models.Index(fields=['tenant', 'updated_at']),
         ]
     
     def __str__(self):
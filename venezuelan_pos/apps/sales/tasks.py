@@ -91,18 +91,22 @@ def update_sales_statistics(self, transaction_id):
 @shared_task
 def cleanup_expired_reservations():
     """
-    Clean up expired seat reservations.
+    Clean up expired seat reservations and payment plans.
+    Releases held seats in bounded batches.
     """
     try:
-        from .models import ReservedTicket
+        from venezuelan_pos.apps.payments.services import ReservationService
         
-        expired_count = ReservedTicket.objects.filter(
-            status=ReservedTicket.Status.ACTIVE,
-            reserved_until__lt=timezone.now()
-        ).update(status=ReservedTicket.Status.EXPIRED)
+        stats = ReservationService.cleanup_expired_reservations()
         
-        if expired_count > 0:
-            logger.info(f"Cleaned up {expired_count} expired reservations")
+        if stats['expired_reservations'] > 0 or stats['expired_payment_plans'] > 0:
+            logger.info(
+                f"Cleaned up {stats['expired_reservations']} expired reservations and "
+                f"{stats['expired_payment_plans']} payment plans, "
+                f"released {stats['released_seats']} seats"
+            )
+        
+        return stats
         
     except Exception as e:
         logger.error(f"Error cleaning up expired reservations: {e}")
@@ -1,5 +1,6 @@
+import json
 from decimal import Decimal
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from datetime import timedelta
@@ -149,7 +150,130 @@ class SalesModelsTestCase(TestCase):
         # Verify seat status updated
         self.seat.refresh_from_db()
         self.assertEqual(self.seat.status, Seat.Status.SOLD)
-    
+
+    def test_transaction_completion_updates_fiscal_ledger(self):
+        """Test completed transactions are accumulated in the fiscal day ledger."""
+        from venezuelan_pos.apps.fiscal.models import FiscalDayLedger
+        from venezuelan_pos.apps.fiscal.services import FiscalLedgerService
+
+        seats = Seat.objects.filter(zone=self.zone)[:2]
+        for seat in seats:
+            transaction = Transaction.objects.create_transaction(
+                tenant=self.tenant,
+                event=self.event,
+                customer=self.customer,
+                items_data=[{
+                    'zone': self.zone,
+                    'seat': seat,
+                    'item_type': TransactionItem.ItemType.NUMBERED_SEAT,
+                    'unit_price': Decimal('100.00'),
+                    'tax_rate': Decimal('0.1600')
+                }]
+            )
+            transaction.complete()
+
+        fiscal_date = FiscalLedgerService.get_fiscal_date(transaction.completed_at)
+        ledger = FiscalDayLedger.objects.get(tenant=self.tenant, fiscal_date=fiscal_date)
+
+        self.assertEqual(ledger.transaction_count, 2)
+        self.assertEqual(ledger.total_amount, Decimal('232.00'))
+        self.assertEqual(ledger.first_series, "TT00000001")
+        self.assertEqual(ledger.last_series, "TT00000002")
+
+        # Ledger matches a full recompute from transactions
+        self.assertEqual(FiscalLedgerService.verify_ledger(self.tenant, fiscal_date), {})
+
+    @override_settings(CACHES={'default': {'BACKEND': 'venezuelan_pos.core.cache_backends.JSONLocMemCache'}})
+    def test_fast_transaction_uses_configured_taxes(self):
+        """Test fast transaction creation uses resolved tax rules, like the regular path."""
+        from django.contrib.auth import get_user_model
+        from venezuelan_pos.apps.fiscal.models import TaxConfiguration
+        from venezuelan_pos.apps.fiscal.services import TaxCalculationService
+        from venezuelan_pos.apps.fiscal.tax_resolver import tax_resolver
+
+        user = get_user_model().objects.create_user(
+            username="taxadmin",
+            password="testpass123",
+            tenant=self.tenant
+        )
+        effective_from = timezone.now() - timedelta(days=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            TaxConfiguration.objects.create(
+                tenant=self.tenant,
+                name="IVA",
+                tax_type='PERCENTAGE',
+                scope='TENANT',
+                rate=Decimal('0.12'),
+                effective_from=effective_from,
+                created_by=user
+            )
+
+        # Warm the resolver, then tax calculation needs no queries
+        tax_resolver.get_rule_set(self.tenant.id, self.event.id)
+
+        # Rules read back from the shared cache in another process
+        tax_resolver._local.clear()
+        rule = tax_resolver.get_rule_set(self.tenant.id, self.event.id).rules[0]
+        self.assertEqual((rule.rate, rule.effective_from), (Decimal('0.12'), effective_from))
+        with self.assertNumQueries(0):
+            expected_tax, _, _ = TaxCalculationService.calculate_taxes(
+                Decimal('250.00'), self.tenant, self.event
+            )
+        self.assertEqual(expected_tax, Decimal('30.00'))
+
+        transaction = Transaction.objects.create_transaction_fast(
+            tenant=self.tenant,
+            event=self.event,
+            customer=self.customer,
+            items_data=[
+                {'zone': self.zone, 'seat': self.seat, 'quantity': 1, 'unit_price': Decimal('100.00')},
+                {'zone': self.zone, 'quantity': 1, 'unit_price': Decimal('150.00')},
+            ]
+        )
+
+        self.assertEqual(transaction.tax_amount, expected_tax)
+        self.assertEqual(transaction.total_amount, Decimal('280.00'))
+        self.assertEqual(
+            sorted(transaction.items.values_list('tax_amount', flat=True)),
+            [Decimal('12.00'), Decimal('18.00')]
+        )
+
+        # Saving a configuration invalidates the compiled rules
+        with self.captureOnCommitCallbacks(execute=True):
+            TaxConfiguration.objects.filter(tenant=self.tenant).first().delete()
+        self.assertEqual(tax_resolver.get_rule_set(self.tenant.id).rules, [])
+
+        # Fixed taxes and rounding are shared out so the items add up
+        with self.captureOnCommitCallbacks(execute=True):
+            for name, tax_type, rate, fixed_amount in [
+                ("IVA", 'PERCENTAGE', Decimal('0.16'), Decimal('0.00')),
+                ("Service fee", 'FIXED', Decimal('0.00'), Decimal('1.00')),
+            ]:
+                TaxConfiguration.objects.create(
+                    tenant=self.tenant,
+                    name=name,
+                    tax_type=tax_type,
+                    scope='TENANT',
+                    rate=rate,
+                    fixed_amount=fixed_amount,
+                    created_by=user
+                )
+
+        transaction = Transaction.objects.create_transaction_fast(
+            tenant=self.tenant,
+            event=self.event,
+            customer=self.customer,
+            items_data=[
+                {'zone': self.zone, 'quantity': 1, 'unit_price': Decimal('33.33')}
+                for _ in range(3)
+            ]
+        )
+
+        self.assertEqual(transaction.tax_amount, Decimal('17.00'))
+        items = transaction.items.all()
+        self.assertEqual(sum(item.tax_amount for item in items), transaction.tax_amount)
+        self.assertEqual(sum(item.total_price for item in items), transaction.total_amount)
+
     def test_reserved_ticket_creation(self):
         """Test reserved ticket creation and expiration."""
         # Create transaction
@@ -333,4 +457,142 @@ class SalesModelsTestCase(TestCase):
         # Verify transaction was updated
         self.assertEqual(transaction.subtotal_amount, expected_subtotal)
         self.assertEqual(transaction.tax_amount, expected_tax)
-        self.assertEqual(transaction.total_amount, expected_total)
\ No newline at end of file
+        self.assertEqual(transaction.total_amount, expected_total)
+
+class AsyncAvailabilityViewsTestCase(TestCase):
+    """Test case for the async availability views."""
+    
+    def setUp(self):
+        """Set up test data."""
+        from venezuelan_pos.apps.tenants.models import User
+
+        self.tenant = Tenant.objects.create(name="Test Tenant", slug="test-tenant")
+        self.venue = Venue.objects.create(tenant=self.tenant, name="Test Venue", capacity=100)
+        self.event = Event.objects.create(
+            tenant=self.tenant,
+            name="Test Event",
+            venue=self.venue,
+            start_date=timezone.now() + timedelta(days=30),
+            end_date=timezone.now() + timedelta(days=30, hours=3),
+            event_type=Event.EventType.NUMBERED_SEAT
+        )
+        self.zone = Zone.objects.create(
+            tenant=self.tenant,
+            event=self.event,
+            name="VIP Zone",
+            zone_type=Zone.ZoneType.NUMBERED,
+            capacity=4,
+            rows=2,
+            seats_per_row=2,
+            base_price=Decimal('100.00')
+        )
+        self.seats = list(Seat.objects.filter(zone=self.zone).order_by('row_number', 'seat_number'))
+        self.seats[0].status = Seat.Status.SOLD
+        self.seats[0].save()
+        self.user = User.objects.create_user(
+            username="seller",
+            password="testpass123",
+            tenant=self.tenant,
+            role=User.Role.EVENT_OPERATOR
+        )
+    
+    def _request(self, path, data, user=None):
+        """An async request as the middleware would pass it to the view."""
+        from django.test import AsyncRequestFactory
+
+        request = AsyncRequestFactory().get(path, data)
+        request.session = {}
+        if user is not None:
+            async def auser():
+                return user
+            request.auser = auser
+        return request
+    
+    async def test_bulk_availability_requires_authentication(self):
+        """Test the async API view answers unauthenticated requests with 401."""
+        from .cache_views import bulk_seat_availability
+
+        request = self._request('/api/v1/sales/seats/bulk-availability/', {'seat_ids': str(self.seats[0].id)})
+        response = await bulk_seat_availability(request)
+        self.assertEqual(response.status_code, 401)
+    
+    async def test_bulk_availability_is_throttled(self):
+        """Test the async API view applies the REST framework default throttles."""
+        from unittest import mock
+        from django.core.cache import cache
+        from django.test import override_settings
+        from rest_framework.throttling import UserRateThrottle
+        from .cache_views import bulk_seat_availability
+
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}), \
+                mock.patch.object(UserRateThrottle, 'THROTTLE_RATES', {'user': '2/hour'}):
+            statuses = []
+            for _ in range(3):
+                request = self._request('/api/v1/sales/seats/bulk-availability/', {'seat_ids': str(self.seats[1].id)})
+                request.user = self.user
+                response = await bulk_seat_availability(request)
+                statuses.append(response.status_code)
+            cache.clear()
+
+        self.assertEqual(statuses, [200, 200, 429])
+        self.assertIn('Retry-After', response)
+    
+    def test_async_redis_pool_uses_cache_options(self):
+        """Test the async Redis pool is sized and timed like the django-redis one."""
+        import redis.asyncio
+        from redis.retry import Retry
+        from redis.backoff import NoBackoff
+        from .cache import sales_cache
+
+        caches = {'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': 'redis://localhost:6379/1',
+            'OPTIONS': {
+                'CONNECTION_POOL_KWARGS': {
+                    'max_connections': 25,
+                    'retry_on_timeout': True,
+                    'retry': Retry(NoBackoff(), 1),
+                },
+                'SOCKET_TIMEOUT': 2,
+                'SOCKET_CONNECT_TIMEOUT': 1,
+            },
+        }}
+        with override_settings(CACHES=caches):
+            kwargs = sales_cache._async_redis_pool_kwargs()
+        
+        self.assertEqual(kwargs, {
+            'max_connections': 25,
+            'retry_on_timeout': True,
+            'socket_timeout': 2,
+            'socket_connect_timeout': 1,
+        })
+        pool = redis.asyncio.ConnectionPool.from_url(caches['default']['LOCATION'], **kwargs)
+        self.assertEqual(pool.max_connections, 25)
+        self.assertEqual(pool.connection_kwargs['socket_timeout'], 2)
+    
+    async def test_ajax_seat_availability(self):
+        """Test seat availability is read from the database when not cached."""
+        from .web_views import ajax_seat_availability
+
+        seat_ids = [str(self.seats[0].id), str(self.seats[1].id), 'not-a-seat']
+        request = self._request('/sales/ajax/seat-availability/', {'seat_ids[]': seat_ids}, self.user)
+        response = await ajax_seat_availability(request)
+        
+        self.assertEqual(response.status_code, 200)
+        availability = json.loads(response.content)['availability']
+        self.assertEqual(list(availability), seat_ids)
+        self.assertEqual(availability[seat_ids[0]]['status'], Seat.Status.SOLD)
+        self.assertTrue(availability[seat_ids[1]]['is_available'])
+        self.assertEqual(availability['not-a-seat']['status'], 'not_found')
+    
+    async def test_ajax_zone_availability(self):
+        """Test zone availability counts the zone's seats."""
+        from .web_views import ajax_zone_availability
+
+        request = self._request('/sales/ajax/zone-availability/', {'zone_id': str(self.zone.id)}, self.user)
+        response = await ajax_zone_availability(request)
+        
+        self.assertEqual(response.status_code, 200)
+        availability = json.loads(response.content)['availability']
+        self.assertEqual(availability['total_seats'], 4)
+        self.assertEqual(availability['available_seats'], 3)
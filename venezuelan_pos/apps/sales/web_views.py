@@ -5,6 +5,7 @@ Provides interactive ticket sales interface with real-time seat selection and sh
 
 import json
 import logging
+import uuid
 from decimal import Decimal, InvalidOperation
 from datetime import datetime, timedelta
 from django.shortcuts import render, get_object_or_404, redirect
@@ -20,7 +21,11 @@ from django.views.decorators.http import require_http_methods, require_POST
 from django.views.decorators.csrf import csrf_exempt
 from django.core.cache import cache
 from django.db import transaction
+from asgiref.sync import sync_to_async
 
+from venezuelan_pos.core.async_views import async_login_required
+from venezuelan_pos.core.db_router import with_reporting_db
+from venezuelan_pos.core.query_budget import query_budget
 from .models import Transaction, TransactionItem, ReservedTicket
 from .serializers import TransactionCreateSerializer, SeatReservationSerializer
 from .cache import sales_cache
@@ -31,6 +36,7 @@ from ..pricing.services import PricingCalculationService
 from ..pricing.sales_integration import stage_pricing_integration
 from venezuelan_pos.apps.payments.models import PaymentMethod, PaymentPlan
 from venezuelan_pos.apps.payments.services import PaymentPlanService
+from venezuelan_pos.apps.reports.dashboards import dashboard_snapshots
 
 logger = logging.getLogger(__name__)
 
@@ -111,6 +117,7 @@ def get_clean_cart(request):
 
 
 @login_required
+@with_reporting_db
 def sales_dashboard(request):
     """Sales dashboard with real-time statistics and transaction monitoring."""
     
@@ -124,26 +131,18 @@ def sales_dashboard(request):
         events = Event.objects.filter(tenant=request.user.tenant)
         reservations = ReservedTicket.objects.filter(tenant=request.user.tenant)
     
-    # Today's statistics
-    today = timezone.now().date()
-    today_start = timezone.make_aware(datetime.combine(today, datetime.min.time()))
-    today_end = timezone.make_aware(datetime.combine(today, datetime.max.time()))
-    
-    today_transactions = transactions.filter(created_at__range=[today_start, today_end])
-    
-    today_revenue = today_transactions.filter(
-        status=Transaction.Status.COMPLETED
-    ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0.00')
+    # Aggregates come from a cached snapshot refreshed as sales happen
+    snapshot = dashboard_snapshots.get_tenant_snapshot(
+        None if request.user.is_admin_user else request.user.tenant
+    )
+    today = snapshot['day']
     
     stats = {
-        'today_sales': today_transactions.filter(status=Transaction.Status.COMPLETED).count(),
-        'today_revenue': str(today_revenue),
-        'pending_transactions': transactions.filter(status=Transaction.Status.PENDING).count(),
-        'active_reservations': reservations.filter(
-            status=ReservedTicket.Status.ACTIVE,
-            reserved_until__gt=timezone.now()
-        ).count(),
-        'active_events': events.filter(status=Event.Status.ACTIVE).count(),
+        'today_sales': snapshot['today_sales'],
+        'today_revenue': str(snapshot['today_revenue']),
+        'pending_transactions': snapshot['pending_transactions'],
+        'active_reservations': snapshot['active_reservations'],
+        'active_events': snapshot['active_events'],
     }
     
     # Recent transactions
@@ -169,6 +168,7 @@ def sales_dashboard(request):
         'active_events': active_events,
         'expiring_reservations': expiring_reservations,
         'today': today,
+        'as_of': snapshot['as_of'],
     }
     
     return render(request, 'sales/dashboard.html', context)
@@ -245,6 +245,7 @@ def seat_selection(request, event_id):
 
 
 @login_required
+@query_budget(max_queries=16)
 def zone_seat_map(request, event_id, zone_id):
     """Detailed seat map for a specific zone - OPTIMIZED VERSION."""
     import time
@@ -1195,6 +1196,9 @@ def checkout_payment_option(request):
 
     return JsonResponse({'success': True})
 @login_required
+# Tickets are written one by one (budgeted in create_ticket_for_item); the
+# rest of the checkout must not repeat per cart item
+@query_budget(allowed_duplicates=('INSERT INTO "digital_tickets"', 'UPDATE "digital_tickets"'))
 def checkout_confirm(request):
     """Checkout step 4 - Confirm and complete transaction - OPTIMIZED VERSION."""
     import time
@@ -1342,14 +1346,16 @@ def checkout_confirm(request):
                 # Invalidate caches to reflect seat availability changes
                 from .cache import sales_cache
 
-                for zone_id in zone_ids:
-                    zone = zones_dict.get(zone_id)
-                    if zone:
-                        sales_cache.invalidate_zone_caches(zone)
-
-                if seat_ids:
-                    for seat_id in seat_ids:
-                        sales_cache.invalidate_seat_availability(seat_id)
+                cart_zones = [zones_dict[zone_id] for zone_id in set(zone_ids) if zone_id in zones_dict]
+                numbered_zone_ids = [zone.id for zone in cart_zones if zone.zone_type == Zone.ZoneType.NUMBERED]
+                # Same keys as invalidate_zone_caches() per zone, deleted together
+                zone_seat_ids = Seat.objects.filter(zone_id__in=numbered_zone_ids).values_list('id', flat=True) \
+                    if numbered_zone_ids else []
+                sales_cache.invalidate_availability_many(
+                    seat_ids={str(seat_id) for seat_id in [*seat_ids, *zone_seat_ids]},
+                    zone_ids=[str(zone.id) for zone in cart_zones],
+                    event_ids={str(zone.event_id) for zone in cart_zones},
+                )
             
             # OPTIMIZATION: Clear session immediately after transaction
             request.session['shopping_cart'] = {}
@@ -1771,50 +1777,59 @@ def cancel_reservation(request, reservation_id):
 
 # AJAX Views for real-time updates
 
-@login_required
-def ajax_seat_availability(request):
-    """Get real-time seat availability via AJAX."""
+@async_login_required
+async def ajax_seat_availability(request):
+    """
+    Get real-time seat availability via AJAX.
+    Cached seats are read in one Redis round trip, the rest in one query.
+    """
     
     seat_ids = request.GET.getlist('seat_ids[]')
     
     if not seat_ids:
         return JsonResponse({'error': 'No seat IDs provided'}, status=400)
     
-    availability_data = {}
+    user = await request.auser()
+    cached_data = await sales_cache.aget_bulk_seat_availability(seat_ids)
     
+    # Fallback to database for seats not in the cache
+    missing_ids = {}
     for seat_id in seat_ids:
+        if seat_id in cached_data:
+            continue
         try:
-            # Check cache first
-            cached_data = sales_cache.get_seat_availability(seat_id)
-            if cached_data:
-                availability_data[seat_id] = cached_data
-            else:
-                # Fallback to database
-                if request.user.is_admin_user:
-                    seat = Seat.objects.get(id=seat_id)
-                else:
-                    seat = Seat.objects.get(id=seat_id, tenant=request.user.tenant)
-                
-                availability_data[seat_id] = {
-                    'status': seat.status,
-                    'is_available': seat.is_available,
-                    'last_updated': timezone.now().isoformat(),
-                }
-        except Seat.DoesNotExist:
-            availability_data[seat_id] = {
-                'status': 'not_found',
-                'is_available': False,
+            missing_ids[uuid.UUID(seat_id)] = seat_id
+        except ValueError:
+            pass
+    
+    seat_data = {}
+    if missing_ids:
+        seats = Seat.objects.filter(id__in=list(missing_ids))
+        if not user.is_admin_user:
+            seats = seats.filter(tenant_id=user.tenant_id)
+        async for seat in seats.only('id', 'status'):
+            seat_data[missing_ids[seat.id]] = {
+                'status': seat.status,
+                'is_available': seat.is_available,
                 'last_updated': timezone.now().isoformat(),
             }
     
+    availability_data = {}
+    for seat_id in seat_ids:
+        availability_data[seat_id] = cached_data.get(seat_id) or seat_data.get(seat_id) or {
+            'status': 'not_found',
+            'is_available': False,
+            'last_updated': timezone.now().isoformat(),
+        }
+    
     return JsonResponse({
         'success': True,
         'availability': availability_data,
     })
 
 
-@login_required
-def ajax_zone_availability(request):
+@async_login_required
+async def ajax_zone_availability(request):
     """Get real-time zone availability via AJAX."""
     
     zone_id = request.GET.get('zone_id')
@@ -1822,11 +1837,13 @@ def ajax_zone_availability(request):
     if not zone_id:
         return JsonResponse({'error': 'Zone ID is required'}, status=400)
     
+    user = await request.auser()
+    
     try:
-        if request.user.is_admin_user:
-            zone = Zone.objects.get(id=zone_id)
+        if user.is_admin_user:
+            zone = await Zone.objects.aget(id=zone_id)
         else:
-            zone = Zone.objects.get(id=zone_id, tenant=request.user.tenant)
+            zone = await Zone.objects.aget(id=zone_id, tenant_id=user.tenant_id)
         
         def _to_int(value, default=0):
             try:
@@ -1837,7 +1854,8 @@ def ajax_zone_availability(request):
                 except (TypeError, ValueError):
                     return default
         
-        cart = get_clean_cart(request)
+        # The cart lives in the session, which loads synchronously
+        cart = await sync_to_async(get_clean_cart)(request)
         cart_quantity = 0
         for item in cart.values():
             if str(item.get('zone_id')) == str(zone_id):
@@ -1846,7 +1864,7 @@ def ajax_zone_availability(request):
         now_iso = timezone.now().isoformat()
         
         # Check cache first
-        cached_data = sales_cache.get_zone_seat_availability(zone_id)
+        cached_data = await sales_cache.aget_zone_seat_availability(zone_id)
         if cached_data:
             availability_data = cached_data.copy()
             
@@ -1864,7 +1882,7 @@ def ajax_zone_availability(request):
             
             total_seats = cached_data.get('total_seats') or cached_data.get('capacity')
             if total_seats is None and zone.zone_type == Zone.ZoneType.NUMBERED:
-                total_seats = zone.seats.count()
+                total_seats = await zone.seats.acount()
             total_seats = _to_int(total_seats, zone.capacity)
             
             sold_seats = cached_data.get('sold_seats') or cached_data.get('sold_capacity')
@@ -1900,10 +1918,10 @@ def ajax_zone_availability(request):
         
         # Fallback to database calculation
         if zone.zone_type == Zone.ZoneType.NUMBERED:
-            available_seats = zone.seats.filter(status=Seat.Status.AVAILABLE).count()
-            total_seats = zone.seats.count()
+            available_seats = await zone.seats.filter(status=Seat.Status.AVAILABLE).acount()
+            total_seats = await zone.seats.acount()
         else:
-            available_seats = zone.available_capacity
+            available_seats = await sync_to_async(lambda: zone.available_capacity)()
             total_seats = zone.capacity
         
         available_seats = _to_int(available_seats, 0)
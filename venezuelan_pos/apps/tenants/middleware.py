@@ -1,21 +1,70 @@
-import threading
+import contextvars
+import functools
+from contextlib import contextmanager
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.core.exceptions import PermissionDenied
-from .models import Tenant
+from .resolver import tenant_resolver
 
-# Thread-local storage for current tenant
-_thread_locals = threading.local()
+# Current tenant of the running request or task. A context variable rather
+# than a thread-local, so concurrent requests on one event loop thread each
+# keep their own tenant.
+_current_tenant = contextvars.ContextVar('current_tenant', default=None)
 
 
 def get_current_tenant():
-    """Get the current tenant from thread-local storage."""
-    return getattr(_thread_locals, 'tenant', None)
+    """Get the current tenant from the active context."""
+    return _current_tenant.get()
 
 
 def set_current_tenant(tenant):
-    """Set the current tenant in thread-local storage."""
-    _thread_locals.tenant = tenant
+    """
+    Set the current tenant in the active context.
+    Returns a token that reset_current_tenant() takes to restore the
+    previous tenant.
+    """
+    return _current_tenant.set(tenant)
+
+
+def reset_current_tenant(token):
+    """Restore the tenant that was current before set_current_tenant() returned token."""
+    _current_tenant.reset(token)
+
+
+@contextmanager
+def tenant_context(tenant):
+    """
+    Run a block with tenant as the current tenant.
+    
+    Usage:
+        with tenant_context(tenant):
+            Event.objects.all()  # only the tenant's events
+    """
+    token = set_current_tenant(tenant)
+    try:
+        yield tenant
+    finally:
+        reset_current_tenant(token)
+
+
+def propagate_tenant_context(func):
+    """
+    Bind func to the caller's context, so it sees the caller's tenant when
+    run elsewhere, e.g. in a thread pool:
+    
+        executor.submit(propagate_tenant_context(render_tickets), order)
+    
+    Each call runs in its own copy, so a bound function can run in several
+    threads at once.
+    """
+    context = contextvars.copy_context()
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+    
+    return wrapper
 
 
 class TenantMiddleware:
@@ -24,20 +73,56 @@ class TenantMiddleware:
     
     This middleware:
     1. Identifies the tenant from the request (header, subdomain, or user)
-    2. Sets the current tenant in thread-local storage
+    2. Sets the current tenant in the request's context
     3. Ensures users can only access their tenant's data
+    
+    It runs natively under both WSGI and ASGI. Under ASGI each request
+    runs in its own context, so concurrent requests never see each
+    other's tenant.
     """
     
+    sync_capable = True
+    async_capable = True
+    
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
     
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        
         # Clear any existing tenant context
         set_current_tenant(None)
-        
+        try:
+            tenant = self._get_request_tenant(request)
+            if tenant:
+                set_current_tenant(tenant)
+            return self.get_response(request)
+        finally:
+            # Clear tenant context after request
+            set_current_tenant(None)
+    
+    async def __acall__(self, request):
+        set_current_tenant(None)
+        try:
+            # Resolution may hit the cache, the database and the lazy user
+            tenant = await sync_to_async(self._get_request_tenant)(request)
+            if tenant:
+                set_current_tenant(tenant)
+            return await self.get_response(request)
+        finally:
+            set_current_tenant(None)
+    
+    def _get_request_tenant(self, request):
+        """
+        Resolve the request's tenant, check the user may access it and
+        attach it to the request. Returns None when there is none.
+        """
         # Skip tenant resolution for certain paths
         if self._should_skip_tenant_resolution(request):
-            return self.get_response(request)
+            return None
         
         # Resolve tenant from request
         tenant = self._resolve_tenant(request)
@@ -48,16 +133,9 @@ class TenantMiddleware:
                 if not request.user.has_tenant_access(tenant):
                     raise PermissionDenied("User does not have access to this tenant")
             
-            # Set tenant context
-            set_current_tenant(tenant)
             request.tenant = tenant
         
-        response = self.get_response(request)
-        
-        # Clear tenant context after request
-        set_current_tenant(None)
-        
-        return response
+        return tenant
     
     def _should_skip_tenant_resolution(self, request):
         """Check if tenant resolution should be skipped for this request."""
@@ -77,40 +155,40 @@ class TenantMiddleware:
         """
         Resolve tenant from request using multiple strategies:
         1. X-Tenant-ID header (for API requests)
-        2. Subdomain (for web requests)
-        3. User's primary tenant (fallback)
+        2. X-Tenant-Slug header
+        3. Subdomain (for web requests)
+        4. User's primary tenant (fallback)
+        
+        Lookups go through the cached tenant resolver, so they rarely
+        query the database.
         """
         
         # Strategy 1: X-Tenant-ID header
         tenant_id = request.headers.get('X-Tenant-ID')
         if tenant_id:
-            try:
-                return Tenant.objects.get(id=tenant_id, is_active=True)
-            except (Tenant.DoesNotExist, ValueError):
-                pass
+            tenant = tenant_resolver.get_by_id(tenant_id)
+            if tenant:
+                return tenant
         
         # Strategy 2: X-Tenant-Slug header
         tenant_slug = request.headers.get('X-Tenant-Slug')
         if tenant_slug:
-            try:
-                return Tenant.objects.get(slug=tenant_slug, is_active=True)
-            except Tenant.DoesNotExist:
-                pass
+            tenant = tenant_resolver.get_by_slug(tenant_slug)
+            if tenant:
+                return tenant
         
         # Strategy 3: Subdomain (e.g., tenant1.example.com)
-        host = request.get_host()
-        if '.' in host:
-            subdomain = host.split('.')[0]
-            if subdomain != 'www' and subdomain != 'api':
-                try:
-                    return Tenant.objects.get(slug=subdomain, is_active=True)
-                except Tenant.DoesNotExist:
-                    pass
+        tenant = tenant_resolver.get_by_host(request.get_host())
+        if tenant:
+            return tenant
         
         # Strategy 4: User's primary tenant (authenticated users only)
-        if request.user.is_authenticated and hasattr(request.user, 'tenant'):
-            if request.user.tenant and request.user.tenant.is_active:
-                return request.user.tenant
+        if request.user.is_authenticated and getattr(request.user, 'tenant_id', None):
+            tenant = tenant_resolver.get_by_id(request.user.tenant_id)
+            if tenant:
+                # Spare the user's lazy tenant lookup later in the request
+                request.user.tenant = tenant
+                return tenant
         
         # No tenant found - this is okay for some endpoints
         return None
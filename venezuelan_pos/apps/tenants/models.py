@@ -230,7 +230,7 @@ class User(AbstractUser):
         """Check if user has access to a specific tenant."""
         if self.is_admin_user:
             return True
-        return self.tenant == tenant
+        return self.tenant_id is not None and self.tenant_id == tenant.pk
 
 
 class TenantUser(models.Model):
@@ -178,49 +178,18 @@ class TenantQueryOptimizer:
     
     @staticmethod
     def get_tenant_dashboard_data(tenant):
-        """Get optimized data for tenant dashboard."""
-        from venezuelan_pos.apps.events.models import Event
-        from venezuelan_pos.apps.sales.models import Transaction
-        from django.utils import timezone
-        from datetime import timedelta
-        
-        # Cache key for dashboard data
-        cache_key = f'tenant_dashboard_{tenant.id}'
-        data = cache.get(cache_key)
-        
-        if data is None:
-            # Get recent activity (last 30 days)
-            thirty_days_ago = timezone.now() - timedelta(days=30)
-            
-            # Optimized queries with select_related and annotations
-            active_events = Event.objects.filter(
-                tenant=tenant,
-                status='active'
-            ).select_related('venue').count()
-            
-            recent_transactions = Transaction.objects.filter(
-                tenant=tenant,
-                created_at__gte=thirty_days_ago,
-                status='completed'
-            ).aggregate(
-                count=models.Count('id'),
-                total_revenue=models.Sum('total_amount')
-            )
-            
-            total_users = tenant.users.filter(is_active=True).count()
-            
-            data = {
-                'active_events': active_events,
-                'recent_transactions': recent_transactions['count'] or 0,
-                'recent_revenue': float(recent_transactions['total_revenue'] or 0),
-                'total_users': total_users,
-                'last_updated': timezone.now().isoformat(),
-            }
-            
-            # Cache for 5 minutes
-            cache.set(cache_key, data, 300)
-        
-        return data
+        """Get tenant dashboard data from its cached snapshot."""
+        from venezuelan_pos.apps.reports.dashboards import dashboard_snapshots
+        
+        snapshot = dashboard_snapshots.get_tenant_snapshot(tenant)
+        
+        return {
+            'active_events': snapshot['active_events'],
+            'recent_transactions': snapshot['recent_transactions'],
+            'recent_revenue': float(snapshot['recent_revenue']),
+            'total_users': snapshot['total_users'],
+            'last_updated': snapshot['as_of'].isoformat(),
+        }
     
     @staticmethod
     def get_tenant_events_optimized(tenant, status=None):
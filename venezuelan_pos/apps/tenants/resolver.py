@@ -0,0 +1,223 @@
+"""
+Cached tenant resolution.
+Tenants are resolved by id, slug or host through two cache levels: a small
+per-process LRU whose entries live a few seconds, and the shared cache,
+which holds a snapshot of each tenant's serialized field values under its
+id and a pointer to that id under its slug. Lookups that find no tenant are cached
+too, so unknown slugs and subdomains do not reach the database on every
+request. Saving or deleting a tenant drops its shared entries once the
+change commits; other processes see it once their local entries expire.
+Snapshots are loaded from the primary, so a lagging replica cannot put
+the old row back into the shared cache.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+TENANT_CACHE_PREFIX = "tenant_resolver"
+
+# Cached in place of a tenant when a lookup finds none
+MISSING = 'missing'
+
+# Subdomains that never name a tenant
+RESERVED_SUBDOMAINS = {'www', 'api'}
+
+
+class TenantResolver:
+    """
+    Resolves tenants without a database query on the common path.
+    Every call returns a new Tenant instance, so a request changing its
+    tenant never affects what other requests see.
+
+    Usage:
+        tenant = tenant_resolver.get_by_slug('acme')
+        tenant = tenant_resolver.get_by_host(request.get_host())
+    """
+
+    # Per-process entries
+    LOCAL_TTL = 10
+    LOCAL_MAX_ENTRIES = 1024
+
+    # Shared cache entries
+    TIMEOUT = 600
+    MISSING_TIMEOUT = 60
+
+    def __init__(self):
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _id_key(tenant_id) -> str:
+        return f"{TENANT_CACHE_PREFIX}:id:{tenant_id}"
+
+    @staticmethod
+    def _slug_key(slug: str) -> str:
+        return f"{TENANT_CACHE_PREFIX}:slug:{slug}"
+
+    # Per-process LRU
+
+    def _local_get(self, key):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return value
+
+    def _local_set(self, key, value) -> None:
+        with self._lock:
+            self._local[key] = (time.monotonic() + self.LOCAL_TTL, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.LOCAL_MAX_ENTRIES:
+                self._local.popitem(last=False)
+
+    def clear_local(self) -> None:
+        """Drop this process's entries."""
+        with self._lock:
+            self._local.clear()
+
+    # Snapshots
+
+    @staticmethod
+    def _snapshot(tenant) -> dict:
+        """Field values of a tenant in serialized form, as stored in the cache."""
+        return {
+            field.attname: None if getattr(tenant, field.attname) is None else field.value_to_string(tenant)
+            for field in tenant._meta.concrete_fields
+        }
+
+    @staticmethod
+    def _instance(snapshot: dict):
+        """A fresh Tenant built from a snapshot, as if loaded from the database."""
+        from .models import Tenant
+
+        fields = {field.attname: field for field in Tenant._meta.concrete_fields}
+        values = [
+            None if value is None else fields[attname].to_python(value)
+            for attname, value in snapshot.items()
+        ]
+        return Tenant.from_db(None, list(snapshot), values)
+
+    @staticmethod
+    def _cache_get(key):
+        try:
+            return cache.get(key)
+        except Exception as e:
+            logger.warning(f"Could not read tenant cache: {e}")
+            return None
+
+    @staticmethod
+    def _cache_set(key, value, timeout) -> None:
+        try:
+            cache.set(key, value, timeout)
+        except Exception as e:
+            logger.warning(f"Could not write tenant cache: {e}")
+
+    def _snapshot_by_id(self, tenant_id) -> Optional[dict]:
+        """Snapshot of a tenant by id, from the shared cache or the database."""
+        from .models import Tenant
+
+        key = self._id_key(tenant_id)
+        snapshot = self._cache_get(key)
+        if snapshot is None:
+            tenant = Tenant.objects.using('default').filter(id=tenant_id).first()
+            snapshot = self._snapshot(tenant) if tenant else MISSING
+            self._cache_set(key, snapshot, self.TIMEOUT if tenant else self.MISSING_TIMEOUT)
+        return None if snapshot == MISSING else snapshot
+
+    def _snapshot_by_slug(self, slug: str) -> Optional[dict]:
+        """Snapshot of a tenant by slug, following the cached slug -> id pointer."""
+        from .models import Tenant
+
+        key = self._slug_key(slug)
+        tenant_id = self._cache_get(key)
+        if tenant_id == MISSING:
+            return None
+
+        if tenant_id is not None:
+            snapshot = self._snapshot_by_id(tenant_id)
+            # Pointers of renamed tenants are stale until they expire
+            if snapshot is not None and snapshot['slug'] == slug:
+                return snapshot
+
+        tenant = Tenant.objects.using('default').filter(slug=slug).first()
+        if tenant is None:
+            self._cache_set(key, MISSING, self.MISSING_TIMEOUT)
+            return None
+
+        snapshot = self._snapshot(tenant)
+        self._cache_set(self._id_key(tenant.id), snapshot, self.TIMEOUT)
+        self._cache_set(key, str(tenant.id), self.TIMEOUT)
+        return snapshot
+
+    # Resolution
+
+    def get_by_id(self, tenant_id, active_only: bool = True):
+        """Tenant with the given id, or None if there is none (or it is inactive)."""
+        try:
+            tenant_id = str(uuid.UUID(str(tenant_id)))
+        except ValueError:
+            return None
+
+        key = ('id', tenant_id)
+        snapshot = self._local_get(key)
+        if snapshot is None:
+            snapshot = self._snapshot_by_id(tenant_id) or MISSING
+            self._local_set(key, snapshot)
+        return self._resolved(snapshot, active_only)
+
+    def get_by_slug(self, slug: str, active_only: bool = True):
+        """Tenant with the given slug, or None if there is none (or it is inactive)."""
+        key = ('slug', slug)
+        snapshot = self._local_get(key)
+        if snapshot is None:
+            snapshot = self._snapshot_by_slug(slug) or MISSING
+            self._local_set(key, snapshot)
+        return self._resolved(snapshot, active_only)
+
+    def get_by_host(self, host: str, active_only: bool = True):
+        """Tenant named by the subdomain of a host (e.g. acme.example.com), if any."""
+        if '.' not in host:
+            return None
+        subdomain = host.split('.')[0]
+        if subdomain in RESERVED_SUBDOMAINS:
+            return None
+        return self.get_by_slug(subdomain, active_only)
+
+    def _resolved(self, snapshot, active_only: bool):
+        if snapshot == MISSING:
+            return None
+        tenant = self._instance(snapshot)
+        if active_only and not tenant.is_active:
+            return None
+        return tenant
+
+    # Invalidation
+
+    def invalidate(self, tenant_id, slug: str) -> None:
+        """
+        Drop the cached entries of a saved or deleted tenant: its snapshot,
+        its slug pointer (or a cached miss of a new slug) and this process's
+        entries.
+        """
+        try:
+            cache.delete_many([self._id_key(tenant_id), self._slug_key(slug)])
+        except Exception as e:
+            logger.warning(f"Could not invalidate tenant cache: {e}")
+        self.clear_local()
+
+
+# Global tenant resolver instance
+tenant_resolver = TenantResolver()
@@ -0,0 +1,46 @@
+from celery.signals import before_task_publish, task_postrun, task_prerun
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .middleware import get_current_tenant, set_current_tenant
+from .models import Tenant
+from .resolver import tenant_resolver
+
+# Message header carrying the publisher's tenant to the worker
+TENANT_HEADER = 'tenant_id'
+
+
+@receiver(post_save, sender=Tenant)
+@receiver(post_delete, sender=Tenant)
+def invalidate_tenant_resolver_on_tenant_change(sender, instance, **kwargs):
+    """
+    Drop cached lookups of a saved or deleted tenant.
+    Runs after commit so other processes can't cache the old row again.
+    """
+    tenant_id, slug = instance.pk, instance.slug
+    transaction.on_commit(lambda: tenant_resolver.invalidate(tenant_id, slug))
+
+
+@before_task_publish.connect
+def add_tenant_header(headers=None, **kwargs):
+    """Send the current tenant along with every task published under one."""
+    tenant = get_current_tenant()
+    if tenant is not None and headers is not None:
+        headers.setdefault(TENANT_HEADER, str(tenant.pk))
+
+
+@task_prerun.connect
+def activate_task_tenant(task=None, **kwargs):
+    """Run a task in the tenant it was published under, or in none."""
+    # Eager tasks run inside the caller's context and keep its tenant
+    if task is None or task.request.is_eager:
+        return
+    tenant_id = getattr(task.request, TENANT_HEADER, None)
+    set_current_tenant(tenant_resolver.get_by_id(tenant_id) if tenant_id else None)
+
+
+@task_postrun.connect
+def clear_task_tenant(task=None, **kwargs):
+    """Leave no tenant behind for the next task of the worker."""
+    if task is not None and not task.request.is_eager:
+        set_current_tenant(None)
@@ -1,3 +1,136 @@
-from django.test import TestCase
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 
-# Create your tests here.
\ No newline at end of file
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from .middleware import (
+    TenantMiddleware, get_current_tenant, propagate_tenant_context, set_current_tenant, tenant_context
+)
+from .models import Tenant
+from .resolver import tenant_resolver
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'venezuelan_pos.core.cache_backends.JSONLocMemCache'}})
+class TenantResolverTest(TestCase):
+    """Test cases for the cached tenant resolver."""
+
+    def setUp(self):
+        cache.clear()
+        tenant_resolver.clear_local()
+        self.tenant = Tenant.objects.create(name="Test Tenant", slug="test-tenant")
+
+    def tearDown(self):
+        cache.clear()
+        tenant_resolver.clear_local()
+
+    def test_lookups_are_cached(self):
+        """Test repeated lookups by id, slug and host skip the database."""
+        self.assertEqual(tenant_resolver.get_by_slug('test-tenant'), self.tenant)
+
+        # Other processes share the snapshot through the cache
+        tenant_resolver.clear_local()
+        with self.assertNumQueries(0):
+            self.assertEqual(tenant_resolver.get_by_id(self.tenant.id), self.tenant)
+            self.assertEqual(tenant_resolver.get_by_host('test-tenant.example.com'), self.tenant)
+            self.assertIsNone(tenant_resolver.get_by_host('www.example.com'))
+            self.assertIsNone(tenant_resolver.get_by_id('not-a-uuid'))
+
+        # Misses are cached too
+        self.assertIsNone(tenant_resolver.get_by_slug('unknown'))
+        tenant_resolver.clear_local()
+        with self.assertNumQueries(0):
+            self.assertIsNone(tenant_resolver.get_by_slug('unknown'))
+
+        # Snapshots read back from the cache keep their field types
+        tenant_resolver.clear_local()
+        tenant = tenant_resolver.get_by_id(self.tenant.id)
+        self.assertEqual(tenant.pk, self.tenant.pk)
+        self.assertEqual(tenant.created_at, self.tenant.created_at)
+        self.assertEqual(tenant.configuration, self.tenant.configuration)
+
+        # Each lookup gets its own instance
+        tenant = tenant_resolver.get_by_slug('test-tenant')
+        tenant.name = "Changed"
+        self.assertEqual(tenant_resolver.get_by_slug('test-tenant').name, "Test Tenant")
+
+    def test_saving_invalidates(self):
+        """Test saving a tenant drops its cached lookups, including misses of its new slug."""
+        self.assertIsNone(tenant_resolver.get_by_slug('renamed'))
+        self.assertEqual(tenant_resolver.get_by_slug('test-tenant'), self.tenant)
+
+        # Cached entries are dropped only once the change commits
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tenant.slug = 'renamed'
+            self.tenant.save()
+            self.assertIsNone(tenant_resolver.get_by_slug('renamed'))
+        self.assertEqual(tenant_resolver.get_by_slug('renamed'), self.tenant)
+        self.assertIsNone(tenant_resolver.get_by_slug('test-tenant'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tenant.is_active = False
+            self.tenant.save()
+        self.assertIsNone(tenant_resolver.get_by_id(self.tenant.id))
+        self.assertEqual(tenant_resolver.get_by_id(self.tenant.id, active_only=False), self.tenant)
+
+
+class TenantContextTest(TestCase):
+    """Test cases for the context-local current tenant."""
+
+    def setUp(self):
+        set_current_tenant(None)
+        self.tenant = Tenant.objects.create(name="Test Tenant", slug="test-tenant")
+        self.other_tenant = Tenant.objects.create(name="Other Tenant", slug="other-tenant")
+
+    def tearDown(self):
+        set_current_tenant(None)
+
+    def test_concurrent_tasks_keep_their_tenant(self):
+        """Test coroutines sharing a thread each see the tenant they set."""
+        async def handle(tenant):
+            with tenant_context(tenant):
+                await asyncio.sleep(0)
+                return get_current_tenant()
+
+        async def handle_both():
+            return await asyncio.gather(handle(self.tenant), handle(self.other_tenant))
+
+        self.assertEqual(asyncio.run(handle_both()), [self.tenant, self.other_tenant])
+        self.assertIsNone(get_current_tenant())
+
+    def test_propagate_to_thread_pool(self):
+        """Test bound functions see the caller's tenant in worker threads."""
+        with tenant_context(self.tenant):
+            task = propagate_tenant_context(get_current_tenant)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            self.assertEqual(executor.submit(task).result(), self.tenant)
+            self.assertIsNone(executor.submit(get_current_tenant).result())
+
+    def test_celery_header_carries_tenant(self):
+        """Test tasks are published with the current tenant's id."""
+        from .signals import add_tenant_header
+
+        headers = {}
+        with tenant_context(self.tenant):
+            add_tenant_header(headers=headers)
+        self.assertEqual(headers, {'tenant_id': str(self.tenant.id)})
+
+    def test_async_middleware(self):
+        """Test the middleware sets the tenant for an async view and clears it afterwards."""
+        async def view(request):
+            return HttpResponse(get_current_tenant().slug)
+
+        # Resolved once here: the test database is not shared with the resolution thread
+        tenant_resolver.clear_local()
+        tenant_resolver.get_by_slug('other-tenant')
+
+        middleware = TenantMiddleware(view)
+        request = RequestFactory().get('/api/v1/events/', HTTP_X_TENANT_SLUG='other-tenant')
+        request.user = type('Anonymous', (), {'is_authenticated': False})()
+
+        response = asyncio.run(middleware(request))
+        self.assertEqual(response.content, b'other-tenant')
+        self.assertEqual(request.tenant, self.other_tenant)
+        self.assertIsNone(get_current_tenant())
+        tenant_resolver.clear_local()
@@ -125,7 +125,7 @@ class DigitalTicketAdmin(AdminTenantMixin, admin.ModelAdmin):
         return "No QR Code"
     qr_code_display.short_description = 'QR Code'
     
-    actions = ['regenerate_qr_codes', 'mark_as_used', 'mark_as_cancelled']
+    actions = ['regenerate_qr_codes', 'mark_as_used', 'mark_as_cancelled', 'export_csv']
     
     def regenerate_qr_codes(self, request, queryset):
         """Regenerate QR codes for selected tickets."""
@@ -157,6 +157,13 @@ class DigitalTicketAdmin(AdminTenantMixin, admin.ModelAdmin):
             f"Successfully marked {count} tickets as cancelled."
         )
     mark_as_cancelled.short_description = "Mark as cancelled"
+    
+    def export_csv(self, request, queryset):
+        """Stream selected tickets as CSV."""
+        from venezuelan_pos.apps.reports.exports import DATASETS, export_queryset
+        
+        return export_queryset(DATASETS['tickets'], queryset.order_by('created_at', 'pk'))
+    export_csv.short_description = "Export selected tickets as CSV"
 
 
 @admin.register(TicketTemplate)
@@ -0,0 +1,340 @@
+"""
+Real-time admission counters for entry control dashboards.
+Counters are incremented in Redis at validation time and periodically
+persisted to the database, so dashboards never aggregate validation logs.
+"""
+
+import logging
+import time
+from typing import Dict, Optional, Any
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from redis.exceptions import ConnectionError, TimeoutError
+
+from .models import AdmissionCounter
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionCounterService:
+    """
+    Live admission counters per event, zone, gate and minute bucket.
+    Uses one Redis hash per event; falls back to database counters
+    when Redis is not available.
+    """
+
+    # Cache key prefixes
+    COUNTER_PREFIX = "admission_counters"
+    DIRTY_SET_KEY = "admission_counters:dirty"
+    SEED_LOCK_SUFFIX = "seed_lock"
+
+    # Seeding lock expiry and how long other workers wait for it
+    SEED_LOCK_TTL = 10
+    SEED_WAIT_ATTEMPTS = 20
+    SEED_WAIT_INTERVAL = 0.05
+
+    # Keep live counters for a week after the last admission
+    COUNTER_TTL = 7 * 24 * 3600
+
+    MINUTE_FORMAT = '%Y-%m-%dT%H:%M'
+
+    def __init__(self):
+        """Initialize the counter service."""
+        self._redis_client = None
+
+        # Try to get direct Redis client for hash operations
+        try:
+            from django_redis import get_redis_connection
+            self._redis_client = get_redis_connection('default')
+        except Exception as e:
+            logger.warning(f"Could not get Redis client: {e}")
+
+    def _get_counter_key(self, tenant_id, event_id) -> str:
+        """Generate the Redis hash key for an event."""
+        return f"{self.COUNTER_PREFIX}:{tenant_id}:{event_id}"
+
+    def _get_delta_key(self, tenant_id, event_id) -> str:
+        """Generate the Redis hash key for an event's not yet persisted increments."""
+        return f"{self.COUNTER_PREFIX}:delta:{tenant_id}:{event_id}"
+
+    def _get_fields(self, zone_id, gate: str, admitted_at) -> Dict[str, str]:
+        """Map an admission to the (dimension, bucket) pairs it increments."""
+        minute = timezone.localtime(admitted_at).strftime(self.MINUTE_FORMAT)
+        fields = {
+            AdmissionCounter.Dimension.TOTAL: '',
+            AdmissionCounter.Dimension.GATE: gate,
+            AdmissionCounter.Dimension.MINUTE: minute,
+        }
+        if zone_id:
+            fields[AdmissionCounter.Dimension.ZONE] = str(zone_id)
+        return fields
+
+    @staticmethod
+    def _encode_field(dimension: str, bucket: str) -> str:
+        """Encode a dimension/bucket pair as a Redis hash field."""
+        return f"{dimension}:{bucket}" if bucket else dimension
+
+    @staticmethod
+    def _decode_field(field: str):
+        """Decode a Redis hash field into a dimension/bucket pair."""
+        dimension, _, bucket = field.partition(':')
+        return dimension, bucket
+
+    # Recording
+
+    def record_admission(self, ticket, gate: Optional[str] = None, admitted_at=None) -> None:
+        """
+        Count a successful admission for a ticket.
+        The increment runs after the surrounding DB transaction commits.
+        """
+        fields = self._get_fields(
+            ticket.zone_id,
+            gate or 'unknown',
+            admitted_at or timezone.now()
+        )
+        tenant_id = ticket.tenant_id
+        event_id = ticket.event_id
+
+        transaction.on_commit(
+            lambda: self._increment(tenant_id, event_id, fields)
+        )
+
+    def _increment(self, tenant_id, event_id, fields: Dict[str, str]) -> None:
+        """Increment counters, preferring Redis over the database."""
+        if self._redis_client:
+            try:
+                self._increment_redis(tenant_id, event_id, fields)
+                return
+            except (ConnectionError, TimeoutError) as e:
+                logger.warning(f"Redis admission counter increment failed: {e}")
+
+        try:
+            self._increment_database(tenant_id, event_id, fields)
+        except Exception as e:
+            # Counting must never break ticket validation
+            logger.error(f"Failed to record admission for event {event_id}: {e}")
+
+    def _increment_redis(self, tenant_id, event_id, fields: Dict[str, str]) -> None:
+        """Increment all counters for an admission in one pipeline."""
+        key = self._get_counter_key(tenant_id, event_id)
+
+        # Restore persisted values before the first admission touches the hash
+        if not self._redis_client.exists(key):
+            self._seed_from_database(key, event_id)
+
+        delta_key = self._get_delta_key(tenant_id, event_id)
+        pipeline = self._redis_client.pipeline(transaction=False)
+        for dimension, bucket in fields.items():
+            field = self._encode_field(dimension, bucket)
+            pipeline.hincrby(key, field, 1)
+            pipeline.hincrby(delta_key, field, 1)
+        pipeline.expire(key, self.COUNTER_TTL)
+        pipeline.sadd(self.DIRTY_SET_KEY, f"{tenant_id}:{event_id}")
+        pipeline.execute()
+
+    def _seed_from_database(self, key: str, event_id) -> None:
+        """
+        Copy persisted counts into a missing Redis hash.
+        One worker seeds under a lock while the others wait for it, so
+        no increment lands in the hash before the persisted counts do.
+        """
+        lock_key = f"{key}:{self.SEED_LOCK_SUFFIX}"
+
+        for _ in range(self.SEED_WAIT_ATTEMPTS):
+            if self._redis_client.set(lock_key, "locked", nx=True, ex=self.SEED_LOCK_TTL):
+                try:
+                    if not self._redis_client.exists(key):
+                        persisted = AdmissionCounter.objects.filter(event_id=event_id).values_list(
+                            'dimension', 'bucket', 'count'
+                        )
+                        pipeline = self._redis_client.pipeline(transaction=True)
+                        for dimension, bucket, count in persisted:
+                            if count:
+                                pipeline.hsetnx(key, self._encode_field(dimension, bucket), count)
+                        pipeline.expire(key, self.COUNTER_TTL)
+                        pipeline.execute()
+                finally:
+                    self._redis_client.delete(lock_key)
+                return
+
+            time.sleep(self.SEED_WAIT_INTERVAL)
+            if self._redis_client.exists(key):
+                return
+
+        logger.warning(f"Timed out waiting to seed admission counters {key}")
+
+    def _increment_database(self, tenant_id, event_id, fields: Dict[str, str]) -> None:
+        """Increment persisted counters directly (used without Redis)."""
+        for dimension, bucket in fields.items():
+            counter, created = AdmissionCounter.objects.get_or_create(
+                tenant_id=tenant_id,
+                event_id=event_id,
+                dimension=dimension,
+                bucket=bucket,
+                defaults={'count': 1}
+            )
+            if not created:
+                AdmissionCounter.objects.filter(pk=counter.pk).update(
+                    count=F('count') + 1,
+                    updated_at=timezone.now()
+                )
+
+    # Reading
+
+    def get_counters(self, tenant, event, minutes: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get live admission counters for an event.
+        Optionally restrict the minute series to the last N buckets.
+        """
+        values = {}
+        source = 'database'
+
+        if self._redis_client:
+            try:
+                raw = self._redis_client.hgetall(
+                    self._get_counter_key(tenant.id, event.id)
+                )
+                if raw:
+                    values = {
+                        self._decode_field(field.decode()): int(count)
+                        for field, count in raw.items()
+                    }
+                    source = 'redis'
+            except (ConnectionError, TimeoutError) as e:
+                logger.warning(f"Redis admission counter read failed: {e}")
+
+        if not values:
+            values = {
+                (dimension, bucket): count
+                for dimension, bucket, count in AdmissionCounter.objects.filter(
+                    tenant=tenant, event=event
+                ).values_list('dimension', 'bucket', 'count')
+            }
+
+        counters = {
+            'event_id': str(event.id),
+            'total_admissions': 0,
+            'zones': {},
+            'gates': {},
+            'minutes': [],
+            'source': source,
+            'as_of': timezone.now(),
+        }
+
+        minute_counts = {}
+        for (dimension, bucket), count in values.items():
+            if dimension == AdmissionCounter.Dimension.TOTAL:
+                counters['total_admissions'] = count
+            elif dimension == AdmissionCounter.Dimension.ZONE:
+                counters['zones'][bucket] = count
+            elif dimension == AdmissionCounter.Dimension.GATE:
+                counters['gates'][bucket] = count
+            elif dimension == AdmissionCounter.Dimension.MINUTE:
+                minute_counts[bucket] = count
+
+        buckets = sorted(minute_counts)
+        if minutes:
+            buckets = buckets[-minutes:]
+        counters['minutes'] = [
+            {'minute': bucket, 'count': minute_counts[bucket]} for bucket in buckets
+        ]
+
+        return counters
+
+    # Persistence
+
+    def persist_counters(self) -> int:
+        """
+        Flush live Redis counters for recently active events to the database.
+        Returns the number of events persisted.
+        """
+        if not self._redis_client:
+            return 0
+
+        try:
+            members = self._redis_client.smembers(self.DIRTY_SET_KEY)
+        except (ConnectionError, TimeoutError) as e:
+            logger.warning(f"Could not read dirty admission counters: {e}")
+            return 0
+
+        persisted = 0
+        for member in members:
+            # Remove before reading so concurrent admissions mark it dirty again
+            self._redis_client.srem(self.DIRTY_SET_KEY, member)
+            tenant_id, _, event_id = member.decode().partition(':')
+
+            # Take the increments made since the last run
+            delta_key = self._get_delta_key(tenant_id, event_id)
+            try:
+                pipeline = self._redis_client.pipeline(transaction=True)
+                pipeline.hgetall(delta_key)
+                pipeline.delete(delta_key)
+                raw, _ = pipeline.execute()
+            except (ConnectionError, TimeoutError) as e:
+                logger.warning(f"Could not read admission counter increments: {e}")
+                break
+            deltas = {
+                self._decode_field(field.decode()): int(count)
+                for field, count in raw.items()
+            }
+            if not deltas:
+                continue
+
+            try:
+                self._apply_deltas(tenant_id, event_id, deltas)
+                persisted += 1
+
+            except Exception as e:
+                logger.error(f"Failed to persist admission counters for event {event_id}: {e}")
+                # Put the increments back for the next run
+                pipeline = self._redis_client.pipeline(transaction=False)
+                for field, count in raw.items():
+                    pipeline.hincrby(delta_key, field, int(count))
+                pipeline.sadd(self.DIRTY_SET_KEY, member)
+                pipeline.execute()
+
+        return persisted
+
+    @staticmethod
+    def _apply_deltas(tenant_id, event_id, deltas: Dict) -> None:
+        """
+        Add increments to the persisted counters of the buckets they touch.
+        Adding rather than overwriting keeps admissions counted in the
+        database while Redis was down.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            AdmissionCounter.objects.bulk_create(
+                [
+                    AdmissionCounter(
+                        tenant_id=tenant_id,
+                        event_id=event_id,
+                        dimension=dimension,
+                        bucket=bucket,
+                        count=0
+                    )
+                    for dimension, bucket in deltas
+                ],
+                ignore_conflicts=True
+            )
+
+            counters = []
+            for counter in AdmissionCounter.objects.filter(
+                event_id=event_id,
+                dimension__in={dimension for dimension, _ in deltas},
+                bucket__in={bucket for _, bucket in deltas}
+            ):
+                delta = deltas.get((counter.dimension, counter.bucket))
+                if delta:
+                    counter.count = F('count') + delta
+                    counter.updated_at = now
+                    counters.append(counter)
+
+            AdmissionCounter.objects.bulk_update(counters, ['count', 'updated_at'])
+
+
+# Global counter service instance
+admission_counters = AdmissionCounterService()
@@ -0,0 +1,89 @@
+# Generated by Django 5.0.14 on 2026-10-18 20:34
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0003_add_payment_methods_to_event_configuration"),
+        ("tenants", "0002_add_performance_indexes"),
+        ("tickets", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AdmissionCounter",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "dimension",
+                    models.CharField(
+                        choices=[
+                            ("total", "Total"),
+                            ("zone", "Zone"),
+                            ("gate", "Gate"),
+                            ("minute", "Minute Bucket"),
+                        ],
+                        help_text="Dimension this counter is aggregated by",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "bucket",
+                    models.CharField(
+                        blank=True,
+                        help_text="Zone ID, gate ID or minute bucket (empty for totals)",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "count",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Number of admissions in this bucket"
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "event",
+                    models.ForeignKey(
+                        help_text="Event these admissions belong to",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="admission_counters",
+                        to="events.event",
+                    ),
+                ),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        help_text="Tenant this record belongs to",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="%(class)s_set",
+                        to="tenants.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Admission Counter",
+                "verbose_name_plural": "Admission Counters",
+                "db_table": "ticket_admission_counters",
+                "indexes": [
+                    models.Index(
+                        fields=["tenant", "event"],
+                        name="ticket_admi_tenant__e027fd_idx",
+                    )
+                ],
+                "unique_together": {("event", "dimension", "bucket")},
+            },
+        ),
+    ]
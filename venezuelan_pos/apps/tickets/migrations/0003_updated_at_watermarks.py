@@ -0,0 +1,30 @@
+# Generated by Django 5.0.14 on 2026-10-18 21:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0001_initial"),
+        ("events", "0003_add_payment_methods_to_event_configuration"),
+        ("sales", "0004_updated_at_watermarks"),
+        ("tenants", "0002_add_performance_indexes"),
+        ("tickets", "0002_admissioncounter"),
+        ("zones", "0005_zone_map_color"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="digitalticket",
+            index=models.Index(
+                fields=["tenant", "updated_at"], name="digital_tic_tenant__0c7757_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticketvalidationlog",
+            index=models.Index(
+                fields=["tenant", "validated_at"], name="ticket_vali_tenant__05e60c_idx"
+            ),
+        ),
+    ]
@@ -12,6 +12,7 @@ from django.conf import settings
 from cryptography.fernet import Fernet
 import base64
 import json
+from venezuelan_pos.core.query_budget import query_budget
 from venezuelan_pos.apps.tenants.models import TenantAwareModel
 from venezuelan_pos.apps.sales.models import Transaction, TransactionItem
 from venezuelan_pos.apps.events.models import Event
@@ -30,18 +31,21 @@ class DigitalTicketManager(models.Manager):
             raise ValidationError("Can only generate tickets for completed transactions")
         
         tickets = []
-        for item in transaction.items.all():
+        # Items are loaded once, with what the tickets copy from them
+        items = list(transaction.items.select_related('zone', 'seat'))
+        for item_index, item in enumerate(items, start=1):
             # Generate individual tickets based on quantity
             for i in range(item.quantity):
-                ticket = self.create_ticket_for_item(transaction, item, i + 1)
+                ticket = self.create_ticket_for_item(transaction, item, i + 1, item_index=item_index)
                 tickets.append(ticket)
         
         return tickets
     
-    def create_ticket_for_item(self, transaction, item, sequence_number=1):
+    @query_budget(max_queries=2)
+    def create_ticket_for_item(self, transaction, item, sequence_number=1, item_index=None):
         """Create a single digital ticket for a transaction item."""
         # Generate unique ticket number
-        ticket_number = self._generate_ticket_number(transaction, item, sequence_number)
+        ticket_number = self._generate_ticket_number(transaction, item, sequence_number, item_index)
         
         # Create the ticket
         ticket = self.create(
@@ -61,15 +65,17 @@ class DigitalTicketManager(models.Manager):
             status=DigitalTicket.Status.ACTIVE
         )
         
-        # Generate QR code after creation
-        ticket.generate_qr_code()
+        # Generate QR code after creation, unless the post_save signal did
+        if not ticket.qr_code_data:
+            ticket.generate_qr_code()
         
         return ticket
     
-    def _generate_ticket_number(self, transaction, item, sequence_number):
+    def _generate_ticket_number(self, transaction, item, sequence_number, item_index=None):
         """Generate unique ticket number."""
         # Format: FISCAL_SERIES-ITEM_INDEX-SEQUENCE
-        item_index = list(transaction.items.all()).index(item) + 1
+        if item_index is None:
+            item_index = list(transaction.items.all()).index(item) + 1
         return f"{transaction.fiscal_series}-{item_index:02d}-{sequence_number:02d}"
     
     def _determine_ticket_type(self, item):
@@ -261,6 +267,7 @@ class DigitalTicket(TenantAwareModel):
             models.Index(fields=['ticket_number']),
             models.Index(fields=['validation_hash']),
             models.Index(fields=['transaction']),
+            models.Index(fields=['tenant', 'updated_at']),
         ]
     
     def __str__(self):
@@ -471,6 +478,14 @@ class DigitalTicket(TenantAwareModel):
             usage_count_after=self.usage_count
         )
         
+        # Update live admission counters
+        from .counters import admission_counters
+        admission_counters.record_admission(
+            self,
+            gate=validation_system_id,
+            admitted_at=self.last_used_at
+        )
+        
         return {
             'valid': True,
             'ticket_number': self.ticket_number,
@@ -904,6 +919,7 @@ class TicketValidationLog(TenantAwareModel):
             models.Index(fields=['validation_system_id']),
             models.Index(fields=['validation_result']),
             models.Index(fields=['validated_at']),
+            models.Index(fields=['tenant', 'validated_at']),
         ]
     
     def __str__(self):
@@ -911,6 +927,57 @@ class TicketValidationLog(TenantAwareModel):
         return f"{self.ticket.ticket_number} - {result} - {self.validated_at}"
 
 
+class AdmissionCounter(TenantAwareModel):
+    """
+    Persisted snapshot of live admission counters.
+    Live values are kept in Redis and periodically flushed here.
+    """
+
+    class Dimension(models.TextChoices):
+        TOTAL = 'total', 'Total'
+        ZONE = 'zone', 'Zone'
+        GATE = 'gate', 'Gate'
+        MINUTE = 'minute', 'Minute Bucket'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='admission_counters',
+        help_text="Event these admissions belong to"
+    )
+    dimension = models.CharField(
+        max_length=20,
+        choices=Dimension.choices,
+        help_text="Dimension this counter is aggregated by"
+    )
+    bucket = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="Zone ID, gate ID or minute bucket (empty for totals)"
+    )
+    count = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of admissions in this bucket"
+    )
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'ticket_admission_counters'
+        verbose_name = 'Admission Counter'
+        verbose_name_plural = 'Admission Counters'
+        unique_together = ['event', 'dimension', 'bucket']
+        indexes = [
+            models.Index(fields=['tenant', 'event']),
+        ]
+
+    def __str__(self):
+        label = f"{self.dimension}:{self.bucket}" if self.bucket else self.dimension
+        return f"{self.event_id} - {label} - {self.count}"
+
+
 # Signal to automatically generate digital tickets when transaction is completed
 from django.db.models.signals import post_save
 from django.dispatch import receiver
@@ -0,0 +1,29 @@
+"""
+Celery tasks for digital tickets.
+"""
+
+import logging
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def persist_admission_counters():
+    """
+    Persist live admission counters from Redis to the database.
+    Runs every minute so counters survive Redis restarts.
+    """
+    try:
+        from .counters import admission_counters
+
+        persisted = admission_counters.persist_counters()
+
+        if persisted > 0:
+            logger.info(f"Persisted admission counters for {persisted} events")
+
+        return persisted
+
+    except Exception as e:
+        logger.error(f"Error persisting admission counters: {e}")
+        return 0
@@ -20,6 +20,9 @@ class TicketValidator:
     Handles QR code decryption, ticket authenticity, and usage tracking.
     """
     
+    # Relations read while validating a ticket, loaded with it
+    TICKET_RELATED = ('event', 'customer', 'zone', 'seat')
+    
     def __init__(self):
         """Initialize validator with encryption key."""
         self.encryption_key = getattr(settings, 'TICKET_ENCRYPTION_KEY', None)
@@ -45,7 +48,7 @@ class TicketValidator:
             
             # Find ticket by ID
             try:
-                ticket = DigitalTicket.objects.get(id=ticket_data.get('ticket_id'))
+                ticket = DigitalTicket.objects.select_related(*self.TICKET_RELATED).get(id=ticket_data.get('ticket_id'))
             except DigitalTicket.DoesNotExist:
                 return self._validation_failed("Ticket not found")
             
@@ -72,7 +75,7 @@ class TicketValidator:
             dict: Validation result with ticket information
         """
         try:
-            ticket = DigitalTicket.objects.get(ticket_number=ticket_number)
+            ticket = DigitalTicket.objects.select_related(*self.TICKET_RELATED).get(ticket_number=ticket_number)
             return self._validate_ticket_usage(ticket, validation_context)
         except DigitalTicket.DoesNotExist:
             return self._validation_failed("Ticket not found")
@@ -101,7 +104,7 @@ class TicketValidator:
             ticket_id = result.get('ticket_id')
             if ticket_id:
                 try:
-                    ticket = DigitalTicket.objects.get(id=ticket_id)
+                    ticket = DigitalTicket.objects.select_related(*self.TICKET_RELATED).get(id=ticket_id)
                     system_id = validation_context.get('system_id', 'unknown') if validation_context else 'unknown'
                     use_result = ticket.validate_and_use(system_id)
                     
@@ -148,7 +151,7 @@ class TicketValidator:
             ticket_id = result.get('ticket_id')
             if ticket_id:
                 try:
-                    ticket = DigitalTicket.objects.get(id=ticket_id)
+                    ticket = DigitalTicket.objects.select_related(*self.TICKET_RELATED).get(id=ticket_id)
                     return ticket.check_validation_only()
                 except DigitalTicket.DoesNotExist:
                     pass
@@ -173,12 +176,12 @@ class TicketValidator:
                 return self._validation_failed("Invalid QR code format")
             
             try:
-                ticket = DigitalTicket.objects.get(id=ticket_data.get('ticket_id'))
+                ticket = DigitalTicket.objects.select_related(*self.TICKET_RELATED).get(id=ticket_data.get('ticket_id'))
             except DigitalTicket.DoesNotExist:
                 return self._validation_failed("Ticket not found")
         else:
             try:
-                ticket = DigitalTicket.objects.get(ticket_number=ticket_identifier)
+                ticket = DigitalTicket.objects.select_related(*self.TICKET_RELATED).get(ticket_number=ticket_identifier)
             except DigitalTicket.DoesNotExist:
                 return self._validation_failed("Ticket not found")
         
@@ -5,6 +5,8 @@ from django.shortcuts import get_object_or_404
 from django.db.models import Q, Count, Case, When, IntegerField
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from venezuelan_pos.core.db_router import with_reporting_db
+from venezuelan_pos.core.query_budget import query_budget
 from venezuelan_pos.apps.tenants.mixins import TenantViewMixin
 from venezuelan_pos.apps.sales.models import Transaction
 from .models import DigitalTicket, TicketTemplate, TicketValidationLog
@@ -314,6 +316,7 @@ class DigitalTicketViewSet(TenantViewMixin, viewsets.ReadOnlyModelViewSet):
             )
     
     @action(detail=False, methods=['get'])
+    @with_reporting_db
     def usage_stats(self, request):
         """Get ticket usage statistics."""
         serializer = TicketUsageStatsSerializer(data=request.query_params)
@@ -514,6 +517,7 @@ class TicketValidationLogViewSet(TenantViewMixin, viewsets.ReadOnlyModelViewSet)
         ).select_related('ticket', 'ticket__customer', 'ticket__event')
     
     @action(detail=False, methods=['get'])
+    @with_reporting_db
     def stats(self, request):
         """Get validation statistics."""
         queryset = self.get_queryset()
@@ -545,6 +549,44 @@ class TicketValidationLogViewSet(TenantViewMixin, viewsets.ReadOnlyModelViewSet)
         
         return Response(stats)
     
+    @action(detail=False, methods=['get'])
+    def live_counters(self, request):
+        """
+        Get live admission counters for an event.
+        Served from Redis counters, never from validation logs.
+        """
+        from venezuelan_pos.apps.events.models import Event
+        from .counters import admission_counters
+        
+        event_id = request.query_params.get('event_id')
+        if not event_id:
+            return Response(
+                {'error': 'event_id is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            event = Event.objects.get(id=event_id, tenant=request.user.tenant)
+        except (Event.DoesNotExist, ValidationError, ValueError):
+            return Response(
+                {'error': 'Event not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        minutes = request.query_params.get('minutes')
+        try:
+            minutes = int(minutes) if minutes else None
+        except ValueError:
+            return Response(
+                {'error': 'minutes must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        counters = admission_counters.get_counters(
+            request.user.tenant, event, minutes=minutes
+        )
+        return Response(counters)
+    
     @action(detail=False, methods=['post'])
     def bulk_validate(self, request):
         """
@@ -579,10 +621,12 @@ class TicketValidationLogViewSet(TenantViewMixin, viewsets.ReadOnlyModelViewSet)
         results = []
         
         for identifier in ticket_identifiers:
-            if mark_as_used:
-                result = validator.validate_and_use_ticket(identifier, validation_context)
-            else:
-                result = validator.check_ticket_status(identifier)
+            # Each ticket costs the same few queries however many are sent
+            with query_budget(max_queries=7, name='TicketViewSet.bulk_validate per ticket'):
+                if mark_as_used:
+                    result = validator.validate_and_use_ticket(identifier, validation_context)
+                else:
+                    result = validator.check_ticket_status(identifier)
             
             result['identifier'] = identifier
             result['validation_timestamp'] = timezone.now()
@@ -605,6 +649,7 @@ class TicketValidationLogViewSet(TenantViewMixin, viewsets.ReadOnlyModelViewSet)
         })
     
     @action(detail=False, methods=['get'])
+    @with_reporting_db
     def validation_stats_detailed(self, request):
         """
         Get detailed validation statistics with breakdown by system, method, etc.
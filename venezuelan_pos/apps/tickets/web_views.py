@@ -16,6 +16,7 @@ from django.db.models import Q, Count, Case, When, IntegerField
 from django.utils import timezone
 from django.core.paginator import Paginator
 from django.db import transaction
+from venezuelan_pos.core.db_router import with_reporting_db
 from venezuelan_pos.apps.tenants.mixins import TenantViewMixin
 from venezuelan_pos.apps.events.models import Event
 from venezuelan_pos.apps.customers.models import Customer
@@ -376,6 +377,7 @@ def resend_ticket(request, ticket_id):
 
 
 @login_required
+@with_reporting_db
 def ticket_analytics(request):
     """Ticket analytics and reporting dashboard."""
     tenant = request.user.tenant
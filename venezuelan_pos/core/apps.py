@@ -12,5 +12,9 @@ class CoreConfig(AppConfig):
     
     def ready(self):
         """Initialize core utilities when Django starts."""
-        # Import signal handlers and optimizations
-        pass
\ No newline at end of file
+        from django.db.backends.signals import connection_created
+
+        from .instrumentation import install_query_counter
+
+        # Count queries per request on every connection, DEBUG or not
+        connection_created.connect(install_query_counter, dispatch_uid='core_install_query_counter')
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+Helpers for async views.
+Under ASGI these views wait on Redis and the database without holding a
+worker thread, so one worker serves many concurrent availability and
+validation requests. Django REST framework (3.14) cannot run async views,
+so API endpoints use plain Django views authenticated and throttled with
+the REST framework authenticators (JWT, session) and throttle classes.
+"""
+
+import functools
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.auth.views import redirect_to_login
+from django.http import JsonResponse
+from django.views import View
+from rest_framework.exceptions import APIException, Throttled
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+
+def _check_api_request(request, view):
+    """
+    Authenticate and throttle an API request like a REST framework view
+    with IsAuthenticated and the default throttle classes.
+    Returns (user, response), where response refuses the request, if set.
+    """
+    drf_request = Request(
+        request,
+        authenticators=[authenticator() for authenticator in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    )
+    try:
+        user = drf_request.user
+    except APIException:
+        user = AnonymousUser()
+
+    if not user.is_authenticated:
+        return user, JsonResponse(
+            {'detail': 'Authentication credentials were not provided.'},
+            status=401
+        )
+
+    waits = []
+    for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+        throttle = throttle_class()
+        if not throttle.allow_request(drf_request, view):
+            waits.append(throttle.wait())
+
+    if waits:
+        throttled = Throttled(max((wait for wait in waits if wait is not None), default=None))
+        response = JsonResponse({'detail': throttled.detail}, status=throttled.status_code)
+        if throttled.wait is not None:
+            response['Retry-After'] = '%d' % throttled.wait
+        return user, response
+
+    return user, None
+
+
+def async_login_required(view):
+    """login_required for async views: anonymous users are sent to the login page."""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def async_api_view(view):
+    """
+    Authenticate and throttle an async API view like a REST framework view
+    with IsAuthenticated and the default throttles: unauthenticated
+    requests get a 401 JSON response, throttled ones a 429.
+    The authenticated user is set on request.user.
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        # Token lookup, session loading and throttle history hit the
+        # database and cache
+        user, response = await sync_to_async(_check_api_request)(request, view)
+        if response is not None:
+            return response
+        request.user = user
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+class AsyncAPIView(View):
+    """
+    Class-based async API view with async_api_view authentication and
+    throttling. Handlers (get, post, ...) must be coroutines returning
+    Django responses.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        user, response = await sync_to_async(_check_api_request)(request, self)
+        if response is not None:
+            return response
+        request.user = user
+        return await super().dispatch(request, *args, **kwargs)
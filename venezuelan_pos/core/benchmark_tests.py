@@ -0,0 +1,53 @@
+"""
+pytest-benchmark cases for the hot paths in core/benchmarks.py.
+Not part of the regular test run (manage.py test does not collect them);
+run and compare with:
+
+    pytest venezuelan_pos/core/benchmark_tests.py --benchmark-autosave
+    pytest venezuelan_pos/core/benchmark_tests.py --benchmark-compare
+    pytest venezuelan_pos/core/benchmark_tests.py --benchmark-json=results.json
+"""
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from venezuelan_pos.apps.tenants.middleware import tenant_context
+from venezuelan_pos.core.benchmarks import BENCHMARK_CASES, seed_venue
+
+pytestmark = pytest.mark.slow
+
+ROUNDS = 10
+WARMUP_ROUNDS = 1
+
+# Smaller than the command's default venue, to keep the suite quick
+VENUE = {
+    'numbered_zones': 2,
+    'rows': 10,
+    'seats_per_row': 10,
+    'general_zones': 1,
+    'general_capacity': 500,
+    'stages': 3,
+    'prior_sales': 50,
+}
+
+
+@pytest.fixture
+def venue(db):
+    venue = seed_venue(**VENUE)
+    with tenant_context(venue.tenant):
+        yield venue
+
+
+@pytest.mark.parametrize('name', list(BENCHMARK_CASES))
+def test_hot_path(benchmark, venue, name):
+    case = BENCHMARK_CASES[name](venue)
+    case.prepare(ROUNDS + WARMUP_ROUNDS)
+    benchmark.group = 'hot paths'
+    benchmark.extra_info['venue'] = venue.config
+    benchmark.pedantic(
+        case.run,
+        setup=lambda: (case.setup(), {}),
+        rounds=ROUNDS,
+        warmup_rounds=WARMUP_ROUNDS
+    )
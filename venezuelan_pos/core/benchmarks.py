@@ -0,0 +1,637 @@
+"""
+Benchmarks of the sales, pricing, ticketing and reporting hot paths.
+A seeded venue (numbered and general zones, price stages, row pricing and
+prior sales) gives every path realistic data to work on; each benchmark
+then times the real service or view, one round at a time, with the
+per-round set-up left out of the timings.
+
+    venue = seed_venue(numbered_zones=2, rows=20, seats_per_row=25, prior_sales=200)
+    results = run_benchmarks(venue, rounds=20)
+
+Used by the benchmark_hot_paths command and by benchmark_tests.py
+(pytest-benchmark). Results are plain dicts, written as JSON for
+run-to-run comparison.
+"""
+
+import platform
+import random
+import statistics
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+import django
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.utils import timezone
+
+from .instrumentation import end_request_stats, start_request_stats
+
+# Venue seeded when no sizes are given
+DEFAULT_VENUE = {
+    'numbered_zones': 2,
+    'rows': 20,
+    'seats_per_row': 25,
+    'general_zones': 1,
+    'general_capacity': 1000,
+    'stages': 3,
+    'prior_sales': 200,
+    'cart_size': 4,
+    'seed': 0,
+}
+
+# Share of each numbered zone's seats prior sales may take; the rest is
+# left for the benchmarks that sell or lock seats
+PRIOR_SALES_SEAT_SHARE = 0.5
+
+# Days prior sales are spread over
+PRIOR_SALES_DAYS = 30
+
+
+class BenchmarkError(Exception):
+    """A benchmarked path failed or the seeded venue cannot support a run."""
+
+
+class BenchmarkVenue:
+    """
+    Objects seeded for a benchmark run, and the seats still free to lock
+    or sell. Seats are handed out once, so every round works on seats
+    nobody holds yet.
+    """
+
+    def __init__(self, tenant, user, customer, event, numbered_zones, general_zones,
+                 payment_method, free_seat_ids, config):
+        self.tenant = tenant
+        self.user = user
+        self.customer = customer
+        self.event = event
+        self.numbered_zones = numbered_zones
+        self.general_zones = general_zones
+        self.payment_method = payment_method
+        self.free_seat_ids = free_seat_ids
+        self.config = config
+
+    @property
+    def zones(self):
+        return self.numbered_zones + self.general_zones
+
+    def take_seats(self, count):
+        """Free seats, as (seat_id, zone_id) pairs, nobody else will be given."""
+        if count > len(self.free_seat_ids):
+            raise BenchmarkError(
+                f"The venue has {len(self.free_seat_ids)} free seats left, {count} needed; "
+                f"seed more rows or run fewer rounds"
+            )
+        seats, self.free_seat_ids = self.free_seat_ids[:count], self.free_seat_ids[count:]
+        return seats
+
+
+def seed_venue(**options) -> BenchmarkVenue:
+    """
+    Create a tenant with one event at a venue of the given size.
+    The event started half an hour ago and is on sale, so tickets can be
+    both sold and validated. Options default to DEFAULT_VENUE.
+    """
+    from venezuelan_pos.apps.customers.models import Customer
+    from venezuelan_pos.apps.events.models import Event, Venue
+    from venezuelan_pos.apps.payments.models import PaymentMethod
+    from venezuelan_pos.apps.pricing.models import PriceStage, RowPricing
+    from venezuelan_pos.apps.tenants.models import Tenant, User
+    from venezuelan_pos.apps.zones.models import Zone
+
+    config = {**DEFAULT_VENUE, **{key: value for key, value in options.items() if value is not None}}
+    rng = random.Random(config['seed'])
+    suffix = uuid.uuid4().hex[:8]
+    now = timezone.now()
+
+    tenant = Tenant.objects.create(
+        name=f"Benchmark {suffix}",
+        slug=f"benchmark-{suffix}",
+        fiscal_series_prefix="BM"
+    )
+    user = User.objects.create_user(
+        username=f"benchmark-{suffix}",
+        password=uuid.uuid4().hex,
+        tenant=tenant,
+        role=User.Role.TENANT_ADMIN
+    )
+    customer = Customer.objects.create(
+        tenant=tenant,
+        name="Benchmark",
+        surname="Customer",
+        email=f"benchmark-{suffix}@example.com",
+        phone="+584121234567"
+    )
+    payment_method = PaymentMethod.objects.create(
+        tenant=tenant,
+        method_type=PaymentMethod.MethodType.CASH,
+        name="Cash"
+    )
+
+    seats_per_zone = config['rows'] * config['seats_per_row']
+    venue = Venue.objects.create(
+        tenant=tenant,
+        name=f"Benchmark Venue {suffix}",
+        capacity=config['numbered_zones'] * seats_per_zone + config['general_zones'] * config['general_capacity']
+    )
+    event = Event.objects.create(
+        tenant=tenant,
+        venue=venue,
+        name=f"Benchmark Event {suffix}",
+        event_type=Event.EventType.MIXED,
+        status=Event.Status.ACTIVE,
+        start_date=now - timedelta(minutes=30),
+        end_date=now + timedelta(hours=4)
+    )
+
+    numbered_zones = [
+        Zone.objects.create(
+            tenant=tenant,
+            event=event,
+            name=f"Numbered {index + 1}",
+            zone_type=Zone.ZoneType.NUMBERED,
+            rows=config['rows'],
+            seats_per_row=config['seats_per_row'],
+            capacity=seats_per_zone,
+            base_price=Decimal('100.00')
+        )
+        for index in range(config['numbered_zones'])
+    ]
+    general_zones = [
+        Zone.objects.create(
+            tenant=tenant,
+            event=event,
+            name=f"General {index + 1}",
+            zone_type=Zone.ZoneType.GENERAL,
+            capacity=config['general_capacity'],
+            base_price=Decimal('50.00')
+        )
+        for index in range(config['general_zones'])
+    ]
+
+    # The first stage is current, later ones follow it back to back
+    stage_start = now - timedelta(days=1)
+    for index in range(config['stages']):
+        stage_end = stage_start + timedelta(days=2)
+        PriceStage.objects.create(
+            tenant=tenant,
+            event=event,
+            name=f"Stage {index + 1}",
+            start_date=stage_start,
+            end_date=stage_end,
+            modifier_type=PriceStage.ModifierType.PERCENTAGE,
+            modifier_value=Decimal('10.00') * (index + 1),
+            stage_order=index + 1
+        )
+        stage_start = stage_end
+
+    # Front rows cost more
+    for zone in numbered_zones:
+        for row in range(1, min(config['rows'], 5) + 1):
+            RowPricing.objects.create(
+                tenant=tenant,
+                zone=zone,
+                row_number=row,
+                percentage_markup=Decimal('5.00') * (6 - row),
+                name=f"Row {row}"
+            )
+
+    free_seat_ids = []
+    sellable_seats = []
+    for zone in numbered_zones:
+        seat_ids = list(zone.seats.order_by('row_number', 'seat_number').values_list('id', flat=True))
+        rng.shuffle(seat_ids)
+        split = int(len(seat_ids) * PRIOR_SALES_SEAT_SHARE)
+        sellable_seats.extend((seat_id, zone) for seat_id in seat_ids[:split])
+        free_seat_ids.extend((seat_id, zone.id) for seat_id in seat_ids[split:])
+
+    _seed_prior_sales(
+        tenant, event, customer, payment_method, sellable_seats, general_zones,
+        config['prior_sales'], config['cart_size'], rng
+    )
+
+    return BenchmarkVenue(
+        tenant, user, customer, event, numbered_zones, general_zones, payment_method,
+        free_seat_ids, config
+    )
+
+
+def _seed_prior_sales(tenant, event, customer, payment_method, sellable_seats, general_zones,
+                      count, cart_size, rng):
+    """
+    Completed sales spread over the last PRIOR_SALES_DAYS, written in bulk
+    (no tickets or signals), with the hourly sales rollups rebuilt after.
+    """
+    from venezuelan_pos.apps.payments.models import Payment
+    from venezuelan_pos.apps.reports.rollups import sales_rollups
+    from venezuelan_pos.apps.sales.models import Transaction, TransactionItem
+    from venezuelan_pos.apps.zones.models import Seat
+
+    if not count:
+        return
+
+    now = timezone.now()
+    transactions, items, payments, sold_seat_ids = [], [], [], []
+    for _ in range(count):
+        completed_at = now - timedelta(minutes=rng.randrange(1, PRIOR_SALES_DAYS * 24 * 60))
+        sale = Transaction(
+            tenant=tenant,
+            event=event,
+            customer=customer,
+            status=Transaction.Status.COMPLETED,
+            completed_at=completed_at
+        )
+        sale_items = []
+        if sellable_seats and (not general_zones or rng.random() < 0.6):
+            for _ in range(min(rng.randint(1, cart_size), len(sellable_seats))):
+                seat_id, zone = sellable_seats.pop()
+                sold_seat_ids.append(seat_id)
+                sale_items.append(TransactionItem(
+                    tenant=tenant, transaction=sale, zone=zone, seat_id=seat_id,
+                    item_type=TransactionItem.ItemType.NUMBERED_SEAT, quantity=1,
+                    unit_price=zone.base_price, subtotal_price=zone.base_price, total_price=zone.base_price
+                ))
+        elif general_zones:
+            zone = rng.choice(general_zones)
+            quantity = rng.randint(1, cart_size)
+            sale_items.append(TransactionItem(
+                tenant=tenant, transaction=sale, zone=zone,
+                item_type=TransactionItem.ItemType.GENERAL_ADMISSION, quantity=quantity,
+                unit_price=zone.base_price, subtotal_price=zone.base_price * quantity,
+                total_price=zone.base_price * quantity
+            ))
+        if not sale_items:
+            break
+
+        sale.subtotal_amount = sale.total_amount = sum(item.total_price for item in sale_items)
+        transactions.append(sale)
+        items.extend(sale_items)
+        payments.append(Payment(
+            tenant=tenant, transaction=sale, payment_method=payment_method,
+            amount=sale.total_amount, net_amount=sale.total_amount,
+            status=Payment.Status.COMPLETED, completed_at=completed_at
+        ))
+
+    Transaction.objects.bulk_create(transactions)
+    TransactionItem.objects.bulk_create(items)
+    Payment.objects.bulk_create(payments)
+    Seat.objects.filter(id__in=sold_seat_ids).update(status=Seat.Status.SOLD)
+    sales_rollups.backfill(tenant=tenant)
+
+
+def create_completed_transaction(venue, seat_count=0, general_quantity=0):
+    """
+    A completed transaction with a fiscal series and no tickets yet.
+    Written without model signals, which would generate its tickets.
+    """
+    from venezuelan_pos.apps.sales.models import FiscalSeriesCounter, Transaction, TransactionItem
+
+    with transaction.atomic():
+        fiscal_series = FiscalSeriesCounter.objects.get_next_series(tenant=venue.tenant, event=venue.event)
+        sale = Transaction(
+            tenant=venue.tenant,
+            event=venue.event,
+            customer=venue.customer,
+            fiscal_series=fiscal_series,
+            status=Transaction.Status.COMPLETED,
+            completed_at=timezone.now()
+        )
+        zones = {zone.id: zone for zone in venue.numbered_zones}
+        items = [
+            TransactionItem(
+                tenant=venue.tenant, transaction=sale, zone=zones[zone_id], seat_id=seat_id,
+                item_type=TransactionItem.ItemType.NUMBERED_SEAT, quantity=1,
+                unit_price=zones[zone_id].base_price, subtotal_price=zones[zone_id].base_price,
+                total_price=zones[zone_id].base_price
+            )
+            for seat_id, zone_id in venue.take_seats(seat_count)
+        ]
+        if general_quantity:
+            zone = venue.general_zones[0]
+            items.append(TransactionItem(
+                tenant=venue.tenant, transaction=sale, zone=zone,
+                item_type=TransactionItem.ItemType.GENERAL_ADMISSION, quantity=general_quantity,
+                unit_price=zone.base_price, subtotal_price=zone.base_price * general_quantity,
+                total_price=zone.base_price * general_quantity
+            ))
+        sale.subtotal_amount = sale.total_amount = sum(item.total_price for item in items)
+        Transaction.objects.bulk_create([sale])
+        TransactionItem.objects.bulk_create(items)
+    return sale
+
+
+class BenchmarkCase:
+    """
+    One benchmarked path. prepare() runs once before the rounds, setup()
+    before each round; both are untimed. run() is the timed call and
+    raises BenchmarkError if the path did not do its job.
+    """
+
+    name = None
+
+    def __init__(self, venue: BenchmarkVenue):
+        self.venue = venue
+
+    def prepare(self, rounds: int) -> None:
+        pass
+
+    def setup(self) -> tuple:
+        return ()
+
+    def run(self, *args) -> None:
+        raise NotImplementedError
+
+
+class LockItemsBenchmark(BenchmarkCase):
+    """CartLockService.lock_items() for a cart of free seats and general admission."""
+
+    name = 'lock_items'
+
+    def prepare(self, rounds):
+        self.session_key = None
+
+    def setup(self):
+        from venezuelan_pos.apps.sales.cart_lock_service import CartLockService
+
+        # Locks of the previous round are released, as leaving the page would
+        if self.session_key:
+            CartLockService.release_locks(self.session_key)
+        self.session_key = uuid.uuid4().hex
+        items = [
+            {'zone_id': str(zone_id), 'seat_id': str(seat_id)}
+            for seat_id, zone_id in self.venue.take_seats(self.venue.config['cart_size'])
+        ]
+        if self.venue.general_zones:
+            items.append({'zone_id': str(self.venue.general_zones[0].id), 'quantity': 2})
+        return (self.session_key, items)
+
+    def run(self, session_key, items):
+        from venezuelan_pos.apps.sales.cart_lock_service import CartLockService
+
+        success, _locks, errors = CartLockService.lock_items(session_key, self.venue.user, items)
+        if not success:
+            raise BenchmarkError(f"lock_items failed: {'; '.join(errors)}")
+
+
+class CheckoutConfirmBenchmark(BenchmarkCase):
+    """The checkout_confirm view completing a cart of seats and general admission."""
+
+    name = 'checkout_confirm'
+
+    def setup(self):
+        cart = {
+            str(seat_id): {
+                'seat_id': str(seat_id), 'zone_id': str(zone_id), 'unit_price': '100.00', 'quantity': 1
+            }
+            for seat_id, zone_id in self.venue.take_seats(self.venue.config['cart_size'])
+        }
+        if self.venue.general_zones:
+            zone_id = str(self.venue.general_zones[0].id)
+            cart[f'general_{zone_id}'] = {'zone_id': zone_id, 'unit_price': '50.00', 'quantity': 2}
+
+        request = RequestFactory().post('/sales/checkout/confirm/', HTTP_ACCEPT='application/json')
+        request.user = self.venue.user
+        request.tenant = self.venue.tenant
+        request.session = SessionStore()
+        request.session['shopping_cart'] = cart
+        request.session['checkout_customer_id'] = str(self.venue.customer.id)
+        request._messages = FallbackStorage(request)
+        return (request,)
+
+    def run(self, request):
+        from venezuelan_pos.apps.sales.web_views import checkout_confirm
+
+        response = checkout_confirm(request)
+        if response.status_code != 200 or b'"success": true' not in response.content:
+            raise BenchmarkError(f"checkout_confirm failed: {response.status_code} {response.content[:200]!r}")
+
+
+class CalculateSeatPriceBenchmark(BenchmarkCase):
+    """calculate_seat_price() for seats across all rows, stages and row pricing applied."""
+
+    name = 'calculate_seat_price'
+
+    def prepare(self, rounds):
+        from venezuelan_pos.apps.zones.models import Seat
+
+        self.seat_ids = list(
+            Seat.objects.filter(zone__in=self.venue.numbered_zones).values_list('id', flat=True)
+        )
+        if not self.seat_ids:
+            raise BenchmarkError("calculate_seat_price needs a numbered zone")
+        self.index = 0
+
+    def setup(self):
+        from venezuelan_pos.apps.zones.models import Seat
+
+        # A freshly loaded seat, as a request would have
+        seat = Seat.objects.get(id=self.seat_ids[self.index % len(self.seat_ids)])
+        self.index += 1
+        return (seat,)
+
+    def run(self, seat):
+        from venezuelan_pos.apps.pricing.services import calculate_seat_price
+
+        calculate_seat_price(seat)
+
+
+class GenerateForTransactionBenchmark(BenchmarkCase):
+    """DigitalTicketManager.generate_for_transaction() for a completed cart."""
+
+    name = 'generate_for_transaction'
+
+    def prepare(self, rounds):
+        self.transaction = create_completed_transaction(
+            self.venue,
+            seat_count=self.venue.config['cart_size'],
+            general_quantity=2 if self.venue.general_zones else 0
+        )
+
+    def setup(self):
+        from venezuelan_pos.apps.tickets.models import DigitalTicket, TicketValidationLog
+
+        # The same transaction is ticketed every round
+        TicketValidationLog.objects.filter(ticket__transaction=self.transaction).delete()
+        DigitalTicket.objects.filter(transaction=self.transaction).delete()
+        return ()
+
+    def run(self):
+        from venezuelan_pos.apps.tickets.models import DigitalTicket
+
+        DigitalTicket.objects.generate_for_transaction(self.transaction)
+
+
+class ValidateAndUseTicketBenchmark(BenchmarkCase):
+    """TicketValidator.validate_and_use_ticket() scanning a fresh ticket's QR code."""
+
+    name = 'validate_and_use_ticket'
+
+    def prepare(self, rounds):
+        from venezuelan_pos.apps.tickets.models import DigitalTicket
+        from venezuelan_pos.apps.tickets.validation import TicketValidator
+
+        if not self.venue.general_zones:
+            raise BenchmarkError("validate_and_use_ticket needs a general zone")
+        sale = create_completed_transaction(self.venue, general_quantity=rounds)
+        self.qr_codes = [ticket.qr_code_data for ticket in DigitalTicket.objects.generate_for_transaction(sale)]
+        self.validator = TicketValidator()
+        self.context = {'system_id': 'benchmark', 'location': 'Gate 1'}
+
+    def setup(self):
+        return (self.qr_codes.pop(),)
+
+    def run(self, qr_code_data):
+        result = self.validator.validate_and_use_ticket(qr_code_data, self.context)
+        if not result.get('valid'):
+            raise BenchmarkError(f"validate_and_use_ticket failed: {result.get('reason') or result}")
+
+
+class SalesReportBenchmark(BenchmarkCase):
+    """ReportService.generate_sales_report_data() over the prior sales period."""
+
+    name = 'generate_sales_report_data'
+
+    def setup(self):
+        now = timezone.now()
+        return ({'start_date': now - timedelta(days=PRIOR_SALES_DAYS), 'end_date': now},)
+
+    def run(self, filters):
+        from venezuelan_pos.apps.reports.services import ReportService
+
+        ReportService.generate_sales_report_data(self.venue.tenant, filters)
+
+
+class OccupancyHeatMapBenchmark(BenchmarkCase):
+    """ReportService.generate_occupancy_heat_map() of a numbered zone, uncached."""
+
+    name = 'generate_occupancy_heat_map'
+
+    def prepare(self, rounds):
+        if not self.venue.numbered_zones:
+            raise BenchmarkError("generate_occupancy_heat_map needs a numbered zone")
+        self.zone = self.venue.numbered_zones[0]
+
+    def setup(self):
+        from venezuelan_pos.apps.reports.services import ReportService
+
+        ReportService.invalidate_heat_maps([(self.zone.id, self.venue.event.id)])
+        return ()
+
+    def run(self):
+        from venezuelan_pos.apps.reports.services import ReportService
+
+        ReportService.generate_occupancy_heat_map(self.zone, self.venue.event)
+
+
+BENCHMARK_CASES = {
+    case.name: case
+    for case in (
+        LockItemsBenchmark,
+        CheckoutConfirmBenchmark,
+        CalculateSeatPriceBenchmark,
+        GenerateForTransactionBenchmark,
+        ValidateAndUseTicketBenchmark,
+        SalesReportBenchmark,
+        OccupancyHeatMapBenchmark,
+    )
+}
+
+
+def _summarize(timings, queries, db_times):
+    """Round statistics, in milliseconds."""
+    ordered = sorted(timings)
+    p95 = statistics.quantiles(ordered, n=20)[18] if len(ordered) >= 2 else ordered[-1]
+    return {
+        'rounds': len(ordered),
+        'mean_ms': statistics.mean(ordered) * 1000,
+        'median_ms': statistics.median(ordered) * 1000,
+        'p95_ms': p95 * 1000,
+        'min_ms': ordered[0] * 1000,
+        'max_ms': ordered[-1] * 1000,
+        'stdev_ms': statistics.stdev(ordered) * 1000 if len(ordered) > 1 else 0.0,
+        'queries': statistics.mean(queries),
+        'db_ms': statistics.mean(db_times) * 1000,
+    }
+
+
+def run_benchmark(name: str, venue: BenchmarkVenue, rounds: int = 20, warmup: int = 2) -> dict:
+    """
+    Time one benchmark. Warm-up rounds run first and are not counted.
+    Queries and database time per round come from the request
+    instrumentation (core/instrumentation.py).
+    """
+    case = BENCHMARK_CASES[name](venue)
+    case.prepare(rounds + warmup)
+
+    timings, queries, db_times = [], [], []
+    for round_index in range(warmup + rounds):
+        args = case.setup()
+        stats = start_request_stats()
+        start = time.perf_counter()
+        try:
+            case.run(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            end_request_stats()
+        if round_index >= warmup:
+            timings.append(elapsed)
+            queries.append(stats.queries)
+            db_times.append(stats.db_time)
+
+    return _summarize(timings, queries, db_times)
+
+
+def run_benchmarks(venue: BenchmarkVenue, names=None, rounds: int = 20, warmup: int = 2) -> dict:
+    """
+    Time the named benchmarks (all by default) against a seeded venue.
+    A benchmark that fails is reported with its error and the run goes on.
+    Each benchmark runs in a savepoint rolled back afterwards, so one
+    does not change the data the next one sees.
+    """
+    results = {}
+    for name in names or BENCHMARK_CASES:
+        try:
+            with transaction.atomic():
+                results[name] = run_benchmark(name, venue, rounds=rounds, warmup=warmup)
+                transaction.set_rollback(True)
+        except Exception as e:
+            results[name] = {'error': f"{type(e).__name__}: {e}"}
+    return results
+
+
+def benchmark_report(results: dict, venue: BenchmarkVenue, label: str = '') -> dict:
+    """JSON-serializable report of a run: environment, venue and results."""
+    return {
+        'label': label,
+        'created_at': timezone.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'machine': platform.machine(),
+        },
+        'venue': venue.config,
+        'results': results,
+    }
+
+
+def compare_results(previous: dict, current: dict) -> dict:
+    """
+    Median change of every benchmark in both reports, as
+    {name: {'previous_ms', 'current_ms', 'change_pct'}}; positive is slower.
+    """
+    comparison = {}
+    for name, result in current['results'].items():
+        before = previous.get('results', {}).get(name)
+        if not before or 'error' in before or 'error' in result:
+            continue
+        comparison[name] = {
+            'previous_ms': before['median_ms'],
+            'current_ms': result['median_ms'],
+            'change_pct': (result['median_ms'] - before['median_ms']) / before['median_ms'] * 100
+            if before['median_ms'] else 0.0,
+        }
+    return comparison
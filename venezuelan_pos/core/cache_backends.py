@@ -0,0 +1,99 @@
+"""
+Cache backends counting hits, misses and latency into the current
+request's stats (core/instrumentation.py).
+
+    CACHES = {'default': {'BACKEND': 'venezuelan_pos.core.cache_backends.InstrumentedRedisCache', ...}}
+"""
+
+import contextvars
+import time
+
+from django.core.cache.backends.locmem import LocMemCache
+from django_redis.cache import RedisCache
+from django_redis.serializers.json import JSONSerializer
+
+from .instrumentation import record_cache_access
+
+_MISSING = object()
+
+# Set while an instrumented call runs, so calls it makes to other
+# instrumented methods (get_many() -> get(), get_or_set() -> add()) are
+# not counted twice
+_in_cache_call = contextvars.ContextVar('in_cache_call', default=False)
+
+
+class InstrumentedCacheMixin:
+    """Counts reads as hits or misses and times reads and writes."""
+
+    def _measure(self, method, *args, **kwargs):
+        """Call a backend method; returns (result, seconds), or (result, None) if nested."""
+        if _in_cache_call.get():
+            return method(*args, **kwargs), None
+
+        token = _in_cache_call.set(True)
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs), time.perf_counter() - start
+        finally:
+            _in_cache_call.reset(token)
+
+    def get(self, key, default=None, *args, **kwargs):
+        value, duration = self._measure(super().get, key, _MISSING, *args, **kwargs)
+        hit = value is not _MISSING
+        if duration is not None:
+            record_cache_access(hits=int(hit), misses=int(not hit), duration=duration)
+        return value if hit else default
+
+    def get_many(self, keys, *args, **kwargs):
+        keys = list(keys)
+        values, duration = self._measure(super().get_many, keys, *args, **kwargs)
+        if duration is not None:
+            record_cache_access(hits=len(values), misses=len(keys) - len(values), duration=duration)
+        return values
+
+    def _write(self, method, *args, **kwargs):
+        result, duration = self._measure(method, *args, **kwargs)
+        if duration is not None:
+            record_cache_access(duration=duration)
+        return result
+
+    def set(self, *args, **kwargs):
+        return self._write(super().set, *args, **kwargs)
+
+    def add(self, *args, **kwargs):
+        return self._write(super().add, *args, **kwargs)
+
+    def set_many(self, *args, **kwargs):
+        return self._write(super().set_many, *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self._write(super().delete, *args, **kwargs)
+
+    def delete_many(self, *args, **kwargs):
+        return self._write(super().delete_many, *args, **kwargs)
+
+
+class InstrumentedRedisCache(InstrumentedCacheMixin, RedisCache):
+    """django-redis cache backend with request instrumentation."""
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    """Local memory cache backend with request instrumentation."""
+
+
+class JSONLocMemCache(LocMemCache):
+    """
+    Local memory cache storing values as JSON, like the Redis cache's
+    JSONSerializer, so tests see the types cached values come back with.
+    """
+
+    serializer = JSONSerializer({})
+
+    def _round_trip(self, value):
+        return self.serializer.loads(self.serializer.dumps(value))
+
+    def add(self, key, value, *args, **kwargs):
+        return super().add(key, self._round_trip(value), *args, **kwargs)
+
+    def set(self, key, value, *args, **kwargs):
+        return super().set(key, self._round_trip(value), *args, **kwargs)
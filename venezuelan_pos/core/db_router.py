@@ -1,11 +1,96 @@
 """
 Database router for read replica configuration.
 Routes read queries to replica database and write queries to primary database.
+Analytics and reporting reads go to the reporting database, falling back to
+the replica and then the primary when an alias lags too far behind. Within a
+routing scope (one request), reads stick to the primary once it has written.
 """
 
+import contextvars
+import functools
 import random
+import time
+from contextlib import contextmanager
+
 from django.conf import settings
 
+REPORTING_DATABASE = 'reporting'
+
+# Cookie keeping a client's reads on the primary shortly after it wrote
+PIN_COOKIE = 'db_pin'
+
+# Routing state lives in context variables, so concurrent requests served
+# from one event loop thread under ASGI keep their own scopes. The scope is
+# a mutable dict: writes recorded in a worker thread (sync_to_async) land in
+# the request's scope.
+_routing_scope = contextvars.ContextVar('db_routing_scope', default=None)
+_preferred_databases = contextvars.ContextVar('db_preferred_databases', default=None)
+
+
+def get_routing_setting(name):
+    """Value of a DATABASE_ROUTING setting, with defaults."""
+    defaults = {
+        'REPORTING_DATABASES': [REPORTING_DATABASE, 'replica'],
+        'MAX_REPLICA_LAG': 30,
+        'LAG_CHECK_INTERVAL': 10,
+        'READ_YOUR_WRITES_WINDOW': 5,
+    }
+    return getattr(settings, 'DATABASE_ROUTING', {}).get(name, defaults[name])
+
+
+def start_routing_scope(pinned=False):
+    """Begin a routing scope, usually a request. Reads stay on the primary if pinned."""
+    _routing_scope.set({'pinned': pinned, 'wrote': False})
+
+
+def end_routing_scope():
+    """
+    End the current routing scope.
+    Returns True if anything was written during it.
+    """
+    scope = _routing_scope.get()
+    _routing_scope.set(None)
+    return bool(scope and scope['wrote'])
+
+
+def record_write():
+    """Pin the rest of the current routing scope to the primary."""
+    scope = _routing_scope.get()
+    if scope is not None:
+        scope['pinned'] = True
+        scope['wrote'] = True
+
+
+def is_pinned_to_primary():
+    """Whether reads of the current routing scope must use the primary."""
+    scope = _routing_scope.get()
+    return bool(scope and scope['pinned'])
+
+
+def get_preferred_databases():
+    """Aliases preferred for reads by the innermost use_reporting_db()/use_read_replica()."""
+    return _preferred_databases.get()
+
+
+@contextmanager
+def prefer_databases(*aliases):
+    """Send reads inside the block to the first usable alias, else the primary."""
+    token = _preferred_databases.set(aliases)
+    try:
+        yield
+    finally:
+        _preferred_databases.reset(token)
+
+
+def use_reporting_db():
+    """Send analytics reads inside the block to the reporting database."""
+    return prefer_databases(*get_routing_setting('REPORTING_DATABASES'))
+
+
+def use_read_replica():
+    """Send reads inside the block to the read replica."""
+    return prefer_databases('replica')
+
 
 class DatabaseRouter:
     """
@@ -31,14 +116,23 @@ class DatabaseRouter:
         'pricing.stagetransition',  # Critical for pricing transitions
     }
     
+    # Apps whose writes do not pin reads to the primary
+    PIN_EXEMPT_APPS = {
+        'sessions',
+        'silk',
+    }
+    
     def db_for_read(self, model, **hints):
         """Suggest the database to read from."""
         app_label = model._meta.app_label
         model_name = f"{app_label}.{model._meta.model_name}"
         
-        # Always use primary for certain apps and models
-        if (app_label in self.PRIMARY_ONLY_APPS or 
-            model_name in self.PRIMARY_ONLY_MODELS):
+        # Always use primary for certain apps
+        if app_label in self.PRIMARY_ONLY_APPS:
+            return 'default'
+        
+        # Read your own writes
+        if is_pinned_to_primary():
             return 'default'
         
         # Check if we're in a transaction - if so, use primary for consistency
@@ -46,6 +140,14 @@ class DatabaseRouter:
         if transaction.get_connection().in_atomic_block:
             return 'default'
         
+        # Analytics reads tolerate lag, even on consistency-critical models
+        preferred = get_preferred_databases()
+        if preferred:
+            return ReadReplicaManager.get_usable_database(preferred)
+        
+        if model_name in self.PRIMARY_ONLY_MODELS:
+            return 'default'
+        
         # Use replica for read operations if available
         if 'replica' in settings.DATABASES:
             return 'replica'
@@ -54,12 +156,15 @@ class DatabaseRouter:
     
     def db_for_write(self, model, **hints):
         """Suggest the database to write to."""
+        if model._meta.app_label not in self.PIN_EXEMPT_APPS:
+            record_write()
+        
         # All writes go to primary database
         return 'default'
     
     def allow_relation(self, obj1, obj2, **hints):
         """Allow relations if models are in the same database."""
-        db_set = {'default', 'replica'}
+        db_set = {'default', 'replica', REPORTING_DATABASE}
         if obj1._state.db in db_set and obj2._state.db in db_set:
             return True
         return None
@@ -90,15 +195,19 @@ class ReportingDatabaseRouter:
     }
     
     def db_for_read(self, model, **hints):
-        """Route reporting reads to replica."""
+        """Route reporting reads to the reporting database."""
         app_label = model._meta.app_label
         model_name = f"{app_label}.{model._meta.model_name}"
         
-        # Use replica for reporting models
+        if is_pinned_to_primary():
+            return 'default'
+        
+        # Use the reporting database for reporting models
         if (app_label in self.REPORTING_APPS or 
             model_name in self.REPORTING_MODELS):
-            if 'replica' in settings.DATABASES:
-                return 'replica'
+            return ReadReplicaManager.get_usable_database(
+                get_routing_setting('REPORTING_DATABASES')
+            )
         
         return None  # Let other routers handle it
     
@@ -120,12 +229,15 @@ class ReadReplicaManager:
     Manager for handling read replica connections and health checks.
     """
     
+    # alias -> (monotonic time of the check, usable)
+    _lag_checks = {}
+    
     @staticmethod
     def get_replica_databases():
         """Get list of available replica databases."""
         replicas = []
         for db_name, db_config in settings.DATABASES.items():
-            if db_name != 'default' and 'replica' in db_name:
+            if db_name != 'default' and ('replica' in db_name or db_name == REPORTING_DATABASE):
                 replicas.append(db_name)
         return replicas
     
@@ -150,24 +262,28 @@ class ReadReplicaManager:
         return replica_status
     
     @staticmethod
-    def get_replica_lag():
+    def get_replica_lag(replicas=None):
         """Get replication lag for PostgreSQL replicas."""
         from django.db import connections
         
         lag_info = {}
-        replicas = ReadReplicaManager.get_replica_databases()
+        if replicas is None:
+            replicas = ReadReplicaManager.get_replica_databases()
         
         for replica_name in replicas:
             try:
                 connection = connections[replica_name]
                 if connection.vendor == 'postgresql':
                     with connection.cursor() as cursor:
+                        # A replica that has replayed everything it received
+                        # is current, however old its last replayed
+                        # transaction is (e.g. behind an idle primary)
                         cursor.execute("""
                             SELECT 
                                 CASE 
-                                    WHEN pg_is_in_recovery() THEN 
-                                        EXTRACT(EPOCH FROM (now() - pg_last_xact_replay_timestamp()))
-                                    ELSE 0 
+                                    WHEN NOT pg_is_in_recovery() THEN 0
+                                    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                                    ELSE EXTRACT(EPOCH FROM (now() - pg_last_xact_replay_timestamp()))
                                 END as lag_seconds;
                         """)
                         result = cursor.fetchone()
@@ -177,6 +293,42 @@ class ReadReplicaManager:
         
         return lag_info
     
+    @classmethod
+    def is_database_usable(cls, alias):
+        """
+        Whether a replica is close enough to the primary to serve reads.
+        Lag is checked at most once per LAG_CHECK_INTERVAL per alias.
+        Replicas on backends without a lag query (e.g. SQLite copies) are
+        always usable. A PostgreSQL replica is not usable when its lag is
+        unknown (None, nothing replayed yet) or the lag check fails.
+        PostgreSQL reports lag as numeric, which arrives as a Decimal.
+        """
+        now = time.monotonic()
+        checked = cls._lag_checks.get(alias)
+        if checked and now - checked[0] < get_routing_setting('LAG_CHECK_INTERVAL'):
+            return checked[1]
+        
+        lag_info = cls.get_replica_lag([alias])
+        if alias not in lag_info:
+            # Backend without a lag query
+            usable = True
+        else:
+            try:
+                usable = float(lag_info[alias]) <= get_routing_setting('MAX_REPLICA_LAG')
+            except (TypeError, ValueError):
+                # Unknown lag (None) or an error message from the lag check
+                usable = False
+        cls._lag_checks[alias] = (now, usable)
+        return usable
+    
+    @classmethod
+    def get_usable_database(cls, aliases):
+        """First configured alias that is not lagging, else the primary."""
+        for alias in aliases:
+            if alias in settings.DATABASES and cls.is_database_usable(alias):
+                return alias
+        return 'default'
+    
     @staticmethod
     def force_primary_db():
         """Context manager to force using primary database."""
@@ -214,6 +366,24 @@ class EnhancedDatabaseRouter(DatabaseRouter):
 
 
 # Utility functions for database operations
+def get_reporting_database():
+    """Alias analytics reads should use right now."""
+    from django.db import transaction
+    
+    if is_pinned_to_primary() or transaction.get_connection().in_atomic_block:
+        return 'default'
+    return ReadReplicaManager.get_usable_database(get_routing_setting('REPORTING_DATABASES'))
+
+
+def using_reporting_db(queryset):
+    """
+    Bind a queryset to the reporting database.
+    Needed for querysets evaluated after the routing context ends, such as
+    those behind streaming responses.
+    """
+    return queryset.using(get_reporting_database())
+
+
 def using_replica(queryset):
     """Force a queryset to use replica database."""
     if 'replica' in settings.DATABASES:
@@ -228,14 +398,25 @@ def using_primary(queryset):
 
 def with_read_replica(func):
     """Decorator to use read replica for a function."""
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        # This would set a context variable to prefer replica
-        return func(*args, **kwargs)
+        with use_read_replica():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def with_reporting_db(func):
+    """Decorator to send a function's reads to the reporting database."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with use_reporting_db():
+            return func(*args, **kwargs)
     return wrapper
 
 
 def with_primary_db(func):
     """Decorator to force using primary database."""
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
         with ReadReplicaManager.force_primary_db():
             return func(*args, **kwargs)
@@ -0,0 +1,166 @@
+"""
+Low-overhead request instrumentation.
+Queries and database time are counted by an execute wrapper installed on
+every database connection, and cache hits, misses and latency by the
+instrumented cache backends (cache_backends.py), so both work with DEBUG
+off. Each request's totals are buffered per process and observed into
+the Prometheus histograms every few seconds instead of on every request.
+"""
+
+import atexit
+import contextvars
+import threading
+import time
+
+from django.conf import settings
+
+from .monitoring import PROMETHEUS_AVAILABLE
+
+# Seconds between writes of the aggregates to Prometheus
+DEFAULT_FLUSH_INTERVAL = 10
+
+_request_stats = contextvars.ContextVar('request_stats', default=None)
+
+
+class RequestStats:
+    """Query and cache totals of one request."""
+
+    __slots__ = ('queries', 'db_time', 'cache_hits', 'cache_misses', 'cache_time')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_time = 0.0
+
+
+def start_request_stats() -> RequestStats:
+    """Start counting for the current request (or task)."""
+    stats = RequestStats()
+    _request_stats.set(stats)
+    return stats
+
+
+def end_request_stats() -> None:
+    """Stop counting for the current request."""
+    _request_stats.set(None)
+
+
+def get_request_stats():
+    """Totals of the current request, or None outside a counted request."""
+    return _request_stats.get()
+
+
+def query_counter(execute, sql, params, many, context):
+    """Execute wrapper counting the queries and database time of the current request."""
+    stats = _request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - start
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """connection_created receiver adding query_counter to a connection once."""
+    if query_counter not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_counter)
+
+
+def record_cache_access(hits: int = 0, misses: int = 0, duration: float = 0.0) -> None:
+    """Add cache hits, misses and time to the current request's totals."""
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.cache_hits += hits
+        stats.cache_misses += misses
+        stats.cache_time += duration
+
+
+class MetricsAggregator:
+    """
+    Per-process buffer of the request histogram observations.
+    Requests only append their values under a lock; the values are observed
+    into Prometheus in one batch per flush interval, outside the request
+    path, since in multiprocess mode every Prometheus update is a write to
+    a shared file.
+
+    Usage:
+        metrics_aggregator.observe_request('sales:bulk-seat-availability', 'GET', 200, 0.012, stats)
+        metrics_aggregator.maybe_flush()
+    """
+
+    def __init__(self, flush_interval=None):
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._cache_results = {'hit': 0, 'miss': 0}
+        self._last_flush = time.monotonic()
+
+    def _get_flush_interval(self):
+        if self.flush_interval is not None:
+            return self.flush_interval
+        return getattr(settings, 'PERFORMANCE_MONITORING', {}).get(
+            'METRICS_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL
+        )
+
+    def _observe(self, histogram, labels, value):
+        """Buffer a value for a histogram child; the caller holds the lock."""
+        self._histograms.setdefault((histogram, labels), []).append(value)
+
+    def observe_request(self, endpoint: str, method: str, status_code: int,
+                        duration: float, stats: RequestStats) -> None:
+        """Aggregate one request's duration, queries, database and cache time."""
+        if not PROMETHEUS_AVAILABLE:
+            return
+
+        from . import monitoring
+
+        status = f"{status_code // 100}xx"
+        with self._lock:
+            self._observe(monitoring.REQUEST_DURATION_HISTOGRAM, (endpoint, method, status), duration)
+            self._observe(monitoring.REQUEST_QUERIES_HISTOGRAM, (endpoint, method), stats.queries)
+            self._observe(monitoring.REQUEST_DB_DURATION_HISTOGRAM, (endpoint, method), stats.db_time)
+            if stats.cache_hits or stats.cache_misses or stats.cache_time:
+                self._observe(
+                    monitoring.REQUEST_CACHE_DURATION_HISTOGRAM, (endpoint, method), stats.cache_time
+                )
+            self._cache_results['hit'] += stats.cache_hits
+            self._cache_results['miss'] += stats.cache_misses
+
+    def maybe_flush(self) -> None:
+        """Flush if the flush interval has passed since the last flush."""
+        if time.monotonic() - self._last_flush >= self._get_flush_interval():
+            self.flush()
+
+    def flush(self) -> None:
+        """Observe the buffered values into the Prometheus metrics and start over."""
+        with self._lock:
+            histograms, self._histograms = self._histograms, {}
+            cache_results, self._cache_results = self._cache_results, {'hit': 0, 'miss': 0}
+            self._last_flush = time.monotonic()
+
+        if not PROMETHEUS_AVAILABLE:
+            return
+
+        from . import monitoring
+
+        for (histogram, labels), values in histograms.items():
+            child = histogram.labels(*labels)
+            for value in values:
+                child.observe(value)
+
+        for result, count in cache_results.items():
+            if count:
+                monitoring.CACHE_OPERATIONS_COUNTER.labels(operation='get', result=result).inc(count)
+
+
+# Global metrics aggregator instance
+metrics_aggregator = MetricsAggregator()
+
+# Workers exiting between flushes keep their last observations
+atexit.register(metrics_aggregator.flush)
@@ -0,0 +1,139 @@
+"""
+Management command to benchmark the sales, pricing, ticketing and
+reporting hot paths against a seeded venue.
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from venezuelan_pos.apps.tenants.middleware import tenant_context
+from venezuelan_pos.core.benchmarks import (
+    BENCHMARK_CASES, DEFAULT_VENUE, benchmark_report, compare_results, run_benchmarks, seed_venue
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark lock_items, checkout_confirm, calculate_seat_price, ticket generation and '
+        'validation, and the sales report and heat map against a seeded venue. '
+        'The venue is rolled back afterwards unless --keep-data is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--benchmark',
+            action='append',
+            choices=list(BENCHMARK_CASES),
+            dest='benchmarks',
+            help='Benchmark to run (repeatable; default: all)'
+        )
+        parser.add_argument('--rounds', type=int, default=20, help='Timed rounds per benchmark')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed rounds before the timed ones')
+        for option, help_text in [
+            ('numbered_zones', 'Numbered zones'),
+            ('rows', 'Rows per numbered zone'),
+            ('seats_per_row', 'Seats per row'),
+            ('general_zones', 'General admission zones'),
+            ('general_capacity', 'Capacity per general zone'),
+            ('stages', 'Price stages'),
+            ('prior_sales', 'Completed sales seeded before the run'),
+            ('cart_size', 'Seats per cart'),
+            ('seed', 'Random seed for the prior sales'),
+        ]:
+            parser.add_argument(
+                f"--{option.replace('_', '-')}",
+                type=int,
+                dest=option,
+                help=f"{help_text} (default: {DEFAULT_VENUE[option]})"
+            )
+        parser.add_argument('--label', default='', help='Label stored with the results, e.g. the change under test')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--compare', help='Results JSON of an earlier run to compare medians with')
+        parser.add_argument(
+            '--fail-threshold',
+            type=float,
+            help='Exit with an error if a median is this many percent slower than in --compare'
+        )
+        parser.add_argument(
+            '--keep-data',
+            action='store_true',
+            help='Commit the seeded venue instead of rolling it back'
+        )
+
+    def handle(self, *args, **options):
+        previous = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    previous = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read {options['compare']}: {e}")
+
+        venue_options = {key: options[key] for key in DEFAULT_VENUE}
+
+        # Benchmarks roll their own changes back; the seeded venue goes with
+        # the outer transaction unless it is kept
+        with transaction.atomic():
+            self.stdout.write('Seeding benchmark venue...')
+            venue = seed_venue(**venue_options)
+            with tenant_context(venue.tenant):
+                results = run_benchmarks(
+                    venue, names=options['benchmarks'], rounds=options['rounds'], warmup=options['warmup']
+                )
+            report = benchmark_report(results, venue, label=options['label'])
+            if not options['keep_data']:
+                transaction.set_rollback(True)
+
+        self.display_results(results)
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2, default=str)
+                f.write('\n')
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        if previous is not None:
+            self.display_comparison(compare_results(previous, report), options['fail_threshold'])
+
+        if any('error' in result for result in results.values()):
+            raise CommandError('Some benchmarks failed')
+
+    def display_results(self, results):
+        """Display benchmark results."""
+        self.stdout.write(self.style.SUCCESS('\n=== HOT PATH BENCHMARK RESULTS ===\n'))
+        self.stdout.write(
+            f"{'benchmark':<30}{'median':>10}{'p95':>10}{'mean':>10}{'stdev':>10}{'queries':>9}{'db':>10}"
+        )
+        for name, result in results.items():
+            if 'error' in result:
+                self.stdout.write(self.style.ERROR(f"{name:<30}{result['error']}"))
+                continue
+            self.stdout.write(
+                f"{name:<30}{result['median_ms']:>8.2f}ms{result['p95_ms']:>8.2f}ms"
+                f"{result['mean_ms']:>8.2f}ms{result['stdev_ms']:>8.2f}ms"
+                f"{result['queries']:>9.1f}{result['db_ms']:>8.2f}ms"
+            )
+
+    def display_comparison(self, comparison, fail_threshold=None):
+        """Display median changes against an earlier run."""
+        self.stdout.write(self.style.SUCCESS('\n=== CHANGE AGAINST EARLIER RUN ===\n'))
+        regressions = []
+        for name, change in comparison.items():
+            line = (
+                f"{name:<30}{change['previous_ms']:>8.2f}ms -> {change['current_ms']:>8.2f}ms "
+                f"({change['change_pct']:+.1f}%)"
+            )
+            if fail_threshold is not None and change['change_pct'] > fail_threshold:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(line))
+            elif change['change_pct'] > 0:
+                self.stdout.write(self.style.WARNING(line))
+            else:
+                self.stdout.write(self.style.SUCCESS(line))
+
+        if regressions:
+            raise CommandError(
+                f"Slower than the earlier run by more than {fail_threshold}%: {', '.join(regressions)}"
+            )
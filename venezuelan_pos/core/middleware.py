@@ -2,13 +2,14 @@
 Performance monitoring middleware for Venezuelan POS System.
 """
 
+import random
 import time
 import logging
 import structlog
 from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
-from django.db import connection
-from django.core.cache import cache
+
+from .instrumentation import end_request_stats, metrics_aggregator, start_request_stats
 
 # Get structured logger
 logger = structlog.get_logger('venezuelan_pos.performance')
@@ -17,57 +18,83 @@ security_logger = structlog.get_logger('venezuelan_pos.security')
 
 class PerformanceMonitoringMiddleware(MiddlewareMixin):
     """
-    Middleware to monitor request performance and log metrics.
+    Middleware to monitor request performance.
+    Every request's duration, query count, database and cache time go to
+    the Prometheus request histograms (core.instrumentation). The detailed
+    request log is sampled at PROFILE_SAMPLE_RATE; slow requests and
+    requests with excessive queries are always logged.
     """
     
     def process_request(self, request):
-        """Start timing the request."""
-        request._performance_start_time = time.time()
-        request._performance_queries_start = len(connection.queries)
+        """Start timing and counting the request."""
+        request._performance_start_time = time.perf_counter()
+        request._performance_stats = start_request_stats()
+        sample_rate = getattr(settings, 'PERFORMANCE_MONITORING', {}).get('PROFILE_SAMPLE_RATE', 1.0)
+        request._performance_sampled = random.random() < sample_rate
         return None
     
     def process_response(self, request, response):
-        """Log performance metrics for the request."""
+        """Record performance metrics for the request."""
         if not hasattr(request, '_performance_start_time'):
             return response
         
         # Calculate timing
-        duration = time.time() - request._performance_start_time
-        query_count = len(connection.queries) - request._performance_queries_start
+        duration = time.perf_counter() - request._performance_start_time
+        stats = request._performance_stats
+        end_request_stats()
+        query_count = stats.queries
+        
+        metrics_aggregator.observe_request(
+            self._get_endpoint(request), request.method, response.status_code, duration, stats
+        )
+        metrics_aggregator.maybe_flush()
+        
+        monitoring_settings = getattr(settings, 'PERFORMANCE_MONITORING', {})
+        slow_threshold = monitoring_settings.get('SLOW_QUERY_THRESHOLD', 0.5)
+        query_threshold = monitoring_settings.get('EXCESSIVE_QUERY_THRESHOLD', 10)
+        is_slow = duration > slow_threshold
+        is_excessive = query_count > query_threshold
+        if not (request._performance_sampled or is_slow or is_excessive):
+            return response
         
         # Get tenant info if available
         tenant_id = getattr(request, 'tenant_id', None)
-        user_id = request.user.id if request.user.is_authenticated else None
+        user = getattr(request, 'user', None)
+        user_id = user.id if user is not None and user.is_authenticated else None
         
         # Log performance metrics
-        logger.info(
-            "request_completed",
-            method=request.method,
-            path=request.path,
-            status_code=response.status_code,
-            duration_ms=round(duration * 1000, 2),
-            query_count=query_count,
-            tenant_id=str(tenant_id) if tenant_id else None,
-            user_id=user_id,
-            user_agent=request.META.get('HTTP_USER_AGENT', ''),
-            remote_addr=self._get_client_ip(request),
-        )
+        if request._performance_sampled:
+            logger.info(
+                "request_completed",
+                method=request.method,
+                path=request.path,
+                status_code=response.status_code,
+                duration_ms=round(duration * 1000, 2),
+                query_count=query_count,
+                db_time_ms=round(stats.db_time * 1000, 2),
+                cache_hits=stats.cache_hits,
+                cache_misses=stats.cache_misses,
+                tenant_id=str(tenant_id) if tenant_id else None,
+                user_id=user_id,
+                user_agent=request.META.get('HTTP_USER_AGENT', ''),
+                remote_addr=self._get_client_ip(request),
+            )
         
         # Log slow requests
-        slow_threshold = getattr(settings, 'PERFORMANCE_MONITORING', {}).get('SLOW_QUERY_THRESHOLD', 0.5)
-        if duration > slow_threshold:
+        if is_slow:
             logger.warning(
                 "slow_request_detected",
                 method=request.method,
                 path=request.path,
                 duration_ms=round(duration * 1000, 2),
                 query_count=query_count,
+                db_time_ms=round(stats.db_time * 1000, 2),
                 tenant_id=str(tenant_id) if tenant_id else None,
                 user_id=user_id,
             )
         
         # Log excessive database queries
-        if query_count > 10:
+        if is_excessive:
             logger.warning(
                 "excessive_queries_detected",
                 method=request.method,
@@ -79,6 +106,13 @@ class PerformanceMonitoringMiddleware(MiddlewareMixin):
         
         return response
     
+    def _get_endpoint(self, request):
+        """Low-cardinality endpoint label: the resolved view name."""
+        resolver_match = getattr(request, 'resolver_match', None)
+        if resolver_match is None:
+            return 'unresolved'
+        return resolver_match.view_name or resolver_match.route
+    
     def _get_client_ip(self, request):
         """Get the client IP address from the request."""
         x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
@@ -176,28 +210,57 @@ class SecurityMonitoringMiddleware(MiddlewareMixin):
 
 class CacheMonitoringMiddleware(MiddlewareMixin):
     """
-    Middleware to monitor cache performance and hit rates.
+    Middleware to log cache hit rates of sampled requests.
+    Hits and misses are counted by the instrumented cache backends into the
+    stats PerformanceMonitoringMiddleware keeps for the request.
+    """
+    
+    def process_response(self, request, response):
+        """Log cache performance metrics."""
+        stats = getattr(request, '_performance_stats', None)
+        if stats is None or not getattr(request, '_performance_sampled', False):
+            return response
+        
+        total_cache_ops = stats.cache_hits + stats.cache_misses
+        if total_cache_ops > 0:
+            hit_rate = stats.cache_hits / total_cache_ops * 100
+            logger.info(
+                "cache_performance",
+                path=request.path,
+                cache_hits=stats.cache_hits,
+                cache_misses=stats.cache_misses,
+                hit_rate_percent=round(hit_rate, 2),
+                cache_time_ms=round(stats.cache_time * 1000, 2),
+            )
+        
+        return response
+
+class DatabaseRoutingMiddleware(MiddlewareMixin):
+    """
+    Read-your-writes stickiness for replica routing.
+    Once a request writes, its remaining reads use the primary, and the
+    client's reads stay there for READ_YOUR_WRITES_WINDOW seconds while
+    replicas catch up.
     """
     
     def process_request(self, request):
-        """Initialize cache monitoring for the request."""
-        request._cache_hits = 0
-        request._cache_misses = 0
+        """Open a routing scope, pinned if the client wrote recently."""
+        from .db_router import PIN_COOKIE, start_routing_scope
+        
+        start_routing_scope(pinned=PIN_COOKIE in request.COOKIES)
         return None
     
     def process_response(self, request, response):
-        """Log cache performance metrics."""
-        if hasattr(request, '_cache_hits') and hasattr(request, '_cache_misses'):
-            total_cache_ops = request._cache_hits + request._cache_misses
-            hit_rate = (request._cache_hits / total_cache_ops * 100) if total_cache_ops > 0 else 0
-            
-            if total_cache_ops > 0:
-                logger.info(
-                    "cache_performance",
-                    path=request.path,
-                    cache_hits=request._cache_hits,
-                    cache_misses=request._cache_misses,
-                    hit_rate_percent=round(hit_rate, 2),
-                )
+        """Close the routing scope and pin the client if the request wrote."""
+        from .db_router import PIN_COOKIE, end_routing_scope, get_routing_setting
+        
+        if end_routing_scope():
+            response.set_cookie(
+                PIN_COOKIE,
+                '1',
+                max_age=get_routing_setting('READ_YOUR_WRITES_WINDOW'),
+                httponly=True,
+                samesite='Lax'
+            )
         
-        return response
\ No newline at end of file
+        return response
@@ -11,6 +11,12 @@ from django.db import connection
 from django.conf import settings
 from contextlib import contextmanager
 
+# Buckets of the request histograms fed by core.instrumentation
+REQUEST_DURATION_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+REQUEST_QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, float("inf"))
+REQUEST_DB_DURATION_BUCKETS = (.001, .005, .01, .025, .05, .1, .25, .5, 1.0, 2.5, float("inf"))
+REQUEST_CACHE_DURATION_BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, float("inf"))
+
 # Prometheus metrics
 try:
     from prometheus_client import Counter, Histogram, Gauge, Summary
@@ -73,6 +79,35 @@ try:
         ['tenant_id']
     )
     
+    # Request metrics (core.instrumentation)
+    REQUEST_DURATION_HISTOGRAM = Histogram(
+        'venezuelan_pos_request_duration_seconds',
+        'Request processing time',
+        ['endpoint', 'method', 'status'],
+        buckets=REQUEST_DURATION_BUCKETS
+    )
+    
+    REQUEST_QUERIES_HISTOGRAM = Histogram(
+        'venezuelan_pos_request_queries',
+        'Database queries per request',
+        ['endpoint', 'method'],
+        buckets=REQUEST_QUERY_BUCKETS
+    )
+    
+    REQUEST_DB_DURATION_HISTOGRAM = Histogram(
+        'venezuelan_pos_request_db_duration_seconds',
+        'Database time per request',
+        ['endpoint', 'method'],
+        buckets=REQUEST_DB_DURATION_BUCKETS
+    )
+    
+    REQUEST_CACHE_DURATION_HISTOGRAM = Histogram(
+        'venezuelan_pos_request_cache_duration_seconds',
+        'Cache time per request',
+        ['endpoint', 'method'],
+        buckets=REQUEST_CACHE_DURATION_BUCKETS
+    )
+    
     PROMETHEUS_AVAILABLE = True
 except ImportError:
     PROMETHEUS_AVAILABLE = False
@@ -0,0 +1,160 @@
+"""
+pytest plugin recording query counts against a baseline file.
+The queries of each test's call phase and the largest count of every
+budgeted block (core/query_budget.py) it ran are compared with the
+baseline; a passing test that now runs more queries fails. For unittest
+style tests the call phase covers setUp, the test and tearDown; pytest
+fixtures, setUpClass and setUpTestData run before it and are not counted.
+Query budgets raise during test runs.
+
+    pytest                              # compare with query_baseline.json
+    pytest --update-query-baseline      # record the current counts
+    pytest --no-query-baseline          # neither
+
+Loaded by the project conftest.py. Settings in pytest.ini:
+    query_baseline = query_baseline.json
+    query_baseline_tolerance = 0        # extra queries allowed
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('query budgets')
+    group.addoption(
+        '--query-baseline',
+        dest='query_baseline',
+        help='Query count baseline file (default: the query_baseline ini value)',
+    )
+    group.addoption(
+        '--update-query-baseline',
+        action='store_true',
+        dest='update_query_baseline',
+        help='Write the query counts of passing tests to the baseline file',
+    )
+    group.addoption(
+        '--no-query-baseline',
+        action='store_true',
+        dest='no_query_baseline',
+        help='Do not compare query counts with the baseline',
+    )
+    parser.addini('query_baseline', 'Query count baseline file', default='query_baseline.json')
+    parser.addini('query_baseline_tolerance', 'Queries allowed over the baseline', default='0')
+
+
+def pytest_configure(config):
+    from venezuelan_pos.core.query_budget import set_query_budget_mode
+
+    set_query_budget_mode('raise')
+    if not config.getoption('no_query_baseline'):
+        config.pluginmanager.register(QueryBaselinePlugin(config), 'query_baseline')
+
+
+def pytest_unconfigure(config):
+    from venezuelan_pos.core.query_budget import set_query_budget_mode
+
+    set_query_budget_mode(None)
+
+
+class QueryBaselinePlugin:
+    """Counts each test's queries and compares them with the baseline."""
+
+    def __init__(self, config):
+        path = config.getoption('query_baseline') or config.getini('query_baseline')
+        self.path = Path(config.rootpath, path)
+        self.update = config.getoption('update_query_baseline')
+        self.tolerance = int(config.getini('query_baseline_tolerance'))
+        self.baseline = self._load()
+        self.tests = {}
+        self.blocks = {}
+        self.regressions = {}
+        self._current_blocks = None
+
+    def _load(self):
+        if not self.path.exists():
+            return {'tests': {}, 'blocks': {}}
+        with open(self.path) as f:
+            baseline = json.load(f)
+        baseline.setdefault('tests', {})
+        baseline.setdefault('blocks', {})
+        return baseline
+
+    def _record_block(self, budget):
+        if self._current_blocks is not None and budget.name:
+            self._current_blocks[budget.name] = max(
+                self._current_blocks.get(budget.name, 0), budget.query_count
+            )
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        from venezuelan_pos.core.query_budget import (
+            QueryBudget, add_budget_recorder, remove_budget_recorder
+        )
+
+        self._current_blocks = {}
+        counter = QueryBudget(max_duplicates=None, mode='warn')
+        add_budget_recorder(self._record_block)
+        try:
+            with counter:
+                yield
+        finally:
+            remove_budget_recorder(self._record_block)
+            item._query_count = counter.query_count
+            item._query_blocks = self._current_blocks
+            self._current_blocks = None
+
+    def _find_regressions(self, nodeid, count, blocks):
+        regressions = []
+        expected = self.baseline['tests'].get(nodeid)
+        if expected is not None and count > expected + self.tolerance:
+            regressions.append(f"test ran {count} queries, baseline {expected}")
+        for name, block_count in blocks.items():
+            expected = self.baseline['blocks'].get(name)
+            if expected is not None and block_count > expected + self.tolerance:
+                regressions.append(f"{name} ran {block_count} queries, baseline {expected}")
+        return regressions
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        report = outcome.get_result()
+        if report.when != 'call' or not report.passed or not hasattr(item, '_query_count'):
+            return
+
+        self.tests[item.nodeid] = item._query_count
+        for name, count in item._query_blocks.items():
+            self.blocks[name] = max(self.blocks.get(name, 0), count)
+
+        if self.update:
+            return
+        regressions = self._find_regressions(item.nodeid, item._query_count, item._query_blocks)
+        if regressions:
+            self.regressions[item.nodeid] = regressions
+            report.outcome = 'failed'
+            report.longrepr = "Query count regression: " + '; '.join(regressions)
+
+    def pytest_sessionfinish(self, session):
+        if not self.update:
+            return
+        # Tests and blocks not run this time keep their baseline
+        baseline = {
+            'tests': {**self.baseline['tests'], **self.tests},
+            'blocks': {**self.baseline['blocks'], **self.blocks},
+        }
+        with open(self.path, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.update:
+            terminalreporter.write_line(
+                f"Query baseline: {len(self.tests)} tests and {len(self.blocks)} budgeted blocks "
+                f"written to {self.path}"
+            )
+        elif self.regressions:
+            terminalreporter.section('query count regressions')
+            for nodeid, regressions in self.regressions.items():
+                terminalreporter.write_line(f"{nodeid}: {'; '.join(regressions)}")
@@ -0,0 +1,188 @@
+"""
+Query budgets.
+A budget caps the queries a view, service call or serializer may run, and
+how often one SQL statement may repeat within it, which is how an N+1
+pattern shows up:
+
+    @query_budget(max_queries=12, max_duplicates=3)
+    def zone_seat_map(request, event_id, zone_id):
+        ...
+
+    with query_budget(max_queries=4, name='ticket bulk validation'):
+        ...
+
+Writes that are meant to run once per row (one INSERT per ticket sold)
+can be let through the duplicate check by statement prefix:
+
+    @query_budget(allowed_duplicates=('INSERT INTO "digital_tickets"',))
+
+Statements are compared with their parameters left out, so the same
+lookup run once per row counts as duplicates. Savepoints and EXPLAIN
+statements (run by profilers) are not counted.
+
+Over-budget code raises QueryBudgetExceeded or logs a warning, depending on
+QUERY_BUDGETS['MODE'] ('raise', 'warn' or 'off'). Deployed code defaults to
+'warn', so a budget never fails a sale that has already committed; test
+runs raise. Every budgeted block's
+counts also go to the registered recorders, such as the pytest plugin
+(pytest_query_budget.py).
+"""
+
+import copy
+import logging
+import re
+from collections import Counter
+from contextlib import ContextDecorator, ExitStack
+from typing import Callable, List, Optional
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+MODES = ('raise', 'warn', 'off')
+
+IGNORED_PREFIXES = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT', 'EXPLAIN')
+
+# Repeats of one statement allowed when a budget does not say
+DEFAULT_MAX_DUPLICATES = 3
+
+_WHITESPACE = re.compile(r'\s+')
+# IN lists of different lengths are the same statement
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+
+_mode_override = None
+_recorders: List[Callable] = []
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A block ran more queries, or repeated a statement more often, than its budget allows."""
+
+
+def get_query_budget_mode() -> str:
+    """Current enforcement mode: 'raise', 'warn' or 'off'."""
+    if _mode_override is not None:
+        return _mode_override
+    return getattr(settings, 'QUERY_BUDGETS', {}).get('MODE', 'warn')
+
+
+def set_query_budget_mode(mode: Optional[str]) -> None:
+    """Override QUERY_BUDGETS['MODE'] (None restores the setting), e.g. in test runs."""
+    global _mode_override
+    if mode is not None and mode not in MODES:
+        raise ValueError(f"Query budget mode must be one of {', '.join(MODES)}")
+    _mode_override = mode
+
+
+def add_budget_recorder(recorder: Callable) -> None:
+    """Call recorder(budget) after every budgeted block."""
+    _recorders.append(recorder)
+
+
+def remove_budget_recorder(recorder: Callable) -> None:
+    if recorder in _recorders:
+        _recorders.remove(recorder)
+
+
+def normalize_sql(sql: str) -> str:
+    """Statement text shared by every execution of the same query."""
+    return _IN_LIST.sub('IN (%s)', _WHITESPACE.sub(' ', sql.strip()))
+
+
+class QueryBudget(ContextDecorator):
+    """
+    Counts the queries run on every database connection of the current
+    thread inside a block and checks them against the budget on exit.
+    Budgets nest; each counts everything inside it.
+    """
+
+    def __init__(self, max_queries: Optional[int] = None, max_duplicates: Optional[int] = DEFAULT_MAX_DUPLICATES,
+                 name: Optional[str] = None, mode: Optional[str] = None, allowed_duplicates: tuple = ()):
+        self.max_queries = max_queries
+        self.max_duplicates = max_duplicates
+        self.allowed_duplicates = tuple(allowed_duplicates)
+        self.name = name
+        self.mode = mode
+        self.statements = []
+        self._stack = None
+
+    def __call__(self, func):
+        if self.name is None:
+            self.name = f"{func.__module__}.{func.__qualname__}"
+        return super().__call__(func)
+
+    def _recreate_cm(self):
+        # A fresh budget per call of a decorated function, so recursive
+        # and concurrent calls keep their own counts
+        return copy.copy(self)
+
+    def _record(self, execute, sql, params, many, context):
+        if not sql.lstrip().upper().startswith(IGNORED_PREFIXES):
+            self.statements.append(sql)
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self.statements = []
+        self._stack = ExitStack()
+        if (self.mode or get_query_budget_mode()) != 'off':
+            for connection in connections.all():
+                self._stack.enter_context(connection.execute_wrapper(self._record))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stack.close()
+        for recorder in list(_recorders):
+            recorder(self)
+        if exc_type is None:
+            self.check()
+        return False
+
+    @property
+    def query_count(self) -> int:
+        return len(self.statements)
+
+    def duplicates(self) -> List[tuple]:
+        """(statement, executions) of statements run more than once, most repeated first."""
+        counts = Counter(normalize_sql(sql) for sql in self.statements)
+        return [(sql, count) for sql, count in counts.most_common() if count > 1]
+
+    def violations(self) -> List[str]:
+        """Descriptions of how the block exceeded its budget."""
+        violations = []
+        if self.max_queries is not None and self.query_count > self.max_queries:
+            violations.append(f"{self.query_count} queries, budget {self.max_queries}")
+        if self.max_duplicates is not None:
+            for sql, count in self.duplicates():
+                if count > self.max_duplicates and not sql.startswith(self.allowed_duplicates):
+                    violations.append(
+                        f"statement run {count} times, budget {self.max_duplicates}: {sql[:300]}"
+                    )
+        return violations
+
+    def check(self) -> None:
+        """Raise or log the budget's violations, per the enforcement mode."""
+        mode = self.mode or get_query_budget_mode()
+        if mode == 'off':
+            return
+
+        violations = self.violations()
+        if not violations:
+            return
+
+        message = f"Query budget of {self.name or 'block'} exceeded: " + '; '.join(violations)
+        if mode == 'raise':
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+def query_budget(max_queries: Optional[int] = None, max_duplicates: Optional[int] = DEFAULT_MAX_DUPLICATES,
+                 name: Optional[str] = None, mode: Optional[str] = None,
+                 allowed_duplicates: tuple = ()) -> QueryBudget:
+    """
+    Budget for a block or a function, usable as a context manager or
+    decorator. max_duplicates=None allows any number of repeats;
+    statements starting with one of allowed_duplicates may repeat freely.
+    """
+    return QueryBudget(max_queries=max_queries, max_duplicates=max_duplicates, name=name, mode=mode,
+                       allowed_duplicates=allowed_duplicates)
+
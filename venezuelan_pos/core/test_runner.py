@@ -0,0 +1,22 @@
+"""
+Test runner enforcing query budgets.
+"""
+
+from django.test.runner import DiscoverRunner
+
+from .query_budget import set_query_budget_mode
+
+
+class QueryBudgetTestRunner(DiscoverRunner):
+    """
+    Runs manage.py test with query budgets raising, like the pytest plugin
+    does, while deployed code only logs budget overruns.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        set_query_budget_mode('raise')
+
+    def teardown_test_environment(self, **kwargs):
+        set_query_budget_mode(None)
+        super().teardown_test_environment(**kwargs)
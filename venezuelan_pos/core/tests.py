@@ -2,12 +2,14 @@
 Tests for database optimizations and performance improvements.
 """
 
-from django.test import TestCase, TransactionTestCase
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
 from django.db import connection
 from django.conf import settings
 from django.core.management import call_command
 from venezuelan_pos.core.db_optimizations import QueryOptimizer, QueryPerformanceMonitor
 from venezuelan_pos.core.db_router import ReadReplicaManager
+from venezuelan_pos.core.instrumentation import end_request_stats, start_request_stats
+from venezuelan_pos.core.query_budget import QueryBudgetExceeded, query_budget
 from venezuelan_pos.apps.tenants.models import Tenant, User
 from venezuelan_pos.apps.events.models import Event, Venue
 from venezuelan_pos.apps.zones.models import Zone, Seat
@@ -135,6 +137,128 @@ class DatabaseRouterTestCase(TransactionTestCase):
         self.assertEqual(read_db, 'default')
 
 
+class ReportingDatabaseRoutingTestCase(SimpleTestCase):
+    """Test routing of analytics reads to the reporting database."""
+    
+    def setUp(self):
+        """Configure reporting and replica aliases without connecting to them."""
+        from unittest import mock
+        from venezuelan_pos.core.db_router import end_routing_scope
+        
+        databases = mock.patch.dict(settings.DATABASES, {
+            'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+            'reporting': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+        })
+        databases.start()
+        self.addCleanup(databases.stop)
+        
+        self.lag = {}
+        lag = mock.patch.object(
+            ReadReplicaManager, 'get_replica_lag',
+            side_effect=lambda replicas=None: {alias: self.lag.get(alias, 0) for alias in replicas}
+        )
+        lag.start()
+        self.addCleanup(lag.stop)
+        
+        ReadReplicaManager._lag_checks.clear()
+        self.addCleanup(ReadReplicaManager._lag_checks.clear)
+        self.addCleanup(end_routing_scope)
+    
+    def test_analytics_reads_use_reporting_database(self):
+        """Analytics reads go to the reporting alias, even for primary-only models."""
+        from django.contrib.auth.models import Group
+        from venezuelan_pos.core.db_router import EnhancedDatabaseRouter, use_reporting_db, with_reporting_db
+        from venezuelan_pos.apps.sales.models import Transaction
+        
+        router = EnhancedDatabaseRouter()
+        self.assertEqual(router.db_for_read(Transaction), 'default')
+        
+        with use_reporting_db():
+            self.assertEqual(router.db_for_read(Transaction), 'reporting')
+            self.assertEqual(router.db_for_read(Event), 'reporting')
+            self.assertEqual(router.db_for_read(Group), 'default')
+            self.assertEqual(router.db_for_write(Transaction), 'default')
+        
+        @with_reporting_db
+        def analytics():
+            return router.db_for_read(Transaction)
+        
+        self.assertEqual(analytics(), 'reporting')
+        self.assertEqual(router.db_for_read(Event), 'replica')
+    
+    def test_lagging_reporting_database_falls_back(self):
+        """Lagging or broken aliases are skipped until the next lag check."""
+        from venezuelan_pos.core.db_router import EnhancedDatabaseRouter, use_reporting_db
+        from venezuelan_pos.apps.sales.models import Transaction
+        
+        router = EnhancedDatabaseRouter()
+        self.lag = {'reporting': 120}
+        with use_reporting_db():
+            self.assertEqual(router.db_for_read(Transaction), 'replica')
+        
+        ReadReplicaManager._lag_checks.clear()
+        self.lag = {'reporting': 120, 'replica': 'error: connection refused'}
+        with use_reporting_db():
+            self.assertEqual(router.db_for_read(Transaction), 'default')
+            
+            # Recovery is noticed only after LAG_CHECK_INTERVAL
+            self.lag = {}
+            self.assertEqual(router.db_for_read(Transaction), 'default')
+    
+    def test_decimal_lag_is_usable(self):
+        """PostgreSQL reports lag as numeric, which psycopg2 returns as Decimal."""
+        from decimal import Decimal
+        
+        self.lag = {'reporting': Decimal('0.250613'), 'replica': Decimal('120.5')}
+        self.assertTrue(ReadReplicaManager.is_database_usable('reporting'))
+        self.assertFalse(ReadReplicaManager.is_database_usable('replica'))
+        
+        ReadReplicaManager._lag_checks.clear()
+        self.lag = {'reporting': None}
+        self.assertFalse(ReadReplicaManager.is_database_usable('reporting'))
+        
+        # Backends without a lag query report nothing and are always usable
+        from unittest import mock
+        ReadReplicaManager._lag_checks.clear()
+        with mock.patch.object(ReadReplicaManager, 'get_replica_lag', return_value={}):
+            self.assertTrue(ReadReplicaManager.is_database_usable('reporting'))
+    
+    def test_reads_stick_to_primary_after_write(self):
+        """A write pins the rest of the request, and the client briefly, to the primary."""
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+        from venezuelan_pos.core.db_router import EnhancedDatabaseRouter, PIN_COOKIE, use_reporting_db
+        from venezuelan_pos.core.middleware import DatabaseRoutingMiddleware
+        from venezuelan_pos.apps.sales.models import Transaction
+        
+        router = EnhancedDatabaseRouter()
+        
+        def view(request):
+            with use_reporting_db():
+                before = router.db_for_read(Transaction)
+                router.db_for_write(Transaction)
+                after = router.db_for_read(Transaction)
+            return HttpResponse(f"{before},{after}")
+        
+        middleware = DatabaseRoutingMiddleware(view)
+        response = middleware(RequestFactory().post('/'))
+        self.assertEqual(response.content, b'reporting,default')
+        self.assertIn(PIN_COOKIE, response.cookies)
+        
+        # Outside a request, writes do not pin anything
+        with use_reporting_db():
+            self.assertEqual(router.db_for_read(Transaction), 'reporting')
+        
+        # The next request of the same client reads from the primary
+        request = RequestFactory().get('/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        response = DatabaseRoutingMiddleware(lambda request: HttpResponse(
+            router.db_for_read(Event)
+        ))(request)
+        self.assertEqual(response.content, b'default')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+
 class OptimizationManagementCommandTestCase(TestCase):
     """Test database optimization management commands."""
     
@@ -227,4 +351,212 @@ class QueryOptimizationTestCase(TestCase):
         with self.assertNumQueries(2):  # 1 for events, 1 for zones
             events = Event.objects.prefetch_related('zones')
             for event in events:
-                list(event.zones.all())  # Force evaluation
\ No newline at end of file
+                list(event.zones.all())  # Force evaluation
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'venezuelan_pos.core.cache_backends.InstrumentedLocMemCache'}
+})
+class RequestInstrumentationTestCase(TestCase):
+    """Test query and cache counting without DEBUG."""
+    
+    def tearDown(self):
+        end_request_stats()
+    
+    def test_queries_are_counted(self):
+        """Test queries are counted through the execute wrapper."""
+        Tenant.objects.count()  # Connect
+        self.assertFalse(settings.DEBUG)
+        
+        from django.test.utils import CaptureQueriesContext
+        
+        stats = start_request_stats()
+        with CaptureQueriesContext(connection) as captured:
+            Tenant.objects.filter(slug="test-tenant").exists()
+            list(Tenant.objects.all())
+        end_request_stats()
+        Tenant.objects.count()
+        
+        self.assertGreaterEqual(stats.queries, 2)
+        self.assertEqual(stats.queries, len(captured))
+        self.assertGreater(stats.db_time, 0)
+    
+    def test_cache_hits_and_misses_are_counted(self):
+        """Test the instrumented backend counts reads, get_many() keys included, once."""
+        from django.core.cache import caches
+        
+        cache = caches['default']
+        stats = start_request_stats()
+        self.assertIsNone(cache.get('key'))
+        cache.set('key', 'value')
+        self.assertEqual(cache.get('key'), 'value')
+        self.assertEqual(cache.get_many(['key', 'other']), {'key': 'value'})
+        self.assertEqual(cache.get_or_set('new', 'default'), 'default')
+        
+        # get_or_set() reads the key again after adding it
+        self.assertEqual(stats.cache_hits, 3)
+        self.assertEqual(stats.cache_misses, 3)
+        self.assertGreater(stats.cache_time, 0)
+    
+    def test_aggregates_are_flushed_to_prometheus(self):
+        """Test aggregated observations reach the Prometheus histograms on flush."""
+        from prometheus_client import REGISTRY
+        from venezuelan_pos.core.instrumentation import MetricsAggregator, RequestStats
+        
+        labels = {'endpoint': 'test-endpoint', 'method': 'GET'}
+        
+        def sample(name, **extra):
+            return REGISTRY.get_sample_value(name, {**labels, **extra}) or 0
+        
+        before_count = sample('venezuelan_pos_request_queries_count')
+        before_bucket = sample('venezuelan_pos_request_queries_bucket', le='5.0')
+        
+        aggregator = MetricsAggregator(flush_interval=60)
+        for queries in (1, 3, 40):
+            stats = RequestStats()
+            stats.queries = queries
+            aggregator.observe_request('test-endpoint', 'GET', 200, 0.01, stats)
+        aggregator.maybe_flush()
+        self.assertEqual(sample('venezuelan_pos_request_queries_count'), before_count)
+        
+        aggregator.flush()
+        self.assertEqual(sample('venezuelan_pos_request_queries_count'), before_count + 3)
+        self.assertEqual(sample('venezuelan_pos_request_queries_bucket', le='5.0'), before_bucket + 2)
+        self.assertEqual(
+            sample('venezuelan_pos_request_duration_seconds_count', status='2xx'), 3
+        )
+
+
+class QueryBudgetTestCase(TestCase):
+    """Test query budgets."""
+    
+    def setUp(self):
+        """Set up test data."""
+        for index in range(3):
+            Tenant.objects.create(name=f"Tenant {index}", slug=f"tenant-{index}")
+    
+    def test_query_count_over_budget_raises(self):
+        """Test a block running more queries than its budget fails."""
+        with self.assertRaisesMessage(QueryBudgetExceeded, "3 queries, budget 2"):
+            with query_budget(max_queries=2, mode='raise'):
+                for tenant in Tenant.objects.all()[:1]:
+                    Tenant.objects.filter(pk=tenant.pk).exists()
+                    Tenant.objects.count()
+    
+    def test_repeated_statement_is_reported(self):
+        """Test the same lookup per row counts as duplicates whatever its parameters."""
+        with query_budget(max_duplicates=None, mode='raise') as budget:
+            for tenant in Tenant.objects.all():
+                Tenant.objects.get(pk=tenant.pk)
+        
+        self.assertEqual(budget.query_count, 4)
+        self.assertEqual(len(budget.duplicates()), 1)
+        self.assertEqual(budget.duplicates()[0][1], 3)
+        
+        with self.assertRaisesMessage(QueryBudgetExceeded, "statement run 3 times, budget 2"):
+            with query_budget(max_duplicates=2, mode='raise'):
+                for tenant in Tenant.objects.all():
+                    Tenant.objects.get(pk=tenant.pk)
+    
+    def test_allowed_duplicates_may_repeat(self):
+        """Test statements listed in allowed_duplicates pass the duplicate check."""
+        with query_budget(max_duplicates=1, mode='raise', allowed_duplicates=('UPDATE "tenants"',)):
+            for tenant in Tenant.objects.all():
+                Tenant.objects.filter(pk=tenant.pk).update(is_active=True)
+    
+    def test_warn_mode_logs(self):
+        """Test warn mode logs the violation instead of raising."""
+        with self.assertLogs('venezuelan_pos.core.query_budget', level='WARNING') as logs:
+            with query_budget(max_queries=0, mode='warn'):
+                Tenant.objects.count()
+        
+        self.assertIn("1 queries, budget 0", logs.output[0])
+    
+    def test_decorator_names_budget_after_function(self):
+        """Test decorated functions get a fresh budget named after them on every call."""
+        @query_budget(max_queries=1, mode='raise')
+        def count_tenants():
+            return Tenant.objects.count()
+        
+        @query_budget(max_queries=1, mode='raise')
+        def count_tenants_twice():
+            Tenant.objects.count()
+            return Tenant.objects.count()
+        
+        self.assertEqual(count_tenants(), 3)
+        self.assertEqual(count_tenants(), 3)
+        with self.assertRaisesMessage(QueryBudgetExceeded, "count_tenants_twice exceeded: 2 queries"):
+            count_tenants_twice()
+    
+    def test_tests_raise_while_deployed_code_warns(self):
+        """Test budgets raise in test runs, but warn by default outside them."""
+        from venezuelan_pos.core.query_budget import get_query_budget_mode, set_query_budget_mode
+        
+        self.assertEqual(get_query_budget_mode(), 'raise')
+        
+        set_query_budget_mode(None)
+        self.addCleanup(set_query_budget_mode, 'raise')
+        with override_settings(QUERY_BUDGETS={}):
+            self.assertEqual(get_query_budget_mode(), 'warn')
+            with self.assertLogs('venezuelan_pos.core.query_budget', level='WARNING'):
+                with query_budget(max_queries=0):
+                    Tenant.objects.count()
+
+
+class HotPathBenchmarkTestCase(TestCase):
+    """Test the hot path benchmark suite."""
+    
+    def setUp(self):
+        """Seed a small benchmark venue."""
+        from venezuelan_pos.core.benchmarks import seed_venue
+        
+        self.venue = seed_venue(
+            numbered_zones=1, rows=4, seats_per_row=5, general_zones=1,
+            general_capacity=50, stages=2, prior_sales=6, cart_size=2
+        )
+    
+    def test_venue_is_seeded(self):
+        """Test seats, stages and prior sales are seeded and half the seats stay free."""
+        from venezuelan_pos.apps.pricing.models import PriceStage
+        from venezuelan_pos.apps.sales.models import Transaction
+        
+        zone = self.venue.numbered_zones[0]
+        self.assertEqual(zone.seats.count(), 20)
+        self.assertEqual(len(self.venue.free_seat_ids), 10)
+        self.assertEqual(PriceStage.objects.filter(event=self.venue.event).count(), 2)
+        self.assertEqual(
+            Transaction.objects.filter(event=self.venue.event, status=Transaction.Status.COMPLETED).count(), 6
+        )
+        free_ids = {seat_id for seat_id, _zone_id in self.venue.free_seat_ids}
+        self.assertFalse(zone.seats.filter(id__in=free_ids).exclude(status=Seat.Status.AVAILABLE).exists())
+    
+    def test_benchmarks_report_timings_and_queries(self):
+        """Test a run reports round statistics per benchmark and compares medians."""
+        from venezuelan_pos.apps.tenants.middleware import tenant_context
+        from venezuelan_pos.core.benchmarks import benchmark_report, compare_results, run_benchmarks
+        
+        with tenant_context(self.venue.tenant):
+            results = run_benchmarks(
+                self.venue, names=['calculate_seat_price', 'generate_occupancy_heat_map'], rounds=3, warmup=1
+            )
+        
+        for name in ('calculate_seat_price', 'generate_occupancy_heat_map'):
+            self.assertNotIn('error', results[name])
+            self.assertEqual(results[name]['rounds'], 3)
+            self.assertGreater(results[name]['queries'], 0)
+            self.assertLessEqual(results[name]['min_ms'], results[name]['median_ms'])
+        
+        report = benchmark_report(results, self.venue, label='test')
+        previous = {'results': {'calculate_seat_price': {
+            **results['calculate_seat_price'], 'median_ms': results['calculate_seat_price']['median_ms'] / 2
+        }}}
+        comparison = compare_results(previous, report)
+        self.assertEqual(list(comparison), ['calculate_seat_price'])
+        self.assertAlmostEqual(comparison['calculate_seat_price']['change_pct'], 100.0)
+    
+    def test_exhausted_seats_are_reported_as_error(self):
+        """Test a benchmark needing more free seats than seeded fails with an error, not the run."""
+        from venezuelan_pos.core.benchmarks import run_benchmarks
+        
+        results = run_benchmarks(self.venue, names=['lock_items'], rounds=10, warmup=0)
+        
+        self.assertIn('free seats left', results['lock_items']['error'])
@@ -95,6 +95,9 @@ MIDDLEWARE = [
     # CORS
     "corsheaders.middleware.CorsMiddleware",
     
+    # Read-your-writes database routing
+    "venezuelan_pos.core.middleware.DatabaseRoutingMiddleware",
+    
     # Sessions and Common
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",  # i18n support
@@ -176,6 +179,22 @@ DATABASES = {
         },
         'CONN_MAX_AGE': 600,
         'CONN_HEALTH_CHECKS': True,
+    },
+    # Analytics and reporting reads, kept off the primary
+    'reporting': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': config('DB_REPORTING_NAME', default=config('DB_REPLICA_NAME', default=config('DB_NAME', default='venezuelan_pos'))),
+        'USER': config('DB_REPORTING_USER', default=config('DB_REPLICA_USER', default=config('DB_USER', default='postgres'))),
+        'PASSWORD': config('DB_REPORTING_PASSWORD', default=config('DB_REPLICA_PASSWORD', default=config('DB_PASSWORD', default='password'))),
+        'HOST': config('DB_REPORTING_HOST', default=config('DB_REPLICA_HOST', default=config('DB_HOST', default='localhost'))),
+        'PORT': config('DB_REPORTING_PORT', default=config('DB_REPLICA_PORT', default=config('DB_PORT', default='5432'))),
+        'OPTIONS': {
+            'connect_timeout': 10,
+            'sslmode': config('DB_SSL_MODE', default='prefer'),
+        },
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'TEST': {'MIRROR': 'default'},
     }
 }
 
@@ -193,9 +212,22 @@ if not DEBUG and config('DB_POOL_ENABLED', default=False, cast=bool):
         'MAX_CONNS': config('DB_REPLICA_MAX_CONNS', default=15, cast=int),
         'MIN_CONNS': config('DB_REPLICA_MIN_CONNS', default=3, cast=int),
     })
+    
+    DATABASES['reporting']['ENGINE'] = 'django_db_pool.backends.postgresql'
+    DATABASES['reporting']['OPTIONS'].update({
+        'MAX_CONNS': config('DB_REPORTING_MAX_CONNS', default=10, cast=int),
+        'MIN_CONNS': config('DB_REPORTING_MIN_CONNS', default=2, cast=int),
+    })
 
 # Database Router for Read Replicas
-DATABASE_ROUTERS = ['venezuelan_pos.core.db_router.DatabaseRouter']
+DATABASE_ROUTERS = ['venezuelan_pos.core.db_router.EnhancedDatabaseRouter']
+
+DATABASE_ROUTING = {
+    'REPORTING_DATABASES': ['reporting', 'replica'],  # Tried in order for analytics reads
+    'MAX_REPLICA_LAG': config('DB_MAX_REPLICA_LAG', default=30, cast=int),  # Seconds
+    'LAG_CHECK_INTERVAL': 10,  # Seconds between lag checks per alias
+    'READ_YOUR_WRITES_WINDOW': 5,  # Seconds a client reads from primary after writing
+}
 
 # Use SQLite for development if PostgreSQL is not available
 if DEBUG and not config('DB_NAME', default=None):
@@ -205,6 +237,14 @@ if DEBUG and not config('DB_NAME', default=None):
             'NAME': BASE_DIR / 'db.sqlite3',
         }
     }
+    
+    # Optional local reporting copy, e.g. DB_REPORTING_SQLITE=reporting.sqlite3
+    if config('DB_REPORTING_SQLITE', default=None):
+        DATABASES['reporting'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / config('DB_REPORTING_SQLITE'),
+            'TEST': {'MIRROR': 'default'},
+        }
 
 
 # Password validation
@@ -276,7 +316,8 @@ REDIS_CACHE_URL = config('REDIS_CACHE_URL', default='redis://localhost:6379/1')
 # Cache Configuration
 CACHES = {
     'default': {
-        'BACKEND': 'django_redis.cache.RedisCache',
+        # django-redis, counting cache hits, misses and latency per request
+        'BACKEND': 'venezuelan_pos.core.cache_backends.InstrumentedRedisCache',
         'LOCATION': REDIS_CACHE_URL,
         'OPTIONS': {
             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
@@ -614,8 +655,18 @@ PERFORMANCE_MONITORING = {
     'ENABLE_QUERY_PROFILING': DEBUG,
     'SLOW_QUERY_THRESHOLD': 0.5,  # Log queries slower than 500ms
     'ENABLE_REQUEST_PROFILING': DEBUG,
-    'PROFILE_SAMPLE_RATE': 0.1 if not DEBUG else 1.0,
+    'PROFILE_SAMPLE_RATE': 0.1 if not DEBUG else 1.0,  # Share of requests logged in detail
+    'EXCESSIVE_QUERY_THRESHOLD': 10,  # Log requests running more queries
+    'METRICS_FLUSH_INTERVAL': 10,  # Seconds between writes of request histograms to Prometheus
+}
+
+# Query budgets (venezuelan_pos.core.query_budget): 'raise', 'warn' or 'off'.
+# Budgeted views and services only log overruns; test runs (manage.py test
+# and pytest) raise instead.
+QUERY_BUDGETS = {
+    'MODE': config('QUERY_BUDGET_MODE', default='warn'),
 }
+TEST_RUNNER = 'venezuelan_pos.core.test_runner.QueryBudgetTestRunner'
 
 # Sentry Configuration for Error Tracking and Performance Monitoring
 SENTRY_DSN = config('SENTRY_DSN', default='')
@@ -759,8 +810,54 @@ CELERY_BEAT_SCHEDULE = {
             'expires': 120,  # Task expires after 2 minutes if not executed
         },
     },
+    'persist-admission-counters': {
+        'task': 'venezuelan_pos.apps.tickets.tasks.persist_admission_counters',
+        'schedule': 60.0,  # Every minute
+        'options': {
+            'expires': 30,  # Task expires after 30 seconds if not executed
+        },
+    },
+    'process-payment-outbox': {
+        'task': 'venezuelan_pos.apps.payments.tasks.process_payment_outbox',
+        'schedule': 30.0,  # Every 30 seconds
+        'options': {
+            'expires': 30,  # Task expires after 30 seconds if not executed
+        },
+    },
+    'flush-audit-log-buffer': {
+        'task': 'venezuelan_pos.apps.fiscal.tasks.flush_audit_log_buffer',
+        'schedule': 10.0,  # Every 10 seconds
+        'options': {
+            'expires': 10,  # Task expires after 10 seconds if not executed
+        },
+    },
+    'refresh-sales-rollups': {
+        'task': 'venezuelan_pos.apps.reports.tasks.refresh_sales_rollups',
+        'schedule': 60.0,  # Every minute
+        'options': {
+            'expires': 60,  # Task expires after 1 minute if not executed
+        },
+    },
+    'run-due-report-schedules': {
+        'task': 'venezuelan_pos.apps.reports.tasks.run_due_report_schedules',
+        'schedule': 60.0,  # Every minute
+        'options': {
+            'expires': 60,  # Task expires after 1 minute if not executed
+        },
+    },
+    'export-analytics-snapshots': {
+        'task': 'venezuelan_pos.apps.reports.tasks.export_analytics_snapshots',
+        'schedule': 3600.0,  # Every hour
+        'options': {
+            'expires': 1800,  # Task expires after 30 minutes if not executed
+        },
+    },
 }
 
+# Columnar analytics snapshots for offline BI
+ANALYTICS_SNAPSHOT_DIR = config('ANALYTICS_SNAPSHOT_DIR', default=str(BASE_DIR / 'analytics_snapshots'))
+ANALYTICS_SNAPSHOT_FORMAT = config('ANALYTICS_SNAPSHOT_FORMAT', default='parquet')  # parquet or arrow
+
 # Cart Lock Configuration
 CART_LOCK_DURATION_MINUTES = config('CART_LOCK_DURATION_MINUTES', default=15, cast=int)
 CART_LOCK_CLEANUP_INTERVAL = config('CART_LOCK_CLEANUP_INTERVAL', default=5, cast=int)